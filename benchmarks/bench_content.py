@@ -0,0 +1,103 @@
+"""
+Load-test archive content serving with a classroom of concurrent clients.
+
+Plants a synthetic lesson archive (a deflated HTML page, a stylesheet
+with a precompressed copy, and a stored video), serves it from a
+LocalServer on a loopback port, and has every client load the page and
+then stream the video in Range requests, as a tablet's player does.
+
+    python benchmarks/bench_content.py --clients 40 --video-mb 20
+"""
+
+import argparse
+import http.client
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from werkzeug.serving import make_server
+
+from eduseedbank.network.scheduler import percentile
+from eduseedbank.server.local_server import LocalServer
+
+
+def build_archive(path: str, video_mb: int):
+    page = b"<html><body>" + b"<p>Menanam padi di lahan kering.</p>" * 2000 + b"</body></html>"
+    with zipfile.ZipFile(path, "w") as zipf:
+        zipf.writestr("metadata.json", '{"title": "Bench lesson"}')
+        zipf.writestr("index.html", page, compress_type=zipfile.ZIP_DEFLATED)
+        zipf.writestr("style.css", b"p { margin: 0 }" * 100, compress_type=zipfile.ZIP_DEFLATED)
+        zipf.writestr("video.mp4", os.urandom(video_mb * 1024 * 1024))
+
+
+def client(port: int, video_size: int, range_bytes: int, latencies: list, totals: dict, lock):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    requests = [("/content/lesson/index.html", {"Accept-Encoding": "gzip"}),
+                ("/content/lesson/style.css", {"Accept-Encoding": "gzip"})]
+    for start in range(0, video_size, range_bytes):
+        end = min(start + range_bytes, video_size) - 1
+        requests.append(("/content/lesson/video.mp4", {"Range": f"bytes={start}-{end}"}))
+
+    received = 0
+    mine = []
+    for path, headers in requests:
+        began = time.perf_counter()
+        connection.request("GET", path, headers=headers)
+        response = connection.getresponse()
+        received += len(response.read())
+        mine.append(time.perf_counter() - began)
+        if response.status not in (200, 206):
+            raise RuntimeError(f"{path}: HTTP {response.status}")
+    connection.close()
+    with lock:
+        latencies.extend(mine)
+        totals["bytes"] += received
+
+
+def run(clients: int, video_mb: int, range_kb: int):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        archive = os.path.join(temp_dir, "lesson.seed")
+        build_archive(archive, video_mb)
+        server = LocalServer(content_dir=os.path.join(temp_dir, "content"))
+        server.plant_archive(archive)
+
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)  # No per-request log lines
+        httpd = make_server("127.0.0.1", 0, server.app, threaded=True)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        port = httpd.server_port
+
+        latencies, totals, lock = [], {"bytes": 0}, threading.Lock()
+        video_size = server.archives["lesson"].members["video.mp4"].size
+        threads = [threading.Thread(target=client, args=(port, video_size, range_kb * 1024,
+                                                         latencies, totals, lock))
+                   for _ in range(clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        httpd.shutdown()
+
+    print(f"{clients} clients, {video_mb} MB video in {range_kb} KB ranges")
+    print(f"  requests    {len(latencies):8d}  ({len(latencies) / elapsed:8.0f}/s)")
+    print(f"  transferred {totals['bytes'] / 1e6:8.1f} MB ({totals['bytes'] / 1e6 / elapsed:8.1f} MB/s)")
+    print(f"  latency p50 {percentile(latencies, 50) * 1000:8.1f} ms")
+    print(f"  latency p99 {percentile(latencies, 99) * 1000:8.1f} ms")
+    print(f"  wall time   {elapsed:8.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=40, help="Concurrent clients")
+    parser.add_argument("--video-mb", type=int, default=20, help="Size of the video member")
+    parser.add_argument("--range-kb", type=int, default=1024, help="Bytes per Range request")
+    args = parser.parse_args()
+    run(args.clients, args.video_mb, args.range_kb)
@@ -0,0 +1,99 @@
+"""
+Measure what request metrics cost.
+
+Times the raw recording operations (counter increment, histogram
+observation) from several threads at once, then the same API and
+content requests through LocalServer with request instrumentation on
+and off, and reports the difference per request.
+
+    python benchmarks/bench_metrics.py --threads 8 --requests 5000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.server.local_server import LocalServer
+from eduseedbank.server.metrics import MetricsRegistry
+
+
+def in_threads(threads: int, work):
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def time_recording(threads: int, operations: int):
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests", ("route", "method", "status"))
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",))
+
+    def count():
+        for _ in range(operations):
+            counter.inc("/api/seeds", "GET", "200")
+
+    def observe():
+        for _ in range(operations):
+            histogram.observe(0.003, "/api/seeds")
+
+    total = threads * operations
+    print(f"  counter inc        {in_threads(threads, count) / total * 1e9:8.0f} ns")
+    print(f"  histogram observe  {in_threads(threads, observe) / total * 1e9:8.0f} ns")
+    start = time.perf_counter()
+    registry.render()
+    print(f"  render             {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+
+def time_requests(temp_dir: str, threads: int, requests: int, instrumented: bool) -> float:
+    server = LocalServer(content_dir=os.path.join(temp_dir, f"content-{instrumented}"), metrics=instrumented)
+    with contextlib.redirect_stdout(io.StringIO()):
+        server.plant_archive(os.path.join(temp_dir, "lesson.seed"))
+        server.plant_seed("catatan", {"title": "Catatan"})
+    paths = ["/api/seeds/catatan", "/content/lesson/index.html", "/api/seeds"]
+
+    def work():
+        client = server.app.test_client()
+        for index in range(requests):
+            client.get(paths[index % len(paths)])
+
+    elapsed = in_threads(threads, work)
+    server.close()
+    return elapsed / (threads * requests)
+
+
+def run(threads: int, operations: int, requests: int):
+    print(f"{threads} threads")
+    time_recording(threads, operations)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with zipfile.ZipFile(os.path.join(temp_dir, "lesson.seed"), "w") as zipf:
+            zipf.writestr("index.html", b"<p>Menanam padi</p>" * 500, compress_type=zipfile.ZIP_DEFLATED)
+        # Alternate to spread drift (thermal, caches) over both configurations
+        plain, instrumented = [], []
+        for _ in range(3):
+            plain.append(time_requests(temp_dir, threads, requests, False))
+            instrumented.append(time_requests(temp_dir, threads, requests, True))
+    plain, instrumented = min(plain), min(instrumented)
+    print(f"  request, no metrics   {plain * 1e6:8.1f} us")
+    print(f"  request, metrics      {instrumented * 1e6:8.1f} us  ({(instrumented / plain - 1) * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent threads")
+    parser.add_argument("--operations", type=int, default=200000, help="Recordings per thread")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per thread and run")
+    args = parser.parse_args()
+    run(args.threads, args.operations, args.requests)
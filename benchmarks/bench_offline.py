@@ -0,0 +1,122 @@
+"""
+Measure how much load offline service workers take off the school server.
+
+A class of tablets opens every page of a planted lesson at the start of
+each class, and each page loads the lesson's stylesheet and images.
+Three kinds of tablet are compared: one without any cache, one that
+revalidates its HTTP cache with If-None-Match, and one running the seed's
+service worker, which precaches the seed on its first visit and then
+only checks the worker for updates. Requests go through Flask's test
+client, so the server time excludes sockets.
+
+    python benchmarks/bench_offline.py --tablets 30 --classes 5
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import zipfile
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.server.local_server import LocalServer
+
+WORDS = ["padi", "sawah", "air", "tanah", "benih", "panen", "pupuk", "hujan", "musim", "petani"]
+
+
+def _make_lesson(path: str, pages: int, images: int, image_bytes: int, video_bytes: int):
+    rng = random.Random(0)
+    with zipfile.ZipFile(path, "w") as zipf:
+        zipf.writestr("metadata.json", '{"title": "Menanam padi"}')
+        for page in range(pages):
+            zipf.writestr(f"page{page}.html", " ".join(rng.choice(WORDS) for _ in range(3000)),
+                          compress_type=zipfile.ZIP_DEFLATED)
+        zipf.writestr("style.css", "body { color: green; }\n" * 50, compress_type=zipfile.ZIP_DEFLATED)
+        for image in range(images):
+            zipf.writestr(f"img/{image}.png", rng.getrandbits(8 * image_bytes).to_bytes(image_bytes, "little"))
+        zipf.writestr("video.mp4", rng.getrandbits(8 * video_bytes).to_bytes(video_bytes, "little"))
+
+
+class Tablet:
+    """One student device; counts the requests and bytes it costs the server."""
+
+    def __init__(self, client, mode: str):
+        self.client = client
+        self.mode = mode
+        self.etags = {}
+        self.worker = None  # ETag of the installed service worker
+        self.requests = 0
+        self.bytes = 0
+
+    def get(self, url: str, conditional: bool = False):
+        headers = {"Accept-Encoding": "gzip"}
+        if conditional and url in self.etags:
+            headers["If-None-Match"] = self.etags[url]
+        response = self.client.get(url, headers=headers)
+        self.requests += 1
+        self.bytes += len(response.data)
+        if "ETag" in response.headers:
+            self.etags[url] = response.headers["ETag"]
+        return response
+
+    def view(self, seed_id: str, page: str, assets):
+        if self.mode == "worker" and self.worker:
+            # Navigations inside the scope only revalidate the worker script
+            self.get(f"/offline/{seed_id}/sw.js", conditional=True)
+            return
+        for url in [f"/content/{seed_id}/{page}"] + assets:
+            self.get(url, conditional=self.mode == "http-cache")
+        if self.mode == "worker":
+            self.worker = self.get(f"/offline/{seed_id}/sw.js").headers["ETag"]
+            for entry in self.get(f"/offline/{seed_id}/precache.json").get_json()["precache"]:
+                self.get(f"{entry['url']}?v={entry['revision']}")
+
+
+def run(tablets: int, classes: int, pages: int, images: int, image_bytes: int, video_bytes: int):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server = LocalServer(content_dir=os.path.join(temp_dir, "content"))
+        try:
+            source = os.path.join(temp_dir, "padi.seed")
+            _make_lesson(source, pages, images, image_bytes, video_bytes)
+            with contextlib.redirect_stdout(io.StringIO()):
+                server.plant_archive(source, move=True)
+            client = server.app.test_client()
+            assets = ["/content/padi/style.css"] + [f"/content/padi/img/{image}.png" for image in range(images)]
+            print(f"{tablets} tablets, {classes} classes, {pages} pages with {len(assets)} assets each, "
+                  f"{video_bytes / 1e6:.1f} MB video")
+            print(f"  {'':12s} {'requests':>9s} {'first class':>12s} {'later/class':>12s} {'MB':>9s} "
+                  f"{'server s':>9s}")
+            for mode in ("no-cache", "http-cache", "worker"):
+                devices = [Tablet(client, mode) for _ in range(tablets)]
+                start = time.perf_counter()
+                per_class = []
+                for _ in range(classes):
+                    before = sum(device.requests for device in devices)
+                    for page in range(pages):
+                        for device in devices:
+                            device.view("padi", f"page{page}.html", assets)
+                    per_class.append(sum(device.requests for device in devices) - before)
+                elapsed = time.perf_counter() - start
+                later = sum(per_class[1:]) / max(1, len(per_class) - 1)
+                print(f"  {mode:12s} {sum(per_class):9d} {per_class[0]:12d} {later:12.0f} "
+                      f"{sum(device.bytes for device in devices) / 1e6:9.1f} {elapsed:9.2f}")
+        finally:
+            server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tablets", type=int, default=30, help="Tablets in the class")
+    parser.add_argument("--classes", type=int, default=5, help="Classes using the lesson")
+    parser.add_argument("--pages", type=int, default=5, help="Pages in the lesson")
+    parser.add_argument("--images", type=int, default=4, help="Images loaded by every page")
+    parser.add_argument("--image-bytes", type=int, default=50 * 1024, help="Size of each image")
+    parser.add_argument("--video-bytes", type=int, default=2 * 1024 * 1024, help="Size of the lesson video")
+    args = parser.parse_args()
+    run(args.tablets, args.classes, args.pages, args.images, args.image_bytes, args.video_bytes)
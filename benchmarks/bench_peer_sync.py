@@ -0,0 +1,169 @@
+"""
+Measure LAN peer sync between school servers on one machine.
+
+Starts several LocalServer processes on different ports that find each
+other by broadcast on 127.255.255.255. The first one holds every seed;
+the benchmark times how long the rest take to hold identical copies and
+how fast the bytes moved. It then replants some seeds on the first
+server with one page changed and measures the second round, where only
+the changed members should cross the network.
+
+    python benchmarks/bench_peer_sync.py --servers 4 --seeds 40 --seed-mb 2
+"""
+
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.server.local_server import LocalServer
+from eduseedbank.server.wsgi import WSGIServer
+
+WORDS = ["padi", "sawah", "air", "tanah", "benih", "panen", "pupuk", "hujan", "musim", "petani"]
+
+
+def build_archive(path: str, index: int, seed_mb: float, revision: int = 0):
+    """A lesson with a few deflated pages and a stored video; `revision` changes the first page."""
+    rng = random.Random(index)
+    with zipfile.ZipFile(path, "w") as zipf:
+        zipf.writestr("metadata.json", json.dumps({"title": f"Pelajaran {index}"}))
+        for page in range(5):
+            text = " ".join(rng.choice(WORDS) for _ in range(3000))
+            if page == 0:
+                text += f" revisi {revision}"
+            zipf.writestr(f"page{page}.html", f"<p>{text}</p>", compress_type=zipfile.ZIP_DEFLATED)
+        video_bytes = int(seed_mb * 1024 * 1024)
+        zipf.writestr("video.mp4", rng.getrandbits(8 * video_bytes).to_bytes(video_bytes, "little"))
+
+
+def serve(index: int, seeds: int, seed_mb: float, workers: int, discovery_port: int, ports, stop):
+    """Server process: plant the lessons (first server only), then serve and sync until `stop` is set."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server = LocalServer(content_dir=os.path.join(temp_dir, "content"), metrics=False)
+        if index == 0:
+            source = os.path.join(temp_dir, "lesson.seed")
+            with contextlib.redirect_stdout(io.StringIO()):
+                for seed in range(seeds):
+                    build_archive(source, seed, seed_mb)
+                    server.plant_archive(source, f"lesson-{seed}", move=True)
+        httpd = WSGIServer(server.app, "127.0.0.1", 0, workers=16)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            server.start_peer_sync(httpd.port, workers=workers, discovery_port=discovery_port,
+                                   broadcast_address="127.255.255.255", announce_interval=1.0)
+            ports.put((index, httpd.port))
+            stop.wait()
+            server.close()
+        httpd.shutdown()
+
+
+def get_json(port: int, path: str):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        connection.request("GET", path)
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+
+def digests(port: int):
+    return {seed_id: entry["digest"] for seed_id, entry in get_json(port, "/api/sync/inventory")["seeds"].items()}
+
+
+def wait_for_convergence(ports, timeout: float = 600.0) -> float:
+    """Seconds until every server's inventory matches the first one's."""
+    start = time.perf_counter()
+    expected = digests(ports[0])
+    while time.perf_counter() - start < timeout:
+        if all(digests(port) == expected for port in ports[1:]):
+            return time.perf_counter() - start
+        time.sleep(0.02)
+    raise TimeoutError("Servers did not converge")
+
+
+def transfer_totals(ports):
+    fetched = reused = 0
+    for port in ports:
+        status = get_json(port, "/api/sync")
+        fetched += status["bytes_fetched"]
+        reused += status["bytes_reused"]
+    return fetched, reused
+
+
+def report(label: str, seconds: float, fetched: int, reused: int):
+    print(f"  {label:22s} converged in {seconds:6.2f} s, {fetched / 1e6:8.1f} MB fetched "
+          f"({fetched / 1e6 / seconds:7.1f} MB/s), {reused / 1e6:8.1f} MB reused locally")
+
+
+def upload(port: int, seed_id: str, path: str):
+    with open(path, "rb") as f:
+        body = f.read()
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    connection.request("PUT", f"/api/seeds/{seed_id}/archive", body)
+    job = json.loads(connection.getresponse().read())
+    connection.close()
+    while get_json(port, f"/api/jobs/{job['job_id']}")["state"] not in ("planted", "failed"):
+        time.sleep(0.01)
+
+
+def run(servers: int, seeds: int, seed_mb: float, changed: int, workers: int):
+    ports_queue, stop = multiprocessing.Queue(), multiprocessing.Event()
+    discovery_port = random.randint(40000, 60000)
+    processes = [multiprocessing.Process(target=serve, args=(index, seeds, seed_mb, workers, discovery_port,
+                                                             ports_queue, stop))
+                 for index in range(servers)]
+    # The first server plants before the rest start, so the clock starts once they can all sync
+    processes[0].start()
+    first = ports_queue.get(timeout=600)
+    start = time.perf_counter()
+    for process in processes[1:]:
+        process.start()
+    try:
+        ports = dict([first] + [ports_queue.get(timeout=600) for _ in processes[1:]])
+        ports = [ports[index] for index in range(servers)]
+        total_mb = seeds * seed_mb
+        print(f"{servers} servers, {seeds} seeds of about {seed_mb:g} MB ({total_mb:g} MB) on the first, "
+              f"{workers} transfers at a time")
+        wait_for_convergence(ports)
+        seconds = time.perf_counter() - start
+        fetched, reused = transfer_totals(ports)
+        report("initial copy", seconds, fetched, reused)
+
+        # Timed from the first upload: peers start pulling while later seeds are still uploading
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, "lesson.seed")
+            for seed in range(changed):
+                build_archive(source, seed, seed_mb, revision=1)
+                upload(ports[0], f"lesson-{seed}", source)
+        wait_for_convergence(ports)
+        seconds = time.perf_counter() - start
+        fetched2, reused2 = transfer_totals(ports)
+        report(f"{changed} seeds changed", seconds, fetched2 - fetched, reused2 - reused)
+    finally:
+        stop.set()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--servers", type=int, default=4, help="Server processes")
+    parser.add_argument("--seeds", type=int, default=40, help="Seeds on the first server")
+    parser.add_argument("--seed-mb", type=float, default=2.0, help="Size of each seed's video member")
+    parser.add_argument("--changed", type=int, default=10, help="Seeds replanted with a changed page")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel range requests per server")
+    args = parser.parse_args()
+    run(args.servers, args.seeds, args.seed_mb, args.changed, args.workers)
@@ -0,0 +1,60 @@
+"""
+Time the gateway broadcast planner on large request windows.
+
+Builds a synthetic topology, draws a window of Zipf-distributed seed
+requests from random schools, and reports planning time, the airtime of
+the planned schedule against answering every request on its own, and
+how long the schedule takes under the duty-cycle limit.
+
+    python benchmarks/bench_planner.py --nodes 1000 --requests 5000
+"""
+
+import argparse
+import os
+import random
+import sys
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.planner import BroadcastPlanner
+from eduseedbank.network.topology import GENERATORS, generate
+
+
+def run(topologies, nodes: int, requests: int, catalog: int, exponent: float,
+        seed_bytes: int, region: str, seed: int):
+    print(f"{nodes} nodes, {requests} requests over {catalog} seeds (zipf {exponent}), {region}")
+    print(f"{'topology':<18} {'plan_s':>7} {'steps':>7} {'airtime_s':>10} "
+          f"{'baseline_s':>11} {'saved':>7} {'makespan_h':>11}")
+    weights = [1.0 / (rank ** exponent) for rank in range(1, catalog + 1)]
+    seeds = [f"seed{i}" for i in range(catalog)]
+    for name in topologies:
+        network = generate(name, nodes, seed=seed).to_network()
+        gateway = network.get_node("gateway")
+        for seed_id in seeds:
+            gateway.store_seed(seed_id, {"title": seed_id, "body": "x" * seed_bytes})
+        rng = random.Random(seed)
+        schools = [node_id for node_id in network.nodes if node_id != "gateway"]
+        window = [(rng.choice(schools), rng.choices(seeds, weights)[0]) for _ in range(requests)]
+
+        schedule = BroadcastPlanner(gateway, region=region).plan(window, now=0.0)
+        print(f"{name:<18} {schedule.planning_time:>7.3f} {len(schedule.transmissions):>7} "
+              f"{schedule.airtime:>10.0f} {schedule.baseline_airtime:>11.0f} "
+              f"{schedule.airtime_saved:>7.1%} {schedule.makespan / 3600:>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--topology", action="append", choices=sorted(GENERATORS),
+                        help="Topology to plan over (repeatable; default: all but line)")
+    parser.add_argument("--nodes", type=int, default=1000, help="Nodes in the topology")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests in the window")
+    parser.add_argument("--catalog", type=int, default=50, help="Distinct seeds on the gateway")
+    parser.add_argument("--exponent", type=float, default=0.9, help="Zipf exponent of popularity")
+    parser.add_argument("--seed-bytes", type=int, default=2000, help="Body size of each seed")
+    parser.add_argument("--region", default="AS923", help="Duty-cycle region")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed")
+    args = parser.parse_args()
+    topologies = args.topology or ["grid", "random_geometric", "clustered_village"]
+    run(topologies, args.nodes, args.requests, args.catalog, args.exponent,
+        args.seed_bytes, args.region, args.seed)
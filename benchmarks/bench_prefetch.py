@@ -0,0 +1,56 @@
+"""
+Measure the on-demand latency curriculum-aware prefetching removes.
+
+Plays a school term on a gateway and a school node that run the real
+transports, TransferManager and PrefetchScheduler: teachers open each
+calendar lesson on a school day of its week and ask for a few seeds the
+calendar does not name. Reports lesson and unplanned latency with and
+without prefetching for a range of storage budgets.
+
+    python benchmarks/bench_prefetch.py --weeks 12 --budgets 32 64 128 256
+"""
+
+import argparse
+import os
+import sys
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.prefetch import simulate_prefetch
+
+
+def run(weeks: int, lessons: int, seed_bytes: int, unplanned: float, budgets, lookahead: int, keep: int,
+        background_share: float, region: str, seed: int):
+    print(f"{weeks} weeks, {lessons} lessons/week, {seed_bytes} B seeds, {unplanned:g} unplanned/week, "
+          f"{region}, background share {background_share:.0%}")
+    print(f"  {'budget KB':>9s} {'hits':>6s} {'mean s':>9s} {'with':>9s} {'p90 s':>9s} {'with':>9s} "
+          f"{'removed':>8s} {'unplanned s':>12s} {'with':>9s} {'wasted KB':>10s}")
+    for budget in budgets:
+        report = simulate_prefetch(weeks=weeks, lessons_per_week=lessons, seed_bytes=seed_bytes,
+                                   unplanned_per_week=unplanned, budget_bytes=budget * 1024,
+                                   lookahead_weeks=lookahead, keep_weeks=keep, region=region,
+                                   background_share=background_share, seed=seed)
+        print(f"  {budget:9d} {report.served_from_prefetch:3d}/{report.demands:<3d}"
+              f"{report.mean_latency_without:9.0f} {report.mean_latency_with:9.0f} "
+              f"{report.p90_latency_without:9.0f} {report.p90_latency_with:9.0f} "
+              f"{report.latency_removed:8.0%} {report.unplanned_mean_without:12.0f} "
+              f"{report.unplanned_mean_with:9.0f} {report.wasted_bytes / 1024:10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--weeks", type=int, default=8, help="Weeks in the term")
+    parser.add_argument("--lessons", type=int, default=4, help="Calendar lessons per week")
+    parser.add_argument("--seed-bytes", type=int, default=8000, help="Body size of each seed")
+    parser.add_argument("--unplanned", type=float, default=2.0, help="Requests per week for seeds off the calendar")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[0, 32, 64, 128], help="Storage budgets in KB")
+    parser.add_argument("--lookahead", type=int, default=1, help="Weeks ahead the planner looks")
+    parser.add_argument("--keep-weeks", type=int, default=1, help="Weeks a prefetched seed is kept after its week")
+    parser.add_argument("--background-share", type=float, default=0.5,
+                        help="Share of the duty cycle prefetches may use")
+    parser.add_argument("--region", default="AS923", help="Regulatory region of the duty cycle")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed")
+    args = parser.parse_args()
+    run(args.weeks, args.lessons, args.seed_bytes, args.unplanned, args.budgets, args.lookahead, args.keep_weeks,
+        args.background_share, args.region, args.seed)
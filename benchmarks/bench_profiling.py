@@ -0,0 +1,70 @@
+"""
+Measure what span instrumentation costs, off and on.
+
+Times a trivial function bare, wrapped with @traced while spans are off,
+and wrapped while spans are on (with and without allocation tracing),
+then the same for `with span(...)` blocks, and finally a LoRaNetwork
+exchange whose route_message is instrumented.
+
+    python benchmarks/bench_profiling.py --calls 1000000
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank import profiling
+from eduseedbank.network.lora import LoRaNetwork, LoRaNode, Message, MessageType
+
+
+def bare(x):
+    return x
+
+
+traced = profiling.traced("bench.traced")(bare)
+
+
+def with_span(x):
+    with profiling.span("bench.span"):
+        return x
+
+
+def ping_pong(messages: int):
+    network = LoRaNetwork()
+    a, b = LoRaNode("a", verbose=False), LoRaNode("b", verbose=False)
+    for node in (a, b):
+        network.add_node(node)
+    a.connect_to_node(b)
+    b.connect_to_node(a)
+    for index in range(messages):
+        a.send_message(Message(MessageType.NETWORK_PING, "a", "b", {"timestamp": index}, index))
+
+
+def per_call_ns(func, calls: int) -> float:
+    return min(timeit.repeat(lambda: func(1), number=calls, repeat=5)) / calls * 1e9
+
+
+def run(calls: int, messages: int):
+    modes = [("off", None), ("on", False), ("on + allocations", True)]
+    print(f"{'':38s} {'ns/call':>9s}")
+    print(f"  {'bare function':36s} {per_call_ns(bare, calls):9.0f}")
+    for label, allocations in modes:
+        if allocations is not None:
+            profiling.enable(allocations=allocations)
+        print(f"  {'@traced, spans ' + label:36s} {per_call_ns(traced, calls):9.0f}")
+        print(f"  {'with span(), spans ' + label:36s} {per_call_ns(with_span, calls):9.0f}")
+        seconds = min(timeit.repeat(lambda: ping_pong(messages), number=1, repeat=3))
+        print(f"  {'ping/pong, spans ' + label:36s} {seconds / messages * 1e9:9.0f}")
+        profiling.disable()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1000000, help="Calls timed per case")
+    parser.add_argument("--messages", type=int, default=20000, help="Pings sent in the network case")
+    args = parser.parse_args()
+    run(args.calls, args.messages)
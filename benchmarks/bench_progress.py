@@ -0,0 +1,121 @@
+"""
+Measure progress recording throughput: write-behind batches versus one commit per event.
+
+A classroom of threads records page views and quiz attempts, first with
+each event committed in its own transaction, then through the batching
+ProgressTracker. Both write to a registry database configured as the
+local server configures it (WAL; --synchronous full makes every commit
+fsync, as a cautious SD-card setup would). Finally times the per-student
+and per-lesson summaries over everything recorded.
+
+    python benchmarks/bench_progress.py --students 40 --events 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from sqlalchemy import event, insert
+
+from eduseedbank.network.scheduler import percentile
+from eduseedbank.server.progress import ProgressTracker, events_table, parse_event
+from eduseedbank.server.registry import SeedRegistry
+
+
+def make_events(students: int, per_student: int, lessons: int):
+    rng = random.Random(0)
+    return [[parse_event({"student_id": f"siswa-{student}", "seed_id": f"lesson-{rng.randrange(lessons)}",
+                          "kind": rng.choice(["view", "attempt"]), "exercise": str(rng.randrange(5)),
+                          "correct": rng.random() < 0.6})
+             for _ in range(per_student)]
+            for student in range(students)]
+
+
+def run_threads(target, workloads):
+    threads = [threading.Thread(target=target, args=(events,)) for events in workloads]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def open_registry(path: str, synchronous: str) -> SeedRegistry:
+    registry = SeedRegistry(path)
+
+    @event.listens_for(registry.engine, "connect")
+    def set_synchronous(dbapi_connection, connection_record):
+        dbapi_connection.execute(f"PRAGMA synchronous={synchronous}")
+
+    registry.engine.dispose()  # Reconnect with the pragma applied
+    return registry
+
+
+def run(students: int, per_student: int, lessons: int, synchronous: str):
+    workloads = make_events(students, per_student, lessons)
+    total = students * per_student
+    with tempfile.TemporaryDirectory() as temp_dir:
+        registry = open_registry(os.path.join(temp_dir, "direct.db"), synchronous)
+        ProgressTracker(registry.engine).close()  # Creates the table
+        lock = threading.Lock()  # SQLite takes one writer at a time anyway
+
+        def direct(events):
+            for item in events:
+                with lock, registry.engine.begin() as conn:
+                    conn.execute(insert(events_table), item)
+
+        direct_time = run_threads(direct, workloads)
+        registry.close()
+
+        registry = open_registry(os.path.join(temp_dir, "batched.db"), synchronous)
+        tracker = ProgressTracker(registry.engine)
+
+        def batched(events):
+            for item in events:
+                tracker.record(item)
+
+        batched_time = run_threads(batched, workloads)
+        start = time.perf_counter()
+        tracker.flush()
+        drained = batched_time + time.perf_counter() - start
+
+        student_times, lesson_times = [], []
+        for student in range(students):
+            began = time.perf_counter()
+            tracker.student_summary(f"siswa-{student}")
+            student_times.append(time.perf_counter() - began)
+        for lesson in range(lessons):
+            began = time.perf_counter()
+            tracker.lesson_summary(f"lesson-{lesson}")
+            lesson_times.append(time.perf_counter() - began)
+        transactions = tracker.transactions
+        tracker.close()
+        registry.close()
+
+    print(f"{students} students x {per_student} events over {lessons} lessons, synchronous={synchronous}")
+    print(f"  commit per event {total / direct_time:10.0f} events/s  ({total} transactions)")
+    print(f"  write-behind     {total / batched_time:10.0f} events/s recorded, "
+          f"{total / drained:10.0f} events/s on disk ({transactions} transactions)")
+    print(f"  student summary p50 {percentile(student_times, 50) * 1000:6.2f} ms, "
+          f"p99 {percentile(student_times, 99) * 1000:6.2f} ms")
+    print(f"  lesson summary  p50 {percentile(lesson_times, 50) * 1000:6.2f} ms, "
+          f"p99 {percentile(lesson_times, 99) * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=40, help="Concurrent students")
+    parser.add_argument("--events", type=int, default=500, help="Events per student")
+    parser.add_argument("--lessons", type=int, default=30, help="Lessons the events spread over")
+    parser.add_argument("--synchronous", choices=["normal", "full"], default="normal",
+                        help="SQLite synchronous setting")
+    args = parser.parse_args()
+    run(args.students, args.events, args.lessons, args.synchronous)
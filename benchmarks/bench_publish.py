@@ -0,0 +1,109 @@
+"""
+Compare the streaming publish pipeline with the hand-wired workflow.
+
+Builds a synthetic lesson (text pages, images and incompressible stand-in
+videos), then publishes it twice: once through PublishPipeline, once the
+way examples/complete_workflow.py does, one step after another with
+temporary files in between: render pages, SeedPackage.save, hash the
+archive, encode every frame. Videos are not transcoded, since ffmpeg
+may be missing; with ffmpeg the pipeline also overlaps the transcodes.
+
+    python benchmarks/bench_publish.py --pages 20 --videos 2 --video-mb 4
+"""
+
+import argparse
+import base64
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.lora import BROADCAST, Message, MessageType
+from eduseedbank.network.transport import encode_message
+from eduseedbank.packaging.core import SeedPackage
+from eduseedbank.packaging.html_generator import HTMLGenerator
+from eduseedbank.publish import PublishPipeline, format_timings, scan_lesson
+
+WORDS = ["padi", "sawah", "air", "tanah", "benih", "panen", "pupuk", "hujan", "musim", "petani"]
+
+
+def build_lesson(directory: str, pages: int, images: int, videos: int, video_mb: float):
+    rng = random.Random(0)
+    os.makedirs(directory)
+    for page in range(pages):
+        with open(os.path.join(directory, f"bab{page:02d}.txt"), "w") as f:
+            f.write("\n\n".join(" ".join(rng.choice(WORDS) for _ in range(80)) for _ in range(30)))
+    for image in range(images):
+        with open(os.path.join(directory, f"gambar{image}.png"), "wb") as f:
+            f.write(rng.getrandbits(8 * 200 * 1024).to_bytes(200 * 1024, "little"))
+    for video in range(videos):
+        with open(os.path.join(directory, f"video{video}.mp4"), "wb") as f:
+            video_bytes = int(video_mb * 1024 * 1024)
+            f.write(rng.getrandbits(8 * video_bytes).to_bytes(video_bytes, "little"))
+
+
+def sequential(lesson_dir: str, output: str, chunk_size: int) -> float:
+    """The hand-wired workflow, one step after another; returns seconds."""
+    start = time.perf_counter()
+    _, members = scan_lesson(lesson_dir)
+    generator = HTMLGenerator()
+    package = SeedPackage("Pelajaran", "", "", "")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for member in members:
+            if member.kind == "page":
+                with open(member.source) as f:
+                    paragraphs = f.read().split("\n\n")
+                page = generator.create_interactive_page(member.name, "\n".join(f"<p>{p}</p>" for p in paragraphs))
+                path = os.path.join(temp_dir, member.name + ".html")
+                generator.save_page(page, path)
+                package.add_file(path, os.path.splitext(member.name)[0] + ".html")
+            else:
+                package.add_file(member.source, member.name)
+        seed_path = package.save(output)
+    with open(seed_path, "rb") as f:
+        seed = f.read()
+    digest = hashlib.sha256(seed).hexdigest()
+    total = -(-len(seed) // chunk_size)
+    with open(output + ".frames", "wb") as f:
+        for index in range(total):
+            chunk = seed[index * chunk_size:(index + 1) * chunk_size]
+            f.write(encode_message(Message(MessageType.SEED_CHUNK, "gateway", BROADCAST, {
+                "seed_id": "pelajaran", "index": index, "total": total, "size": len(seed),
+                "digest": digest, "chunk_size": chunk_size, "last": index == total - 1,
+                "data": base64.b64encode(chunk).decode("ascii")}, 0)) + b"\n")
+    return time.perf_counter() - start
+
+
+def run(pages: int, images: int, videos: int, video_mb: float, chunk_size: int, runs: int):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lesson = os.path.join(temp_dir, "lesson")
+        build_lesson(lesson, pages, images, videos, video_mb)
+        pipeline = PublishPipeline(transcode=False, chunk_size=chunk_size)
+        best = None
+        for _ in range(runs):
+            result = pipeline.run(lesson, os.path.join(temp_dir, "pipeline"))
+            if best is None or result.seconds < best.seconds:
+                best = result
+        hand_wired = min(sequential(lesson, os.path.join(temp_dir, "sequential"), chunk_size) for _ in range(runs))
+        print(f"{pages} pages, {images} images, {videos} videos of {video_mb:g} MB, "
+              f"{chunk_size}-byte frames, best of {runs}")
+        print(format_timings(best))
+        print(f"  hand-wired workflow {hand_wired:.2f} s, pipeline {best.seconds:.2f} s "
+              f"({hand_wired / best.seconds:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20, help="Text pages in the lesson")
+    parser.add_argument("--images", type=int, default=10, help="200 KB images in the lesson")
+    parser.add_argument("--videos", type=int, default=2, help="Videos in the lesson")
+    parser.add_argument("--video-mb", type=float, default=2.0, help="Size of each video")
+    parser.add_argument("--chunk-size", type=int, default=128, help="Bytes of seed per frame")
+    parser.add_argument("--runs", type=int, default=3, help="Runs of each; the fastest is reported")
+    args = parser.parse_args()
+    run(args.pages, args.images, args.videos, args.video_mb, args.chunk_size, args.runs)
@@ -0,0 +1,84 @@
+"""
+Measure LocalServer cold start with many planted seeds.
+
+Plants a library of small lesson archives, then times starting a fresh
+server against the existing registry and against a content directory
+without one, where every archive has to be opened and indexed again.
+Also times the first and repeated content requests for one seed, which
+load its member index from the registry.
+
+    python benchmarks/bench_registry.py --seeds 10000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.server.local_server import REGISTRY_FILE, LocalServer
+
+
+def build_archive(path: str, index: int, members: int):
+    with zipfile.ZipFile(path, "w") as zipf:
+        zipf.writestr("metadata.json", f'{{"title": "Pelajaran {index}", "grade": {index % 12 + 1}}}')
+        for number in range(members):
+            zipf.writestr(f"page{number}.html", f"<p>Halaman {number} pelajaran {index}</p>" * 20,
+                          compress_type=zipfile.ZIP_DEFLATED)
+
+
+def timed_start(content_dir: str):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        server = LocalServer(content_dir=content_dir)
+    return server, time.perf_counter() - start
+
+
+def run(seeds: int, members: int):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        content_dir = os.path.join(temp_dir, "content")
+        source = os.path.join(temp_dir, "lesson.seed")
+        server = LocalServer(content_dir=content_dir)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for index in range(seeds):
+                build_archive(source, index, members)
+                server.plant_archive(source, f"lesson-{index}", move=True)
+        planting = time.perf_counter() - start
+        server.registry.close()
+
+        server, warm = timed_start(content_dir)
+        client = server.app.test_client()
+        seed_id = f"lesson-{seeds // 2}"
+        start = time.perf_counter()
+        client.get(f"/content/{seed_id}/page0.html")
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(100):
+            client.get(f"/content/{seed_id}/page0.html")
+        repeated = (time.perf_counter() - start) / 100
+        server.registry.close()
+
+        os.remove(os.path.join(content_dir, REGISTRY_FILE))
+        _, rescan = timed_start(content_dir)
+
+    print(f"{seeds} seeds of {members} members")
+    print(f"  planting            {planting:8.2f} s  ({seeds / planting:8.0f} seeds/s)")
+    print(f"  start from registry {warm * 1000:8.1f} ms")
+    print(f"  start by rescanning {rescan * 1000:8.1f} ms")
+    print(f"  first request       {first * 1000:8.2f} ms")
+    print(f"  repeated request    {repeated * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seeds", type=int, default=10000, help="Planted seeds")
+    parser.add_argument("--members", type=int, default=20, help="Pages per seed archive")
+    args = parser.parse_args()
+    run(args.seeds, args.members)
@@ -0,0 +1,101 @@
+"""
+Measure full-text search over a school's worth of planted lessons.
+
+Plants lesson archives whose pages draw words with a Zipf distribution
+from a few thousand made-up Indonesian-like words plus a list of real
+topic words, waits for the background indexer, then times ranked queries
+of one to three topic words (the last one often a prefix) through
+/api/search.
+
+    python benchmarks/bench_search.py --seeds 3000 --queries 2000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import zipfile
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.scheduler import percentile
+from eduseedbank.server.local_server import LocalServer
+
+VOCABULARY = ("padi jagung sawah air hujan tanah pupuk benih panen kebun ikan sungai hutan "
+              "pohon daun akar bunga buah sayur hewan burung matahari bulan bintang bumi "
+              "angka hitung tambah kurang kali bagi pecahan sudut garis bangun ruang waktu "
+              "sejarah desa kota pulau laut gunung cuaca musim kesehatan makanan gizi").split()
+SYLLABLES = "ba be bi bu ka ke ki ku la le li lu ma me mi mu na ni nu pa pe pi ra ri ru sa si su ta ti tu".split()
+
+
+def make_vocabulary(rng: random.Random, size: int):
+    words = set(VOCABULARY)
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    words = sorted(words)
+    rng.shuffle(words)
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    return words, weights
+
+
+def build_archive(path: str, index: int, rng: random.Random, pages: int, words: int, vocabulary):
+    topic = rng.sample(VOCABULARY, 3)
+    with zipfile.ZipFile(path, "w") as zipf:
+        zipf.writestr("metadata.json", (f'{{"title": "Pelajaran {topic[0]} {index}", '
+                                        f'"description": "Tentang {topic[1]} dan {topic[2]}", '
+                                        f'"subject": "IPA"}}'))
+        for number in range(pages):
+            text = " ".join(rng.choices(*vocabulary, k=words))
+            zipf.writestr(f"page{number}.html", f"<html><body><p>{text}</p></body></html>",
+                          compress_type=zipfile.ZIP_DEFLATED)
+
+
+def run(seeds: int, queries: int, pages: int, words: int, vocabulary_size: int):
+    rng = random.Random(0)
+    vocabulary = make_vocabulary(rng, vocabulary_size)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server = LocalServer(content_dir=os.path.join(temp_dir, "content"))
+        source = os.path.join(temp_dir, "lesson.seed")
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for index in range(seeds):
+                build_archive(source, index, rng, pages, words, vocabulary)
+                server.plant_archive(source, f"lesson-{index}", move=True)
+        planted = time.perf_counter() - start
+        server.search.wait()
+        indexed = time.perf_counter() - start
+
+        client = server.app.test_client()
+        latencies, results = [], 0
+        for _ in range(queries):
+            terms = rng.sample(VOCABULARY, rng.randint(1, 3))
+            if rng.random() < 0.5:
+                terms[-1] = terms[-1][:rng.randint(2, len(terms[-1]))]
+            began = time.perf_counter()
+            response = client.get("/api/search", query_string={"q": " ".join(terms)})
+            latencies.append(time.perf_counter() - began)
+            results += len(response.get_json()["results"])
+        server.search.shutdown()
+
+    print(f"{seeds} seeds of {pages} pages x {words} words, {queries} queries")
+    print(f"  planted          {planted:8.2f} s")
+    print(f"  indexed          {indexed:8.2f} s")
+    print(f"  results/query    {results / queries:8.1f}")
+    print(f"  latency p50      {percentile(latencies, 50) * 1000:8.2f} ms")
+    print(f"  latency p99      {percentile(latencies, 99) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seeds", type=int, default=3000, help="Planted lessons")
+    parser.add_argument("--queries", type=int, default=2000, help="Search requests")
+    parser.add_argument("--pages", type=int, default=5, help="HTML pages per lesson")
+    parser.add_argument("--words", type=int, default=300, help="Words per page")
+    parser.add_argument("--vocabulary", type=int, default=5000, help="Distinct words in the pages")
+    args = parser.parse_args()
+    run(args.seeds, args.queries, args.pages, args.words, args.vocabulary)
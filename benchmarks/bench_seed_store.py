@@ -0,0 +1,92 @@
+"""
+Benchmark node seed storage: lookup latency and resident memory with 10k seeds.
+
+Compares the default in-memory dict against DiskSeedStore, reading a mix
+of hot (recently used) and cold seeds.
+
+    python benchmarks/bench_seed_store.py --seeds 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.storage import DiskSeedStore
+
+
+def resident_memory_mb() -> float:
+    """Current resident set size in MB (Linux), or peak RSS elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_seed(i: int, payload_bytes: int) -> dict:
+    return {
+        "title": f"Lesson {i}",
+        "subject": "Science",
+        "curriculum": "Jawa Barat",
+        "body": "x" * payload_bytes
+    }
+
+
+def time_lookups(store, keys, repeats: int) -> float:
+    """Mean lookup latency in microseconds."""
+    start = time.perf_counter()
+    for key in keys * repeats:
+        store[key]
+    return (time.perf_counter() - start) / (len(keys) * repeats) * 1e6
+
+
+def run(num_seeds: int, payload_bytes: int, lookups: int):
+    rng = random.Random(0)
+    keys = [f"seed{i}" for i in range(num_seeds)]
+    hot = rng.sample(keys, min(32, num_seeds))
+    cold = rng.sample(keys, min(lookups, num_seeds))
+
+    base = resident_memory_mb()
+    memory_store = {}
+    for i, key in enumerate(keys):
+        memory_store[key] = make_seed(i, payload_bytes)
+    dict_rss = resident_memory_mb() - base
+    print(f"dict:          rss +{dict_rss:7.1f} MB  "
+          f"lookup {time_lookups(memory_store, cold, 10):7.2f} us")
+    del memory_store
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        start = time.perf_counter()
+        store = DiskSeedStore(temp_dir, hot_items=64)
+        for i, key in enumerate(keys):
+            store[key] = make_seed(i, payload_bytes)
+        write_rate = num_seeds / (time.perf_counter() - start)
+
+        base = resident_memory_mb()
+        start = time.perf_counter()
+        store = DiskSeedStore(temp_dir, hot_items=64)
+        reopen = time.perf_counter() - start
+        disk_rss = resident_memory_mb() - base
+
+        print(f"DiskSeedStore: rss +{disk_rss:7.1f} MB  "
+              f"cold {time_lookups(store, cold, 1):7.2f} us  "
+              f"hot {time_lookups(store, hot, 100):7.2f} us  "
+              f"writes {write_rate:7.0f}/s  reopen {reopen * 1000:.0f} ms  "
+              f"on disk {store.used_bytes / (1024 * 1024):.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seeds", type=int, default=10000, help="Number of stored seeds")
+    parser.add_argument("--payload", type=int, default=4096, help="Bytes of content per seed")
+    parser.add_argument("--lookups", type=int, default=2000, help="Cold lookups to time")
+    args = parser.parse_args()
+    run(args.seeds, args.payload, args.lookups)
@@ -0,0 +1,189 @@
+"""
+Load-test the local server's API and content routes.
+
+Plants a set of lesson archives, starts LocalServer either on the
+threaded keep-alive WSGIServer or on werkzeug's threaded development
+server (what `app.run` uses), and has a classroom of clients, each on
+one persistent connection, issue a fixed, seeded mix of requests: seed
+listing and lookup, search, lesson pages (gzip and plain) and video
+ranges. Reports p50/p99 latency and requests per second per route and
+overall, and the response cache's hit ratio.
+
+    python benchmarks/bench_server.py --clients 40 --workers 16
+    python benchmarks/bench_server.py --clients 40 --server dev
+    python benchmarks/bench_server.py --cache-mb 0
+"""
+
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from collections import defaultdict
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from werkzeug.serving import make_server
+
+from eduseedbank.network.scheduler import percentile
+from eduseedbank.server.local_server import LocalServer
+from eduseedbank.server.wsgi import WSGIServer
+
+TOPICS = "padi jagung sawah hujan pupuk panen ikan hutan pecahan sejarah gizi cuaca".split()
+VIDEO_BYTES = 2 * 1024 * 1024
+RANGE_BYTES = 256 * 1024
+PAGE_WORDS = 25000  # About 170 KB of lesson text
+SYLLABLES = "ba be bi bu ka ke ki ku la le li lu ma me mi mu na ni nu pa pe pi ra ri ru sa si su ta ti tu".split()
+# Made-up words plus the topics, Zipf-distributed like the words of real text
+VOCABULARY = sorted({"".join(random.Random(n).choices(SYLLABLES, k=2 + n % 3)) for n in range(5000)} | set(TOPICS))
+random.Random(0).shuffle(VOCABULARY)
+WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+
+
+def build_archive(path: str, index: int):
+    topic = TOPICS[index % len(TOPICS)]
+    rng = random.Random(index)
+    text = " ".join(rng.choices(VOCABULARY, WEIGHTS, k=PAGE_WORDS))
+    page = f"<html><body><h1>Belajar tentang {topic} bagian {index}</h1><p>{text}</p></body></html>"
+    with zipfile.ZipFile(path, "w") as zipf:
+        zipf.writestr("metadata.json", f'{{"title": "Pelajaran {topic} {index}", "subject": "IPA"}}')
+        zipf.writestr("index.html", page, compress_type=zipfile.ZIP_DEFLATED)
+        zipf.writestr("video.mp4", random.Random(index).getrandbits(8 * VIDEO_BYTES).to_bytes(VIDEO_BYTES, "little"))
+
+
+def request_mix(rng: random.Random, seeds: int, count: int):
+    """(route label, path, headers) for one client, drawn with fixed weights."""
+    routes = []
+    for _ in range(count):
+        seed = f"lesson-{rng.randrange(seeds)}"
+        kind = rng.choices(["list", "seed", "search", "page", "plain", "video"], weights=[1, 2, 2, 3, 2, 4])[0]
+        if kind == "list":
+            routes.append(("GET /api/seeds", "/api/seeds", {}))
+        elif kind == "seed":
+            routes.append(("GET /api/seeds/<id>", f"/api/seeds/{seed}", {}))
+        elif kind == "search":
+            routes.append(("GET /api/search", f"/api/search?q={rng.choice(TOPICS)}", {}))
+        elif kind == "page":
+            routes.append(("GET /content page", f"/content/{seed}/index.html", {"Accept-Encoding": "gzip"}))
+        elif kind == "plain":
+            routes.append(("GET /content inflated", f"/content/{seed}/index.html", {}))
+        else:
+            start = rng.randrange(0, VIDEO_BYTES - RANGE_BYTES)
+            routes.append(("GET /content range", f"/content/{seed}/video.mp4",
+                           {"Range": f"bytes={start}-{start + RANGE_BYTES - 1}"}))
+    return routes
+
+
+def client(port: int, routes, latencies, errors, lock):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    mine = defaultdict(list)
+    failed = 0
+    for label, path, headers in routes:
+        began = time.perf_counter()
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status not in (200, 206):
+                failed += 1
+        except (OSError, http.client.HTTPException):
+            failed += 1
+            connection.close()
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        mine[label].append(time.perf_counter() - began)
+    connection.close()
+    with lock:
+        for label, values in mine.items():
+            latencies[label].extend(values)
+        errors[0] += failed
+
+
+def serve(server_kind: str, workers: int, seeds: int, cache_mb: int, metrics: bool, ports, stop):
+    """Server process: plant the lessons, report the port, serve until `stop` is set."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server = LocalServer(content_dir=os.path.join(temp_dir, "content"),
+                             response_cache_bytes=cache_mb * 1024 * 1024, metrics=metrics)
+        source = os.path.join(temp_dir, "lesson.seed")
+        with contextlib.redirect_stdout(io.StringIO()):
+            for index in range(seeds):
+                build_archive(source, index)
+                server.plant_archive(source, f"lesson-{index}", move=True)
+        server.search.wait()
+
+        if server_kind == "wsgi":
+            httpd = WSGIServer(server.app, "127.0.0.1", 0, workers=workers)
+            port = httpd.port
+        else:
+            logging.getLogger("werkzeug").setLevel(logging.ERROR)  # No per-request log lines
+            httpd = make_server("127.0.0.1", 0, server.app, threaded=True)
+            port = httpd.server_port
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        ports.put(port)
+        stop.wait()
+        httpd.shutdown()
+
+
+def run(server_kind: str, clients: int, workers: int, requests: int, seeds: int, cache_mb: int,
+        metrics: bool = True):
+    # The server gets a process of its own so the clients do not compete for its GIL
+    ports, stop = multiprocessing.Queue(), multiprocessing.Event()
+    process = multiprocessing.Process(target=serve, args=(server_kind, workers, seeds, cache_mb, metrics,
+                                                                      ports, stop))
+    process.start()
+    try:
+        port = ports.get(timeout=300)
+        rng = random.Random(0)
+        mixes = [request_mix(rng, seeds, requests) for _ in range(clients)]
+        latencies, errors, lock = defaultdict(list), [0], threading.Lock()
+        threads = [threading.Thread(target=client, args=(port, mix, latencies, errors, lock)) for mix in mixes]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        connection.request("GET", "/api/cache")
+        cache = json.loads(connection.getresponse().read())
+        connection.close()
+    finally:
+        stop.set()
+        process.join()
+
+    mode = f"WSGIServer, {workers} workers" if server_kind == "wsgi" else "werkzeug development server"
+    print(f"{clients} clients x {requests} requests on {mode}{'' if metrics else ', no request metrics'}")
+    print(f"  {'route':22s} {'count':>7s} {'p50 ms':>8s} {'p99 ms':>8s}")
+    every = []
+    for label in sorted(latencies):
+        values = latencies[label]
+        every.extend(values)
+        print(f"  {label:22s} {len(values):7d} {percentile(values, 50) * 1000:8.2f} "
+              f"{percentile(values, 99) * 1000:8.2f}")
+    print(f"  {'all':22s} {len(every):7d} {percentile(every, 50) * 1000:8.2f} "
+          f"{percentile(every, 99) * 1000:8.2f}")
+    print(f"  throughput {len(every) / elapsed:8.0f} requests/s, {errors[0]} errors, {elapsed:.2f} s")
+    print(f"  response cache {cache['hit_ratio']:.1%} hits, {cache['used_bytes'] / 1e6:.1f} MB "
+          f"in {cache['entries']} entries")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--server", choices=["wsgi", "dev"], default="wsgi", help="Server to test")
+    parser.add_argument("--clients", type=int, default=40, help="Concurrent clients")
+    parser.add_argument("--workers", type=int, default=16, help="WSGIServer worker threads")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per client")
+    parser.add_argument("--seeds", type=int, default=20, help="Planted lessons")
+    parser.add_argument("--cache-mb", type=int, default=64, help="Response cache size (0 disables it)")
+    parser.add_argument("--no-metrics", action="store_true", help="Serve without per-request metrics")
+    args = parser.parse_args()
+    run(args.server, args.clients, args.workers, args.requests, args.seeds, args.cache_mb, not args.no_metrics)
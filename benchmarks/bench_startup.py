@@ -0,0 +1,75 @@
+"""
+Measure CLI startup time with `python -X importtime`.
+
+Runs `--help` for the CLI and for each of its commands in fresh
+interpreters and reports the best wall time and total import time of
+each, next to a bare interpreter and `import click` as baselines, then
+the modules that cost the most for one command.
+
+    python benchmarks/bench_startup.py --runs 10 --command create-package
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Add src to path so we can import our modules
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, SRC)
+
+from eduseedbank.cli.main import COMMANDS
+
+
+def import_times(args):
+    """Wall seconds and [(module, self us, cumulative us)] of one `python -X importtime <args>` run."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], capture_output=True, text=True,
+                            env=dict(os.environ, PYTHONPATH=SRC), check=True)
+    elapsed = time.perf_counter() - start
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return elapsed, modules
+
+
+def measure(args, runs: int):
+    """Best wall time and import time (ms) over `runs`, with the module list of the best run."""
+    best = None
+    for _ in range(runs):
+        elapsed, modules = import_times(args)
+        imports = sum(self_us for _, self_us, _ in modules) / 1000
+        if best is None or elapsed < best[0]:
+            best = (elapsed, imports, modules)
+    return best[0] * 1000, best[1], best[2]
+
+
+def run(runs: int, command: str, top: int):
+    cases = [("python -c pass", ["-c", "pass"]), ("import click", ["-c", "import click"]),
+             ("eduseedbank --help", ["-m", "eduseedbank.cli.main", "--help"])]
+    cases += [(f"{name} --help", ["-m", "eduseedbank.cli.main", name, "--help"]) for name in COMMANDS]
+    print(f"best of {runs} runs")
+    print(f"  {'':28s} {'wall ms':>8s} {'imports ms':>11s} {'modules':>8s}")
+    for label, args in cases:
+        wall, imports, modules = measure(args, runs)
+        print(f"  {label:28s} {wall:8.1f} {imports:11.1f} {len(modules):8d}")
+
+    _, _, modules = measure(["-m", "eduseedbank.cli.main", command, "--help"], runs)
+    print(f"slowest imports of {command} --help (self ms, cumulative ms)")
+    for name, self_us, cumulative_us in sorted(modules, key=lambda m: -m[1])[:top]:
+        print(f"  {name:40s} {self_us / 1000:6.1f} {cumulative_us / 1000:8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Runs per case; the fastest is reported")
+    parser.add_argument("--command", default="create-package", choices=sorted(COMMANDS),
+                        help="Command whose slowest imports are listed")
+    parser.add_argument("--top", type=int, default=10, help="Imports listed for --command")
+    args = parser.parse_args()
+    run(args.runs, args.command, args.top)
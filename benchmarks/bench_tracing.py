@@ -0,0 +1,99 @@
+"""
+Measure simulator throughput with tracing off, printing, and binary tracing.
+
+Replays the same chunked seed transfers over a multi-hop synthetic
+topology in four modes: quiet nodes, verbose nodes printing every event
+(to /dev/null), an in-memory ring-buffer tracer, and a tracer streaming
+to a trace file. Reports frames delivered per second of wall time.
+
+    python benchmarks/bench_tracing.py --nodes 200 --requests 200
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.topology import GENERATORS, generate
+from eduseedbank.network.trace import Tracer, analyse_trace, read_trace
+from eduseedbank.network.transfer import TransferManager
+
+MODES = ("quiet", "verbose", "ring", "file")
+
+
+def run_mode(mode: str, topology: str, nodes: int, requests: int, seed_bytes: int,
+             seed: int, trace_path: str):
+    network = generate(topology, nodes, seed=seed).to_network()
+    network.multi_hop = True
+    frames = [0]
+
+    def count(message):
+        frames[0] += 1
+        return True
+
+    network.link_filter = count
+    gateway = network.get_node("gateway")
+    for i in range(10):
+        gateway.store_seed(f"seed{i}", {"title": f"Lesson {i}", "body": "x" * seed_bytes})
+    for node in network.nodes.values():
+        node.verbose = mode == "verbose"
+        TransferManager(node)
+
+    tracer = None
+    if mode == "ring":
+        tracer = Tracer()
+    elif mode == "file":
+        tracer = Tracer(path=trace_path)
+    network.set_tracer(tracer)
+
+    rng = random.Random(seed)
+    schools = [node_id for node_id in network.nodes if node_id != "gateway"]
+    script = [(rng.choice(schools), f"seed{rng.randrange(10)}") for _ in range(requests)]
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        for school, seed_id in script:
+            node = network.get_node(school)
+            node.transfers.request(seed_id, "gateway")
+            node.seed_storage.pop(seed_id, None)
+        if tracer:
+            tracer.close()
+        elapsed = time.perf_counter() - start
+    return frames[0], elapsed, tracer
+
+
+def run(topology: str, nodes: int, requests: int, seed_bytes: int, seed: int):
+    print(f"{topology}, {nodes} nodes, {requests} chunked requests of {seed_bytes} B")
+    print(f"{'mode':<8} {'frames':>8} {'wall_s':>8} {'frames/s':>10} {'events':>9} {'slowdown':>9}")
+    baseline = None
+    with tempfile.TemporaryDirectory() as temp_dir:
+        trace_path = os.path.join(temp_dir, "run.trace")
+        for mode in MODES:
+            frames, elapsed, tracer = run_mode(mode, topology, nodes, requests, seed_bytes,
+                                               seed, trace_path)
+            rate = frames / elapsed if elapsed else 0.0
+            baseline = baseline or rate
+            events = tracer.written if tracer else 0
+            print(f"{mode:<8} {frames:>8} {elapsed:>8.2f} {rate:>10.0f} {events:>9} "
+                  f"{baseline / rate if rate else 0:>8.2f}x")
+
+        analysis = analyse_trace(read_trace(trace_path))
+        print(f"trace file: {os.path.getsize(trace_path)} bytes, "
+              f"{len(analysis.paths)} messages, {len(analysis.latencies())} delivered")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--topology", choices=sorted(GENERATORS), default="random_geometric")
+    parser.add_argument("--nodes", type=int, default=200, help="Nodes in the topology")
+    parser.add_argument("--requests", type=int, default=200, help="Seed requests to replay")
+    parser.add_argument("--seed-bytes", type=int, default=2000, help="Body size of each seed")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed")
+    args = parser.parse_args()
+    run(args.topology, args.nodes, args.requests, args.seed_bytes, args.seed)
@@ -0,0 +1,64 @@
+"""
+Load-test the LoRa protocol across cores: one process per node over UDP multicast.
+
+Every process runs a node that pings random peers on a shared loopback
+multicast channel with optional loss and latency, then reports frame
+counters back to the parent.
+
+    python benchmarks/bench_transport.py --nodes 8 --duration 5 --loss 0.05
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.transport import run_udp_node
+
+
+def run(nodes: int, duration: float, interval: float, loss: float, latency: float, port: int):
+    node_ids = [f"node{i}" for i in range(nodes)]
+    results = multiprocessing.Queue()
+    processes = []
+    for node_id in node_ids:
+        peers = [peer for peer in node_ids if peer != node_id]
+        process = multiprocessing.Process(
+            target=run_udp_node,
+            args=(node_id, peers, duration, interval, results),
+            kwargs={"port": port, "loss": loss, "latency": latency}
+        )
+        processes.append(process)
+
+    start = time.time()
+    for process in processes:
+        process.start()
+    stats = [results.get(timeout=duration + 30) for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.time() - start
+
+    sent = sum(s["frames_sent"] for s in stats)
+    received = sum(s["frames_received"] for s in stats)
+    dropped = sum(s["frames_dropped"] for s in stats)
+    print(f"{nodes} processes, {duration:.0f}s, loss {loss:.0%}, latency {latency * 1000:.0f} ms")
+    print(f"  frames sent      {sent:8d}  ({sent / duration:8.0f}/s)")
+    print(f"  frames received  {received:8d}  ({received / duration:8.0f}/s)")
+    print(f"  frames dropped   {dropped:8d}")
+    print(f"  bytes sent       {sum(s['bytes_sent'] for s in stats):8d}")
+    print(f"  wall time        {elapsed:8.1f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=os.cpu_count() or 4, help="Node processes")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds of traffic")
+    parser.add_argument("--interval", type=float, default=0.005, help="Seconds between pings per node")
+    parser.add_argument("--loss", type=float, default=0.0, help="Frame loss probability")
+    parser.add_argument("--latency", type=float, default=0.0, help="Per-frame latency in seconds")
+    parser.add_argument("--port", type=int, default=5007, help="Multicast port")
+    args = parser.parse_args()
+    run(args.nodes, args.duration, args.interval, args.loss, args.latency, args.port)
@@ -0,0 +1,365 @@
+"""
+Benchmark suite for EduSeedbank.
+
+Measures each subsystem on synthetic fixtures, with no network, radio or
+ffmpeg needed: seed save and read throughput, HTML page render rate, the
+dissemination model's speed, chunked transfers through LoRaNetwork and
+the local server's request rate. A run
+produces a JSON-ready report with the environment it ran in; compare()
+checks a report against a saved baseline and flags regressions.
+
+Heavy modules are imported inside the benchmarks so `eduseedbank bench
+--help` stays as quick as the other commands.
+"""
+
+import contextlib
+import io
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import zipfile
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+from eduseedbank import __version__
+
+REPORT_VERSION = 1
+DEFAULT_TOLERANCE = 0.10  # Relative slowdown flagged as a regression
+WORDS = ["padi", "sawah", "air", "tanah", "benih", "panen", "pupuk", "hujan", "musim", "petani"]
+
+
+@dataclass
+class BenchResult:
+    """One measured value; `higher_is_better` says which way a change is a regression."""
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool = True
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class Comparison:
+    """A result next to its baseline; `change` is relative and positive when it improved."""
+    name: str
+    unit: str
+    baseline: Optional[float]
+    current: Optional[float]
+    change: Optional[float]
+    regressed: bool
+
+
+def _best_rate(work: Callable[[], float], repeat: int) -> float:
+    """Highest units per second over `repeat` calls of work(), which returns the units it did."""
+    best = 0.0
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        units = work()
+        best = max(best, units / max(time.perf_counter() - start, 1e-9))
+    return best
+
+
+def _random_bytes(rng: random.Random, n: int) -> bytes:
+    """`n` incompressible bytes from `rng`; Random.randbytes needs Python 3.9."""
+    return rng.getrandbits(8 * n).to_bytes(n, "little") if n else b""
+
+
+def _lesson_files(directory: str, rng: random.Random, pages: int = 5, video_bytes: int = 1024 * 1024) -> Dict[str, str]:
+    """Write a lesson's pages and an incompressible stand-in video; {archive name: path}."""
+    files = {}
+    for page in range(pages):
+        path = os.path.join(directory, f"page{page}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("<p>" + " ".join(rng.choice(WORDS) for _ in range(3000)) + "</p>")
+        files[f"page{page}.html"] = path
+    path = os.path.join(directory, "video.mp4")
+    with open(path, "wb") as f:
+        f.write(_random_bytes(rng, video_bytes))
+    files["video.mp4"] = path
+    return files
+
+
+def bench_seeds(scale: float = 1.0, repeat: int = 3) -> List[BenchResult]:
+    """Seed save throughput through SeedPackage and read throughput through SeedArchive."""
+    from eduseedbank.packaging.core import SeedPackage
+    from eduseedbank.server.archive import SeedArchive
+
+    count = max(2, round(20 * scale))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        files = _lesson_files(temp_dir, random.Random(0))
+        outputs = [os.path.join(temp_dir, f"lesson-{index}") for index in range(count)]
+
+        def save():
+            for output in outputs:
+                package = SeedPackage(f"Pelajaran {output}", "Sintetis", "K13", "IPA")
+                for name, path in files.items():
+                    package.add_file(path, name)
+                package.save(output)
+            return sum(os.path.getsize(f"{output}.seed") for output in outputs) / 1e6
+
+        def read():
+            total = 0
+            for output in outputs:
+                archive = SeedArchive(f"{output}.seed")
+                for name in archive.members:
+                    stream = archive.open(name)
+                    try:
+                        total += sum(len(chunk) for chunk in stream)
+                    finally:
+                        stream.close()
+            return total / 1e6
+
+        saved = _best_rate(save, repeat)
+        return [BenchResult("seed_save", saved, "MB/s"), BenchResult("seed_read", _best_rate(read, repeat), "MB/s")]
+
+
+def bench_html(scale: float = 1.0, repeat: int = 3) -> List[BenchResult]:
+    """Interactive lesson pages rendered per second by HTMLGenerator."""
+    from eduseedbank.packaging.html_generator import HTMLGenerator
+
+    generator = HTMLGenerator()
+    rng = random.Random(0)
+    content = "\n".join(" ".join(rng.choice(WORDS) for _ in range(60)) for _ in range(20))
+    exercises = [{"question": f"Pertanyaan {index}?", "options": ["padi", "jagung", "kedelai", "ubi"],
+                  "correct_answer": "padi"} for index in range(5)]
+    pages = max(10, round(2000 * scale))
+
+    def render():
+        for index in range(pages):
+            generator.create_interactive_page(f"Pelajaran {index}", content, exercises)
+        return pages
+
+    return [BenchResult("html_render", _best_rate(render, repeat), "pages/s")]
+
+
+def bench_lora(scale: float = 1.0, repeat: int = 3) -> List[BenchResult]:
+    """
+    LoRa benchmarks: the dissemination model and real chunked transfers.
+
+    `dissemination_*` time network.benchmark.DisseminationSimulator, the
+    discrete-event model of flooding two seeds over a grid. `lora_transfer*`
+    download a seed through TransferManager over a multi-hop LoRaNetwork,
+    so they cover the node, routing and transfer code the mesh runs.
+    """
+    from eduseedbank.network.benchmark import DisseminationSimulator, flood_seeds
+    from eduseedbank.network.lora import LoRaNetwork, LoRaNode
+    from eduseedbank.network.radio import message_airtime
+    from eduseedbank.network.topology import generate
+    from eduseedbank.network.transfer import TransferManager
+
+    nodes = max(25, round(400 * scale))
+    topology = generate("grid", nodes, seed=0)
+    results = []
+
+    def flood():
+        result = DisseminationSimulator(topology).run_flood(flood_seeds(2))
+        results.append(result)
+        return result.events
+
+    rate = _best_rate(flood, repeat)
+
+    rng = random.Random(0)
+    seed = {"title": "Pelajaran", "body": " ".join(rng.choice(WORDS) for _ in range(max(200, round(20000 * scale))))}
+    airtimes = []
+
+    def transfer():
+        network = LoRaNetwork()
+        network.multi_hop = True
+        chain = [LoRaNode(f"node{index}", verbose=False) for index in range(4)]
+        for node in chain:
+            network.add_node(node)
+        for near, far in zip(chain, chain[1:]):
+            near.connect_to_node(far)
+            far.connect_to_node(near)
+        chain[0].store_seed("lesson", seed)
+        frames = []
+
+        def count(message):
+            frames.append(message_airtime(message))
+            return True
+
+        network.link_filter = count
+        manager = TransferManager(chain[-1])
+        manager.request("lesson", chain[0].node_id)
+        if manager.completed != ["lesson"]:
+            raise RuntimeError("LoRa transfer benchmark did not complete")
+        airtimes.append(sum(frames))
+        return len(frames)
+
+    frame_rate = _best_rate(transfer, repeat)
+    # Airtimes are deterministic for a given workload, so they change only when the protocol does
+    return [BenchResult("dissemination_events", rate, "events/s"),
+            BenchResult("dissemination_airtime", results[-1].airtime / nodes, "s/node", higher_is_better=False),
+            BenchResult("lora_transfer", frame_rate, "frames/s"),
+            BenchResult("lora_transfer_airtime", airtimes[-1], "s/seed", higher_is_better=False)]
+
+
+def bench_server(scale: float = 1.0, repeat: int = 3) -> List[BenchResult]:
+    """Local server requests per second through Flask's test client, no sockets involved."""
+    from eduseedbank.server.local_server import LocalServer
+
+    seeds = 5
+    rounds = max(10, round(500 * scale))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server = LocalServer(content_dir=os.path.join(temp_dir, "content"))
+        try:
+            source = os.path.join(temp_dir, "lesson.seed")
+            rng = random.Random(0)
+            with contextlib.redirect_stdout(io.StringIO()):
+                for index in range(seeds):
+                    with zipfile.ZipFile(source, "w") as zipf:
+                        zipf.writestr("metadata.json", f'{{"title": "Pelajaran {index}"}}')
+                        zipf.writestr("index.html", " ".join(rng.choice(WORDS) for _ in range(3000)),
+                                      compress_type=zipfile.ZIP_DEFLATED)
+                        zipf.writestr("video.mp4", _random_bytes(rng, 256 * 1024))
+                    server.plant_archive(source, f"lesson-{index}", move=True)
+            paths = ["/api/seeds", "/api/seeds/lesson-0", "/content/lesson-1/index.html",
+                     "/content/lesson-2/video.mp4", "/api/search?q=padi+sawah"]
+            client = server.app.test_client()
+
+            def requests():
+                for _ in range(rounds):
+                    for path in paths:
+                        response = client.get(path)
+                        response.close()
+                        if response.status_code != 200:
+                            raise RuntimeError(f"GET {path} returned {response.status_code}")
+                return rounds * len(paths)
+
+            return [BenchResult("server_requests", _best_rate(requests, repeat), "requests/s")]
+        finally:
+            server.close()
+
+
+# Benchmark group name -> function returning its results
+BENCHMARKS = {
+    "seeds": bench_seeds,
+    "html": bench_html,
+    "lora": bench_lora,
+    "server": bench_server,
+}
+
+
+def environment() -> Dict:
+    """Interpreter, machine and package versions a report was measured with."""
+    from importlib import metadata
+
+    packages = {}
+    for package in ("flask", "werkzeug", "sqlalchemy", "click"):
+        try:
+            packages[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            packages[package] = None
+    return {
+        "eduseedbank": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "executable": sys.executable,
+        "packages": packages,
+    }
+
+
+def run_benchmarks(names: Optional[Iterable[str]] = None, scale: float = 1.0, repeat: int = 3,
+                   progress: Optional[Callable[[str], None]] = None) -> Dict:
+    """
+    Run benchmark groups and build a report.
+
+    Args:
+        names: Groups from BENCHMARKS to run; all of them by default
+        scale: Multiplier on each benchmark's workload; below 1 for a quick run
+        repeat: Runs of each workload; the best one is reported
+        progress: Called with each group's name before it runs
+
+    Returns:
+        JSON-ready dict with the environment, settings and results
+    """
+    names = list(names or BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}; choose from {', '.join(BENCHMARKS)}")
+    results = []
+    for name in names:
+        if progress:
+            progress(name)
+        results.extend(result.to_dict() for result in BENCHMARKS[name](scale=scale, repeat=repeat))
+    return {
+        "version": REPORT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "settings": {"benchmarks": names, "scale": scale, "repeat": repeat},
+        "results": results,
+    }
+
+
+def compare(baseline: Dict, report: Dict, tolerance: float = DEFAULT_TOLERANCE) -> List[Comparison]:
+    """
+    Compare a report with a baseline report, result by result.
+
+    Args:
+        baseline: Report saved from an earlier run
+        report: Report of the current run
+        tolerance: Relative change for the worse tolerated before a result counts as regressed
+
+    Returns:
+        One Comparison per result in either report, current results first
+    """
+    before = {result["name"]: result for result in baseline.get("results", [])}
+    after = {result["name"]: result for result in report.get("results", [])}
+    comparisons = []
+    for name in list(after) + [name for name in before if name not in after]:
+        old, new = before.get(name), after.get(name)
+        change = None
+        if old and new and old["value"]:
+            change = (new["value"] - old["value"]) / old["value"]
+            if not new.get("higher_is_better", True):
+                change = -change
+        comparisons.append(Comparison(
+            name=name,
+            unit=(new or old)["unit"],
+            baseline=old["value"] if old else None,
+            current=new["value"] if new else None,
+            change=change,
+            regressed=change is not None and change < -tolerance
+        ))
+    return comparisons
+
+
+def report_differences(baseline: Dict, report: Dict) -> List[str]:
+    """Environment fields and workload scale that differ between two reports, making them less comparable."""
+    old = dict(baseline.get("environment", {}), scale=baseline.get("settings", {}).get("scale"))
+    new = dict(report.get("environment", {}), scale=report.get("settings", {}).get("scale"))
+    fields = ("eduseedbank", "python", "implementation", "machine", "cpu_count", "packages", "scale")
+    return [f"{field}: {old.get(field)} -> {new.get(field)}" for field in fields if old.get(field) != new.get(field)]
+
+
+def format_report(report: Dict) -> str:
+    """Human-readable table of a report's results."""
+    env = report["environment"]
+    lines = [f"eduseedbank {env['eduseedbank']}, {env['implementation']} {env['python']} on {env['platform']}, "
+             f"{env['cpu_count']} CPUs, scale {report['settings']['scale']:g}"]
+    for result in report["results"]:
+        lines.append(f"  {result['name']:22s} {result['value']:14.2f} {result['unit']}")
+    return "\n".join(lines)
+
+
+def format_comparison(comparisons: List[Comparison], tolerance: float = DEFAULT_TOLERANCE) -> str:
+    """Human-readable table of comparisons, marking regressions beyond `tolerance`."""
+    lines = [f"  {'':22s} {'baseline':>14s} {'current':>14s} {'change':>8s}"]
+    for item in comparisons:
+        baseline = f"{item.baseline:14.2f}" if item.baseline is not None else f"{'-':>14s}"
+        current = f"{item.current:14.2f}" if item.current is not None else f"{'-':>14s}"
+        change = f"{item.change:+8.1%}" if item.change is not None else f"{'-':>8s}"
+        flag = "  REGRESSION" if item.regressed else ""
+        lines.append(f"  {item.name:22s} {baseline} {current} {change} {item.unit}{flag}")
+    regressions = sum(item.regressed for item in comparisons)
+    lines.append(f"{regressions} regression(s) beyond {tolerance:.0%}")
+    return "\n".join(lines)
@@ -0,0 +1,51 @@
+"""
+Benchmark command: measure every subsystem and compare with a baseline.
+"""
+
+import json
+import sys
+
+import click
+
+from eduseedbank.bench import BENCHMARKS, DEFAULT_TOLERANCE
+
+
+@click.command()
+@click.option("--only", multiple=True, type=click.Choice(list(BENCHMARKS)),
+              help="Run only this benchmark group; repeat for several")
+@click.option("--scale", default=1.0, type=float, help="Workload multiplier; 0.1 for a quick run")
+@click.option("--repeat", default=3, type=int, help="Runs of each workload; the best is reported")
+@click.option("--output", "output_path", default=None, help="Write the JSON report to this file")
+@click.option("--json", "as_json", is_flag=True, help="Print the JSON report instead of a table")
+@click.option("--compare", "baseline_path", default=None, type=click.Path(exists=True, dir_okay=False),
+              help="Baseline JSON report to compare with; exits 1 on a regression")
+@click.option("--tolerance", default=DEFAULT_TOLERANCE, type=float,
+              help="Relative slowdown tolerated before a result counts as regressed")
+def bench(only, scale: float, repeat: int, output_path: str, as_json: bool, baseline_path: str, tolerance: float):
+    """Benchmark seeds, HTML rendering, the LoRa simulator and the local server."""
+    from eduseedbank import bench as suite
+
+    baseline = None
+    if baseline_path:
+        try:
+            with open(baseline_path, encoding="utf-8") as f:
+                baseline = json.load(f)
+        except ValueError as e:
+            click.echo(f"Error reading baseline: {e}", err=True)
+            sys.exit(1)
+
+    report = suite.run_benchmarks(only or None, scale=scale, repeat=repeat,
+                                  progress=lambda name: click.echo(f"Running {name}...", err=True))
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        click.echo(f"Report written to {output_path}", err=True)
+    click.echo(json.dumps(report, indent=2) if as_json else suite.format_report(report))
+
+    if baseline is not None:
+        comparisons = suite.compare(baseline, report, tolerance)
+        for difference in suite.report_differences(baseline, report):
+            click.echo(f"Warning: run differs from the baseline in {difference}", err=True)
+        click.echo(suite.format_comparison(comparisons, tolerance), err=as_json)
+        if any(item.regressed for item in comparisons):
+            sys.exit(1)
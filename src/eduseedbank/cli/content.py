@@ -0,0 +1,91 @@
+"""
+Content commands: packages, videos and HTML pages.
+"""
+
+import sys
+
+import click
+
+
+@click.command()
+@click.option("--title", prompt="Title", help="Title of the educational content")
+@click.option("--description", prompt="Description", help="Description of the content")
+@click.option("--curriculum", prompt="Curriculum", help="Regional curriculum")
+@click.option("--subject", prompt="Subject", help="Educational subject")
+@click.option("--output", prompt="Output path", help="Output path for the seed package")
+def create_package(title: str, description: str, curriculum: str, subject: str, output: str):
+    """Create a new educational content package."""
+    from eduseedbank.packaging.core import PackagingSystem
+    try:
+        packaging_system = PackagingSystem()
+        package = packaging_system.create_package(title, description, curriculum, subject)
+        
+        # For now, we'll just save an empty package
+        # In a real implementation, we would add files to the package
+        package_path = package.save(output)
+        click.echo(f"Package created successfully: {package_path}")
+    except Exception as e:
+        click.echo(f"Error creating package: {e}", err=True)
+        sys.exit(1)
+
+
+@click.command()
+@click.option("--input", prompt="Input video path", help="Path to input video file")
+@click.option("--output", prompt="Output video path", help="Path for compressed video")
+@click.option("--size", default=5, help="Target size in MB (default: 5)")
+def compress_video(input: str, output: str, size: int):
+    """Compress a video for LoRa transmission."""
+    from eduseedbank.compression.video import VideoCompressor
+    try:
+        compressor = VideoCompressor()
+        if compressor.compress_video(input, output, size):
+            click.echo(f"Video compressed successfully: {output}")
+        else:
+            click.echo("Error compressing video", err=True)
+            sys.exit(1)
+    except Exception as e:
+        click.echo(f"Error compressing video: {e}", err=True)
+        sys.exit(1)
+
+
+@click.command()
+@click.option("--title", prompt="Page title", help="Title of the HTML page")
+@click.option("--content", prompt="Content", help="Main content (HTML format)")
+@click.option("--output", prompt="Output path", help="Output path for HTML file")
+def create_html(title: str, content: str, output: str):
+    """Create an interactive HTML educational page."""
+    from eduseedbank.packaging.html_generator import HTMLGenerator
+    try:
+        generator = HTMLGenerator()
+        html_content = generator.create_interactive_page(title, content)
+        if generator.save_page(html_content, output):
+            click.echo(f"HTML page created successfully: {output}")
+        else:
+            click.echo("Error creating HTML page", err=True)
+            sys.exit(1)
+    except Exception as e:
+        click.echo(f"Error creating HTML page: {e}", err=True)
+        sys.exit(1)
+
+
+@click.command()
+@click.argument("lesson_dir", type=click.Path(exists=True, file_okay=False))
+@click.option("--output", required=True, help="Output path; .seed and .frames are added")
+@click.option("--seed-id", default=None, help="Seed id the frames carry (default: the output's file name)")
+@click.option("--no-transcode", is_flag=True, help="Package videos as they are instead of running ffmpeg")
+@click.option("--size", default=5, help="Target size of each transcoded video in MB (default: 5)")
+@click.option("--chunk-size", default=128, help="Bytes of seed per LoRa frame (default: 128)")
+@click.option("--transcode-workers", default=2, help="Videos transcoded at the same time (default: 2)")
+def publish(lesson_dir: str, output: str, seed_id: str, no_transcode: bool, size: int, chunk_size: int,
+            transcode_workers: int):
+    """Publish a lesson folder as a seed package and LoRa-ready frames."""
+    from eduseedbank.publish import format_timings, publish as publish_lesson
+    try:
+        result = publish_lesson(lesson_dir, output, seed_id, transcode=not no_transcode, target_size_mb=size,
+                                transcode_workers=transcode_workers, chunk_size=chunk_size)
+        click.echo(f"Seed package: {result.seed_path}")
+        click.echo(f"LoRa frames: {result.frames_path} (sha256 {result.digest})")
+        click.echo(format_timings(result))
+    except Exception as e:
+        click.echo(f"Error publishing lesson: {e}", err=True)
+        sys.exit(1)
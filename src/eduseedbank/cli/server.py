@@ -0,0 +1,27 @@
+"""
+Local server command.
+"""
+
+import sys
+
+import click
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", help="Host to run the server on")
+@click.option("--port", default=8080, help="Port to run the server on")
+@click.option("--workers", default=0,
+              help="Serve with N worker threads and keep-alive (0: Flask development server)")
+@click.option("--peer-sync", is_flag=True,
+              help="Find other servers on the LAN by broadcast and pull seeds from them")
+def run_server(host: str, port: int, workers: int, peer_sync: bool):
+    """Run the local EduSeedbank server."""
+    from eduseedbank.server.local_server import LocalServer
+    try:
+        server = LocalServer(host=host, port=port)
+        mode = f"{workers} workers" if workers > 0 else "development server"
+        click.echo(f"Starting EduSeedbank server on {host}:{port} ({mode})")
+        server.run(workers=workers, peer_sync=peer_sync)
+    except Exception as e:
+        click.echo(f"Error starting server: {e}", err=True)
+        sys.exit(1)
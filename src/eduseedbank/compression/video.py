@@ -7,6 +7,8 @@ import os
 import subprocess
 from typing import Optional
 
+from eduseedbank.profiling import traced
+
 
 class VideoCompressor:
     """Handles compression of video content for low-bandwidth transmission."""
@@ -25,6 +27,7 @@ class VideoCompressor:
         except FileNotFoundError:
             return False
 
+    @traced("compression.compress_video")
     def compress_video(self, input_path: str, output_path: str, 
                       target_size_mb: int = 5) -> bool:
         """
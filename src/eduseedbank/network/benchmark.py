@@ -0,0 +1,307 @@
+"""
+Dissemination benchmark suite for the LoRa mesh.
+
+Runs scripted seed workloads over synthetic topologies with a
+discrete-event model of the transfer protocol: frames are charged their
+LoRa time on air, each node's radio sends one frame at a time, and
+relays store and forward whole seeds. The model is analytic: it never
+runs LoRaNode, LoRaNetwork or TransferManager, only costs their frames,
+so it measures the protocol's shape at scale, not the speed of the code
+(eduseedbank.bench times real transfers). Two workloads are provided:
+
+- flood: every node should end up with every seed; holders announce new
+  seeds and neighbours pull them (the data plane of the gossip protocol).
+- requests: a script of (time, node, seed) requests, each served from the
+  nearest holder over the shortest path; requesters then hold the seed.
+
+Results are reproducible from the seed passed to the generators.
+"""
+
+import heapq
+import math
+import random
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional
+
+from eduseedbank.profiling import traced
+
+from .lora import DEFAULT_CHUNK_SIZE, Message, MessageType
+from .radio import DEFAULT_PROFILE, RadioProfile, frame_size
+from .topology import Topology, generate
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+DEFAULT_TOPOLOGIES = ("grid", "random_geometric", "clustered_village", "line")
+
+
+@dataclass
+class SeedRequest:
+    """A scripted request: `node` wants `seed_id` at `time` seconds."""
+    time: float
+    node: int
+    seed_id: str
+
+
+@dataclass
+class BenchmarkResult:
+    """Metrics from one workload run."""
+    topology: str
+    nodes: int
+    edges: int
+    workload: str
+    seeds: int
+    completed: bool
+    coverage_time: float  # Seconds until the last delivery
+    airtime: float  # Total seconds on air across all radios
+    frames: int
+    delivered_bytes: int
+    events: int  # Steps of the model's event loop, not frames through real nodes
+    wall_time: float
+
+    @property
+    def frames_per_byte(self) -> float:
+        return self.frames / self.delivered_bytes if self.delivered_bytes else 0.0
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["frames_per_byte"] = self.frames_per_byte
+        return data
+
+
+def flood_seeds(num_seeds: int) -> List[str]:
+    return [f"seed{i}" for i in range(num_seeds)]
+
+
+def zipf_requests(topology: Topology, num_requests: int, num_seeds: int = 50,
+                  exponent: float = 1.0, duration: float = 86400.0,
+                  seed: int = 0) -> List[SeedRequest]:
+    """Requests from random nodes over `duration` seconds with Zipf-distributed seed popularity."""
+    rng = random.Random(seed)
+    weights = [1.0 / (rank ** exponent) for rank in range(1, num_seeds + 1)]
+    seed_ids = flood_seeds(num_seeds)
+    candidates = [i for i in range(topology.size) if i not in topology.gateways]
+    requests = [
+        SeedRequest(rng.uniform(0, duration), rng.choice(candidates), rng.choices(seed_ids, weights)[0])
+        for _ in range(num_requests)
+    ]
+    requests.sort(key=lambda r: r.time)
+    return requests
+
+
+class DisseminationSimulator:
+    """
+    Discrete-event model of seed transfers over a Topology.
+
+    Frame airtimes come from representative protocol messages, but no
+    node, network or transfer objects are built. A hop costs one request
+    and every chunk (no request per window), and frames are never lost
+    or collide.
+    """
+
+    def __init__(self, topology: Topology, seed_bytes: int = 20000,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 profile: RadioProfile = DEFAULT_PROFILE):
+        self.topology = topology
+        self.seed_bytes = seed_bytes
+        self.chunk_size = chunk_size
+        self.profile = profile
+        self.chunks = max(1, math.ceil(seed_bytes / chunk_size))
+
+        # Frame sizes come from representative protocol messages
+        request = Message(MessageType.SEED_REQUEST, "node0", "node1",
+                          {"seed_id": "seed0", "chunk_size": chunk_size, "window": 16}, 0)
+        chunk = Message(MessageType.SEED_CHUNK, "node0", "node1", {
+            "seed_id": "seed0", "index": 0, "total": self.chunks, "size": seed_bytes,
+            "chunk_size": chunk_size, "digest": "0" * 64, "last": False,
+            "data": "A" * (4 * math.ceil(chunk_size / 3))
+        }, 0)
+        announce = Message(MessageType.INVENTORY_OFFER, "node0", "broadcast", {"seed_ids": ["seed0"]}, 0)
+        self.request_airtime = profile.airtime(frame_size(request))
+        self.chunk_airtime = profile.airtime(frame_size(chunk))
+        self.announce_airtime = profile.airtime(frame_size(announce))
+        self._reset()
+
+    def _reset(self):
+        size = self.topology.size
+        self.holdings = [set() for _ in range(size)]
+        self.busy_until = [0.0] * size
+        self.airtime = 0.0
+        self.frames = 0
+        self.delivered_bytes = 0
+        self.events = 0
+        self.last_delivery = 0.0
+        self._queue = []
+        self._seq = 0
+
+    def _schedule(self, when: float, kind: str, *args):
+        heapq.heappush(self._queue, (when, self._seq, kind, args))
+        self._seq += 1
+
+    def _transmit(self, node: int, start: float, frames: int, frame_airtime: float) -> float:
+        """Occupy `node`'s radio for `frames` frames; returns when the last one ends."""
+        begin = max(start, self.busy_until[node])
+        duration = frames * frame_airtime
+        self.busy_until[node] = begin + duration
+        self.airtime += duration
+        self.frames += frames
+        return begin + duration
+
+    def _transfer(self, sender: int, receiver: int, start: float) -> float:
+        """One-hop seed transfer: a request from the receiver, then every chunk."""
+        requested = self._transmit(receiver, start, 1, self.request_airtime)
+        return self._transmit(sender, requested, self.chunks, self.chunk_airtime)
+
+    def _deliver(self, node: int, seed_id: str, when: float):
+        self.holdings[node].add(seed_id)
+        self.delivered_bytes += self.seed_bytes
+        self.last_delivery = max(self.last_delivery, when)
+
+    def _run_events(self, handlers: Dict):
+        while self._queue:
+            when, _, kind, args = heapq.heappop(self._queue)
+            self.events += 1
+            handlers[kind](when, *args)
+
+    @traced("network.simulate_flood")
+    def run_flood(self, seed_ids: Iterable[str]) -> BenchmarkResult:
+        """Spread every seed from the gateways to every node."""
+        self._reset()
+        seed_ids = list(seed_ids)
+        fetching = set()
+        start = time.perf_counter()
+
+        for gateway in self.topology.gateways:
+            for seed_id in seed_ids:
+                self.holdings[gateway].add(seed_id)
+                self._schedule(0.0, "announce", gateway, seed_id)
+
+        def announce(when: float, node: int, seed_id: str):
+            sent = self._transmit(node, when, 1, self.announce_airtime)
+            for neighbor in self.topology.neighbors[node]:
+                key = (neighbor, seed_id)
+                if seed_id in self.holdings[neighbor] or key in fetching:
+                    continue
+                fetching.add(key)
+                self._schedule(self._transfer(node, neighbor, sent), "arrive", neighbor, seed_id)
+
+        def arrive(when: float, node: int, seed_id: str):
+            self._deliver(node, seed_id, when)
+            self._schedule(when, "announce", node, seed_id)
+
+        self._run_events({"announce": announce, "arrive": arrive})
+        wall = time.perf_counter() - start
+        completed = all(len(h) == len(seed_ids) for h in self.holdings)
+        return self._result("flood", len(seed_ids), completed, wall)
+
+    def _path_to_holder(self, node: int, seed_id: str) -> Optional[List[int]]:
+        """Shortest path from the nearest holder of `seed_id` to `node`."""
+        parents = {node: None}
+        queue = deque([node])
+        while queue:
+            current = queue.popleft()
+            if seed_id in self.holdings[current]:
+                path = [current]
+                while parents[path[-1]] is not None:
+                    path.append(parents[path[-1]])
+                return path
+            for neighbor in self.topology.neighbors[current]:
+                if neighbor not in parents:
+                    parents[neighbor] = current
+                    queue.append(neighbor)
+        return None
+
+    @traced("network.simulate_requests")
+    def run_requests(self, requests: List[SeedRequest]) -> BenchmarkResult:
+        """Serve scripted requests from the nearest holder, relaying hop by hop."""
+        self._reset()
+        seed_ids = {r.seed_id for r in requests}
+        start = time.perf_counter()
+        for gateway in self.topology.gateways:
+            self.holdings[gateway].update(seed_ids)
+        for request in requests:
+            self._schedule(request.time, "request", request.node, request.seed_id)
+        unserved = []
+
+        def request(when: float, node: int, seed_id: str):
+            if seed_id in self.holdings[node]:
+                return
+            path = self._path_to_holder(node, seed_id)
+            if path is None:
+                unserved.append((node, seed_id))
+                return
+            # The request travels towards the holder, then the seed is
+            # stored and forwarded back along the same path.
+            t = when
+            for hop in reversed(path[1:]):
+                t = self._transmit(hop, t, 1, self.request_airtime)
+            for sender in path[:-1]:
+                t = self._transmit(sender, t, self.chunks, self.chunk_airtime)
+            self._schedule(t, "arrive", node, seed_id)
+
+        def arrive(when: float, node: int, seed_id: str):
+            self._deliver(node, seed_id, when)
+
+        self._run_events({"request": request, "arrive": arrive})
+        wall = time.perf_counter() - start
+        return self._result("requests", len(seed_ids), not unserved, wall)
+
+    def _result(self, workload: str, seeds: int, completed: bool, wall: float) -> BenchmarkResult:
+        return BenchmarkResult(
+            topology=self.topology.name,
+            nodes=self.topology.size,
+            edges=self.topology.edge_count(),
+            workload=workload,
+            seeds=seeds,
+            completed=completed,
+            coverage_time=self.last_delivery,
+            airtime=self.airtime,
+            frames=self.frames,
+            delivered_bytes=self.delivered_bytes,
+            events=self.events,
+            wall_time=wall
+        )
+
+
+def run_suite(topologies: Iterable[str] = DEFAULT_TOPOLOGIES, sizes: Iterable[int] = DEFAULT_SIZES,
+              workload: str = "flood", seed: int = 0, num_seeds: int = 1,
+              requests_per_node: float = 0.1, seed_bytes: int = 20000) -> List[BenchmarkResult]:
+    """
+    Run a workload over every topology/size combination.
+
+    Args:
+        topologies: Generator names from topology.GENERATORS
+        sizes: Node counts to generate
+        workload: "flood" or "requests"
+        seed: RNG seed for topologies and request scripts
+        num_seeds: Seeds to flood, or distinct seeds in the request script
+        requests_per_node: Request script length relative to node count
+        seed_bytes: Encoded size of each seed
+    """
+    if workload not in ("flood", "requests"):
+        raise ValueError(f"Unknown workload: {workload}")
+    results = []
+    for name in topologies:
+        for size in sizes:
+            topology = generate(name, size, seed=seed)
+            simulator = DisseminationSimulator(topology, seed_bytes=seed_bytes)
+            if workload == "flood":
+                results.append(simulator.run_flood(flood_seeds(num_seeds)))
+            else:
+                script = zipf_requests(topology, max(1, int(size * requests_per_node)),
+                                       num_seeds=max(num_seeds, 1), seed=seed)
+                results.append(simulator.run_requests(script))
+    return results
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    """Render results as a fixed-width table."""
+    lines = [f"{'topology':<18} {'nodes':>7} {'workload':<9} {'coverage_s':>11} "
+             f"{'airtime_s':>11} {'frames':>9} {'frames/KB':>9}"]
+    for r in results:
+        lines.append(
+            f"{r.topology:<18} {r.nodes:>7} {r.workload:<9} {r.coverage_time:>11.0f} "
+            f"{r.airtime:>11.0f} {r.frames:>9} {r.frames_per_byte * 1024:>9.2f}"
+            + ("" if r.completed else "  (incomplete)")
+        )
+    return "\n".join(lines)
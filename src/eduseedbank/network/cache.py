@@ -0,0 +1,311 @@
+"""
+In-network caching of seed chunks at relay nodes.
+
+A RelayCache keeps copies of SEED_CHUNK frames a node forwards, up to a
+byte capacity, and answers later chunked SEED_REQUESTs that pass through
+it. Chunks it holds go straight back to the requester; the request
+continues towards the holder with those chunks marked as already had,
+so only the remainder crosses the rest of the path.
+
+Eviction is popularity-aware: LFU with dynamic aging (LFU-DA) keeps
+chunks of frequently requested seeds while letting stale favourites age
+out. Plain LRU is available for comparison.
+"""
+
+import base64
+import heapq
+import random
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .lora import LoRaNetwork, LoRaNode, Message, MessageType, encode_seed
+from .radio import DEFAULT_PROFILE, RadioProfile, message_airtime
+
+CACHE_POLICIES = ("lfu-da", "lru")
+
+
+class ChunkCache:
+    """Byte-capped cache of seed chunks keyed by (seed_id, digest, chunk_size, index)."""
+
+    def __init__(self, capacity_bytes: int, policy: str = "lfu-da"):
+        if policy not in CACHE_POLICIES:
+            raise ValueError(f"Unknown cache policy: {policy}")
+        self.capacity_bytes = capacity_bytes
+        self.policy = policy
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._chunks = OrderedDict()  # key -> bytes, in LRU order
+        self._priority = {}  # key -> LFU-DA priority
+        self._heap = []  # (priority, seq, key); stale entries are skipped
+        self._seq = 0
+        self._age = 0.0  # LFU-DA inflation factor L
+        self._frequency = {}  # seed_id -> requests seen, shared by a seed's chunks
+        self.seeds = {}  # (seed_id, digest, chunk_size) -> (total, size)
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def __contains__(self, key: Tuple) -> bool:
+        return key in self._chunks
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def record_request(self, seed_id: str):
+        """Count a request for a seed; popularity is tracked per seed, not per chunk."""
+        self._frequency[seed_id] = self._frequency.get(seed_id, 0) + 1
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        data = self._chunks.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touch(key)
+        return data
+
+    def put(self, key: Tuple, data: bytes):
+        if len(data) > self.capacity_bytes:
+            return
+        if key in self._chunks:
+            self._touch(key)
+            return
+        while self.used_bytes + len(data) > self.capacity_bytes and self._chunks:
+            self._evict()
+        self._chunks[key] = data
+        self.used_bytes += len(data)
+        self._touch(key)
+
+    def _touch(self, key: Tuple):
+        self._chunks.move_to_end(key)
+        if self.policy == "lfu-da":
+            priority = self._age + self._frequency.get(key[0], 1)
+            self._priority[key] = priority
+            heapq.heappush(self._heap, (priority, self._seq, key))
+            self._seq += 1
+
+    def _evict(self):
+        if self.policy == "lru":
+            key, data = self._chunks.popitem(last=False)
+        else:
+            while True:
+                priority, _, key = heapq.heappop(self._heap)
+                if self._priority.get(key) == priority and key in self._chunks:
+                    break
+            data = self._chunks.pop(key)
+            del self._priority[key]
+            # Dynamic aging: new entries start at the evicted priority, so
+            # once-popular chunks cannot squat in the cache forever
+            self._age = priority
+        self.used_bytes -= len(data)
+        self.evictions += 1
+
+
+class RelayCache:
+    """Caches chunks a relay forwards and answers later requests from them."""
+
+    def __init__(self, node: LoRaNode, capacity_bytes: int = 64 * 1024, policy: str = "lfu-da"):
+        self.node = node
+        self.cache = ChunkCache(capacity_bytes, policy)
+        self.chunks_served = 0
+        node.relay_cache = self
+
+    def intercept(self, message: Message) -> bool:
+        """
+        Inspect a frame being forwarded.
+
+        Returns True if the relay fully handled it and it must not be
+        forwarded further.
+        """
+        if message.msg_type == MessageType.SEED_CHUNK:
+            self._store(message)
+        elif message.msg_type == MessageType.SEED_REQUEST and "chunk_size" in message.payload:
+            return self._answer(message)
+        return False
+
+    def _store(self, message: Message):
+        payload = message.payload
+        seed = (payload["seed_id"], payload["digest"], payload["chunk_size"])
+        # Re-inserted so the most recently seen version of a seed sorts last
+        self.cache.seeds.pop(seed, None)
+        self.cache.seeds[seed] = (payload["total"], payload["size"])
+        self.cache.put(seed + (payload["index"],), base64.b64decode(payload["data"]))
+
+    def _answer(self, message: Message) -> bool:
+        request = message.payload
+        seed_id = request["seed_id"]
+        chunk_size = int(request["chunk_size"])
+        self.cache.record_request(seed_id)
+        known = [(seed, meta) for seed, meta in self.cache.seeds.items()
+                 if seed[0] == seed_id and seed[2] == chunk_size]
+        if not known:
+            return False
+        seed, (total, size) = known[-1]
+
+        have = bytearray(base64.b64decode(request["have"])) if request.get("have") else bytearray()
+        have.extend(b"\0" * ((total + 7) // 8 - len(have)))
+        start = int(request.get("offset", 0)) // chunk_size
+        for index in range(start):
+            # Offset-based resume: everything before the offset is already had
+            have[index >> 3] |= 1 << (index & 7)
+        wanted = [i for i in range(start, total) if not have[i >> 3] & (1 << (i & 7))]
+        if request.get("window"):
+            wanted = wanted[:request["window"]]
+
+        cached = []
+        for index in wanted:
+            data = self.cache.get(seed + (index,))
+            if data is not None:
+                cached.append((index, data))
+        if not cached:
+            return False
+
+        complete = len(cached) == len(wanted)
+        for position, (index, data) in enumerate(cached):
+            self.chunks_served += 1
+            # Sent as the relay, naming the holder so follow-up requests still head its way
+            self.node.send_message(Message(
+                msg_type=MessageType.SEED_CHUNK,
+                source=self.node.node_id,
+                destination=message.source,
+                payload={
+                    "holder": message.destination,
+                    "seed_id": seed_id,
+                    "index": index,
+                    "total": total,
+                    "size": size,
+                    "chunk_size": chunk_size,
+                    "digest": seed[1],
+                    "last": complete and position == len(cached) - 1,
+                    "data": base64.b64encode(data).decode("ascii")
+                },
+                timestamp=self.node.now()
+            ))
+            have[index >> 3] |= 1 << (index & 7)
+        if complete:
+            return True
+
+        # Forward the rest of the request with the cached chunks marked as had
+        forwarded = dict(request)
+        forwarded.pop("offset", None)
+        forwarded["have"] = base64.b64encode(bytes(have)).decode("ascii")
+        if request.get("window"):
+            forwarded["window"] = request["window"] - len(cached)
+        self.node.send_message(Message(
+            msg_type=MessageType.SEED_REQUEST,
+            source=message.source,
+            destination=message.destination,
+            payload=forwarded,
+            timestamp=message.timestamp
+        ))
+        return True
+
+
+@dataclass
+class CacheReport:
+    """Relay caching results for one request workload."""
+    policy: str
+    requests: int
+    chunks_requested: int
+    chunks_from_cache: int
+    airtime_with_cache: float
+    airtime_without_cache: float
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of requested chunks answered by a relay instead of the gateway."""
+        return self.chunks_from_cache / self.chunks_requested if self.chunks_requested else 0.0
+
+    @property
+    def airtime_saved(self) -> float:
+        """Fraction of airtime saved by caching."""
+        if not self.airtime_without_cache:
+            return 0.0
+        return 1.0 - self.airtime_with_cache / self.airtime_without_cache
+
+
+def _zipf_script(network: LoRaNetwork, requests: int, catalog: int, exponent: float,
+                 rng: random.Random) -> List[Tuple[str, str]]:
+    schools = [node_id for node_id, node in network.nodes.items() if not node.is_gateway]
+    weights = [1.0 / (rank ** exponent) for rank in range(1, catalog + 1)]
+    seeds = [f"seed{i}" for i in range(catalog)]
+    return [(rng.choice(schools), rng.choices(seeds, weights)[0]) for _ in range(requests)]
+
+
+def _run_workload(network: LoRaNetwork, script: List[Tuple[str, str]], catalog: int,
+                  seed_bytes: int, capacity_bytes: Optional[int], policy: str,
+                  profile: RadioProfile) -> Tuple[float, int, List[RelayCache]]:
+    """Play `script` over `network`; returns airtime, chunks requested and the relay caches."""
+    from .transfer import TransferManager
+
+    airtime = [0.0]
+
+    def charge(message: Message) -> bool:
+        airtime[0] += message_airtime(message, profile)
+        return True
+
+    network.multi_hop = True
+    network.link_filter = charge
+    gateway = next(node for node in network.nodes.values() if node.is_gateway)
+    for i in range(catalog):
+        gateway.store_seed(f"seed{i}", {"title": f"Lesson {i}", "body": "x" * seed_bytes})
+
+    caches = []
+    for node in network.nodes.values():
+        if node is not gateway:
+            node.seed_storage = {}
+            if capacity_bytes:
+                caches.append(RelayCache(node, capacity_bytes, policy))
+        TransferManager(node)
+
+    chunks_requested = 0
+    for school, seed_id in script:
+        node = network.get_node(school)
+        size = len(encode_seed(gateway.seed_storage[seed_id]))
+        chunks_requested += -(-size // node.transfers.chunk_size)
+        node.transfers.request(seed_id, gateway.node_id)
+        # Schools without local storage fetch a lesson each time a class asks for it
+        node.seed_storage.pop(seed_id, None)
+    return airtime[0], chunks_requested, caches
+
+
+def simulate_relay_caching(network_factory, requests: int = 500, catalog: int = 50,
+                           exponent: float = 0.9, seed_bytes: int = 2000,
+                           capacity_bytes: int = 16 * 1024, policy: str = "lfu-da",
+                           seed: int = 0, profile: RadioProfile = DEFAULT_PROFILE) -> CacheReport:
+    """
+    Compare airtime for a Zipf request workload with and without relay caches.
+
+    Args:
+        network_factory: Callable returning a fresh LoRaNetwork with one gateway,
+            e.g. `lambda: generate("random_geometric", 200).to_network()`
+        requests: Number of scripted requests
+        catalog: Distinct seeds held by the gateway
+        exponent: Zipf exponent of seed popularity
+        seed_bytes: Size of each seed's body
+        capacity_bytes: Cache capacity per relay
+        policy: "lfu-da" or "lru"
+        seed: RNG seed for the request script
+
+    Returns:
+        CacheReport with the share of chunks served by relays and airtime saved
+    """
+    baseline = network_factory()
+    script = _zipf_script(baseline, requests, catalog, exponent, random.Random(seed))
+    without, chunks_requested, _ = _run_workload(baseline, script, catalog, seed_bytes,
+                                                 None, policy, profile)
+    with_cache, _, caches = _run_workload(network_factory(), script, catalog, seed_bytes,
+                                          capacity_bytes, policy, profile)
+    return CacheReport(
+        policy=policy,
+        requests=requests,
+        chunks_requested=chunks_requested,
+        chunks_from_cache=sum(c.chunks_served for c in caches),
+        airtime_with_cache=with_cache,
+        airtime_without_cache=without
+    )
@@ -0,0 +1,281 @@
+"""
+Gossip-based seed dissemination for the LoRa mesh.
+
+Nodes periodically broadcast a compact Bloom filter summary of their
+seed storage. Neighbours that hold seeds missing from the summary reply
+with an offer, and the summarising node pulls only what it lacks from
+the first neighbour that offered it.
+"""
+
+import base64
+import hashlib
+import math
+import random
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from .lora import BROADCAST, LoRaNetwork, LoRaNode, Message, MessageType
+from .radio import payload_size
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter over seed IDs."""
+
+    def __init__(self, num_bits: int, num_hashes: int, salt: int = 0):
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = max(1, num_hashes)
+        self.salt = salt
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fp_rate: float = 0.01, salt: int = 0) -> "BloomFilter":
+        """Create a filter sized for `capacity` items at the given false-positive rate."""
+        capacity = max(1, capacity)
+        num_bits = int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        num_hashes = int(round((num_bits / capacity) * math.log(2)))
+        return cls(num_bits, num_hashes, salt)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Double hashing: h1 + i*h2 gives k independent-enough positions
+        # from a single digest.
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16,
+                                 salt=self.salt.to_bytes(8, "little")).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        """Add an item to the filter."""
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def to_payload(self) -> Dict:
+        """Serialize the filter for a message payload."""
+        return {
+            "num_bits": self.num_bits,
+            "num_hashes": self.num_hashes,
+            "salt": self.salt,
+            "bits": base64.b64encode(bytes(self.bits)).decode("ascii")
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Dict) -> "BloomFilter":
+        """Rebuild a filter from a message payload."""
+        bloom = cls(payload["num_bits"], payload["num_hashes"], payload.get("salt", 0))
+        bloom.bits = bytearray(base64.b64decode(payload["bits"]))
+        return bloom
+
+
+class GossipAgent:
+    """Runs the anti-entropy protocol on behalf of a single node."""
+
+    def __init__(self, node: LoRaNode, fp_rate: float = 0.01,
+                 max_offer: int = 16, request_timeout: int = 3):
+        self.node = node
+        self.fp_rate = fp_rate
+        self.max_offer = max_offer
+        self.request_timeout = request_timeout  # Rounds before re-requesting
+        self.round = 0
+        self.pending = {}  # seed_id -> round the request was sent
+        self.control_messages = 0
+        self.control_bytes = 0
+        self.data_bytes = 0
+        node.gossip = self
+
+    def build_summary(self) -> BloomFilter:
+        """Summarise this node's seed storage."""
+        # A fresh salt every round means a false positive for one seed
+        # does not hide it from neighbours forever.
+        bloom = BloomFilter.for_capacity(len(self.node.seed_storage), self.fp_rate,
+                                         salt=self.round)
+        for seed_id in self.node.seed_storage:
+            bloom.add(seed_id)
+        return bloom
+
+    def gossip_round(self, round_number: int):
+        """Broadcast an inventory summary to all neighbours."""
+        self.round = round_number
+        self._settle_pending()
+
+        payload = self.build_summary().to_payload()
+        payload["count"] = len(self.node.seed_storage)
+        summary = Message(
+            msg_type=MessageType.INVENTORY_SUMMARY,
+            source=self.node.node_id,
+            destination=BROADCAST,
+            payload=payload,
+            timestamp=self.node.now()
+        )
+        self._count_control(payload)
+        self.node.broadcast_message(summary)
+
+    def handle_message(self, message: Message):
+        """Dispatch a gossip control message."""
+        if message.msg_type == MessageType.INVENTORY_SUMMARY:
+            self._handle_summary(message)
+        elif message.msg_type == MessageType.INVENTORY_OFFER:
+            self._handle_offer(message)
+
+    def _handle_summary(self, message: Message):
+        """Offer the seeds a neighbour's summary says it is missing."""
+        bloom = BloomFilter.from_payload(message.payload)
+        missing = [seed_id for seed_id in self.node.seed_storage if seed_id not in bloom]
+        if not missing:
+            return
+
+        payload = {"seed_ids": missing[:self.max_offer]}
+        offer = Message(
+            msg_type=MessageType.INVENTORY_OFFER,
+            source=self.node.node_id,
+            destination=message.source,
+            payload=payload,
+            timestamp=self.node.now()
+        )
+        self._count_control(payload)
+        self.node.send_message(offer)
+
+    def _handle_offer(self, message: Message):
+        """Pull offered seeds that we still lack and have not already requested."""
+        for seed_id in message.payload.get("seed_ids", []):
+            if seed_id in self.node.seed_storage or seed_id in self.pending:
+                continue
+            self.pending[seed_id] = self.round
+
+            payload = {"seed_id": seed_id}
+            request = Message(
+                msg_type=MessageType.SEED_REQUEST,
+                source=self.node.node_id,
+                destination=message.source,
+                payload=payload,
+                timestamp=self.node.now()
+            )
+            self._count_control(payload)
+            self.node.send_message(request)
+
+    def _settle_pending(self):
+        """Account for arrived seeds and expire requests that went unanswered."""
+        for seed_id, sent_round in list(self.pending.items()):
+            if seed_id in self.node.seed_storage:
+                self.data_bytes += payload_size(self.node.seed_storage[seed_id])
+                del self.pending[seed_id]
+            elif self.round - sent_round >= self.request_timeout:
+                del self.pending[seed_id]
+
+    def _count_control(self, payload: Dict):
+        self.control_messages += 1
+        self.control_bytes += payload_size(payload)
+
+
+@dataclass
+class GossipResult:
+    """Outcome of a gossip convergence run."""
+    num_nodes: int
+    num_seeds: int
+    rounds: int
+    converged: bool
+    control_messages: int
+    control_bytes: int
+    data_bytes: int
+
+    @property
+    def control_overhead(self) -> float:
+        """Control bytes per delivered data byte."""
+        return self.control_bytes / self.data_bytes if self.data_bytes else 0.0
+
+
+def build_random_mesh(num_nodes: int, extra_links: int = 1,
+                      rng: Optional[random.Random] = None) -> LoRaNetwork:
+    """
+    Build a connected random mesh: a random spanning tree plus a few extra links per node.
+
+    Node "gateway" is the root; other nodes are named node1..nodeN-1.
+    """
+    rng = rng or random.Random(0)
+    network = LoRaNetwork()
+    nodes = [LoRaNode("gateway", is_gateway=True, verbose=False)]
+    for i in range(1, num_nodes):
+        nodes.append(LoRaNode(f"node{i}", verbose=False))
+    for node in nodes:
+        network.add_node(node)
+
+    def link(a: LoRaNode, b: LoRaNode):
+        if a is not b:
+            a.connect_to_node(b)
+            b.connect_to_node(a)
+
+    for i in range(1, num_nodes):
+        link(nodes[i], nodes[rng.randrange(i)])
+    for i in range(num_nodes):
+        for _ in range(extra_links):
+            if rng.random() < 0.5:
+                link(nodes[i], nodes[rng.randrange(num_nodes)])
+    return network
+
+
+def run_gossip(network: LoRaNetwork, max_rounds: int = 100,
+               rng: Optional[random.Random] = None, fp_rate: float = 0.01) -> GossipResult:
+    """
+    Run gossip rounds over `network` until every node holds every seed.
+
+    Args:
+        network: Network whose nodes already hold their initial seeds
+        max_rounds: Give up after this many rounds
+        rng: Random source for the per-round node order
+        fp_rate: Bloom filter false-positive rate
+
+    Returns:
+        GossipResult with convergence round and traffic counters
+    """
+    rng = rng or random.Random(0)
+    nodes = list(network.nodes.values())
+    agents = [node.gossip or GossipAgent(node, fp_rate=fp_rate) for node in nodes]
+    all_seeds = set()
+    for node in nodes:
+        all_seeds.update(node.seed_storage.keys())
+
+    def converged() -> bool:
+        return all(len(node.seed_storage) >= len(all_seeds) for node in nodes)
+
+    rounds = 0
+    while rounds < max_rounds and not converged():
+        rounds += 1
+        rng.shuffle(agents)
+        for agent in agents:
+            agent.gossip_round(rounds)
+    for agent in agents:
+        agent.round = rounds + 1
+        agent._settle_pending()
+
+    return GossipResult(
+        num_nodes=len(nodes),
+        num_seeds=len(all_seeds),
+        rounds=rounds,
+        converged=converged(),
+        control_messages=sum(a.control_messages for a in agents),
+        control_bytes=sum(a.control_bytes for a in agents),
+        data_bytes=sum(a.data_bytes for a in agents)
+    )
+
+
+def measure_convergence(sizes: Iterable[int] = (10, 50, 100, 500),
+                        num_seeds: int = 10, seed: int = 0) -> List[GossipResult]:
+    """
+    Measure convergence time and control overhead as the network grows.
+
+    Seeds start on randomly chosen nodes; each size uses the same RNG seed
+    so runs are reproducible.
+    """
+    results = []
+    for size in sizes:
+        rng = random.Random(seed)
+        network = build_random_mesh(size, rng=rng)
+        nodes = list(network.nodes.values())
+        for i in range(num_seeds):
+            holder = rng.choice(nodes)
+            holder.store_seed(f"seed{i}", {"title": f"Seed {i}", "files": [f"content{i}.html"]})
+        results.append(run_gossip(network, rng=rng))
+    return results
@@ -9,10 +9,14 @@ In a real implementation, this would interface with actual LoRa hardware.
 import time
 import random
 import json
+import base64
+import hashlib
 from typing import Dict, List, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 
+from eduseedbank.profiling import traced
+
 
 class MessageType(Enum):
     SEED_REQUEST = "seed_request"
@@ -20,6 +24,21 @@ class MessageType(Enum):
     SEED_DATA = "seed_data"
     NETWORK_PING = "network_ping"
     NETWORK_PONG = "network_pong"
+    INVENTORY_SUMMARY = "inventory_summary"
+    INVENTORY_OFFER = "inventory_offer"
+    SEED_CHUNK = "seed_chunk"
+
+
+# Bytes of encoded seed carried by one SEED_CHUNK frame
+DEFAULT_CHUNK_SIZE = 128
+
+# Destination of frames meant for every node in radio range
+BROADCAST = "broadcast"
+
+
+def encode_seed(seed_data: Dict) -> bytes:
+    """Canonical byte encoding of a seed, split into chunks for resumable transfers."""
+    return json.dumps(seed_data, sort_keys=True, separators=(",", ":")).encode("utf-8")
 
 
 @dataclass
@@ -30,47 +49,111 @@ class Message:
     destination: str
     payload: Dict
     timestamp: float
+    trace_id: int = field(default=0, compare=False, repr=False)  # Assigned by a Tracer
 
 
 class LoRaNode:
     """Represents a node in the LoRa mesh network."""
     
-    def __init__(self, node_id: str, is_gateway: bool = False):
+    def __init__(self, node_id: str, is_gateway: bool = False, verbose: bool = True,
+                 seed_storage=None):
         self.node_id = node_id
         self.is_gateway = is_gateway
+        self.verbose = verbose
         self.connected_nodes = []
         self.message_queue = []
-        self.seed_storage = {}
+        # Any mutable mapping works; see storage.DiskSeedStore for a disk-backed one
+        self.seed_storage = seed_storage if seed_storage is not None else {}
         self.network = None  # Reference to the network this node belongs to
+        self.transport = None  # Optional Transport; None routes through self.network
+        self.gossip = None  # Optional GossipAgent for inventory exchange
+        self.transfers = None  # Optional TransferManager for resumable downloads
+        self.relay_cache = None  # Optional RelayCache for chunks forwarded through this node
+        self.tracer = None  # Optional trace.Tracer; set through LoRaNetwork.set_tracer
+        self.planner = None  # Optional BroadcastPlanner batching requests to this node
         
+    def now(self) -> float:
+        """Current time according to the network's clock."""
+        return self.network.clock() if self.network else time.time()
+
     def connect_to_node(self, node: 'LoRaNode'):
         """Connect to another node in the network."""
         if node not in self.connected_nodes:
             self.connected_nodes.append(node)
+            if self.network:
+                self.network.clear_routes()
             
+    def set_transport(self, transport):
+        """Send and receive frames through `transport` instead of direct calls."""
+        self.transport = transport
+        transport.attach(self)
+
     def send_message(self, message: Message):
         """Send a message to the network."""
         # In a real implementation, this would send via LoRa radio
-        # For simulation, we route through the network
-        print(f"[{self.node_id}] Sending {message.msg_type.value} to {message.destination}")
-        if self.network:
-            self.network.route_message(message)
+        # For simulation, we route through the network or the transport
+        if self.verbose:
+            print(f"[{self.node_id}] Sending {message.msg_type.value} to {message.destination}")
+        if self.tracer:
+            self.tracer.send(self.node_id, message, self.now())
+        if self.transport:
+            self.transport.send(message)
+        elif self.network:
+            self.network.route_message(message, via=self.node_id)
         
     def receive_message(self, message: Message):
         """Receive a message from the network."""
-        print(f"[{self.node_id}] Received {message.msg_type.value} from {message.source}")
-        
-        if message.msg_type == MessageType.SEED_REQUEST:
+        if self.verbose:
+            print(f"[{self.node_id}] Received {message.msg_type.value} from {message.source}")
+        if self.tracer:
+            self.tracer.receive(self.node_id, message, self.now())
+
+        if message.destination not in (self.node_id, BROADCAST) and self._on_route(message):
+            self._forward(message)
+        elif message.msg_type == MessageType.SEED_REQUEST:
             self._handle_seed_request(message)
         elif message.msg_type == MessageType.SEED_DATA:
             self._handle_seed_data(message)
+        elif message.msg_type == MessageType.SEED_CHUNK:
+            if self.transfers:
+                self.transfers.handle_chunk(message)
         elif message.msg_type == MessageType.NETWORK_PING:
             self._handle_ping(message)
+        elif message.msg_type in (MessageType.INVENTORY_SUMMARY, MessageType.INVENTORY_OFFER):
+            if self.gossip:
+                self.gossip.handle_message(message)
             
+    def _on_route(self, message: Message) -> bool:
+        """Whether this node is a hop on the multi-hop route from the message's source."""
+        network = self.network
+        if not (network and network.multi_hop) or message.destination not in network.nodes:
+            return False
+        # Every relay picks next_hop towards the destination, so the route follows from the source
+        hop = message.source
+        while hop is not None and hop != message.destination:
+            hop = network.next_hop(hop, message.destination)
+            if hop == self.node_id:
+                return True
+        return False
+
+    def _forward(self, message: Message):
+        """Relay a message addressed to another node one hop further."""
+        if self.relay_cache and self.relay_cache.intercept(message):
+            return
+        if self.verbose:
+            print(f"[{self.node_id}] Forwarding {message.msg_type.value} to {message.destination}")
+        if self.tracer:
+            self.tracer.forward(self.node_id, message, self.now())
+        self.send_message(message)
+
     def _handle_seed_request(self, message: Message):
         """Handle a seed request message."""
         seed_id = message.payload.get("seed_id")
-        if seed_id in self.seed_storage:
+        if self.planner and self.planner.collect(message):
+            return
+        if seed_id in self.seed_storage and "chunk_size" in message.payload:
+            self._send_seed_chunks(seed_id, message)
+        elif seed_id in self.seed_storage:
             # Send the seed data back
             response_payload = {
                 "seed_id": seed_id,
@@ -82,24 +165,72 @@ class LoRaNode:
                 source=self.node_id,
                 destination=message.source,
                 payload=response_payload,
-                timestamp=time.time()
+                timestamp=self.now()
             )
             
             self.send_message(response)
             
+    def _send_seed_chunks(self, seed_id: str, message: Message):
+        """
+        Answer a resumable request with SEED_CHUNK frames.
+
+        The request names a chunk size and may carry either a byte "offset"
+        to resume from or a "have" bitmap of chunks already received, plus
+        a "window" limiting how many chunks go out before the requester
+        asks again, and a "priority" class the chunks are sent in.
+        """
+        request = message.payload
+        encoded = encode_seed(self.seed_storage[seed_id])
+        chunk_size = max(1, int(request["chunk_size"]))
+        total = max(1, -(-len(encoded) // chunk_size))
+        have = base64.b64decode(request["have"]) if request.get("have") else b""
+        start = int(request.get("offset", 0)) // chunk_size
+
+        missing = [
+            index for index in range(start, total)
+            if not (index >> 3 < len(have) and have[index >> 3] & (1 << (index & 7)))
+        ]
+        window = request.get("window")
+        if window:
+            missing = missing[:window]
+
+        digest = hashlib.sha256(encoded).hexdigest()
+        for position, index in enumerate(missing):
+            chunk = encoded[index * chunk_size:(index + 1) * chunk_size]
+            payload = {
+                "seed_id": seed_id,
+                "index": index,
+                "total": total,
+                "size": len(encoded),
+                "chunk_size": chunk_size,
+                "digest": digest,
+                "last": position == len(missing) - 1,
+                "data": base64.b64encode(chunk).decode("ascii")
+            }
+            if type(request.get("priority")) is int:
+                # Chunks go out in the class the requester asked for, e.g. background for
+                # prefetches; the scheduler only honours classes lower than bulk data's
+                payload["priority"] = request["priority"]
+            self.send_message(Message(
+                msg_type=MessageType.SEED_CHUNK,
+                source=self.node_id,
+                destination=message.source,
+                payload=payload,
+                timestamp=self.now()
+            ))
+
     def _handle_seed_data(self, message: Message):
         """Handle seed data message."""
         seed_id = message.payload.get("seed_id")
         seed_data = message.payload.get("seed_data")
         if seed_id and seed_data:
-            self.seed_storage[seed_id] = seed_data
-            print(f"[{self.node_id}] Stored seed {seed_id}")
+            self.store_seed(seed_id, seed_data)
             
     def _handle_ping(self, message: Message):
         """Handle network ping message."""
         # Respond with pong
         pong_payload = {
-            "timestamp": message.payload.get("timestamp", time.time())
+            "timestamp": message.payload.get("timestamp", self.now())
         }
         
         pong = Message(
@@ -107,22 +238,35 @@ class LoRaNode:
             source=self.node_id,
             destination=message.source,
             payload=pong_payload,
-            timestamp=time.time()
+            timestamp=self.now()
         )
         
         self.send_message(pong)
         
     def broadcast_message(self, message: Message):
         """Broadcast a message to all connected nodes."""
+        if self.tracer:
+            self.tracer.send(self.node_id, message, self.now())
+        if self.transport:
+            # One frame on the shared channel; receivers filter by range
+            self.transport.send(message)
+            return
+        runtime = self.network.runtime if self.network else None
         for node in self.connected_nodes:
             # In a real implementation, this would use LoRa broadcast
             # For simulation, we directly call receive_message
-            node.receive_message(message)
+            if runtime:
+                runtime.submit(message, destination=node.node_id)
+            else:
+                node.receive_message(message)
             
     def store_seed(self, seed_id: str, seed_data: Dict):
         """Store a seed in this node's storage."""
         self.seed_storage[seed_id] = seed_data
-        print(f"[{self.node_id}] Stored seed {seed_id}")
+        if self.verbose:
+            print(f"[{self.node_id}] Stored seed {seed_id}")
+        if self.tracer:
+            self.tracer.store(self.node_id, seed_id, self.now())
 
 
 class LoRaNetwork:
@@ -130,19 +274,79 @@ class LoRaNetwork:
     
     def __init__(self):
         self.nodes = {}
+        self.clock = time.time  # Replaced by the runtime's clock when one is attached
+        self.runtime = None  # Optional AsyncNetworkRuntime delivering via node queues
+        self.link_filter = None  # Optional callable(message) -> bool; False drops the frame
+        self.multi_hop = False  # Deliver hop by hop along connected_nodes instead of directly
+        self._routes = {}  # destination -> {node_id: next hop}
+        self.tracer = None  # Optional trace.Tracer shared by every node
         
     def add_node(self, node: LoRaNode):
         """Add a node to the network."""
         self.nodes[node.node_id] = node
         node.network = self  # Set reference to this network
-        
-    def route_message(self, message: Message):
-        """Route a message to its destination."""
-        # In a simple simulation, we directly deliver to the destination
-        if message.destination in self.nodes:
-            self.nodes[message.destination].receive_message(message)
-        else:
+        node.tracer = self.tracer
+        self.clear_routes()
+
+    def set_tracer(self, tracer):
+        """Record events from every node into `tracer`; None turns tracing off."""
+        self.tracer = tracer
+        for node in self.nodes.values():
+            node.tracer = tracer
+
+    def clear_routes(self):
+        """Forget cached routes after the topology changes."""
+        self._routes = {}
+
+    def next_hop(self, current: str, destination: str) -> Optional[str]:
+        """Next node on a shortest path from `current` to `destination`."""
+        if destination not in self._routes:
+            # BFS outwards from the destination; each node's parent is its next hop
+            parents = {destination: destination}
+            frontier = [destination]
+            while frontier:
+                next_frontier = []
+                for node_id in frontier:
+                    for neighbor in self.nodes[node_id].connected_nodes:
+                        if neighbor.node_id not in parents:
+                            parents[neighbor.node_id] = node_id
+                            next_frontier.append(neighbor.node_id)
+                frontier = next_frontier
+            self._routes[destination] = parents
+        return self._routes[destination].get(current)
+
+    @traced("network.route_message")
+    def route_message(self, message: Message, via: Optional[str] = None):
+        """
+        Route a message to its destination.
+
+        Args:
+            message: Message to deliver
+            via: Node currently transmitting it (defaults to the message source);
+                only used for multi-hop routing
+        """
+        if message.destination not in self.nodes:
             print(f"Warning: Destination {message.destination} not found in network")
+            return
+
+        receiver = message.destination
+        if self.multi_hop:
+            receiver = self.next_hop(via or message.source, message.destination)
+            if receiver is None:
+                print(f"Warning: No route from {via or message.source} to {message.destination}")
+                return
+
+        if self.link_filter and not self.link_filter(message):
+            if self.tracer:
+                self.tracer.drop(via or message.source, message, self.clock())
+            return
+
+        if self.runtime:
+            self.runtime.submit(message, destination=receiver)
+            return
+
+        # In a simple simulation, we directly deliver to the destination
+        self.nodes[receiver].receive_message(message)
             
     def simulate_network_traffic(self):
         """Simulate network traffic by processing message queues."""
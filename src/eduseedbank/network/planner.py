@@ -0,0 +1,335 @@
+"""
+Gateway-side broadcast planning for overlapping seed demand.
+
+Instead of answering every SEED_REQUEST on its own, a BroadcastPlanner
+collects the requests that reach a gateway over a window and covers them
+with as few transmissions as it can. A broadcast from any node reaches
+its whole radio neighbourhood, so one transmission of a seed can serve
+every school around a relay; the seed first travels from the nearest
+holder to that relay hop by hop.
+
+Choosing the broadcasts is a weighted set cover problem: each candidate
+(node, seed) covers the requesters in the node's neighbourhood and costs
+the hops needed to bring the seed there plus the broadcast itself. The
+planner solves it greedily per seed, always taking the candidate with the
+most uncovered requesters per frame of airtime, and then lays the chosen
+transmissions out in time under each node's duty-cycle limit.
+"""
+
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from .lora import (BROADCAST, DEFAULT_CHUNK_SIZE, LoRaNetwork, LoRaNode, Message, MessageType,
+                   encode_seed)
+from .radio import DEFAULT_PROFILE, RadioProfile, frame_size
+from .scheduler import REGION_DUTY_CYCLES, DutyCycleLimiter
+
+RELAY = "relay"
+BROADCAST_STEP = "broadcast"
+
+# Hops around new holders whose distances are refreshed after each greedy step
+RELAX_DEPTH = 4
+
+
+@dataclass
+class PlannedTransmission:
+    """One seed transmission in a broadcast schedule."""
+    node: str
+    seed_id: str
+    kind: str  # RELAY to the next hop, or BROADCAST_STEP to the neighbourhood
+    target: Optional[str]  # Next hop for relays
+    frames: int
+    airtime: float
+    covers: List[str] = field(default_factory=list)  # Requesters served by this step
+    start: float = 0.0
+    end: float = 0.0
+
+
+@dataclass
+class BroadcastSchedule:
+    """Transmissions that cover a window of requests."""
+    transmissions: List[PlannedTransmission]
+    requests: int
+    unserved: List[Tuple[str, str]]  # (requester, seed_id) with no route or unknown seed
+    baseline_airtime: float  # Answering every request separately along its shortest path
+    planning_time: float = 0.0
+
+    @property
+    def airtime(self) -> float:
+        return sum(t.airtime for t in self.transmissions)
+
+    @property
+    def makespan(self) -> float:
+        return max((t.end for t in self.transmissions), default=0.0)
+
+    @property
+    def airtime_saved(self) -> float:
+        if not self.baseline_airtime:
+            return 0.0
+        return 1.0 - self.airtime / self.baseline_airtime
+
+
+class BroadcastPlanner:
+    """Batches a gateway's seed requests into a duty-cycle aware broadcast schedule."""
+
+    def __init__(self, node: LoRaNode, window: float = 60.0,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, profile: RadioProfile = DEFAULT_PROFILE,
+                 region: Optional[str] = "AS923", duty_cycle: Optional[float] = None):
+        """
+        Args:
+            node: Gateway whose requests are planned; it becomes the seeds' source
+            window: Seconds to collect requests before a plan is due
+            chunk_size: Seed bytes per frame on air
+            profile: Radio settings for airtime
+            region: Regulatory region selecting the duty cycle; None for no limit
+            duty_cycle: Use this duty cycle instead of the region's
+        """
+        if duty_cycle is None and region is not None:
+            if region not in REGION_DUTY_CYCLES:
+                raise ValueError(f"Unknown region: {region}")
+            duty_cycle = REGION_DUTY_CYCLES[region]
+        self.node = node
+        self.window = window
+        self.chunk_size = chunk_size
+        self.profile = profile
+        self.duty_cycle = duty_cycle
+        self.pending = []  # (requester, seed_id)
+        self.window_start = None
+        self.limiters = {}  # node_id -> DutyCycleLimiter, kept across windows
+        self.busy_until = {}  # node_id -> end of its last planned transmission
+        # Every frame is a full chunk, so one airtime figure serves all of them
+        self.frame_airtime = profile.airtime(frame_size(Message(
+            MessageType.SEED_CHUNK, node.node_id, BROADCAST, {
+                "seed_id": "", "index": 0, "total": 0, "size": 0, "chunk_size": chunk_size,
+                "digest": "0" * 64, "last": False, "data": "A" * (4 * math.ceil(chunk_size / 3))
+            }, 0)))
+        self._frames = {}  # seed_id -> frames per copy
+        node.planner = self
+
+    def collect(self, message: Message) -> bool:
+        """Queue a SEED_REQUEST for the next plan; False if this node cannot serve it."""
+        seed_id = message.payload.get("seed_id")
+        if seed_id not in self.node.seed_storage:
+            return False
+        if self.window_start is None:
+            self.window_start = self.node.now()
+        self.pending.append((message.source, seed_id))
+        return True
+
+    def due(self, now: Optional[float] = None) -> bool:
+        """True once the collection window has elapsed."""
+        if self.window_start is None:
+            return False
+        now = self.node.now() if now is None else now
+        return now - self.window_start >= self.window
+
+    def frames_for(self, seed_id: str) -> int:
+        frames = self._frames.get(seed_id)
+        if frames is None:
+            size = len(encode_seed(self.node.seed_storage[seed_id]))
+            frames = self._frames[seed_id] = max(1, -(-size // self.chunk_size))
+        return frames
+
+    def plan(self, requests: Optional[List[Tuple[str, str]]] = None,
+             now: Optional[float] = None) -> BroadcastSchedule:
+        """
+        Cover `requests` (default: the pending ones) with a broadcast schedule.
+
+        Args:
+            requests: (requester node_id, seed_id) pairs
+            now: Earliest start for the schedule (default: the node's clock)
+        """
+        started = time.perf_counter()
+        requests = self.pending if requests is None else requests
+        now = self.node.now() if now is None else now
+        graph = _Graph(self.node.network)
+        gateway = graph.index[self.node.node_id]
+        hops, parents = graph.distances([gateway])
+
+        by_seed = {}
+        unserved = []
+        baseline = 0.0
+        for requester, seed_id in requests:
+            index = graph.index.get(requester)
+            if index is None or hops[index] < 0 or seed_id not in self.node.seed_storage:
+                unserved.append((requester, seed_id))
+                continue
+            baseline += hops[index] * self.frames_for(seed_id) * self.frame_airtime
+            by_seed.setdefault(seed_id, set()).add(index)
+
+        # Popular seeds first, so they get the earliest slots
+        transmissions = []
+        for seed_id, demand in sorted(by_seed.items(), key=lambda item: -len(item[1])):
+            transmissions.extend(self._cover(graph, seed_id, demand, gateway, hops, parents))
+        self._place(transmissions, now)
+        return BroadcastSchedule(transmissions, len(requests), unserved, baseline,
+                                 time.perf_counter() - started)
+
+    def _cover(self, graph: "_Graph", seed_id: str, demand: set, gateway: int,
+               hops: List[int], parents: List[int]) -> List[PlannedTransmission]:
+        """Greedy set cover of one seed's requesters."""
+        neighbors = graph.neighbors
+        incoming = graph.incoming
+        names = graph.names
+        frames = self.frames_for(seed_id)
+        airtime = frames * self.frame_airtime
+        dist = list(hops)
+        parent = list(parents)
+        holders = {gateway}
+        uncovered = set(demand) - holders
+
+        # count[t]: uncovered requesters one broadcast from t would reach.
+        # Links may be one-way, so this goes by who hears t, not whom d hears.
+        count = {}
+        for d in uncovered:
+            for t in incoming[d]:
+                count[t] = count.get(t, 0) + 1
+            count[d] = count.get(d, 0) + 1
+
+        def score(t):
+            # Requesters reached per transmission: dist[t] relay hops, plus a
+            # broadcast unless t itself is the only requester it reaches
+            cost = dist[t] + (count[t] > (t in uncovered))
+            return count[t] / cost, -dist[t]
+
+        steps = []
+        while uncovered:
+            best = max((t for t in count if dist[t] >= 0), key=score)
+
+            # Relay the seed from the nearest holder to `best`
+            path = [best]
+            while path[-1] not in holders:
+                path.append(parent[path[-1]])
+            path.reverse()
+            reached = set()
+            for sender, receiver in zip(path, path[1:]):
+                covered = [names[receiver]] if receiver in uncovered else []
+                steps.append(PlannedTransmission(names[sender], seed_id, RELAY, names[receiver],
+                                                 frames, airtime, covered))
+                reached.add(receiver)
+
+            newly = {best} | reached
+            remaining = [d for d in neighbors[best] if d in uncovered and d not in reached]
+            if remaining:
+                steps.append(PlannedTransmission(names[best], seed_id, BROADCAST_STEP, None,
+                                                 frames, airtime, [names[d] for d in remaining]))
+                newly.update(neighbors[best])
+
+            if not newly & uncovered:
+                raise RuntimeError(f"Planning {seed_id} from {names[best]} covered no requester")
+            for d in newly & uncovered:
+                uncovered.discard(d)
+                for t in incoming[d] + [d]:
+                    count[t] -= 1
+                    if not count[t]:
+                        del count[t]
+            holders |= newly
+            graph.relax(newly, dist, parent)
+        return steps
+
+    def _place(self, transmissions: List[PlannedTransmission], now: float):
+        """Assign start times honouring hop order, one radio per node and duty cycles."""
+        ready = {}  # (node, seed_id) -> when the node holds the seed
+        for step in transmissions:
+            limiter = self.limiters.get(step.node)
+            if limiter is None:
+                limiter = self.limiters[step.node] = DutyCycleLimiter(self.duty_cycle)
+            source_ready = now if step.node == self.node.node_id else ready.get((step.node, step.seed_id), now)
+            start = max(source_ready, self.busy_until.get(step.node, now))
+            for frame in range(step.frames):
+                start = limiter.earliest_start(start, self.frame_airtime)
+                limiter.record(start, self.frame_airtime)
+                if frame == 0:
+                    step.start = start
+                start += self.frame_airtime
+            step.end = start
+            self.busy_until[step.node] = start
+            if step.kind == RELAY:
+                ready[(step.target, step.seed_id)] = start
+            else:
+                for neighbor in self.node.network.nodes[step.node].connected_nodes:
+                    ready.setdefault((neighbor.node_id, step.seed_id), start)
+
+    def execute(self, schedule: BroadcastSchedule):
+        """
+        Carry out a schedule over the simulated network, in start-time order.
+
+        Relay and broadcast steps belong to other nodes; in the simulator the
+        gateway drives them directly. Each step is a SEED_DATA frame that
+        receivers store.
+        """
+        nodes = self.node.network.nodes
+        for step in sorted(schedule.transmissions, key=lambda t: t.start):
+            sender = nodes[step.node]
+            payload = {"seed_id": step.seed_id, "seed_data": self.node.seed_storage[step.seed_id]}
+            if step.kind == RELAY:
+                sender.send_message(Message(MessageType.SEED_DATA, step.node, step.target,
+                                            payload, step.start))
+            else:
+                sender.broadcast_message(Message(MessageType.SEED_DATA, step.node, BROADCAST,
+                                                 payload, step.start))
+
+    def flush(self, now: Optional[float] = None) -> BroadcastSchedule:
+        """Plan and execute every pending request, then start a new window."""
+        schedule = self.plan(now=now)
+        self.execute(schedule)
+        self.pending = []
+        self.window_start = None
+        return schedule
+
+
+class _Graph:
+    """Index-based adjacency of a LoRaNetwork for fast traversal."""
+
+    def __init__(self, network: LoRaNetwork):
+        self.names = list(network.nodes)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.neighbors = [[self.index[n.node_id] for n in node.connected_nodes if n.node_id in self.index]
+                          for node in network.nodes.values()]
+        self.incoming = [[] for _ in self.names]  # Nodes whose broadcasts each node hears
+        for sender, receivers in enumerate(self.neighbors):
+            for receiver in receivers:
+                self.incoming[receiver].append(sender)
+
+    def distances(self, sources: List[int]) -> Tuple[List[int], List[int]]:
+        """BFS hop counts from the nearest source (-1 if unreachable) and parent pointers."""
+        dist = [-1] * len(self.names)
+        parent = [-1] * len(self.names)
+        for s in sources:
+            dist[s] = 0
+        queue = deque(sources)
+        while queue:
+            current = queue.popleft()
+            for neighbor in self.neighbors[current]:
+                if dist[neighbor] < 0:
+                    dist[neighbor] = dist[current] + 1
+                    parent[neighbor] = current
+                    queue.append(neighbor)
+        return dist, parent
+
+    def relax(self, new_sources, dist: List[int], parent: List[int], depth: int = RELAX_DEPTH):
+        """
+        Lower distances after `new_sources` became holders.
+
+        Only nodes within `depth` hops of the new sources are updated; beyond
+        that, distances stay upper bounds whose parent chains still lead to a
+        holder. This keeps each greedy step local on large meshes.
+        """
+        queue = deque()
+        for s in new_sources:
+            if dist[s] != 0:
+                dist[s] = 0
+                parent[s] = -1
+            queue.append(s)
+        while queue:
+            current = queue.popleft()
+            if dist[current] >= depth:
+                continue
+            for neighbor in self.neighbors[current]:
+                if dist[neighbor] < 0 or dist[neighbor] > dist[current] + 1:
+                    dist[neighbor] = dist[current] + 1
+                    parent[neighbor] = current
+                    queue.append(neighbor)
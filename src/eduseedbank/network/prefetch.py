@@ -0,0 +1,493 @@
+"""
+Curriculum-aware prefetching for school nodes.
+
+A TermCalendar says which subjects and topics each week of a school term
+covers. A PrefetchPlanner matches it against the seeds a gateway offers,
+using the curriculum and subject in each seed's metadata and the topic's
+words in its title, description and topics, and lists the seeds the
+coming weeks need, earliest first, within a storage budget.
+
+A PrefetchScheduler on the school node fetches those seeds through its
+TransferManager in the BACKGROUND scheduler class, one at a time and
+only while the node has no download of its own running and the
+duty-cycle budget has room to spare. Holders send the chunks in the same
+class, so a teacher's own request always goes ahead of a prefetch, and
+background frames never use more than their share of the duty cycle.
+
+simulate_prefetch() plays a term of lesson demand on a gateway and a
+school node, with and without a PrefetchScheduler, and reports how much
+on-demand latency prefetching removes.
+"""
+
+import math
+import random
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Mapping, Optional, Set
+
+from .lora import DEFAULT_CHUNK_SIZE, LoRaNetwork, LoRaNode, encode_seed
+from .radio import DEFAULT_PROFILE, RadioProfile
+from .scheduler import BACKGROUND, DutyCycleLimiter, ScheduledTransport, TransmitScheduler, percentile
+from .transfer import TransferManager
+from .transport import InProcessTransport
+
+WEEK = 7 * 24 * 3600.0
+SCHOOL_DAYS = 5
+
+
+@dataclass
+class CalendarEntry:
+    """A subject, and optionally a topic, taught in one week of the term."""
+    week: int
+    subject: str
+    topic: str = ""
+
+
+class TermCalendar:
+    """Weeks of a school term mapped to the subjects and topics taught in them."""
+
+    def __init__(self, start: float, entries: List[CalendarEntry], week_seconds: float = WEEK):
+        """
+        Args:
+            start: Unix time the first week begins
+            entries: What each week covers; weeks are numbered from 1
+            week_seconds: Length of a week (shorter in simulations and tests)
+        """
+        self.start = start
+        self.entries = sorted(entries, key=lambda entry: entry.week)
+        self.week_seconds = week_seconds
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TermCalendar":
+        """
+        Build a calendar from its JSON form:
+
+            {"start": "2026-07-13", "weeks": {"1": [{"subject": "IPA", "topic": "fotosintesis"}]}}
+
+        `start` is a Unix time or an ISO date in local time.
+        """
+        start = data["start"]
+        if isinstance(start, str):
+            start = datetime.fromisoformat(start).timestamp()
+        entries = [CalendarEntry(int(week), item["subject"], item.get("topic", ""))
+                   for week, items in data.get("weeks", {}).items() for item in items]
+        return cls(float(start), entries, data.get("week_seconds", WEEK))
+
+    def week_at(self, t: float) -> int:
+        """Week of the term `t` falls in; 0 or less before the term starts."""
+        return math.floor((t - self.start) / self.week_seconds) + 1
+
+    def week_start(self, week: int) -> float:
+        return self.start + (week - 1) * self.week_seconds
+
+    def upcoming(self, now: float, lookahead_weeks: int) -> List[CalendarEntry]:
+        """Entries from the current week up to `lookahead_weeks` weeks ahead."""
+        current = self.week_at(now)
+        return [entry for entry in self.entries if current <= entry.week <= current + lookahead_weeks]
+
+
+def _words(text: str) -> Set[str]:
+    return set(re.findall(r"\w+", text.lower()))
+
+
+def match_score(metadata: Dict, entry: CalendarEntry, curriculum: Optional[str] = None) -> float:
+    """
+    How well a seed fits a calendar entry, from 0 to 1.
+
+    The seed's subject must be the entry's and, when both name one, its
+    curriculum the school's. The score is then the share of the topic's
+    words found in the seed's title, description and topics; an entry
+    without a topic scores every seed of its subject 0.5.
+    """
+    if curriculum and metadata.get("curriculum") and metadata["curriculum"].lower() != curriculum.lower():
+        return 0.0
+    if metadata.get("subject", "").lower() != entry.subject.lower():
+        return 0.0
+    topic = _words(entry.topic)
+    if not topic:
+        return 0.5
+    text = _words(" ".join([metadata.get("title", ""), metadata.get("description", "")] +
+                           list(metadata.get("topics", []))))
+    return len(topic & text) / len(topic)
+
+
+@dataclass
+class PrefetchCandidate:
+    """A seed the calendar says will be needed."""
+    seed_id: str
+    week: int
+    needed_by: float
+    score: float
+    size: int
+
+
+class PrefetchPlanner:
+    """Predicts the seeds the coming weeks need and fits them into a storage budget."""
+
+    def __init__(self, calendar: TermCalendar, catalog: Mapping[str, Dict], curriculum: Optional[str] = None,
+                 budget_bytes: int = 256 * 1024, lookahead_weeks: int = 2, min_score: float = 0.5,
+                 per_entry: int = 1):
+        """
+        Args:
+            calendar: The school's term calendar
+            catalog: seed_id -> seed data (its metadata) for every seed on offer
+            curriculum: The school's regional curriculum; None accepts any
+            budget_bytes: Storage prefetched seeds may take up
+            lookahead_weeks: Weeks beyond the current one to prefetch for
+            min_score: Lowest match_score() worth prefetching
+            per_entry: Best-matching seeds taken per calendar entry
+        """
+        self.calendar = calendar
+        self.catalog = catalog
+        self.curriculum = curriculum
+        self.budget_bytes = budget_bytes
+        self.lookahead_weeks = lookahead_weeks
+        self.min_score = min_score
+        self.per_entry = per_entry
+        self._sizes = {}
+
+    def size_of(self, seed_id: str) -> int:
+        """Bytes a seed takes on air and on disk (its encoded form)."""
+        if seed_id not in self._sizes:
+            self._sizes[seed_id] = len(encode_seed(self.catalog[seed_id]))
+        return self._sizes[seed_id]
+
+    def predict(self, now: float) -> List[PrefetchCandidate]:
+        """Seeds the upcoming weeks need, earliest first, then best match first."""
+        best = {}
+        for entry in self.calendar.upcoming(now, self.lookahead_weeks):
+            scored = [(match_score(metadata, entry, self.curriculum), seed_id)
+                      for seed_id, metadata in self.catalog.items()]
+            scored = sorted((item for item in scored if item[0] >= self.min_score), key=lambda item: (-item[0], item[1]))
+            for score, seed_id in scored[:self.per_entry]:
+                if seed_id not in best or entry.week < best[seed_id].week:
+                    best[seed_id] = PrefetchCandidate(seed_id, entry.week, self.calendar.week_start(entry.week),
+                                                      score, self.size_of(seed_id))
+        return sorted(best.values(), key=lambda c: (c.needed_by, -c.score, c.seed_id))
+
+    def plan(self, now: float, held: Iterable[str] = (), used_bytes: int = 0) -> List[PrefetchCandidate]:
+        """
+        Predicted seeds to fetch, in order, that fit the budget.
+
+        Args:
+            now: Current time
+            held: Seeds the node already has
+            used_bytes: Budget already taken by earlier prefetches still held
+        """
+        held = set(held)
+        planned = []
+        for candidate in self.predict(now):
+            if candidate.seed_id in held:
+                continue
+            if used_bytes + candidate.size <= self.budget_bytes:
+                planned.append(candidate)
+                used_bytes += candidate.size
+        return planned
+
+
+class PrefetchScheduler:
+    """Fetches predicted seeds on a school node while its radio has nothing better to do."""
+
+    def __init__(self, node: LoRaNode, planner: PrefetchPlanner, source: str,
+                 max_utilisation: float = 0.5, limiter: Optional[DutyCycleLimiter] = None,
+                 keep_weeks: int = 1, retry_after: float = 86400.0):
+        """
+        Args:
+            node: School node; needs a TransferManager in `node.transfers`
+            planner: What to prefetch
+            source: Node to fetch from, usually the gateway
+            max_utilisation: Duty-cycle budget use above which no prefetch starts
+            limiter: Duty-cycle limiter to watch (default: the one of the node's
+                ScheduledTransport, if any)
+            keep_weeks: Weeks after its week ends a prefetched seed is kept
+            retry_after: Seconds without a new chunk before a prefetch is given up
+        """
+        if node.transfers is None:
+            raise ValueError(f"Node {node.node_id} needs a TransferManager to prefetch")
+        self.node = node
+        self.planner = planner
+        self.source = source
+        self.max_utilisation = max_utilisation
+        self.limiter = limiter
+        self.keep_weeks = keep_weeks
+        self.retry_after = retry_after
+        self.prefetched = {}  # seed_id -> week it was fetched for
+        self.in_flight = None  # (candidate, time of its last new chunk, chunks received by then)
+        self.fetched = []
+
+    def _scheduler(self) -> Optional[TransmitScheduler]:
+        return getattr(self.node.transport, "scheduler", None)
+
+    def idle(self, now: float) -> bool:
+        """Whether a prefetch may start: no download of the node's own, nothing queued, budget to spare."""
+        if self.in_flight or self.node.transfers.partials:
+            return False
+        scheduler = self._scheduler()
+        if scheduler is not None and len(scheduler):
+            return False
+        limiter = self.limiter or (scheduler.limiter if scheduler is not None else None)
+        return limiter is None or limiter.utilisation(now) < self.max_utilisation
+
+    def used_bytes(self) -> int:
+        return sum(self.planner.size_of(seed_id) for seed_id in self.prefetched if seed_id in self.node.seed_storage)
+
+    def tick(self, now: Optional[float] = None) -> Optional[str]:
+        """
+        Track the running prefetch, drop stale ones and start the next if the node is idle.
+
+        Returns:
+            The seed_id of a prefetch started by this call, or None
+        """
+        now = self.node.now() if now is None else now
+        storage = self.node.seed_storage
+        if self.in_flight:
+            candidate, progressed, received = self.in_flight
+            partial = self.node.transfers.partials.get(candidate.seed_id)
+            if candidate.seed_id in storage:
+                self.prefetched[candidate.seed_id] = candidate.week
+                self.fetched.append(candidate.seed_id)
+                self.in_flight = None
+            elif partial is not None and partial.received > received:
+                # Background frames get a share of the duty cycle, so a seed can take hours
+                self.in_flight = (candidate, now, partial.received)
+            elif now - progressed >= self.retry_after:
+                self.node.transfers.discard(candidate.seed_id)
+                self.in_flight = None
+
+        week = self.planner.calendar.week_at(now)
+        for seed_id, seed_week in list(self.prefetched.items()):
+            if week > seed_week + self.keep_weeks:
+                del self.prefetched[seed_id]
+                if seed_id in storage:
+                    del storage[seed_id]
+
+        if not self.idle(now):
+            return None
+        plan = self.planner.plan(now, storage, self.used_bytes())
+        if not plan:
+            return None
+        candidate = plan[0]
+        self.in_flight = (candidate, now, 0)
+        self.node.transfers.request(candidate.seed_id, self.source, priority=BACKGROUND)
+        return candidate.seed_id
+
+    def demand(self, seed_id: str):
+        """
+        Fetch a seed someone is waiting for, ahead of any prefetch.
+
+        A prefetch of the same seed already under way carries on in the
+        normal bulk class, keeping the chunks it has.
+        """
+        if self.in_flight and self.in_flight[0].seed_id == seed_id:
+            self.in_flight = None
+        self.node.transfers.priorities.pop(seed_id, None)
+        self.node.transfers.request(seed_id, self.source)
+
+
+@dataclass
+class PrefetchReport:
+    """On-demand latency over a simulated term with and without prefetching."""
+    demands: int
+    served_from_prefetch: int
+    mean_latency_without: float
+    mean_latency_with: float
+    p90_latency_without: float
+    p90_latency_with: float
+    unplanned_mean_without: float
+    unplanned_mean_with: float
+    prefetched_bytes: int
+    wasted_bytes: int
+    peak_prefetch_bytes: int
+    latencies_without: List[float] = field(default_factory=list, repr=False)
+    latencies_with: List[float] = field(default_factory=list, repr=False)
+
+    @property
+    def latency_removed(self) -> float:
+        """Fraction of the mean on-demand latency prefetching removes."""
+        if not self.mean_latency_without:
+            return 0.0
+        return 1.0 - self.mean_latency_with / self.mean_latency_without
+
+
+@dataclass
+class _Demand:
+    at: float
+    seed_id: str
+    planned: bool
+
+
+def _term(weeks: int, lessons_per_week: int, subjects: List[str], extra_seeds: int, seed_bytes: int,
+          unplanned_per_week: float, rng: random.Random, week_seconds: float):
+    """Calendar, catalog and demand script of a synthetic term."""
+    entries, catalog, demands = [], {}, []
+    for week in range(1, weeks + 1):
+        for lesson in range(lessons_per_week):
+            subject = subjects[(week * lessons_per_week + lesson) % len(subjects)]
+            topic = f"topik{week}x{lesson} {subject.lower()}"
+            entries.append(CalendarEntry(week, subject, topic))
+            seed_id = f"w{week}-l{lesson}"
+            catalog[seed_id] = {"title": f"Pelajaran {topic}", "subject": subject, "curriculum": "K13",
+                                "body": "x" * seed_bytes}
+            # Teachers open the lesson on a school day of its week
+            demands.append(_Demand(week_seconds * (week - 1 + rng.uniform(0, SCHOOL_DAYS / 7)), seed_id, True))
+    for extra in range(extra_seeds):
+        subject = rng.choice(subjects)
+        catalog[f"extra{extra}"] = {"title": f"Bacaan tambahan {extra}", "subject": subject, "curriculum": "K13",
+                                    "body": "x" * seed_bytes}
+    t = rng.expovariate(unplanned_per_week / week_seconds) if unplanned_per_week else math.inf
+    while t < weeks * week_seconds and extra_seeds:
+        demands.append(_Demand(t, f"extra{rng.randrange(extra_seeds)}", False))
+        t += rng.expovariate(unplanned_per_week / week_seconds)
+    demands.sort(key=lambda demand: demand.at)
+    return TermCalendar(0.0, entries, week_seconds), catalog, demands
+
+
+def _run_term(calendar: TermCalendar, catalog: Dict, demands: List[_Demand], prefetch: bool, chunk_size: int,
+              window: int, budget_bytes: int, lookahead_weeks: int, keep_weeks: int, region: str,
+              background_share: float, tick_interval: float, profile: RadioProfile):
+    """
+    Play the demand script on a gateway and a school node.
+
+    Both nodes send through a ScheduledTransport in virtual time; the
+    school downloads with a TransferManager and, when `prefetch` is set,
+    a PrefetchScheduler ticked after every frame and every
+    `tick_interval` seconds. Teachers' requests go through
+    PrefetchScheduler.demand() or straight to the TransferManager.
+    """
+    clock = [0.0]
+    network = LoRaNetwork()
+    network.clock = lambda: clock[0]
+    gateway = LoRaNode("gateway", is_gateway=True, verbose=False)
+    school = LoRaNode("school", verbose=False)
+    transports = []
+    for node in (gateway, school):
+        network.add_node(node)
+        transport = ScheduledTransport(InProcessTransport(network), TransmitScheduler(
+            profile=profile, region=region, background_share=background_share))
+        node.set_transport(transport)
+        transports.append(transport)
+    gateway.connect_to_node(school)
+    school.connect_to_node(gateway)
+    gateway.seed_storage.update(catalog)
+    transfers = TransferManager(school, chunk_size=chunk_size, window=window)
+    planner = PrefetchPlanner(calendar, catalog, "K13", budget_bytes, lookahead_weeks)
+    prefetcher = PrefetchScheduler(school, planner, "gateway", keep_weeks=keep_weeks) if prefetch else None
+
+    pending = deque(demands)
+    waiting = {}  # seed_id -> [(demanded at, planned)]
+    demanded = set()
+    latencies, unplanned, served, peak = [], [], 0, 0
+    end = (max(entry.week for entry in calendar.entries) + 1) * calendar.week_seconds
+    next_tick = 0.0
+    while True:
+        now = clock[0]
+        while pending and pending[0].at <= now:
+            demand = pending.popleft()
+            demanded.add(demand.seed_id)
+            if demand.seed_id in school.seed_storage:
+                served += prefetcher is not None and demand.seed_id in prefetcher.prefetched
+                (latencies if demand.planned else unplanned).append(0.0)
+                continue
+            if demand.seed_id not in waiting:
+                if prefetcher:
+                    prefetcher.demand(demand.seed_id)
+                else:
+                    transfers.request(demand.seed_id, "gateway")
+            waiting.setdefault(demand.seed_id, []).append((demand.at, demand.planned))
+
+        sent = sum(len(transport.pump(now)) for transport in transports)
+        for seed_id in [seed_id for seed_id in waiting if seed_id in school.seed_storage]:
+            # The last chunk finished arriving when the gateway's radio went quiet
+            for at, planned in waiting.pop(seed_id):
+                (latencies if planned else unplanned).append(transports[0].busy_until - at)
+
+        if prefetcher and (sent or now >= next_tick):
+            prefetcher.tick(now)
+            peak = max(peak, prefetcher.used_bytes())
+            if now >= next_tick:
+                next_tick = now + tick_interval
+
+        candidates = [transport.next_send() for transport in transports]
+        if pending:
+            candidates.append(pending[0].at)
+        if prefetcher and now < end:
+            candidates.append(next_tick)
+        candidates = [candidate for candidate in candidates if candidate is not None]
+        if not candidates:
+            break
+        clock[0] = max(now, min(candidates))
+
+    fetched = prefetcher.fetched if prefetcher else []
+    prefetched = sum(planner.size_of(seed_id) for seed_id in fetched)
+    wasted = sum(planner.size_of(seed_id) for seed_id in set(fetched) - demanded)
+    return latencies, unplanned, served, prefetched, wasted, peak
+
+
+def simulate_prefetch(weeks: int = 8, lessons_per_week: int = 4, subjects: Optional[List[str]] = None,
+                      extra_seeds: int = 20, seed_bytes: int = 8000, unplanned_per_week: float = 2.0,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE, window: int = 16, budget_bytes: int = 128 * 1024,
+                      lookahead_weeks: int = 1, keep_weeks: int = 1, region: str = "AS923",
+                      background_share: float = 0.5, tick_interval: float = 3600.0,
+                      week_seconds: float = WEEK, seed: int = 0,
+                      profile: RadioProfile = DEFAULT_PROFILE) -> PrefetchReport:
+    """
+    Compare on-demand latency over a term with and without prefetching.
+
+    Every calendar lesson has a matching seed on the gateway, which a
+    teacher opens on a random school day of its week; unplanned requests
+    for other seeds arrive as a Poisson process. A school node fetches
+    from a gateway node over a duty-cycled link, through the same
+    ScheduledTransport, TransferManager and PrefetchScheduler a real
+    school would run.
+
+    Args:
+        weeks: Weeks in the term
+        lessons_per_week: Calendar entries (and lesson seeds) per week
+        subjects: Subjects the lessons rotate through
+        extra_seeds: Seeds on offer that no calendar entry names
+        seed_bytes: Body size of each seed
+        unplanned_per_week: Mean requests per week for seeds outside the calendar
+        chunk_size: Bytes per SEED_CHUNK frame
+        window: Chunks requested at a time
+        budget_bytes: Storage prefetched seeds may take up
+        lookahead_weeks: Weeks ahead the planner looks
+        keep_weeks: Weeks after its week a prefetched seed is kept
+        region: Regulatory region of the duty cycle
+        background_share: Share of the duty cycle prefetch frames may use
+        tick_interval: Seconds between PrefetchScheduler ticks while no frames flow
+        week_seconds: Length of a week
+        seed: RNG seed for the demand script
+
+    Returns:
+        PrefetchReport with latencies in seconds
+    """
+    subjects = subjects or ["IPA", "Matematika", "Pertanian", "Bahasa"]
+    calendar, catalog, demands = _term(weeks, lessons_per_week, subjects, extra_seeds, seed_bytes,
+                                       unplanned_per_week, random.Random(seed), week_seconds)
+    options = dict(chunk_size=chunk_size, window=window, budget_bytes=budget_bytes, lookahead_weeks=lookahead_weeks,
+                   keep_weeks=keep_weeks, region=region, background_share=background_share,
+                   tick_interval=tick_interval, profile=profile)
+    without, unplanned_without, _, _, _, _ = _run_term(calendar, catalog, demands, False, **options)
+    with_prefetch, unplanned_with, served, prefetched, wasted, peak = _run_term(calendar, catalog, demands, True,
+                                                                               **options)
+
+    def mean(values):
+        return sum(values) / len(values) if values else 0.0
+
+    return PrefetchReport(
+        demands=len(demands),
+        served_from_prefetch=served,
+        mean_latency_without=mean(without),
+        mean_latency_with=mean(with_prefetch),
+        p90_latency_without=percentile(without, 90),
+        p90_latency_with=percentile(with_prefetch, 90),
+        unplanned_mean_without=mean(unplanned_without),
+        unplanned_mean_with=mean(unplanned_with),
+        prefetched_bytes=prefetched,
+        wasted_bytes=wasted,
+        peak_prefetch_bytes=peak,
+        latencies_without=without,
+        latencies_with=with_prefetch
+    )
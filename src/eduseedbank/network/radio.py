@@ -0,0 +1,69 @@
+"""
+LoRa radio model for the EduSeedbank simulator.
+
+Estimates frame sizes and time-on-air so simulations can report airtime
+instead of message counts.
+"""
+
+import json
+import math
+from dataclasses import dataclass
+from typing import Dict
+
+from .lora import Message, MessageType
+
+# Type, source, destination and sequence number in a compact binary header
+FRAME_HEADER_BYTES = 12
+
+
+@dataclass
+class RadioProfile:
+    """LoRa modulation parameters."""
+    spreading_factor: int = 9
+    bandwidth_hz: int = 125000
+    coding_rate: int = 1  # 1..4 for 4/5..4/8
+    preamble_symbols: int = 8
+    explicit_header: bool = True
+    crc: bool = True
+
+    def airtime(self, payload_bytes: int) -> float:
+        """
+        Time on air in seconds for a frame with the given payload length.
+
+        Uses the formula from the Semtech SX127x datasheet.
+        """
+        sf = self.spreading_factor
+        symbol_time = (2 ** sf) / self.bandwidth_hz
+        # Low data rate optimisation is mandatory once a symbol exceeds 16 ms
+        low_data_rate = 1 if symbol_time > 0.016 else 0
+        header = 0 if self.explicit_header else 1
+        numerator = 8 * payload_bytes - 4 * sf + 28 + 16 * int(self.crc) - 20 * header
+        payload_symbols = 8 + max(
+            math.ceil(numerator / (4 * (sf - 2 * low_data_rate))) * (self.coding_rate + 4), 0
+        )
+        preamble_time = (self.preamble_symbols + 4.25) * symbol_time
+        return preamble_time + payload_symbols * symbol_time
+
+
+DEFAULT_PROFILE = RadioProfile()
+
+
+def payload_size(payload: Dict) -> int:
+    """Approximate on-air size of a payload in bytes (compact JSON)."""
+    return len(json.dumps(payload, separators=(",", ":"), default=str))
+
+
+def frame_size(message: Message) -> int:
+    """On-air size of a message in bytes."""
+    size = FRAME_HEADER_BYTES + payload_size(message.payload)
+    data = message.payload.get("data")
+    if message.msg_type == MessageType.SEED_CHUNK and isinstance(data, str):
+        # Chunk bodies travel as raw bytes, not base64
+        raw = len(data) * 3 // 4 - data[-2:].count("=")
+        size -= len(data) - raw
+    return size
+
+
+def message_airtime(message: Message, profile: RadioProfile = DEFAULT_PROFILE) -> float:
+    """Time on air in seconds for a message."""
+    return profile.airtime(frame_size(message))
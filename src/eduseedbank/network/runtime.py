@@ -0,0 +1,320 @@
+"""
+Asyncio runtime for the LoRa mesh simulation.
+
+Each node runs as its own task draining a bounded inbound queue
+(`LoRaNode.message_queue`). Messages sent from a handler are collected
+and delivered after the handler returns, so ping/pong chains and long
+forwarding paths interleave instead of recursing on the caller's stack.
+Each outgoing frame is put on its destination's queue by a delivery
+task of its own. A full destination queue holds the frame's delivery
+task back or, with overflow="drop", discards the frame like a busy radio
+would. A node may have at most `queue_size` frames waiting to reach a
+queue; past that its task stops handling messages until one lands
+(backpressure), unless a frame it waits on is headed for a node that is
+itself stopped that way, in which case it sends anyway so two busy
+peers never wait on each other forever.
+
+The same handlers run under a SimulatedClock, where virtual time jumps
+straight to the next scheduled delivery whenever the network is idle,
+or under a WallClock, where link latency is real time.
+"""
+
+import asyncio
+import heapq
+import time
+from collections import Counter
+from typing import Callable, List, Optional, Union
+
+from .lora import LoRaNetwork, LoRaNode, Message
+
+
+class WallClock:
+    """Clock backed by real time."""
+
+    def now(self) -> float:
+        return time.time()
+
+    def timer(self, delay: float) -> asyncio.Future:
+        """Return a future that resolves after `delay` seconds."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        loop.call_later(max(0.0, delay), _resolve, future)
+        return future
+
+    async def sleep(self, delay: float):
+        await self.timer(delay)
+
+    def pending(self) -> int:
+        # Real timers fire on their own; the runtime never has to advance them.
+        return 0
+
+
+class SimulatedClock:
+    """Discrete-event clock whose time only moves when the runtime advances it."""
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+        self._timers = []
+        self._seq = 0
+
+    def now(self) -> float:
+        return self._now
+
+    def timer(self, delay: float) -> asyncio.Future:
+        """Return a future that resolves once virtual time reaches now + delay."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._timers, (self._now + max(0.0, delay), self._seq, future))
+        self._seq += 1
+        return future
+
+    async def sleep(self, delay: float):
+        await self.timer(delay)
+
+    def pending(self) -> int:
+        return len(self._timers)
+
+    def next_deadline(self) -> Optional[float]:
+        return self._timers[0][0] if self._timers else None
+
+    def advance(self):
+        """Jump to the earliest deadline and wake everything due at that time."""
+        if not self._timers:
+            return
+        when = self._timers[0][0]
+        self._now = when
+        while self._timers and self._timers[0][0] == when:
+            _, _, future = heapq.heappop(self._timers)
+            _resolve(future)
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AsyncNetworkRuntime:
+    """Runs every node of a LoRaNetwork as an asyncio task with its own queue."""
+
+    def __init__(self, network: LoRaNetwork,
+                 clock: Optional[Union[SimulatedClock, WallClock]] = None,
+                 queue_size: int = 64,
+                 latency: Union[float, Callable[[Message], float]] = 0.0,
+                 overflow: str = "block"):
+        """
+        Args:
+            network: Network whose nodes should be driven by this runtime
+            clock: SimulatedClock (default) or WallClock
+            queue_size: Capacity of each node's inbound queue
+            latency: Per-hop delay in seconds, or a callable computing it per message
+            overflow: "block" to apply backpressure, "drop" to discard on a full queue
+        """
+        if overflow not in ("block", "drop"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.network = network
+        self.clock = clock or SimulatedClock()
+        self.queue_size = queue_size
+        self.latency = latency
+        self.overflow = overflow
+        self.delivered = 0
+        self.dropped = 0
+        self.throttled = 0  # Times a node waited for one of its frames to reach a queue
+        self.peak_in_flight = 0  # Most frames one node had waiting to reach a queue at once
+        self._tasks = []
+        self._outbox = []
+        self._in_handler = False
+        self._active = 0  # Messages queued, being put, or being handled
+        self._in_transit = 0  # Messages waiting out their link latency
+        self._idle_event = None
+        self._in_flight = {}  # node_id -> Counter of destinations its frames are waiting to reach
+        self._blocked = set()  # Nodes whose task waits for room in its window
+        self._changed = None  # Resolved whenever a window or _blocked changes
+
+    def start(self):
+        """Attach to the network and spawn one task per node. Call from a running loop."""
+        self._idle_event = asyncio.Event()
+        self._changed = asyncio.get_running_loop().create_future()
+        self.network.runtime = self
+        self.network.clock = self.clock.now
+        for node in self.network.nodes.values():
+            node.message_queue = asyncio.Queue(self.queue_size)
+            self._in_flight[node.node_id] = Counter()
+            self._tasks.append(asyncio.create_task(self._node_loop(node)))
+
+    async def stop(self):
+        """Cancel node tasks and return the network to synchronous delivery."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.network.runtime = None
+        self.network.clock = time.time
+        for node in self.network.nodes.values():
+            node.message_queue = []
+
+    def submit(self, message: Message, destination: Optional[str] = None):
+        """Queue a message for delivery to `destination` (defaults to message.destination)."""
+        destination = destination or message.destination
+        if destination not in self.network.nodes:
+            print(f"Warning: Destination {destination} not found in network")
+            return
+
+        if self._in_handler:
+            # Delivered by the sending node's task once its handler returns
+            self._outbox.append((destination, message))
+            return
+
+        self._send(destination, message)
+
+    def _send(self, destination: str, message: Message, sender: Optional[str] = None):
+        """
+        Deliver a message from a task of its own, so no node loop waits on another's queue.
+
+        Frames from a node's handler count against that node's window
+        until they are on the destination queue or dropped.
+        """
+        if sender is not None:
+            window = self._in_flight[sender]
+            window[destination] += 1
+            self.peak_in_flight = max(self.peak_in_flight, sum(window.values()))
+        self._active += 1
+        asyncio.get_running_loop().create_task(self._deliver(destination, message, sender))
+
+    async def _reserve(self, sender: str):
+        """Wait until `sender` may put another frame in flight."""
+        window = self._in_flight[sender]
+        if sum(window.values()) < self.queue_size:
+            return
+        self.throttled += 1
+        self._blocked.add(sender)
+        self._notify()
+        try:
+            # A frame stuck on a node that is itself waiting here would never land
+            while sum(window.values()) >= self.queue_size and not any(
+                    count and destination in self._blocked for destination, count in window.items()):
+                await self._changed
+        finally:
+            self._blocked.discard(sender)
+            self._notify()
+
+    def _release(self, sender: Optional[str], destination: str):
+        if sender is not None:
+            self._in_flight[sender][destination] -= 1
+            self._notify()
+
+    def _notify(self):
+        """Wake every node waiting in _reserve to check its window again."""
+        if not self._changed.done():
+            self._changed.set_result(None)
+        self._changed = asyncio.get_running_loop().create_future()
+
+    async def _deliver(self, destination: str, message: Message, sender: Optional[str] = None):
+        self._active -= 1
+        await self._dispatch(destination, message, sender)
+        self._check_idle()
+
+    async def _dispatch(self, destination: str, message: Message, sender: Optional[str] = None):
+        delay = self.latency(message) if callable(self.latency) else self.latency
+        if delay > 0:
+            self._in_transit += 1
+            asyncio.get_running_loop().create_task(self._deliver_later(destination, message, delay, sender))
+        else:
+            await self._enqueue(destination, message, sender)
+
+    async def _deliver_later(self, destination: str, message: Message, delay: float,
+                             sender: Optional[str] = None):
+        timer = self.clock.timer(delay)
+        self._check_idle()
+        await timer
+        self._in_transit -= 1
+        await self._enqueue(destination, message, sender)
+        self._check_idle()
+
+    async def _enqueue(self, destination: str, message: Message, sender: Optional[str] = None):
+        queue = self.network.nodes[destination].message_queue
+        if self.overflow == "drop" and queue.full():
+            self.dropped += 1
+            self._release(sender, destination)
+            return
+        self._active += 1
+        await queue.put(message)
+        self._release(sender, destination)
+
+    async def _node_loop(self, node: LoRaNode):
+        queue = node.message_queue
+        while True:
+            message = await queue.get()
+            # Handlers are synchronous, so no other task can run while
+            # _in_handler is set and the shared outbox is safe.
+            self._in_handler = True
+            try:
+                node.receive_message(message)
+            except Exception as e:
+                print(f"[{node.node_id}] Error handling {message.msg_type.value}: {e}")
+            finally:
+                self._in_handler = False
+                outgoing, self._outbox = self._outbox, []
+
+            # Delivery tasks start in creation order, and a full queue
+            # serves waiting puts first come first served, so frames
+            # from one handler still arrive in the order they were sent.
+            for destination, out in outgoing:
+                await self._reserve(node.node_id)
+                self._send(destination, out, sender=node.node_id)
+            self.delivered += 1
+            self._active -= 1
+            self._check_idle()
+
+    def _is_idle(self) -> bool:
+        # Under a SimulatedClock the network is idle once every in-transit
+        # message is parked on a timer; under a WallClock pending() is 0.
+        return self._active == 0 and self._in_transit == self.clock.pending()
+
+    def _check_idle(self):
+        if self._idle_event is not None and self._is_idle():
+            self._idle_event.set()
+
+    async def run_until_idle(self, until: Optional[float] = None):
+        """
+        Process messages until nothing is left to deliver.
+
+        Args:
+            until: With a SimulatedClock, stop before advancing past this virtual time
+        """
+        while True:
+            if not self._is_idle():
+                self._idle_event.clear()
+                await self._idle_event.wait()
+                continue
+            # Let tasks woken by the last event settle before deciding
+            await asyncio.sleep(0)
+            if not self._is_idle():
+                continue
+            if isinstance(self.clock, SimulatedClock) and self.clock.pending():
+                if until is not None and self.clock.next_deadline() > until:
+                    return
+                self.clock.advance()
+                continue
+            return
+
+
+def run_messages(network: LoRaNetwork, messages: List[Message], **runtime_options) -> AsyncNetworkRuntime:
+    """
+    Convenience wrapper: send `messages` through an AsyncNetworkRuntime until the network is idle.
+
+    Each message is sent by its source node. Returns the stopped runtime so
+    callers can inspect delivery counters and the final clock time.
+    """
+    async def _run():
+        runtime = AsyncNetworkRuntime(network, **runtime_options)
+        runtime.start()
+        for message in messages:
+            sender = network.get_node(message.source)
+            if sender:
+                sender.send_message(message)
+            else:
+                runtime.submit(message)
+        await runtime.run_until_idle()
+        await runtime.stop()
+        return runtime
+
+    return asyncio.run(_run())
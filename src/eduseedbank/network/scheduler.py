@@ -0,0 +1,412 @@
+"""
+Per-node transmit scheduling for the LoRa mesh.
+
+A TransmitScheduler orders a node's outgoing frames by priority class
+(control before requests before bulk data before background data such
+as prefetches), shares each bulk class between concurrent transfers with
+self-clocked weighted fair queueing, and holds frames back when sending
+them would break the regional duty-cycle limit.
+"""
+
+import heapq
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .lora import DEFAULT_CHUNK_SIZE, Message, MessageType
+from .radio import DEFAULT_PROFILE, RadioProfile, frame_size
+from .transport import Transport
+
+# Priority classes, lowest value first
+CONTROL = 0
+REQUEST = 1
+BULK = 2
+BACKGROUND = 3  # Bulk data nobody is waiting for yet, such as prefetched seeds
+CLASSES = (CONTROL, REQUEST, BULK, BACKGROUND)
+
+PRIORITY_CLASSES = {
+    MessageType.NETWORK_PING: CONTROL,
+    MessageType.NETWORK_PONG: CONTROL,
+    MessageType.INVENTORY_SUMMARY: CONTROL,
+    MessageType.INVENTORY_OFFER: CONTROL,
+    MessageType.SEED_REQUEST: REQUEST,
+    MessageType.SEED_RESPONSE: REQUEST,
+    MessageType.SEED_DATA: BULK,
+    MessageType.SEED_CHUNK: BULK,
+}
+
+# Fraction of time a node may spend transmitting, averaged over an hour.
+# None means the region has no duty-cycle rule (dwell-time limits apply instead).
+REGION_DUTY_CYCLES = {
+    "EU868": 0.01,
+    "AS923": 0.01,
+    "IN865": None,
+    "US915": None,
+    "AU915": None,
+}
+DUTY_CYCLE_WINDOW = 3600.0
+
+
+def priority_of(message: Message) -> int:
+    """
+    Priority class of a message.
+
+    A "priority" in the payload, which remote requesters choose, can only
+    demote a frame to a lower class than its type's; anything else,
+    including values that are not classes at all, is ignored.
+    """
+    default = PRIORITY_CLASSES.get(message.msg_type, BULK)
+    requested = message.payload.get("priority")
+    if type(requested) is int and requested in CLASSES and requested > default:
+        return requested
+    return default
+
+
+def flow_of(message: Message) -> Tuple[str, str]:
+    """Transfers are told apart by destination and seed."""
+    return message.destination, message.payload.get("seed_id", "")
+
+
+class DutyCycleLimiter:
+    """Sliding-window airtime budget for one radio."""
+
+    def __init__(self, duty_cycle: Optional[float], window: float = DUTY_CYCLE_WINDOW):
+        self.duty_cycle = duty_cycle
+        self.window = window
+        self.budget = duty_cycle * window if duty_cycle else None
+        self._history = deque()  # (start, airtime) of recent transmissions
+        self._used = 0.0
+
+    def _expire(self, now: float):
+        while self._history and self._history[0][0] + self.window <= now:
+            self._used -= self._history.popleft()[1]
+
+    def earliest_start(self, now: float, airtime: float, share: float = 1.0) -> float:
+        """
+        Earliest time a frame of `airtime` seconds may start without exceeding the budget.
+
+        `share` limits the frame to that fraction of the budget, so lower
+        classes can leave headroom for control traffic.
+        """
+        if self.budget is None:
+            return now
+        self._expire(now)
+        budget = self.budget * share
+        used = self._used
+        start = now
+        # Wait for old transmissions to age out of the window one by one
+        for sent_at, duration in self._history:
+            if used + airtime <= budget:
+                break
+            used -= duration
+            start = sent_at + self.window
+        return start
+
+    def record(self, start: float, airtime: float):
+        if self.budget is None:
+            return
+        self._history.append((start, airtime))
+        self._used += airtime
+
+    def utilisation(self, now: float) -> float:
+        """Fraction of the budget used in the current window."""
+        if self.budget is None:
+            return 0.0
+        self._expire(now)
+        return self._used / self.budget
+
+
+class TransmitScheduler:
+    """Priority classes with weighted fair queueing and a duty-cycle limit."""
+
+    def __init__(self, profile: RadioProfile = DEFAULT_PROFILE, region: Optional[str] = "AS923",
+                 duty_cycle: Optional[float] = None, weights: Optional[Dict] = None,
+                 control_reserve: float = 0.1, background_share: float = 0.5):
+        """
+        Args:
+            profile: Radio settings used to compute each frame's airtime
+            region: Regulatory region selecting the duty cycle; None for no limit
+            duty_cycle: Use this duty cycle instead of the region's
+            weights: Relative share per flow (destination, seed_id); default 1.0
+            control_reserve: Fraction of the duty-cycle budget bulk frames may not use
+            background_share: Fraction of the duty-cycle budget background frames may use,
+                so the rest stays free for transfers someone is waiting for
+        """
+        if duty_cycle is None and region is not None:
+            if region not in REGION_DUTY_CYCLES:
+                raise ValueError(f"Unknown region: {region}")
+            duty_cycle = REGION_DUTY_CYCLES[region]
+        self.profile = profile
+        self.limiter = DutyCycleLimiter(duty_cycle)
+        self.weights = weights or {}
+        self.control_reserve = control_reserve
+        self.background_share = min(background_share, 1.0 - control_reserve)
+        self._queues = {priority: [] for priority in CLASSES}
+        self._finish = {}  # (class, flow) -> virtual finish time of its last queued frame
+        self._virtual_time = {BULK: 0.0, BACKGROUND: 0.0}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def enqueue(self, message: Message, now: float = 0.0):
+        """Queue a frame for transmission."""
+        airtime = self.profile.airtime(frame_size(message))
+        priority = priority_of(message)
+        tag = self._seq
+        if priority >= BULK:
+            # Self-clocked fair queueing: a flow's frames are tagged with
+            # virtual finish times, so each flow advances at its weight.
+            flow = flow_of(message)
+            start = max(self._virtual_time[priority], self._finish.get((priority, flow), 0.0))
+            tag = start + airtime / self.weights.get(flow, 1.0)
+            self._finish[(priority, flow)] = tag
+        heapq.heappush(self._queues[priority], (tag, self._seq, now, airtime, message))
+        self._seq += 1
+
+    def pending_messages(self):
+        """Iterate over every queued message, in no particular order."""
+        for queue in self._queues.values():
+            for entry in queue:
+                yield entry[4]
+
+    def peek(self) -> Optional[Tuple[float, float, Message]]:
+        """Return (enqueued_at, airtime, message) of the next frame without removing it."""
+        for priority in CLASSES:
+            if self._queues[priority]:
+                _, _, enqueued, airtime, message = self._queues[priority][0]
+                return enqueued, airtime, message
+        return None
+
+    def next_start(self, now: float) -> Optional[float]:
+        """When the next frame may go on air, or None if nothing is queued."""
+        head = self.peek()
+        if head is None:
+            return None
+        priority = priority_of(head[2])
+        share = 1.0
+        if priority == BULK:
+            share = 1.0 - self.control_reserve
+        elif priority == BACKGROUND:
+            share = self.background_share
+        return self.limiter.earliest_start(now, head[1], share)
+
+    def pop(self, now: float) -> Optional[Tuple[float, float, float, Message]]:
+        """
+        Take the next frame if it may start at `now`.
+
+        Returns (start, airtime, enqueued_at, message), or None when the
+        queue is empty or the duty cycle says wait.
+        """
+        start = self.next_start(now)
+        if start is None or start > now:
+            return None
+        for priority in CLASSES:
+            if self._queues[priority]:
+                tag, _, enqueued, airtime, message = heapq.heappop(self._queues[priority])
+                break
+        if priority >= BULK:
+            self._virtual_time[priority] = tag
+        self.limiter.record(now, airtime)
+        return now, airtime, enqueued, message
+
+
+class FifoScheduler(TransmitScheduler):
+    """First-in first-out baseline with the same duty-cycle handling."""
+
+    def enqueue(self, message: Message, now: float = 0.0):
+        airtime = self.profile.airtime(frame_size(message))
+        heapq.heappush(self._queues[BULK], (self._seq, self._seq, now, airtime, message))
+        self._seq += 1
+
+
+class ScheduledTransport(Transport):
+    """
+    Transport wrapper that sends frames through a TransmitScheduler.
+
+    In simulations call pump(now) as virtual time advances; with real
+    radios call start() to drain the queue from a background thread.
+    Frames count as sent when pump() hands them to the inner transport,
+    at their on-air size.
+    """
+
+    def __init__(self, inner, scheduler: Optional[TransmitScheduler] = None,
+                 clock: Optional[Callable[[], float]] = None):
+        """
+        Args:
+            inner: Transport that actually puts frames on the channel
+            scheduler: Queueing policy (default TransmitScheduler for AS923)
+            clock: Time source for enqueue timestamps (default: the node's clock)
+        """
+        super().__init__()
+        self.inner = inner
+        self.scheduler = scheduler or TransmitScheduler()
+        self.clock = clock
+        self.busy_until = 0.0
+        self._lock = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def attach(self, node):
+        super().attach(node)
+        self.inner.attach(node)
+
+    def send(self, message: Message):
+        with self._lock:
+            self.scheduler.enqueue(message, self._now())
+            self._lock.notify()
+
+    def _now(self) -> float:
+        if self.clock:
+            return self.clock()
+        return self.node.now() if self.node else time.time()
+
+    def next_send(self) -> Optional[float]:
+        """When pump() can next put a frame on air, or None if nothing is queued."""
+        with self._lock:
+            head = self.scheduler.peek()
+            if head is None:
+                return None
+            return self.scheduler.next_start(max(self.busy_until, head[0]))
+
+    def pump(self, now: float) -> List[Message]:
+        """Transmit, back to back, every frame that may start by `now`."""
+        sent = []
+        while True:
+            with self._lock:
+                head = self.scheduler.peek()
+                if head is None:
+                    return sent
+                # A frame cannot start before it was queued or while the radio is busy
+                start = self.scheduler.next_start(max(self.busy_until, head[0]))
+                if start > now:
+                    return sent
+                _, airtime, _, message = self.scheduler.pop(start)
+            self.busy_until = start + airtime
+            self.inner.send(message)
+            self.frames_sent += 1
+            self.bytes_sent += frame_size(message)
+            sent.append(message)
+
+    def start(self):
+        """Drain the queue in real time from a daemon thread."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            with self._lock:
+                now = time.time()
+                start = self.scheduler.next_start(max(now, self.busy_until))
+                if start is None or start > now:
+                    self._lock.wait(timeout=None if start is None else start - now)
+                    continue
+            self.pump(now)
+            # Hold the radio for the frame's time on air before the next one
+            wait = self.busy_until - time.time()
+            if wait > 0:
+                time.sleep(wait)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._lock.notify()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        self.inner.close()
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(p / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+@dataclass
+class LatencyReport:
+    """Control-message latency under bulk load; unsent frames count with their wait so far."""
+    scheduler: str
+    control_messages: int  # Every control frame that arrived, sent or not
+    p50: float
+    p90: float
+    p99: float
+    max: float
+    bulk_frames_sent: int
+    duty_cycle_used: float
+    unsent_control: int
+
+
+def simulate_control_latency(scheduler: TransmitScheduler, transfers: int = 4,
+                             chunks_per_transfer: int = 400, control_rate: float = 0.01,
+                             duration: float = 3600.0, seed: int = 0) -> LatencyReport:
+    """
+    Measure control-frame latency on one node saturated with bulk transfers.
+
+    At time zero `transfers` concurrent SEED_CHUNK transfers are queued;
+    pings and seed requests then arrive as a Poisson process at
+    `control_rate` per second. Latency is measured from enqueue to the end
+    of the frame's transmission. Frames still unsent when the run ends
+    count as having waited until then, a lower bound on their latency, so
+    a scheduler that starves control traffic cannot look fast.
+    """
+    rng = random.Random(seed)
+    for t in range(transfers):
+        for index in range(chunks_per_transfer):
+            scheduler.enqueue(Message(MessageType.SEED_CHUNK, "gateway", f"school{t}", {
+                "seed_id": f"seed{t}", "index": index, "data": "A" * (4 * DEFAULT_CHUNK_SIZE // 3)
+            }, 0.0), 0.0)
+
+    arrivals = []
+    t = rng.expovariate(control_rate)
+    while t < duration:
+        msg_type = rng.choice([MessageType.NETWORK_PING, MessageType.SEED_REQUEST])
+        arrivals.append((t, Message(msg_type, "gateway", "school0", {"seed_id": "seed9"}, t)))
+        t += rng.expovariate(control_rate)
+
+    now = 0.0
+    latencies = []
+    bulk_sent = 0
+    pending = deque(arrivals)
+    while now < duration and (pending or len(scheduler)):
+        while pending and pending[0][0] <= now:
+            at, message = pending.popleft()
+            scheduler.enqueue(message, at)
+        popped = scheduler.pop(now)
+        if popped is None:
+            # Idle or duty-cycle bound: jump to whichever comes first
+            candidates = [scheduler.next_start(now)]
+            if pending:
+                candidates.append(pending[0][0])
+            candidates = [c for c in candidates if c is not None and c > now]
+            if not candidates:
+                break
+            now = min(candidates)
+            continue
+        start, airtime, enqueued, message = popped
+        now = start + airtime
+        if priority_of(message) >= BULK:
+            bulk_sent += 1
+        else:
+            latencies.append(now - enqueued)
+
+    end = max(now, duration)
+    unsent = [m.timestamp for m in scheduler.pending_messages() if priority_of(m) < BULK]
+    unsent += [at for at, _ in pending]
+    latencies += [end - at for at in unsent]
+    return LatencyReport(
+        scheduler=type(scheduler).__name__,
+        control_messages=len(latencies),
+        p50=percentile(latencies, 50),
+        p90=percentile(latencies, 90),
+        p99=percentile(latencies, 99),
+        max=max(latencies) if latencies else 0.0,
+        bulk_frames_sent=bulk_sent,
+        duty_cycle_used=scheduler.limiter.utilisation(now),
+        unsent_control=len(unsent)
+    )
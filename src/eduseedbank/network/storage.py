@@ -0,0 +1,209 @@
+"""
+Pluggable seed storage for LoRa nodes.
+
+`LoRaNode.seed_storage` is any mutable mapping of seed_id -> seed data.
+The default is a plain dict; DiskSeedStore keeps every seed on disk as a
+`.seed` zip whose one member, metadata.json, is the seed's data as
+uncompressed JSON (not a full SeedPackage, which also carries content
+files). It reads that member back through mmap and holds only a small
+LRU of hot items in memory.
+A per-node byte quota is enforced by evicting seeds under an LRU or LFU
+policy, and pinned seeds are never evicted.
+"""
+
+import json
+import mmap
+import os
+import zipfile
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, Optional
+from urllib.parse import quote, unquote
+
+from eduseedbank.server.archive import LOCAL_HEADER, member_data_offset
+
+SEED_EXTENSION = ".seed"
+METADATA_MEMBER = "metadata.json"
+PINNED_FILE = "pinned.json"
+EVICTION_POLICIES = ("lru", "lfu")
+
+
+def _seed_path(directory: str, seed_id: str) -> str:
+    return os.path.join(directory, quote(seed_id, safe="") + SEED_EXTENSION)
+
+
+class DiskSeedStore(MutableMapping):
+    """Disk-backed seed storage with an in-memory hot cache and a byte quota."""
+
+    def __init__(self, directory: str, quota_bytes: Optional[int] = None,
+                 policy: str = "lru", hot_items: int = 64):
+        """
+        Args:
+            directory: Directory holding one `.seed` file per stored seed
+            quota_bytes: Maximum total size of stored seed files (None for unlimited)
+            policy: Eviction policy when over quota, "lru" or "lfu"
+            hot_items: Number of decoded seeds kept in memory
+        """
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.directory = directory
+        self.quota_bytes = quota_bytes
+        self.policy = policy
+        self.hot_items = hot_items
+        self.used_bytes = 0
+        self.evictions = 0
+        self._index = OrderedDict()  # seed_id -> (path, data offset, length, file size), in LRU order
+        self._hits = {}  # seed_id -> access count, for LFU
+        self._hot = OrderedDict()  # seed_id -> encoded JSON, decoded afresh on every read
+        self.pinned = set()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Rebuild the index from the `.seed` files already on disk."""
+        pinned_path = os.path.join(self.directory, PINNED_FILE)
+        if os.path.exists(pinned_path):
+            with open(pinned_path) as f:
+                self.pinned = set(json.load(f))
+
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(SEED_EXTENSION):
+                continue
+            path = os.path.join(self.directory, name)
+            entries.append((os.path.getmtime(path), unquote(name[:-len(SEED_EXTENSION)]), path))
+        # Oldest first so the LRU order survives a restart approximately
+        for _, seed_id, path in sorted(entries):
+            try:
+                self._index_file(seed_id, path)
+            except (zipfile.BadZipFile, KeyError, OSError) as e:
+                print(f"Skipping unreadable seed file {path}: {e}")
+
+    def _index_file(self, seed_id: str, path: str):
+        with open(path, "rb") as f:
+            with zipfile.ZipFile(f) as zipf:
+                info = zipf.getinfo(METADATA_MEMBER)
+            if info.compress_type == zipfile.ZIP_STORED:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    start = info.header_offset
+                    offset = member_data_offset(mapped[start:start + LOCAL_HEADER.size], info)
+            else:
+                offset = None  # Compressed member, read through zipfile instead
+        size = os.path.getsize(path)
+        self._index[seed_id] = (path, offset, info.file_size, size)
+        self._hits.setdefault(seed_id, 0)
+        self.used_bytes += size
+
+    def _read(self, seed_id: str) -> bytes:
+        path, offset, length, _ = self._index[seed_id]
+        if offset is None:
+            with zipfile.ZipFile(path) as zipf:
+                return zipf.read(METADATA_MEMBER)
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[offset:offset + length]
+
+    def __getitem__(self, seed_id: str) -> Dict:
+        """Return a fresh copy of the seed; change it by assigning it back."""
+        if seed_id not in self._index:
+            raise KeyError(seed_id)
+        self._index.move_to_end(seed_id)
+        self._hits[seed_id] += 1
+
+        if seed_id in self._hot:
+            self._hot.move_to_end(seed_id)
+            return json.loads(self._hot[seed_id])
+        encoded = self._read(seed_id)
+        self._remember(seed_id, encoded)
+        return json.loads(encoded)
+
+    def __setitem__(self, seed_id: str, seed_data: Dict):
+        encoded = json.dumps(seed_data).encode("utf-8")
+        path = _seed_path(self.directory, seed_id)
+        tmp_path = path + ".tmp"
+        # Stored uncompressed so reads can slice the member straight out of the mmap
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_STORED) as zipf:
+            zipf.writestr(METADATA_MEMBER, encoded)
+        size = os.path.getsize(tmp_path)
+
+        replaced = seed_id in self._index
+        if replaced:
+            self._forget(seed_id, keep_file=True)
+        try:
+            self._make_room(size)
+        except RuntimeError:
+            os.remove(tmp_path)
+            if replaced:
+                self._index_file(seed_id, path)
+            raise
+        os.replace(tmp_path, path)
+        self._index_file(seed_id, path)
+        self._remember(seed_id, encoded)
+
+    def __delitem__(self, seed_id: str):
+        if seed_id not in self._index:
+            raise KeyError(seed_id)
+        self._forget(seed_id)
+        self.unpin(seed_id)
+
+    def __contains__(self, seed_id) -> bool:
+        return seed_id in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._index))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def pin(self, seed_id: str):
+        """Protect a seed from eviction."""
+        self.pinned.add(seed_id)
+        self._save_pins()
+
+    def unpin(self, seed_id: str):
+        """Allow a seed to be evicted again."""
+        if seed_id in self.pinned:
+            self.pinned.discard(seed_id)
+            self._save_pins()
+
+    def _save_pins(self):
+        with open(os.path.join(self.directory, PINNED_FILE), "w") as f:
+            json.dump(sorted(self.pinned), f)
+
+    def _remember(self, seed_id: str, encoded: bytes):
+        if self.hot_items <= 0:
+            return
+        self._hot[seed_id] = encoded
+        self._hot.move_to_end(seed_id)
+        while len(self._hot) > self.hot_items:
+            self._hot.popitem(last=False)
+
+    def _forget(self, seed_id: str, keep_file: bool = False):
+        path, _, _, size = self._index.pop(seed_id)
+        self._hits.pop(seed_id, None)
+        self._hot.pop(seed_id, None)
+        self.used_bytes -= size
+        if not keep_file and os.path.exists(path):
+            os.remove(path)
+
+    def _make_room(self, incoming: int):
+        """Evict unpinned seeds until `incoming` more bytes fit in the quota."""
+        if self.quota_bytes is None:
+            return
+        if incoming > self.quota_bytes:
+            raise RuntimeError(f"Seed of {incoming} bytes exceeds the store quota of {self.quota_bytes}")
+
+        while self.used_bytes + incoming > self.quota_bytes:
+            victim = self._choose_victim()
+            if victim is None:
+                raise RuntimeError("Seed store quota exceeded and every stored seed is pinned")
+            self._forget(victim)
+            self.evictions += 1
+
+    def _choose_victim(self) -> Optional[str]:
+        candidates = (seed_id for seed_id in self._index if seed_id not in self.pinned)
+        if self.policy == "lru":
+            # _index is kept in access order, oldest first
+            return next(candidates, None)
+        # LFU; ties go to the least recently used because _index is in LRU order
+        return min(candidates, key=lambda seed_id: self._hits[seed_id], default=None)
@@ -0,0 +1,203 @@
+"""
+Synthetic topology generators for LoRa mesh simulations.
+
+Each generator returns a Topology: node positions in metres plus an
+adjacency list of nodes within radio range. Generators are deterministic
+for a given seed, and the spatial hashing used for neighbour search keeps
+them practical up to around 100k nodes.
+"""
+
+import math
+import random
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from .lora import LoRaNetwork, LoRaNode
+
+# Typical rural LoRa range between rooftop antennas
+DEFAULT_RANGE_M = 2000.0
+
+
+@dataclass
+class Topology:
+    """Node positions and radio links of a synthetic mesh."""
+    name: str
+    positions: List[Tuple[float, float]]
+    neighbors: List[List[int]]
+    gateways: List[int] = field(default_factory=lambda: [0])
+
+    @property
+    def size(self) -> int:
+        return len(self.positions)
+
+    def node_id(self, index: int) -> str:
+        return "gateway" if index == self.gateways[0] else f"node{index}"
+
+    def edge_count(self) -> int:
+        return sum(len(n) for n in self.neighbors) // 2
+
+    def hops_from(self, sources: List[int]) -> List[int]:
+        """BFS hop count from the nearest source; -1 for unreachable nodes."""
+        hops = [-1] * self.size
+        queue = deque(sources)
+        for source in sources:
+            hops[source] = 0
+        while queue:
+            current = queue.popleft()
+            for neighbor in self.neighbors[current]:
+                if hops[neighbor] < 0:
+                    hops[neighbor] = hops[current] + 1
+                    queue.append(neighbor)
+        return hops
+
+    def to_network(self) -> LoRaNetwork:
+        """Build a LoRaNetwork of quiet LoRaNodes wired like this topology."""
+        network = LoRaNetwork()
+        nodes = [LoRaNode(self.node_id(i), is_gateway=i in self.gateways, verbose=False)
+                 for i in range(self.size)]
+        for node in nodes:
+            network.add_node(node)
+        for i, links in enumerate(self.neighbors):
+            nodes[i].connected_nodes = [nodes[j] for j in links]
+        return network
+
+
+def _link_within_range(positions: List[Tuple[float, float]], radius: float) -> List[List[int]]:
+    """Connect every pair of nodes closer than `radius`, using a grid of radius-sized cells."""
+    cells: Dict[Tuple[int, int], List[int]] = {}
+    for index, (x, y) in enumerate(positions):
+        cells.setdefault((int(x // radius), int(y // radius)), []).append(index)
+
+    neighbors = [[] for _ in positions]
+    radius_sq = radius * radius
+    for (cx, cy), members in cells.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                others = cells.get((cx + dx, cy + dy))
+                if not others:
+                    continue
+                for i in members:
+                    xi, yi = positions[i]
+                    for j in others:
+                        # Each unordered pair is considered once
+                        if j <= i:
+                            continue
+                        xj, yj = positions[j]
+                        if (xi - xj) ** 2 + (yi - yj) ** 2 <= radius_sq:
+                            neighbors[i].append(j)
+                            neighbors[j].append(i)
+    return neighbors
+
+
+def _connect_components(topology: Topology) -> Topology:
+    """Bridge disconnected islands to the gateway's component with a relay link each."""
+    hops = topology.hops_from(topology.gateways)
+    positions = topology.positions
+    while True:
+        stranded = [i for i, h in enumerate(hops) if h < 0]
+        if not stranded:
+            return topology
+        # Link the first stranded node to its closest reachable node; this
+        # stands in for the directional antenna a deployment would add.
+        island = stranded[0]
+        reachable = [i for i, h in enumerate(hops) if h >= 0]
+        xi, yi = positions[island]
+        target = min(reachable, key=lambda j: (positions[j][0] - xi) ** 2 + (positions[j][1] - yi) ** 2)
+        topology.neighbors[island].append(target)
+        topology.neighbors[target].append(island)
+        hops = topology.hops_from(topology.gateways)
+
+
+def grid(size: int, spacing: float = 1500.0, radius: float = DEFAULT_RANGE_M) -> Topology:
+    """Nodes on a square grid; with the defaults each node hears its 4 direct neighbours."""
+    side = max(1, math.ceil(math.sqrt(size)))
+    positions = [((i % side) * spacing, (i // side) * spacing) for i in range(size)]
+    return Topology("grid", positions, _link_within_range(positions, radius))
+
+
+def line(size: int, spacing: float = 1500.0, radius: float = DEFAULT_RANGE_M) -> Topology:
+    """A chain of nodes along a road or river; the worst case for hop count."""
+    positions = [(i * spacing, 0.0) for i in range(size)]
+    return Topology("line", positions, _link_within_range(positions, radius))
+
+
+def random_geometric(size: int, seed: int = 0, radius: float = DEFAULT_RANGE_M,
+                     mean_degree: float = 8.0) -> Topology:
+    """
+    Nodes scattered uniformly over a square sized for `mean_degree` neighbours each.
+
+    Isolated islands are bridged to the gateway so every node is reachable.
+    """
+    rng = random.Random(seed)
+    # Expected degree of a random geometric graph is density * pi * r^2
+    area = size * math.pi * radius * radius / max(mean_degree, 1.0)
+    side = math.sqrt(area)
+    positions = [(rng.uniform(0, side), rng.uniform(0, side)) for _ in range(size)]
+    topology = Topology("random_geometric", positions, _link_within_range(positions, radius))
+    return _connect_components(topology)
+
+
+def clustered_village(size: int, seed: int = 0, village_size: int = 50,
+                      village_spread: float = 800.0, village_gap: float = 6000.0,
+                      radius: float = DEFAULT_RANGE_M) -> Topology:
+    """
+    Dense villages separated by farmland.
+
+    Nodes cluster around village centres; villages are laid out on a
+    jittered grid `village_gap` apart, further than radio range, so they
+    are joined by a chain of relay nodes along the gap between neighbouring
+    villages. The relays count towards `size`: the villages get whatever
+    nodes the relays leave, and relays are dropped if there are more of
+    them than `size` minus one node per village.
+    """
+    rng = random.Random(seed)
+    villages = max(1, size // max(village_size, 1))
+    side = max(1, math.ceil(math.sqrt(villages)))
+    centres = []
+    for v in range(villages):
+        jitter = village_gap * 0.2
+        centres.append(((v % side) * village_gap + rng.uniform(-jitter, jitter),
+                        (v // side) * village_gap + rng.uniform(-jitter, jitter)))
+
+    # Relay nodes along the road between horizontally and vertically adjacent villages
+    relays = []
+    step = radius * 0.8
+    for v, (cx, cy) in enumerate(centres):
+        for other in (v + 1, v + side):
+            if other >= villages or (other == v + 1 and other % side == 0):
+                continue
+            ox, oy = centres[other]
+            distance = math.hypot(ox - cx, oy - cy)
+            hops = int(distance // step)
+            for h in range(1, hops + 1):
+                t = h / (hops + 1)
+                relays.append((cx + (ox - cx) * t, cy + (oy - cy) * t))
+    # _connect_components links up any villages whose relays were dropped
+    relays = relays[:max(size - villages, 0)]
+
+    positions = []
+    for i in range(size - len(relays)):
+        cx, cy = centres[i % villages]
+        positions.append((rng.gauss(cx, village_spread), rng.gauss(cy, village_spread)))
+    positions.extend(relays)
+
+    topology = Topology("clustered_village", positions, _link_within_range(positions, radius))
+    return _connect_components(topology)
+
+
+GENERATORS = {
+    "grid": grid,
+    "line": line,
+    "random_geometric": random_geometric,
+    "clustered_village": clustered_village,
+}
+
+
+def generate(name: str, size: int, seed: int = 0, **options) -> Topology:
+    """Generate a topology by name; grid and line ignore the seed."""
+    if name not in GENERATORS:
+        raise ValueError(f"Unknown topology: {name}")
+    if name in ("grid", "line"):
+        return GENERATORS[name](size, **options)
+    return GENERATORS[name](size, seed=seed, **options)
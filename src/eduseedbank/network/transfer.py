@@ -0,0 +1,494 @@
+"""
+Resumable seed transfers for the LoRa mesh.
+
+A TransferManager requests seeds chunk by chunk, tells the holder which
+chunks it already has, and checkpoints partial downloads to disk so a
+transfer interrupted by a link outage, or by a node reboot, continues
+where it stopped instead of starting again from zero.
+
+Chunks normally carry a seed's JSON encoding (lora.encode_seed). Chunks
+whose payload says "encoding": "archive" carry a whole `.seed` archive
+instead, as written by the publish pipeline; those are saved as files.
+"""
+
+import base64
+import binascii
+import bisect
+import hashlib
+import json
+import os
+import random
+import zipfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from urllib.parse import quote, unquote
+
+from .lora import DEFAULT_CHUNK_SIZE, LoRaNetwork, LoRaNode, Message, MessageType
+from .radio import DEFAULT_PROFILE, RadioProfile, message_airtime
+
+CHECKPOINT_EXTENSION = ".json"
+PARTIAL_EXTENSION = ".part"
+ARCHIVE_ENCODING = "archive"  # SEED_CHUNK "encoding" of frames carrying a .seed archive
+
+
+def _chunk_fits(payload: Dict, data: bytes) -> bool:
+    """Check a chunk frame describes a consistent transfer and `data` is the slice it names."""
+    fields = [payload.get(key) for key in ("size", "chunk_size", "total", "index")]
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in fields):
+        return False
+    size, chunk_size, total, index = fields
+    if size <= 0 or chunk_size <= 0 or total != -(-size // chunk_size):
+        return False
+    if not 0 <= index < total:
+        return False
+    return len(data) == min(chunk_size, size - index * chunk_size)
+
+
+class PartialTransfer:
+    """A seed download in progress."""
+
+    def __init__(self, seed_id: str, size: int, total: int, chunk_size: int, digest: str,
+                 encoding: Optional[str] = None):
+        self.seed_id = seed_id
+        self.size = size
+        self.total = total
+        self.chunk_size = chunk_size
+        self.digest = digest
+        self.encoding = encoding  # None for JSON seeds, ARCHIVE_ENCODING for .seed archives
+        self.bitmap = bytearray((total + 7) // 8)
+        self.buffer = bytearray(size)
+        self.received = 0
+
+    def has(self, index: int) -> bool:
+        return bool(self.bitmap[index >> 3] & (1 << (index & 7)))
+
+    def add(self, index: int, data: bytes) -> bool:
+        """Store a chunk. Returns False for duplicates."""
+        if index >= self.total or self.has(index):
+            return False
+        start = index * self.chunk_size
+        self.buffer[start:start + len(data)] = data
+        self.bitmap[index >> 3] |= 1 << (index & 7)
+        self.received += 1
+        return True
+
+    @property
+    def complete(self) -> bool:
+        return self.received >= self.total
+
+    def contiguous_bytes(self) -> int:
+        """Length of the prefix received without gaps, for offset-based resume."""
+        index = 0
+        while index < self.total and self.has(index):
+            index += 1
+        return min(self.size, index * self.chunk_size)
+
+    def to_checkpoint(self) -> Dict:
+        return {
+            "seed_id": self.seed_id,
+            "size": self.size,
+            "total": self.total,
+            "chunk_size": self.chunk_size,
+            "digest": self.digest,
+            "encoding": self.encoding,
+            "bitmap": base64.b64encode(bytes(self.bitmap)).decode("ascii")
+        }
+
+
+class TransferManager:
+    """Requests seeds in chunks on behalf of a node and checkpoints partial downloads."""
+
+    def __init__(self, node: LoRaNode, checkpoint_dir: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, window: int = 16,
+                 resume: bool = True, checkpoint_every: int = 8, durable: bool = True,
+                 auto_continue: bool = True, archive_dir: Optional[str] = None):
+        """
+        Args:
+            node: Node that receives the seeds
+            checkpoint_dir: Directory for partial downloads (None keeps them in memory only)
+            chunk_size: Bytes of seed per SEED_CHUNK frame
+            window: Chunks the holder sends per request
+            resume: Send a bitmap of received chunks; False resumes by contiguous offset
+            checkpoint_every: Chunks between checkpoint writes
+            durable: fsync checkpoints so they survive power loss
+            auto_continue: Request the next window as soon as one ends. When False,
+                finished windows are recorded in `continuations` for the caller
+                to act on.
+            archive_dir: Directory `.seed` archives received are saved to; without
+                one, archive transfers are discarded once complete
+        """
+        self.node = node
+        self.checkpoint_dir = checkpoint_dir
+        self.chunk_size = chunk_size
+        self.window = window
+        self.resume = resume
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.durable = durable
+        self.auto_continue = auto_continue
+        self.archive_dir = archive_dir
+        self.continuations = {}  # seed_id -> source whose window just ended
+        self._continuing = False  # A handle_chunk further up the stack is requesting windows
+        self.priorities = {}  # seed_id -> scheduler class its windows are requested in
+        self.partials = {}
+        self.completed = []
+        self._since_checkpoint = {}
+        node.transfers = self
+        if checkpoint_dir:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+            self._load_checkpoints()
+
+    def request(self, seed_id: str, source: str, priority: Optional[int] = None):
+        """
+        Ask `source` for the chunks of `seed_id` we do not have yet.
+
+        `priority` sets the scheduler class (see scheduler.priority_of) of
+        this request, the chunks answering it and every later window of the
+        transfer; None keeps the class the transfer already has.
+        """
+        if priority is not None:
+            self.priorities[seed_id] = priority
+        payload = {"seed_id": seed_id, "chunk_size": self.chunk_size, "window": self.window}
+        if seed_id in self.priorities:
+            payload["priority"] = self.priorities[seed_id]
+        partial = self.partials.get(seed_id)
+        if partial and partial.received:
+            if self.resume:
+                payload["have"] = base64.b64encode(bytes(partial.bitmap)).decode("ascii")
+            else:
+                payload["offset"] = partial.contiguous_bytes()
+
+        self.node.send_message(Message(
+            msg_type=MessageType.SEED_REQUEST,
+            source=self.node.node_id,
+            destination=source,
+            payload=payload,
+            timestamp=self.node.now()
+        ))
+
+    def discard(self, seed_id: str):
+        """Throw away a partial download so the next request starts from zero."""
+        self.partials.pop(seed_id, None)
+        self.priorities.pop(seed_id, None)
+        self._since_checkpoint.pop(seed_id, None)
+        self._remove_checkpoint(seed_id)
+
+    def handle_chunk(self, message: Message):
+        """Store an incoming chunk and ask for the next window when this one ends."""
+        payload = message.payload
+        try:
+            data = base64.b64decode(payload["data"], validate=True)
+        except (binascii.Error, TypeError, ValueError):
+            return
+        if not _chunk_fits(payload, data):
+            return
+        seed_id = payload["seed_id"]
+        partial = self.partials.get(seed_id)
+        if partial is None or partial.digest != payload["digest"]:
+            # New transfer, or the holder's copy changed under us
+            partial = PartialTransfer(seed_id, payload["size"], payload["total"],
+                                      payload["chunk_size"], payload["digest"], payload.get("encoding"))
+            self.partials[seed_id] = partial
+        elif (partial.size, partial.total, partial.chunk_size) != (
+                payload["size"], payload["total"], payload["chunk_size"]):
+            return
+
+        if partial.add(payload["index"], data):
+            self._write_chunk(partial, payload["index"], data)
+
+        if partial.complete:
+            self._finish(partial)
+        elif payload.get("last"):
+            # Chunks a relay answered from its cache name the holder to ask next
+            self.continuations[seed_id] = payload.get("holder", message.source)
+            if self.auto_continue:
+                self._continue()
+
+    def _continue(self):
+        """
+        Request the next window of every transfer whose window ended.
+
+        On a synchronous network the reply to a request arrives before
+        request() returns, so windows ending inside it are left queued for
+        the outermost call's loop instead of nesting one call per window.
+        """
+        if self._continuing:
+            return
+        self._continuing = True
+        try:
+            while self.continuations:
+                seed_id = next(iter(self.continuations))
+                self.request(seed_id, self.continuations.pop(seed_id))
+        finally:
+            self._continuing = False
+
+    def _finish(self, partial: PartialTransfer):
+        del self.partials[partial.seed_id]
+        self.priorities.pop(partial.seed_id, None)
+        self._since_checkpoint.pop(partial.seed_id, None)
+        self._remove_checkpoint(partial.seed_id)
+
+        encoded = bytes(partial.buffer)
+        if hashlib.sha256(encoded).hexdigest() != partial.digest:
+            print(f"[{self.node.node_id}] Digest mismatch for seed {partial.seed_id}, discarding")
+            return
+        if partial.encoding == ARCHIVE_ENCODING:
+            seed_data = self._save_archive(partial.seed_id, encoded)
+            if seed_data is None:
+                return
+        else:
+            seed_data = json.loads(encoded)
+        self.node.store_seed(partial.seed_id, seed_data)
+        self.completed.append(partial.seed_id)
+
+    def _save_archive(self, seed_id: str, encoded: bytes) -> Optional[Dict]:
+        """
+        Write a received `.seed` archive to archive_dir.
+
+        Returns the archive's metadata.json plus its "archive" path, the
+        seed data the node stores, or None if the archive was discarded.
+        """
+        if not self.archive_dir:
+            print(f"[{self.node.node_id}] No archive_dir for seed archive {seed_id}, discarding")
+            return None
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = os.path.join(self.archive_dir, quote(seed_id, safe="") + ".seed")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(encoded)
+        try:
+            with zipfile.ZipFile(tmp_path) as zipf:
+                names = zipf.namelist()
+                metadata = json.loads(zipf.read("metadata.json")) if "metadata.json" in names else {}
+        except (zipfile.BadZipFile, ValueError) as e:
+            os.remove(tmp_path)
+            print(f"[{self.node.node_id}] Unreadable seed archive {seed_id}, discarding: {e}")
+            return None
+        os.replace(tmp_path, path)
+        seed_data = dict(metadata) if isinstance(metadata, dict) else {}
+        seed_data["archive"] = path
+        return seed_data
+
+    # Checkpointing
+
+    def _paths(self, seed_id: str):
+        base = os.path.join(self.checkpoint_dir, quote(seed_id, safe=""))
+        return base + CHECKPOINT_EXTENSION, base + PARTIAL_EXTENSION
+
+    def _write_chunk(self, partial: PartialTransfer, index: int, data: bytes):
+        if not self.checkpoint_dir:
+            return
+        meta_path, part_path = self._paths(partial.seed_id)
+        mode = "r+b" if os.path.exists(part_path) else "wb"
+        with open(part_path, mode) as f:
+            f.seek(index * partial.chunk_size)
+            f.write(data)
+
+        # The bitmap is only written every few chunks; chunks that land after
+        # the last checkpoint are simply requested again after a reboot.
+        count = self._since_checkpoint.get(partial.seed_id, 0) + 1
+        if count >= self.checkpoint_every or partial.complete:
+            self._write_checkpoint(partial, meta_path)
+            count = 0
+        self._since_checkpoint[partial.seed_id] = count
+
+    def _write_checkpoint(self, partial: PartialTransfer, meta_path: str):
+        part_path = self._paths(partial.seed_id)[1]
+        if self.durable and os.path.exists(part_path):
+            # Chunk data must hit the disk before the bitmap that vouches for it
+            with open(part_path, "rb") as f:
+                os.fsync(f.fileno())
+
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(partial.to_checkpoint(), f)
+            if self.durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, meta_path)
+
+    def checkpoint(self):
+        """Write the bitmap of every partial download now."""
+        if not self.checkpoint_dir:
+            return
+        for partial in self.partials.values():
+            self._write_checkpoint(partial, self._paths(partial.seed_id)[0])
+            self._since_checkpoint[partial.seed_id] = 0
+
+    def _remove_checkpoint(self, seed_id: str):
+        if not self.checkpoint_dir:
+            return
+        for path in self._paths(seed_id):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _load_checkpoints(self):
+        """Restore partial downloads left behind by a previous run."""
+        for name in os.listdir(self.checkpoint_dir):
+            if not name.endswith(CHECKPOINT_EXTENSION):
+                continue
+            seed_id = unquote(name[:-len(CHECKPOINT_EXTENSION)])
+            meta_path, part_path = self._paths(seed_id)
+            try:
+                with open(meta_path) as f:
+                    state = json.load(f)
+                partial = PartialTransfer(seed_id, state["size"], state["total"],
+                                          state["chunk_size"], state["digest"], state.get("encoding"))
+                bitmap = base64.b64decode(state["bitmap"])
+                with open(part_path, "rb") as f:
+                    data = f.read()
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[{self.node.node_id}] Ignoring unreadable checkpoint {meta_path}: {e}")
+                continue
+
+            for index in range(partial.total):
+                if bitmap[index >> 3] & (1 << (index & 7)):
+                    start = index * partial.chunk_size
+                    chunk = data[start:start + partial.chunk_size]
+                    if len(chunk) == min(partial.chunk_size, partial.size - start):
+                        partial.add(index, chunk)
+            self.partials[seed_id] = partial
+
+
+class IntermittentLink:
+    """
+    Link filter that is up and down for random, exponentially distributed periods.
+
+    Installed as `LoRaNetwork.link_filter`, it charges each frame its time
+    on air, advances the simulated clock, and drops frames that do not
+    fit entirely inside an up period.
+    """
+
+    def __init__(self, mean_up: float, mean_down: float, seed: int = 0,
+                 profile: RadioProfile = DEFAULT_PROFILE):
+        self.mean_up = mean_up
+        self.mean_down = mean_down
+        self.profile = profile
+        self.rng = random.Random(seed)
+        self.now = 0.0
+        self.airtime = 0.0
+        self.frames = 0
+        self.lost_frames = 0
+        self._starts = [0.0]  # Start of each up period
+        self._ends = [self.rng.expovariate(1 / mean_up)]
+
+    def _extend(self, t: float):
+        while self._ends[-1] <= t:
+            start = self._ends[-1] + self.rng.expovariate(1 / self.mean_down)
+            self._starts.append(start)
+            self._ends.append(start + self.rng.expovariate(1 / self.mean_up))
+
+    def _period(self, t: float) -> int:
+        self._extend(t)
+        return bisect.bisect_right(self._starts, t) - 1
+
+    def is_up(self, t: float) -> bool:
+        period = self._period(t)
+        return period >= 0 and t < self._ends[period]
+
+    def wait_until_up(self):
+        """Advance the clock to the start of the next up period if the link is down."""
+        if not self.is_up(self.now):
+            self.now = self._starts[self._period(self.now) + 1]
+
+    def __call__(self, message: Message) -> bool:
+        duration = message_airtime(message, self.profile)
+        start = self.now
+        self.now += duration
+        self.airtime += duration
+        self.frames += 1
+        delivered = self.is_up(start) and self._period(start) == self._period(self.now) \
+            and self.is_up(self.now)
+        if not delivered:
+            self.lost_frames += 1
+        return delivered
+
+
+@dataclass
+class TransferResult:
+    """Outcome of an intermittent-link transfer simulation."""
+    resume: bool
+    seed_bytes: int
+    completed: bool
+    airtime: float
+    frames: int
+    lost_frames: int
+    requests: int
+    elapsed: float
+
+
+def simulate_intermittent_transfer(seed_bytes: int = 20000, mean_up: float = 60.0,
+                                   mean_down: float = 600.0, resume: bool = True,
+                                   chunk_size: int = DEFAULT_CHUNK_SIZE, window: int = 16,
+                                   retry_delay: float = 5.0, max_time: float = 30 * 86400.0,
+                                   seed: int = 0,
+                                   profile: RadioProfile = DEFAULT_PROFILE) -> TransferResult:
+    """
+    Transfer one seed from a gateway to a school over a link that keeps dropping.
+
+    With resume=True the school re-requests only missing chunks after an
+    outage; with resume=False every outage restarts the transfer from zero.
+
+    Args:
+        seed_bytes: Approximate encoded size of the seed
+        mean_up: Mean length of a link-up period in seconds
+        mean_down: Mean length of an outage in seconds
+        resume: Resume from a chunk bitmap instead of restarting
+        chunk_size: Bytes per SEED_CHUNK frame
+        window: Chunks sent per request
+        retry_delay: Seconds the school waits after a stall before asking again
+        max_time: Give up after this much simulated time
+        seed: RNG seed for the link schedule
+
+    Returns:
+        TransferResult with total airtime to completion
+    """
+    link = IntermittentLink(mean_up, mean_down, seed=seed, profile=profile)
+    network = LoRaNetwork()
+    network.clock = lambda: link.now
+    network.link_filter = link
+    gateway = LoRaNode("gateway", is_gateway=True, verbose=False)
+    school = LoRaNode("school1", verbose=False)
+    network.add_node(gateway)
+    network.add_node(school)
+    gateway.store_seed("lesson", {"title": "Lesson", "body": "x" * seed_bytes})
+    manager = TransferManager(school, chunk_size=chunk_size, window=window, resume=resume,
+                              auto_continue=False)
+
+    requests = 0
+    while "lesson" not in school.seed_storage and link.now < max_time:
+        link.wait_until_up()
+        if not resume and requests:
+            # Without resume support an interruption costs the whole transfer
+            manager.discard("lesson")
+        requests += 1
+        manager.request("lesson", "gateway")
+        # Keep asking while windows arrive intact
+        while manager.continuations.pop("lesson", None):
+            requests += 1
+            manager.request("lesson", "gateway")
+        if "lesson" not in school.seed_storage:
+            # Stalled on a lost frame; wait before trying again
+            link.now += retry_delay
+
+    return TransferResult(
+        resume=resume,
+        seed_bytes=seed_bytes,
+        completed="lesson" in school.seed_storage,
+        airtime=link.airtime,
+        frames=link.frames,
+        lost_frames=link.lost_frames,
+        requests=requests,
+        elapsed=link.now
+    )
+
+
+def compare_resume(seed_bytes: int = 20000, mean_up: float = 60.0, mean_down: float = 600.0,
+                   runs: int = 5, **options) -> List[TransferResult]:
+    """Run the intermittent-link simulation with and without resume for several link schedules."""
+    results = []
+    for run in range(runs):
+        for resume in (True, False):
+            results.append(simulate_intermittent_transfer(
+                seed_bytes, mean_up, mean_down, resume=resume, seed=run, **options
+            ))
+    return results
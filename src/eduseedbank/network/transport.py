@@ -0,0 +1,361 @@
+"""
+Pluggable transports underneath LoRaNode.send_message.
+
+A transport moves serialized frames between nodes. InProcessTransport
+keeps the original direct-call behaviour; UdpMulticastTransport and the
+pty-based serial emulator carry real bytes between processes, so many
+nodes can run as separate processes on one Linux box and share a
+simulated radio channel.
+"""
+
+import json
+import os
+import random
+import select
+import socket
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .lora import BROADCAST, LoRaNetwork, LoRaNode, Message, MessageType
+
+DEFAULT_MULTICAST_GROUP = "239.255.42.99"
+DEFAULT_MULTICAST_PORT = 5007
+MAX_DATAGRAM = 65507
+
+
+def encode_message(message: Message) -> bytes:
+    """Serialize a message to a single-line JSON frame."""
+    return json.dumps({
+        "type": message.msg_type.value,
+        "src": message.source,
+        "dst": message.destination,
+        "ts": message.timestamp,
+        "payload": message.payload
+    }, separators=(",", ":")).encode("utf-8")
+
+
+def decode_message(frame: bytes) -> Message:
+    """Parse a frame produced by encode_message."""
+    data = json.loads(frame)
+    return Message(
+        msg_type=MessageType(data["type"]),
+        source=data["src"],
+        destination=data["dst"],
+        payload=data["payload"],
+        timestamp=data["ts"]
+    )
+
+
+class Transport(ABC):
+    """Base class for node transports; subclasses implement send()."""
+
+    def __init__(self):
+        self.node = None
+        self.frames_sent = 0
+        self.frames_received = 0
+        self.bytes_sent = 0
+
+    def attach(self, node: LoRaNode):
+        """Bind this transport to the node whose frames it carries."""
+        self.node = node
+
+    @abstractmethod
+    def send(self, message: Message):
+        """Put one frame on the channel."""
+
+    def close(self):
+        """Release sockets, threads or file descriptors."""
+        pass
+
+    def _accepts(self, message: Message) -> bool:
+        return message.source != self.node.node_id and \
+            message.destination in (self.node.node_id, BROADCAST)
+
+
+class InProcessTransport(Transport):
+    """Direct method calls through a LoRaNetwork, as in the original simulator."""
+
+    def __init__(self, network: LoRaNetwork):
+        super().__init__()
+        self.network = network
+
+    def send(self, message: Message):
+        self.frames_sent += 1
+        if message.destination == BROADCAST:
+            # Through the runtime's node queues when there is one, like LoRaNode.broadcast_message
+            runtime = self.network.runtime
+            for neighbor in self.node.connected_nodes:
+                if runtime:
+                    runtime.submit(message, destination=neighbor.node_id)
+                else:
+                    neighbor.receive_message(message)
+        else:
+            self.network.route_message(message, via=self.node.node_id)
+
+
+class _ThreadedTransport(Transport):
+    """Shared receive-side behaviour for transports that read frames on a thread."""
+
+    def __init__(self, loss: float = 0.0, latency: float = 0.0,
+                 neighbors: Optional[Iterable[str]] = None, seed: Optional[int] = None):
+        super().__init__()
+        self.loss = loss
+        self.latency = latency
+        self.neighbors = set(neighbors) if neighbors is not None else None
+        self.rng = random.Random(seed)
+        self.frames_dropped = 0
+        # Handlers are not thread-safe; one frame is handled at a time per node
+        self.handler_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+
+    def _start(self, target: Callable):
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+
+    def _deliver(self, frame: bytes):
+        try:
+            message = decode_message(frame)
+        except (ValueError, KeyError) as e:
+            print(f"Dropping malformed frame: {e}")
+            return
+        if not self._accepts(message):
+            return
+        # Only frames from nodes within radio range are heard
+        if self.neighbors is not None and message.source not in self.neighbors:
+            return
+        if self.loss and self.rng.random() < self.loss:
+            self.frames_dropped += 1
+            return
+        if self.latency:
+            timer = threading.Timer(self.latency, self._handle, (message,))
+            timer.daemon = True
+            timer.start()
+        else:
+            self._handle(message)
+
+    def _handle(self, message: Message):
+        if self._closed.is_set():
+            return
+        with self.handler_lock:
+            self.frames_received += 1
+            self.node.receive_message(message)
+
+    def close(self):
+        self._closed.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+
+class UdpMulticastTransport(_ThreadedTransport):
+    """
+    Emulates a shared radio channel with UDP multicast on the loopback interface.
+
+    Every frame reaches every process in the group; each node keeps only
+    frames addressed to it (or broadcast) from sources in `neighbors`,
+    then applies the configured loss and latency.
+    """
+
+    def __init__(self, group: str = DEFAULT_MULTICAST_GROUP, port: int = DEFAULT_MULTICAST_PORT,
+                 interface: str = "127.0.0.1", **options):
+        super().__init__(**options)
+        self.group = group
+        self.port = port
+        self.interface = interface
+        self._recv_sock = None
+        self._send_sock = None
+
+    def attach(self, node: LoRaNode):
+        super().attach(node)
+        recv_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        recv_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            recv_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        recv_sock.bind(("", self.port))
+        membership = struct.pack("4s4s", socket.inet_aton(self.group), socket.inet_aton(self.interface))
+        recv_sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        recv_sock.settimeout(0.2)
+
+        send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        send_sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 0)  # Never leave the host
+        send_sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        send_sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(self.interface))
+
+        self._recv_sock, self._send_sock = recv_sock, send_sock
+        self._start(self._receive_loop)
+
+    def send(self, message: Message):
+        frame = encode_message(message)
+        if len(frame) > MAX_DATAGRAM:
+            raise ValueError(f"Frame of {len(frame)} bytes does not fit in a datagram")
+        self._send_sock.sendto(frame, (self.group, self.port))
+        self.frames_sent += 1
+        self.bytes_sent += len(frame)
+
+    def _receive_loop(self):
+        while not self._closed.is_set():
+            try:
+                frame, _ = self._recv_sock.recvfrom(MAX_DATAGRAM)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self._deliver(frame)
+
+    def close(self):
+        super().close()
+        for sock in (self._recv_sock, self._send_sock):
+            if sock:
+                sock.close()
+
+
+class PtyRadioHub:
+    """
+    Serial radio emulator: one pseudo-terminal per node, all sharing one channel.
+
+    Each node opens its pty slave device as if it were a serial LoRa modem
+    and exchanges newline-delimited frames; the hub copies every frame it
+    reads from one pty to all the others.
+    """
+
+    def __init__(self, count: int):
+        # pty and tty only exist on POSIX systems
+        import pty
+        import tty
+
+        self.masters = []
+        self.devices = []
+        # Slaves stay open so a master does not see EOF between node restarts
+        self._slaves = []
+        for _ in range(count):
+            master, slave = pty.openpty()
+            tty.setraw(slave)
+            self.masters.append(master)
+            self._slaves.append(slave)
+            self.devices.append(os.ttyname(slave))
+        self.frames_forwarded = 0
+        self._buffers = {master: b"" for master in self.masters}
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._closed.is_set():
+            readable, _, _ = select.select(self.masters, [], [], 0.2)
+            for master in readable:
+                try:
+                    data = os.read(master, 65536)
+                except OSError:
+                    continue
+                buffer = self._buffers[master] + data
+                *frames, self._buffers[master] = buffer.split(b"\n")
+                for frame in frames:
+                    if not frame:
+                        continue
+                    self.frames_forwarded += 1
+                    for other in self.masters:
+                        if other != master:
+                            os.write(other, frame + b"\n")
+
+    def close(self):
+        self._closed.set()
+        self._thread.join(timeout=1.0)
+        for fd in self.masters + self._slaves:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class SerialTransport(_ThreadedTransport):
+    """Newline-framed transport over a serial device, such as a PtyRadioHub pty."""
+
+    def __init__(self, device: str, **options):
+        super().__init__(**options)
+        self.device = device
+        self._fd = None
+
+    def attach(self, node: LoRaNode):
+        import tty
+
+        super().attach(node)
+        self._fd = os.open(self.device, os.O_RDWR | os.O_NOCTTY)
+        tty.setraw(self._fd)
+        self._start(self._receive_loop)
+
+    def send(self, message: Message):
+        frame = encode_message(message) + b"\n"
+        view = memoryview(frame)
+        while view:
+            written = os.write(self._fd, view)
+            view = view[written:]
+        self.frames_sent += 1
+        self.bytes_sent += len(frame)
+
+    def _receive_loop(self):
+        buffer = b""
+        while not self._closed.is_set():
+            readable, _, _ = select.select([self._fd], [], [], 0.2)
+            if not readable:
+                continue
+            try:
+                data = os.read(self._fd, 65536)
+            except OSError:
+                break
+            buffer += data
+            *frames, buffer = buffer.split(b"\n")
+            for frame in frames:
+                if frame:
+                    self._deliver(frame)
+
+    def close(self):
+        super().close()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def run_udp_node(node_id: str, peers: List[str], duration: float = 5.0, ping_interval: float = 0.01,
+                 results=None, **transport_options) -> Dict:
+    """
+    Run one node over UDP multicast for `duration` seconds, pinging random peers.
+
+    Intended as a multiprocessing target: start one process per node and
+    pass a multiprocessing queue as `results` to collect per-node counters.
+    """
+    node = LoRaNode(node_id, verbose=False)
+    transport = UdpMulticastTransport(**transport_options)
+    node.set_transport(transport)
+    rng = random.Random(node_id)
+    # Let the other processes join the group before traffic starts
+    time.sleep(0.5)
+
+    deadline = time.time() + duration
+    pings = 0
+    while time.time() < deadline and peers:
+        node.send_message(Message(
+            msg_type=MessageType.NETWORK_PING,
+            source=node_id,
+            destination=rng.choice(peers),
+            payload={"timestamp": time.time()},
+            timestamp=time.time()
+        ))
+        pings += 1
+        time.sleep(ping_interval)
+    time.sleep(0.5)  # Drain in-flight frames
+    transport.close()
+
+    stats = {
+        "node_id": node_id,
+        "pings_sent": pings,
+        "frames_sent": transport.frames_sent,
+        "frames_received": transport.frames_received,
+        "frames_dropped": transport.frames_dropped,
+        "bytes_sent": transport.bytes_sent
+    }
+    if results is not None:
+        results.put(stats)
+    return stats
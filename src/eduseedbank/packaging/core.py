@@ -9,6 +9,8 @@ import zipfile
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from eduseedbank.profiling import traced
+
 
 class SeedPackage:
     """Represents an educational content package (seed)."""
@@ -39,6 +41,7 @@ class SeedPackage:
         else:
             raise FileNotFoundError(f"File not found: {file_path}")
 
+    @traced("packaging.save")
     def save(self, output_path: str) -> str:
         """Save the seed package as a zip file."""
         # Create metadata file
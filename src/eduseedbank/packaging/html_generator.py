@@ -6,6 +6,8 @@ Creates interactive educational HTML content.
 import os
 from typing import List, Dict
 
+from eduseedbank.profiling import traced
+
 
 class HTMLGenerator:
     """Generates interactive HTML educational content."""
@@ -14,6 +16,7 @@ class HTMLGenerator:
         self.templates_dir = os.path.join(os.path.dirname(__file__), "templates")
         os.makedirs(self.templates_dir, exist_ok=True)
 
+    @traced("packaging.render_page")
     def create_interactive_page(self, title: str, content: str, 
                               exercises: List[Dict] = None) -> str:
         """
@@ -116,6 +119,42 @@ class HTMLGenerator:
     </div>
     
     <script>
+        // Progress goes to the school's local server when the page is served
+        // from it (/content/<seed_id>/<page>); opened any other way it stays local.
+        const PROGRESS_URL = "/api/progress";
+
+        function progressContext() {{
+            const match = location.pathname.match(/^\\/content\\/([^\\/]+)\\/(.+)$/);
+            if (!match) return null;
+            let student = new URLSearchParams(location.search).get("student");
+            try {{
+                student = student || localStorage.getItem("eduseedbankStudent") ||
+                    "anon-" + Math.random().toString(36).slice(2, 10);
+                localStorage.setItem("eduseedbankStudent", student);
+            }} catch (e) {{
+                student = student || "anon";
+            }}
+            return {{student_id: student, seed_id: decodeURIComponent(match[1]), page: decodeURIComponent(match[2])}};
+        }}
+
+        function reportProgress(event) {{
+            const context = progressContext();
+            if (!context) return;
+            const body = JSON.stringify(Object.assign(context, event));
+            if (navigator.sendBeacon && navigator.sendBeacon(PROGRESS_URL, body)) return;
+            fetch(PROGRESS_URL, {{method: "POST", body: body, keepalive: true}}).catch(() => {{}});
+        }}
+
+        reportProgress({{kind: "view"}});
+
+        // Served from a school server, keep the whole seed on this device
+        // after the first visit (the server builds /offline/<seed_id>/sw.js).
+        const seedMatch = location.pathname.match(/^\\/content\\/([^\\/]+)\\//);
+        if (seedMatch && "serviceWorker" in navigator) {{
+            navigator.serviceWorker.register(`/offline/${{seedMatch[1]}}/sw.js`,
+                                             {{scope: `/content/${{seedMatch[1]}}/`}}).catch(() => {{}});
+        }}
+
         function checkAnswer(exerciseId, correctAnswer) {{
             const selectedOption = document.querySelector(`input[name="exercise${{exerciseId}}"]:checked`);
             const feedback = document.getElementById(`feedback${{exerciseId}}`);
@@ -127,7 +166,11 @@ class HTMLGenerator:
                 return;
             }}
             
-            if (selectedOption.value === correctAnswer) {{
+            const correct = selectedOption.value === correctAnswer;
+            reportProgress({{kind: "attempt", exercise: String(exerciseId),
+                             answer: selectedOption.value, correct: correct}});
+
+            if (correct) {{
                 feedback.textContent = "Benar! Jawaban Anda tepat.";
                 feedback.className = "feedback correct";
             }} else {{
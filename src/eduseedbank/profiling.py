@@ -0,0 +1,247 @@
+"""
+Profiling hooks for EduSeedbank.
+
+Spans time named stages of the packaging, compression, network and
+server code:
+
+    with span("packaging.save"):
+        ...
+
+    @traced("network.route_message")
+    def route_message(...):
+        ...
+
+While spans are off (the default) `span()` hands back one shared no-op
+context manager and `traced` functions make a single flag check before
+calling through, so instrumented hot paths cost next to nothing. Once
+enable() is called, every span adds its wall time, the CPU time of its
+thread and, optionally, the bytes it left allocated (via tracemalloc) to
+per-name totals that summary() and format_summary() report.
+
+Whole-program profiles come from profile_to(), which the CLI's global
+`--profile` option uses: cProfile statistics for pstats and snakeviz, or
+collapsed stacks, sampled from every thread, for flame graph tools.
+"""
+
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Optional
+
+PROFILE_FORMATS = ("pstats", "collapsed")
+SAMPLE_INTERVAL = 0.001  # Seconds between stack samples of the collapsed format
+
+_enabled = False
+_allocations = False
+_started_tracemalloc = False
+_stats = {}
+_lock = threading.Lock()
+
+
+@dataclass
+class SpanStats:
+    """Totals of every run of one span; times include nested spans."""
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    allocated: int = 0  # Net bytes left allocated, when allocations are traced
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class _NullSpan:
+    """What span() returns while spans are off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """One timed run of a named span."""
+
+    __slots__ = ("name", "wall", "cpu", "memory")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.memory = _traced_memory() if _allocations else 0
+        self.cpu = time.thread_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        allocated = _traced_memory() - self.memory if _allocations else 0
+        with _lock:
+            stats = _stats.get(self.name)
+            if stats is None:
+                stats = _stats[self.name] = SpanStats()
+            stats.calls += 1
+            stats.wall += wall
+            stats.cpu += cpu
+            stats.allocated += allocated
+        return False
+
+
+def _traced_memory() -> int:
+    import tracemalloc
+    return tracemalloc.get_traced_memory()[0]
+
+
+def span(name: str):
+    """Context manager timing the block under `name` while spans are enabled."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def traced(name: str) -> Callable:
+    """Decorator running every call of a function inside span(name)."""
+    def decorate(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def enable(allocations: bool = False):
+    """
+    Start recording spans.
+
+    Args:
+        allocations: Also trace allocations with tracemalloc, which slows
+            allocation-heavy code down several times
+    """
+    global _enabled, _allocations, _started_tracemalloc
+    if allocations:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracemalloc = True
+    _allocations = allocations
+    _enabled = True
+
+
+def disable():
+    """Stop recording spans; totals so far are kept until reset()."""
+    global _enabled, _allocations, _started_tracemalloc
+    if _started_tracemalloc:
+        import tracemalloc
+        tracemalloc.stop()
+    _enabled = _allocations = _started_tracemalloc = False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """Forget every span total."""
+    with _lock:
+        _stats.clear()
+
+
+def summary() -> Dict[str, SpanStats]:
+    """Copy of the span totals by name."""
+    with _lock:
+        return {name: SpanStats(**stats.to_dict()) for name, stats in _stats.items()}
+
+
+def format_summary(stats: Optional[Dict[str, SpanStats]] = None) -> str:
+    """Table of span totals, slowest first."""
+    stats = summary() if stats is None else stats
+    if not stats:
+        return "No spans recorded"
+    lines = [f"  {'span':32s} {'calls':>8s} {'wall s':>9s} {'cpu s':>9s} {'ms/call':>9s} {'alloc KB':>10s}"]
+    for name, item in sorted(stats.items(), key=lambda entry: -entry[1].wall):
+        lines.append(f"  {name:32s} {item.calls:8d} {item.wall:9.3f} {item.cpu:9.3f} "
+                     f"{item.wall / item.calls * 1000:9.3f} {item.allocated / 1024:10.1f}")
+    return "\n".join(lines)
+
+
+class StackSampler:
+    """Samples the stacks of every thread and counts them as collapsed stacks."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="eduseedbank-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.counts[";".join(reversed(stack))] += 1
+
+    def write(self, path: str):
+        """Write `thread;outer;...;inner count` lines, the input flamegraph.pl and speedscope read."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+
+
+def profile_to(path: str, profile_format: str = "pstats") -> Callable[[], None]:
+    """
+    Start profiling the process.
+
+    Args:
+        path: File the profile is written to
+        profile_format: "pstats" for cProfile statistics of the calling
+            thread, or "collapsed" for stacks sampled from every thread
+
+    Returns:
+        Function that stops profiling and writes `path`
+    """
+    if profile_format not in PROFILE_FORMATS:
+        raise ValueError(f"Unknown profile format {profile_format}; choose from {', '.join(PROFILE_FORMATS)}")
+    if profile_format == "collapsed":
+        sampler = StackSampler()
+        sampler.start()
+
+        def finish():
+            sampler.stop()
+            sampler.write(path)
+        return finish
+
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    def finish():
+        profiler.disable()
+        profiler.dump_stats(path)
+    return finish
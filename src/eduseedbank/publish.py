@@ -0,0 +1,480 @@
+"""
+Streaming publish pipeline: lesson folder to seed archive and LoRa frames.
+
+A lesson folder holds pages (.html, or .txt and .md as plain text),
+videos and other assets, plus an optional lesson.json with the seed's
+metadata and, under "pages", a title and exercises per page file:
+
+    {"title": "Menanam Padi", "subject": "Pertanian",
+     "pages": {"intro.txt": {"title": "Pengantar", "exercises": [...]}}}
+
+publish() turns it into `<output>.seed` and `<output>.frames` with five
+stages, each in its own thread and connected by bounded queues, so a
+stage works on one item while the next stage handles the one before:
+
+    render -> transcode -> package -> hash -> frame
+
+render fills pages into interactive HTML; transcode runs ffmpeg on
+videos, several at once; package writes the zip as a stream, never
+seeking back, so its bytes flow straight on; hash computes the sha256
+receivers verify; frame splits the archive into SEED_CHUNK frames, one
+transport JSON line each, marked "encoding": "archive" so a receiving
+TransferManager saves the archive (see its archive_dir) instead of
+decoding a JSON seed. Every frame carries the archive's size, chunk
+count and digest, which are only known once the last byte is hashed, so
+frames are encoded with placeholders that one pass over the finished
+lines fills in.
+"""
+
+import base64
+import hashlib
+import html
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from eduseedbank.network.lora import BROADCAST, DEFAULT_CHUNK_SIZE, Message, MessageType
+from eduseedbank.network.transfer import ARCHIVE_ENCODING
+from eduseedbank.network.transport import encode_message
+from eduseedbank.packaging.core import SeedPackage
+from eduseedbank.packaging.html_generator import HTMLGenerator
+from eduseedbank.profiling import span
+
+LESSON_FILE = "lesson.json"
+PAGE_EXTENSIONS = (".html", ".htm", ".txt", ".md")
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".webm")
+BLOCK_SIZE = 256 * 1024  # Archive bytes handed from stage to stage at a time
+QUEUE_SIZE = 8
+STAGES = ("render", "transcode", "package", "hash", "frame")
+
+# Frame fields only known once the whole archive is hashed; written as placeholders, then filled in
+_PENDING = {"total": -1, "size": -1, "digest": ""}
+
+
+def _fields(values: Dict) -> bytes:
+    """The `"key":value,...` run a dict contributes to a compact JSON object."""
+    return json.dumps(values, separators=(",", ":")).encode("utf-8")[1:-1]
+
+
+@dataclass
+class StageTiming:
+    """Work done by one stage; busy seconds exclude time spent waiting on its queues."""
+    name: str
+    items: int = 0
+    bytes: int = 0
+    busy: float = 0.0
+    waiting: float = 0.0
+
+
+@dataclass
+class PublishResult:
+    """Where a lesson was published to, and how long each stage took."""
+    seed_id: str
+    seed_path: str
+    frames_path: str
+    digest: str
+    size: int
+    frames: int
+    seconds: float
+    stages: List[StageTiming] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class _Member:
+    """One archive member on its way through the pipeline."""
+    name: str
+    kind: str  # "page", "video" or "asset"
+    source: Optional[str] = None
+    data: Optional[bytes] = None
+
+
+class _Aborted(Exception):
+    """Raised inside a stage once another stage has failed."""
+
+
+def _title(name: str) -> str:
+    return os.path.splitext(os.path.basename(name))[0].replace("_", " ").replace("-", " ").title()
+
+
+def _archive_name(member: _Member, transcode: bool) -> str:
+    """Name a member is packaged under: pages become .html, transcoded videos .mp4."""
+    stem = os.path.splitext(member.name)[0]
+    if member.kind == "page":
+        return stem + ".html"
+    if member.kind == "video" and transcode:
+        return stem + ".mp4"
+    return member.name
+
+
+def _check_names(members: List[_Member], transcode: bool):
+    """Raise ValueError if two files would be packaged under the same name."""
+    seen = {"metadata.json": None}
+    for member in members:
+        name = _archive_name(member, transcode)
+        if name in seen:
+            other = f"{seen[name]} and {member.name}" if seen[name] else member.name
+            raise ValueError(f"{other} would both be packaged as {name}; rename one of them")
+        seen[name] = member.name
+
+
+def scan_lesson(lesson_dir: str) -> Tuple[Dict, List[_Member]]:
+    """
+    Read a lesson folder.
+
+    Args:
+        lesson_dir: Folder with pages, videos, assets and an optional lesson.json
+
+    Returns:
+        (lesson.json contents, members) with pages first, then assets, then
+        videos, so the slow transcodes start while the rest is packaged
+    """
+    lesson = {}
+    lesson_path = os.path.join(lesson_dir, LESSON_FILE)
+    if os.path.exists(lesson_path):
+        with open(lesson_path, encoding="utf-8") as f:
+            lesson = json.load(f)
+
+    groups = {"page": [], "asset": [], "video": []}
+    for root, dirs, files in os.walk(lesson_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, lesson_dir).replace(os.sep, "/")
+            if filename.startswith(".") or name == LESSON_FILE:
+                continue
+            extension = os.path.splitext(filename)[1].lower()
+            kind = "page" if extension in PAGE_EXTENSIONS else "video" if extension in VIDEO_EXTENSIONS else "asset"
+            groups[kind].append(_Member(name=name, kind=kind, source=path))
+    return lesson, groups["page"] + groups["asset"] + groups["video"]
+
+
+class PublishPipeline:
+    """Publishes lesson folders as seed archives and LoRa frames with overlapping stages."""
+
+    def __init__(self, transcode: bool = True, target_size_mb: int = 5, transcode_workers: int = 2,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, source: str = "gateway", queue_size: int = QUEUE_SIZE):
+        """
+        Args:
+            transcode: Run videos through ffmpeg; False packages them as they are
+            target_size_mb: Size each transcoded video aims for
+            transcode_workers: Videos transcoded at the same time
+            chunk_size: Bytes of archive per SEED_CHUNK frame
+            source: Node id the frames are sent from
+            queue_size: Items each queue holds before its producer waits
+        """
+        self.transcode = transcode
+        self.target_size_mb = target_size_mb
+        self.transcode_workers = max(1, transcode_workers)
+        self.chunk_size = chunk_size
+        self.source = source
+        self.queue_size = queue_size
+
+    def run(self, lesson_dir: str, output: str, seed_id: Optional[str] = None) -> PublishResult:
+        """
+        Publish a lesson folder.
+
+        Args:
+            lesson_dir: Lesson folder, see scan_lesson()
+            output: Output path without extension; `.seed` and `.frames` are added
+            seed_id: Seed id the frames carry (default: the output's file name)
+
+        Returns:
+            PublishResult with the per-stage timings
+        """
+        if not os.path.isdir(lesson_dir):
+            raise FileNotFoundError(f"Lesson folder not found: {lesson_dir}")
+        lesson, members = scan_lesson(lesson_dir)
+        _check_names(members, self.transcode)
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        run = _Run(self, lesson, members, output, seed_id or os.path.basename(output))
+        return run.execute()
+
+
+class _Run:
+    """State of one publish: the queues between stages and what each stage produced."""
+
+    def __init__(self, pipeline: PublishPipeline, lesson: Dict, members: List[_Member], output: str, seed_id: str):
+        self.pipeline = pipeline
+        self.lesson = lesson
+        self.members = members
+        self.seed_id = seed_id
+        self.seed_path = f"{output}.seed"
+        self.frames_path = f"{output}.frames"
+        self.timings = {name: StageTiming(name) for name in STAGES}
+        self.queues = {name: queue.Queue(pipeline.queue_size) for name in STAGES[1:]}
+        self.abort = threading.Event()
+        self.errors = []
+        self.lock = threading.Lock()
+        self.digest = None
+        self.size = 0
+        self.frames = 0
+
+    def execute(self) -> PublishResult:
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.temp_dir = temp_dir
+            threads = [threading.Thread(target=self._stage, args=(name,), name=f"publish-{name}", daemon=True)
+                       for name in STAGES]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        if self.errors:
+            for path in (self.seed_path, self.frames_path):
+                for leftover in (path, path + ".part"):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+            raise self.errors[0]
+        return PublishResult(self.seed_id, self.seed_path, self.frames_path, self.digest, self.size, self.frames,
+                             time.perf_counter() - start, [self.timings[name] for name in STAGES])
+
+    # Plumbing
+
+    def _stage(self, name: str):
+        timing = self.timings[name]
+        start = time.perf_counter()
+        try:
+            with span(f"publish.{name}"):
+                getattr(self, f"_{name}")(timing)
+        except _Aborted:
+            pass
+        except Exception as e:
+            self.errors.append(e)
+            self.abort.set()
+        finally:
+            with self.lock:
+                timing.busy += time.perf_counter() - start - timing.waiting
+
+    def _put(self, timing: StageTiming, stage: str, item):
+        """Hand an item to `stage`, waiting while its queue is full."""
+        start = time.perf_counter()
+        while True:
+            try:
+                self.queues[stage].put(item, timeout=0.1)
+                break
+            except queue.Full:
+                if self.abort.is_set():
+                    raise _Aborted()
+        timing.waiting += time.perf_counter() - start
+
+    def _items(self, timing: StageTiming, stage: str):
+        """Items handed to `stage` until the previous stage's final None."""
+        while True:
+            start = time.perf_counter()
+            while True:
+                try:
+                    item = self.queues[stage].get(timeout=0.1)
+                    break
+                except queue.Empty:
+                    if self.abort.is_set():
+                        raise _Aborted()
+            timing.waiting += time.perf_counter() - start
+            if item is None:
+                return
+            yield item
+
+    # Stages
+
+    def _render(self, timing: StageTiming):
+        generator = HTMLGenerator()
+        pages = self.lesson.get("pages", {})
+        for member in self.members:
+            if member.kind == "page":
+                member = self._render_page(generator, member, pages.get(member.name, {}))
+                timing.items += 1
+                timing.bytes += len(member.data)
+            self._put(timing, "transcode", member)
+        self._put(timing, "transcode", None)
+
+    def _render_page(self, generator: HTMLGenerator, member: _Member, page: Dict) -> _Member:
+        with open(member.source, encoding="utf-8") as f:
+            text = f.read()
+        if os.path.splitext(member.name)[1].lower() not in (".html", ".htm"):
+            text = "\n".join(f"<p>{html.escape(paragraph.strip())}</p>"
+                             for paragraph in text.split("\n\n") if paragraph.strip())
+        content = generator.create_interactive_page(page.get("title") or _title(member.name), text,
+                                                    page.get("exercises"))
+        return _Member(name=_archive_name(member, True), kind="page", data=content.encode("utf-8"))
+
+    def _transcode(self, timing: StageTiming):
+        pipeline = self.pipeline
+        compressor = None
+        if pipeline.transcode and any(member.kind == "video" for member in self.members):
+            from eduseedbank.compression.video import VideoCompressor
+            compressor = VideoCompressor()
+            if not compressor.ffmpeg_available:
+                print("Warning: FFmpeg is not available, packaging videos without transcoding")
+                compressor = None
+
+        pool = ThreadPoolExecutor(pipeline.transcode_workers, thread_name_prefix="publish-ffmpeg")
+        futures = []
+        try:
+            for index, member in enumerate(self._items(timing, "transcode")):
+                if member.kind == "video" and compressor:
+                    # Futures keep archive order while several videos transcode at once
+                    member = pool.submit(self._transcode_video, compressor, index, member, timing)
+                    futures.append(member)
+                self._put(timing, "package", member)
+            self._put(timing, "package", None)
+        finally:
+            if self.abort.is_set():
+                # Transcodes not started yet are dropped (shutdown's cancel_futures needs Python 3.9)
+                for future in futures:
+                    future.cancel()
+            # The package stage waits for the transcodes still running
+            pool.shutdown(wait=False)
+
+    def _transcode_video(self, compressor, index: int, member: _Member, timing: StageTiming) -> _Member:
+        start = time.perf_counter()
+        name = _archive_name(member, True)
+        output = os.path.join(self.temp_dir, f"{index}.mp4")
+        if not compressor.compress_video(member.source, output, self.pipeline.target_size_mb):
+            raise RuntimeError(f"Could not transcode {member.name}")
+        with self.lock:
+            timing.items += 1
+            timing.bytes += os.path.getsize(output)
+            timing.busy += time.perf_counter() - start
+        return _Member(name=name, kind="video", source=output)
+
+    def _package(self, timing: StageTiming):
+        writer = _BlockWriter(self.seed_path + ".part", lambda block: self._put(timing, "hash", block))
+        try:
+            package = SeedPackage(self.lesson.get("title") or _title(self.seed_id),
+                                  self.lesson.get("description", ""), self.lesson.get("curriculum", ""),
+                                  self.lesson.get("subject", ""))
+            # A writer that cannot seek makes zipfile stream each member, sizes following in a data descriptor
+            with zipfile.ZipFile(writer, "w") as zipf:
+                zipf.writestr("metadata.json", json.dumps(package.metadata, indent=2),
+                              compress_type=zipfile.ZIP_DEFLATED)
+                for member in self._items(timing, "package"):
+                    if isinstance(member, Future):
+                        start = time.perf_counter()
+                        member = member.result()
+                        timing.waiting += time.perf_counter() - start
+                    # Pages compress well; videos and images are compressed already
+                    compress_type = zipfile.ZIP_DEFLATED if member.kind == "page" else zipfile.ZIP_STORED
+                    if member.data is not None:
+                        zipf.writestr(member.name, member.data, compress_type=compress_type)
+                    else:
+                        zipf.write(member.source, member.name, compress_type=compress_type)
+                    timing.items += 1
+            writer.close()
+        finally:
+            writer.file.close()
+        os.replace(self.seed_path + ".part", self.seed_path)
+        timing.bytes = writer.written
+        self._put(timing, "hash", None)
+
+    def _hash(self, timing: StageTiming):
+        digest = hashlib.sha256()
+        for block in self._items(timing, "hash"):
+            digest.update(block)
+            timing.items += 1
+            timing.bytes += len(block)
+            self._put(timing, "frame", block)
+        self.digest = digest.hexdigest()
+        self.size = timing.bytes
+        self._put(timing, "frame", None)
+
+    def _frame(self, timing: StageTiming):
+        chunk_size = self.pipeline.chunk_size
+        spool_path = os.path.join(self.temp_dir, "frames")
+        head, middle, tail = self._frame_template()
+        carry = b""
+        index = 0
+        with open(spool_path, "wb") as spool:
+            for block in self._items(timing, "frame"):
+                data = carry + block
+                end = len(data) - len(data) % chunk_size
+                lines = []
+                for offset in range(0, end, chunk_size):
+                    lines.append(b"%s%d%s%s%s" % (head, index, middle,
+                                                  base64.b64encode(data[offset:offset + chunk_size]), tail))
+                    index += 1
+                spool.write(b"".join(lines))
+                carry = data[end:]
+            if carry or index == 0:
+                spool.write(b"%s%d%s%s%s" % (head, index, middle, base64.b64encode(carry), tail))
+                index += 1
+
+        # The hash stage set the digest before its final None reached this stage
+        pending = _fields(_PENDING)
+        known = _fields({"total": index, "size": self.size, "digest": self.digest})
+        with open(spool_path, "rb") as spool, open(self.frames_path + ".part", "wb") as frames:
+            for number, line in enumerate(spool, 1):
+                line = line.replace(pending, known, 1)
+                if number == index:
+                    line = line.replace(b'"last":false', b'"last":true', 1)
+                frames.write(line)
+        os.replace(self.frames_path + ".part", self.frames_path)
+        self.frames = timing.items = index
+        timing.bytes = os.path.getsize(self.frames_path)
+
+    def _frame_template(self) -> Tuple[bytes, bytes, bytes]:
+        """encode_message() of a frame split around its index and data, which are all that vary."""
+        payload = {"seed_id": self.seed_id, "index": 0, **_PENDING, "chunk_size": self.pipeline.chunk_size,
+                   "encoding": ARCHIVE_ENCODING, "last": False, "data": ""}
+        line = encode_message(Message(MessageType.SEED_CHUNK, self.pipeline.source, BROADCAST, payload, 0))
+        head, rest = line.split(b'"index":0,', 1)
+        middle, tail = rest.split(b'"data":""', 1)
+        return head + b'"index":', b"," + middle + b'"data":"', b'"' + tail + b"\n"
+
+
+class _BlockWriter:
+    """Write-only file for zipfile that also hands the bytes on in BLOCK_SIZE blocks."""
+
+    def __init__(self, path: str, handoff):
+        self.file = open(path, "wb")
+        self.handoff = handoff
+        self.buffer = bytearray()
+        self.written = 0
+
+    def write(self, data) -> int:
+        self.buffer += data
+        if len(self.buffer) >= BLOCK_SIZE:
+            self._flush_block()
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def _flush_block(self):
+        block = bytes(self.buffer)
+        self.buffer.clear()
+        self.file.write(block)
+        self.written += len(block)
+        self.handoff(block)
+
+    def close(self):
+        if self.buffer:
+            self._flush_block()
+        self.file.close()
+
+
+def publish(lesson_dir: str, output: str, seed_id: Optional[str] = None, **options) -> PublishResult:
+    """Publish a lesson folder with a PublishPipeline built from `options`; see PublishPipeline.run()."""
+    return PublishPipeline(**options).run(lesson_dir, output, seed_id)
+
+
+def format_timings(result: PublishResult) -> str:
+    """Per-stage breakdown of a publish, with how much the stages overlapped."""
+    lines = [f"Published {result.seed_id}: {result.size / 1e6:.2f} MB seed, {result.frames} frames "
+             f"in {result.seconds:.2f} s",
+             f"  {'stage':10s} {'items':>7s} {'MB':>9s} {'busy s':>8s} {'waiting s':>10s}"]
+    for stage in result.stages:
+        lines.append(f"  {stage.name:10s} {stage.items:7d} {stage.bytes / 1e6:9.2f} {stage.busy:8.3f} "
+                     f"{stage.waiting:10.3f}")
+    busy = sum(stage.busy for stage in result.stages)
+    lines.append(f"  {busy:.2f} busy seconds in {result.seconds:.2f} s wall "
+                 f"({busy / max(result.seconds, 1e-9):.1f}x overlap)")
+    return "\n".join(lines)
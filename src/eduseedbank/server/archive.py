@@ -0,0 +1,258 @@
+"""
+Read-only access to the members of planted `.seed` archives.
+
+A SeedArchive reads an archive's zip directory once and keeps the byte
+offset of every member's data, so serving a member never extracts the
+archive. Stored members are byte ranges of the file and can go out with
+os.sendfile; deflated members are either inflated on the fly or, for
+clients that accept gzip, sent as-is wrapped in a gzip header and
+trailer built from the zip's CRC and size.
+"""
+
+import hashlib
+import os
+import socket
+import struct
+import zipfile
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Fixed part of a zip local file header; the name and extra field follow it.
+LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+# gzip member header: magic, deflate, no flags, no mtime, no extra flags, unknown OS
+_GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+
+READ_BLOCK = 64 * 1024
+
+
+def _pread(file, size: int, offset: int) -> bytes:
+    """
+    Read `size` bytes at `offset` of an open binary file.
+
+    Uses os.pread where the platform has it (POSIX), leaving the file
+    position alone; elsewhere (Windows) seeks and reads, so `file` must
+    not be shared between threads, as none of the handles here are.
+    """
+    if hasattr(os, "pread"):
+        return os.pread(file.fileno(), size, offset)
+    file.seek(offset)
+    return file.read(size)
+
+
+def member_data_offset(header: bytes, info: zipfile.ZipInfo) -> int:
+    """Offset of a member's raw data, given the LOCAL_HEADER.size bytes at its header_offset."""
+    fields = LOCAL_HEADER.unpack_from(header)
+    if fields[0] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+    name_length, extra_length = fields[9], fields[10]
+    return info.header_offset + LOCAL_HEADER.size + name_length + extra_length
+
+
+@dataclass
+class MemberInfo:
+    """Where one member's data lives inside its archive."""
+    name: str
+    offset: int  # First byte of the member's (possibly compressed) data
+    compressed_size: int
+    size: int
+    compress_type: int
+    crc: int
+
+    @property
+    def stored(self) -> bool:
+        return self.compress_type == zipfile.ZIP_STORED
+
+    @property
+    def deflated(self) -> bool:
+        return self.compress_type == zipfile.ZIP_DEFLATED
+
+
+def content_digest(members: Iterable[MemberInfo]) -> str:
+    """
+    Digest of what an archive holds: the name, size, CRC and compression of each member.
+
+    Two archives with the same digest serve the same content, whatever
+    order their members were written in.
+    """
+    digest = hashlib.sha1()
+    for member in sorted(members, key=lambda m: m.name):
+        line = f"{member.name}\0{member.size}\0{member.crc:08x}\0{member.compress_type}\n"
+        digest.update(line.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ArchiveStream:
+    """
+    Response body made of literal bytes and byte ranges of an archive file.
+
+    Servers that know about it call sendfile() to push the file ranges with
+    os.sendfile; everything else reads it like a file.
+    """
+
+    def __init__(self, path: str, parts: List[Union[bytes, Tuple[int, int]]]):
+        self.path = path
+        self.parts = parts  # bytes, or (offset, length) of the archive file
+        self.length = sum(len(p) if isinstance(p, bytes) else p[1] for p in parts)
+        self._file = open(path, "rb")
+        self._part = 0
+        self._position = 0  # Within the current part
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = []
+        remaining = self.length if size is None or size < 0 else size
+        while remaining > 0 and self._part < len(self.parts):
+            part = self.parts[self._part]
+            if isinstance(part, bytes):
+                data = part[self._position:self._position + remaining]
+            else:
+                offset, length = part
+                data = _pread(self._file, min(remaining, length - self._position), offset + self._position)
+            if not data:
+                break
+            chunks.append(data)
+            remaining -= len(data)
+            self._position += len(data)
+            part_length = len(part) if isinstance(part, bytes) else part[1]
+            if self._position >= part_length:
+                self._part += 1
+                self._position = 0
+        return b"".join(chunks)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            data = self.read(READ_BLOCK)
+            if not data:
+                return
+            yield data
+
+    def sendfile(self, sock: socket.socket) -> int:
+        """Write the whole body to `sock`, file ranges without copying through Python."""
+        sent = 0
+        for part in self.parts:
+            if isinstance(part, bytes):
+                sock.sendall(part)
+                sent += len(part)
+            else:
+                offset, length = part
+                sent += sock.sendfile(self._file, offset, length)
+        return sent
+
+    def close(self):
+        self._file.close()
+
+
+class InflatingStream:
+    """Decompresses a deflated member as it is read, optionally skipping a prefix."""
+
+    def __init__(self, path: str, member: MemberInfo, start: int = 0, length: Optional[int] = None):
+        self._file = open(path, "rb")
+        self._offset = member.offset
+        self._end = member.offset + member.compressed_size
+        self._inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+        self._skip = start
+        self._remaining = member.size - start if length is None else length
+        self.length = self._remaining
+
+    def __iter__(self) -> Iterator[bytes]:
+        while self._remaining > 0:
+            if self._offset < self._end:
+                raw = _pread(self._file, min(READ_BLOCK, self._end - self._offset), self._offset)
+                self._offset += len(raw)
+                data = self._inflater.decompress(raw)
+            else:
+                data = self._inflater.flush()
+                if not data:
+                    return
+            if self._skip:
+                skipped = min(self._skip, len(data))
+                data = data[skipped:]
+                self._skip -= skipped
+            data = data[:self._remaining]
+            self._remaining -= len(data)
+            if data:
+                yield data
+
+    def close(self):
+        self._file.close()
+
+
+class SeedArchive:
+    """Member index of one `.seed` archive."""
+
+    def __init__(self, path: str, members: Optional[Dict[str, MemberInfo]] = None, version: int = 1):
+        self.path = path
+        self.version = version  # Bumped each time the seed is replanted
+        stat = os.stat(path)
+        self.mtime = stat.st_mtime
+        self.size = stat.st_size
+        self.members = members if members is not None else self._index()
+        self._digest = None
+
+    @property
+    def digest(self) -> str:
+        """content_digest() of the archive's members."""
+        if self._digest is None:
+            self._digest = content_digest(self.members.values())
+        return self._digest
+
+    def _index(self) -> Dict[str, MemberInfo]:
+        members = {}
+        with open(self.path, "rb") as f:
+            with zipfile.ZipFile(f) as zipf:
+                infos = [info for info in zipf.infolist() if not info.is_dir()]
+            for info in infos:
+                header = _pread(f, LOCAL_HEADER.size, info.header_offset)
+                try:
+                    offset = member_data_offset(header, info)
+                except struct.error:
+                    raise zipfile.BadZipFile(f"Truncated local header for {info.filename} in {self.path}")
+                members[info.filename] = MemberInfo(
+                    name=info.filename,
+                    offset=offset,
+                    compressed_size=info.compress_size,
+                    size=info.file_size,
+                    compress_type=info.compress_type,
+                    crc=info.CRC
+                )
+        return members
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.members
+
+    def read(self, name: str) -> bytes:
+        """Whole decoded member; meant for small members such as metadata.json."""
+        member = self.members[name]
+        if member.stored:
+            with open(self.path, "rb") as f:
+                return _pread(f, member.size, member.offset)
+        stream = self.open(name)
+        try:
+            return b"".join(stream)
+        finally:
+            stream.close()
+
+    def open(self, name: str, start: int = 0, length: Optional[int] = None):
+        """
+        Body for the decoded bytes of a member, or a range of them.
+
+        Stored members come back as a sendfile-capable ArchiveStream.
+        """
+        member = self.members[name]
+        length = member.size - start if length is None else length
+        if member.stored:
+            return ArchiveStream(self.path, [(member.offset + start, length)])
+        if member.deflated:
+            return InflatingStream(self.path, member, start, length)
+        raise ValueError(f"Unsupported compression for {name} in {self.path}")
+
+    def open_gzip(self, name: str) -> ArchiveStream:
+        """A deflated member as a gzip body, without recompressing it."""
+        member = self.members[name]
+        if not member.deflated:
+            raise ValueError(f"{name} is not deflated")
+        trailer = struct.pack("<II", member.crc, member.size & 0xFFFFFFFF)
+        return ArchiveStream(self.path, [_GZIP_HEADER, (member.offset, member.compressed_size), trailer])
@@ -5,27 +5,50 @@ Serves content to school devices and manages user accounts.
 
 import os
 import json
-from flask import Flask, render_template, send_file, request, jsonify
-from typing import Dict, List
+import hashlib
+import html
+import mimetypes
+import shutil
+import tempfile
+import uuid
+import zipfile
+from dataclasses import asdict
+from email.utils import formatdate
+from urllib.parse import quote, unquote
 
+from flask import Flask, render_template, send_file, request, jsonify, abort, Response
+from typing import Dict, List, Optional
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.wsgi import wrap_file
 
-class LocalServer:
-    """Local server for EduSeedbank that serves educational content."""
+from eduseedbank.profiling import traced
 
-    def __init__(self, content_dir: str = "content", host: str = "127.0.0.1", port: int = 8080):
-        self.content_dir = content_dir
-        self.host = host
-        self.port = port
-        self.app = Flask(__name__)
-        self.seeds = {}  # In-memory storage of planted seeds
-        self._setup_routes()
-        
-    def _setup_routes(self):
-        """Set up Flask routes for the server."""
-        
-        @self.app.route("/")
-        def home():
-            return """
+from .archive import SeedArchive
+from .metrics import MetricsRegistry, RequestMetrics
+from .offline import precache_manifest, revision, service_worker
+from .peer_sync import PeerSync
+from .planting import PlantingPool
+from .progress import ProgressTracker, parse_event
+from .registry import SeedRegistry
+from .response_cache import ResponseCache
+from .search import SearchIndex
+from .wsgi import WSGIServer
+
+SEED_EXTENSION = ".seed"
+METADATA_MEMBER = "metadata.json"
+UPLOAD_DIR = ".uploads"
+REGISTRY_FILE = "registry.db"
+UPLOAD_CHUNK = 256 * 1024
+DEFAULT_SEARCH_RESULTS = 20
+MAX_SEARCH_RESULTS = 100
+LISTING_PARAMS = ("limit", "offset", "subject", "curriculum", "q")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+MAX_EVENTS_PER_POST = 1000
+LISTINGS = "listings"  # Response cache group of everything built from the seed list
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+HOME_PAGE = """
             <!DOCTYPE html>
             <html>
             <head>
@@ -48,22 +71,180 @@ class LocalServer:
                 
                 <h2>Bibit yang Ditanam:</h2>
                 <div id="seeds-list">
-                    <!-- Seeds will be listed here -->
+                    <!-- seeds -->
                 </div>
-                
-                <script>
-                    // In a real implementation, this would fetch from the server
-                    document.getElementById('seeds-list').innerHTML = '<p>Belum ada bibit yang ditanam.</p>';
-                </script>
             </body>
             </html>
             """
-            
+
+
+def _bounded_int(value: Optional[str], default: int, maximum: Optional[int] = None) -> int:
+    """
+    Read a limit or offset query parameter.
+
+    Values that are not integers fall back to `default`; the rest are
+    clamped to [0, maximum], so a negative limit is an empty page rather
+    than, as SQLite reads a negative LIMIT, no limit at all.
+    """
+    try:
+        number = int(value) if value is not None else default
+    except ValueError:
+        number = default
+    number = max(number, 0)
+    return number if maximum is None else min(number, maximum)
+
+
+class LocalServer:
+    """Local server for EduSeedbank that serves educational content."""
+
+    def __init__(self, content_dir: str = "content", host: str = "127.0.0.1", port: int = 8080,
+                 upload_workers: int = 2, max_upload_bytes: Optional[int] = None,
+                 registry_path: Optional[str] = None, response_cache_bytes: int = 64 * 1024 * 1024,
+                 metrics: bool = True):
+        self.content_dir = content_dir
+        self.host = host
+        self.port = port
+        self.max_upload_bytes = max_upload_bytes
+        self.app = Flask(__name__)
+        os.makedirs(content_dir, exist_ok=True)
+        registry_path = registry_path or os.path.join(content_dir, REGISTRY_FILE)
+        new_registry = not os.path.exists(registry_path)
+        self.registry = SeedRegistry(registry_path)
+        self.seeds = self.registry.seeds()  # seed_id -> metadata of every planted seed
+        self.archives = {}  # seed_id -> SeedArchive, indexed on first use
+        self.responses = ResponseCache(response_cache_bytes)
+        self._generation = 0  # Bumped whenever self.seeds changes; part of listing cache keys
+        self.server_id = uuid.uuid4().hex  # Tells this server apart from its peers on the LAN
+        self.peer_sync = None
+        self.search = SearchIndex(self.registry.engine)
+        self.progress = ProgressTracker(self.registry.engine)
+        self.metrics = MetricsRegistry()
+        self.planting = PlantingPool(self, workers=upload_workers, registry=self.registry,
+                                     metrics=self.metrics)
+        # Uploads interrupted by a restart have no job left to finish them
+        shutil.rmtree(os.path.join(content_dir, UPLOAD_DIR), ignore_errors=True)
+        if new_registry:
+            self._import_archives()
+        else:
+            # Seeds planted before search existed, or whose indexing a restart cut short
+            for seed_id in self.search.unindexed():
+                self.search.submit(seed_id, self.seeds.get(seed_id, {}), self._open_archive(seed_id))
+        self._setup_routes()
+        self._setup_metrics(metrics)
+        self.app.wsgi_app = traced("server.request")(self.app.wsgi_app)
+
+    def _setup_metrics(self, instrument_requests: bool):
+        """Register /metrics and the scrape-time views of the server's state."""
+        if instrument_requests:
+            self.app.wsgi_app = RequestMetrics(self.app.wsgi_app, self.metrics)
+
+            @self.app.before_request
+            def label_route():
+                rule = request.url_rule
+                request.environ[RequestMetrics.ROUTE_KEY] = rule.rule if rule else "<unmatched>"
+
+        m, cache = self.metrics, self.responses
+        m.callback("eduseedbank_response_cache_hits_total", "Response cache hits", "counter",
+                   lambda: {(): cache.hits})
+        m.callback("eduseedbank_response_cache_misses_total", "Response cache misses", "counter",
+                   lambda: {(): cache.misses})
+        m.callback("eduseedbank_response_cache_evictions_total", "Response cache evictions", "counter",
+                   lambda: {(): cache.evictions})
+        m.callback("eduseedbank_response_cache_bytes", "Bytes held by the response cache", "gauge",
+                   lambda: {(): cache.used_bytes})
+        m.callback("eduseedbank_registry_seeds", "Planted seeds", "gauge", lambda: {(): len(self.seeds)})
+        m.callback("eduseedbank_registry_archives_open", "Archives whose member index is loaded", "gauge",
+                   lambda: {(): len(self.archives)})
+        m.callback("eduseedbank_registry_database_bytes", "Size of the registry database and its WAL",
+                   "gauge", lambda: {(): self._registry_bytes()})
+        m.callback("eduseedbank_progress_events_recorded_total", "Progress events accepted", "counter",
+                   lambda: {(): self.progress.recorded})
+        m.callback("eduseedbank_progress_events_written_total", "Progress events written to disk", "counter",
+                   lambda: {(): self.progress.written})
+        m.callback("eduseedbank_progress_events_pending", "Progress events waiting to be written", "gauge",
+                   lambda: {(): self.progress.pending})
+
+        @self.app.route("/metrics")
+        def metrics():
+            """Server metrics in the Prometheus text exposition format."""
+            return Response(self.metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+    def _registry_bytes(self) -> int:
+        size = 0
+        for path in (self.registry.path, self.registry.path + "-wal"):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def _setup_routes(self):
+        """Set up Flask routes for the server."""
+        
+        @self.app.route("/")
+        def home():
+            return self._cached_listing(("home",), self._render_home, "text/html")
+
         @self.app.route("/api/seeds")
         def list_seeds():
-            """API endpoint to list all planted seeds."""
-            return jsonify(list(self.seeds.keys()))
-            
+            """
+            API endpoint to list planted seeds.
+
+            Without query parameters this is the list of seed IDs. With any of
+            limit, offset, subject, curriculum or q (matched against seed ID and
+            title) it is a page of {"seed_id", "title", "subject", "curriculum"}
+            entries with the total number of matches.
+            """
+            params = {name: request.args[name] for name in LISTING_PARAMS if name in request.args}
+            if not params:
+                return self._cached_listing(("ids",), lambda: json.dumps(list(self.seeds.keys())))
+            limit = _bounded_int(params.get("limit"), DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+            offset = _bounded_int(params.get("offset"), 0)
+            key = ("page", tuple(sorted(params.items())))
+            return self._cached_listing(key, lambda: json.dumps(self._seed_page(params, limit, offset)))
+
+        @self.app.route("/api/progress", methods=["POST"])
+        def record_progress():
+            """
+            API endpoint recording page views and quiz attempts from lesson pages.
+
+            Takes one event or {"events": [...]}, each with student_id, seed_id,
+            kind ("view" or "attempt") and optionally page, exercise, answer,
+            correct and at. Events are written in batches shortly afterwards.
+            """
+            # Pages send with navigator.sendBeacon, which cannot set a JSON content type
+            data = request.get_json(force=True, silent=True)
+            raw = data.get("events") if isinstance(data, dict) and "events" in data else [data]
+            if not isinstance(raw, list) or not raw or len(raw) > MAX_EVENTS_PER_POST:
+                return jsonify({"error": f"Send 1 to {MAX_EVENTS_PER_POST} events"}), 400
+            try:
+                events = [parse_event(event) for event in raw]
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            self.progress.record_many(events)
+            return jsonify({"accepted": len(events)}), 202
+
+        @self.app.route("/api/progress/students/<student_id>")
+        def student_progress(student_id):
+            """API endpoint summarising one student's progress per lesson."""
+            summary = self.progress.student_summary(student_id)
+            if summary is None:
+                return jsonify({"error": "Student not found"}), 404
+            return jsonify(summary)
+
+        @self.app.route("/api/progress/lessons/<seed_id>")
+        def lesson_progress(seed_id):
+            """API endpoint summarising how students did on one lesson."""
+            summary = self.progress.lesson_summary(seed_id)
+            if summary is None:
+                return jsonify({"error": "No progress recorded for this lesson"}), 404
+            return jsonify(summary)
+
+        @self.app.route("/api/cache")
+        def cache_stats():
+            """API endpoint reporting the response cache's size and hit ratio."""
+            return jsonify(self.responses.stats())
+
         @self.app.route("/api/seeds/<seed_id>")
         def get_seed(seed_id):
             """API endpoint to get information about a specific seed."""
@@ -72,6 +253,18 @@ class LocalServer:
             else:
                 return jsonify({"error": "Seed not found"}), 404
                 
+        @self.app.route("/api/search")
+        def search():
+            """
+            API endpoint ranking planted seeds against a free-text query.
+
+            Query parameters: q (the search text), limit (default 20) and offset.
+            """
+            limit = _bounded_int(request.args.get("limit"), DEFAULT_SEARCH_RESULTS, MAX_SEARCH_RESULTS)
+            offset = _bounded_int(request.args.get("offset"), 0)
+            query = request.args.get("q", "")
+            return jsonify({"query": query, "results": self.search.search(query, limit, offset)})
+
         @self.app.route("/api/plant", methods=["POST"])
         def plant_seed():
             """API endpoint to plant a new seed."""
@@ -81,21 +274,420 @@ class LocalServer:
             seed_id = data.get("seed_id", "unknown")
             seed_data = data.get("seed_data", {})
             
-            self.seeds[seed_id] = seed_data
+            self.plant_seed(seed_id, seed_data)
             return jsonify({"status": "success", "message": f"Seed {seed_id} planted successfully"})
             
-        @self.app.route("/content/<path:filename>")
-        def serve_content(filename):
-            """Serve educational content files."""
-            # In a real implementation, this would securely serve content
-            # from the content directory
-            return f"Content file: {filename}"
+        @self.app.route("/api/seeds/<seed_id>/archive", methods=["PUT"])
+        def upload_seed(seed_id):
+            """
+            Stream an uploaded .seed archive to disk and plant it in the background.
+
+            Returns 202 with a job whose progress is at /api/jobs/<job_id>. An
+            optional X-Seed-SHA256 header is checked against the received bytes.
+            """
+            try:
+                path, size, sha256 = self._receive_upload()
+            except RequestEntityTooLarge as e:
+                return jsonify({"error": e.description}), 413
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            job = self.planting.submit(seed_id, path, size, sha256,
+                                       request.headers.get("X-Seed-SHA256"))
+            return jsonify(job.to_dict()), 202, {"Location": f"/api/jobs/{job.job_id}"}
+
+        @self.app.route("/api/jobs/<job_id>")
+        def job_status(job_id):
+            """API endpoint reporting the state of a planting job."""
+            job = self.planting.get(job_id)
+            if job is None:
+                return jsonify({"error": "Job not found"}), 404
+            return jsonify(job.to_dict())
+
+        @self.app.route("/api/sync/inventory")
+        def sync_inventory():
+            """
+            API endpoint listing planted archives for peer servers to compare with theirs.
+
+            Each seed has its archive size, planting time and content digest.
+            """
+            return self._cached_listing(("sync",), lambda: json.dumps(
+                {"server_id": self.server_id, "seeds": self.registry.inventory()}))
+
+        @self.app.route("/api/sync/seeds/<seed_id>/manifest")
+        def sync_manifest(seed_id):
+            """API endpoint giving the member index of a seed's archive file, for delta pulls."""
+            archive = self.get_archive(seed_id)
+            if archive is None:
+                return jsonify({"error": "Seed not found"}), 404
+            return jsonify({"seed_id": seed_id, "digest": archive.digest, "size": archive.size,
+                            "members": [asdict(member) for member in archive.members.values()]})
+
+        @self.app.route("/api/sync/seeds/<seed_id>/archive")
+        def sync_archive(seed_id):
+            """The raw archive file of a seed, with range requests validated by its digest."""
+            archive = self.get_archive(seed_id)
+            if archive is None:
+                abort(404)
+            return send_file(archive.path, mimetype="application/zip", conditional=True, etag=archive.digest)
+
+        @self.app.route("/api/sync")
+        def sync_status():
+            """API endpoint reporting discovered peers and what was pulled from them."""
+            if self.peer_sync is None:
+                return jsonify({"server_id": self.server_id, "enabled": False})
+            return jsonify(dict(self.peer_sync.status(), enabled=True))
+
+        @self.app.route("/content/<seed_id>/<path:member>")
+        def serve_content(seed_id, member):
+            """Serve a member of a planted seed archive without extracting it."""
+            archive = self.get_archive(seed_id)
+            if archive is None or member not in archive.members:
+                abort(404)
+            return self._member_response(seed_id, archive, member)
+
+        @self.app.route("/offline/<seed_id>/precache.json")
+        def offline_manifest(seed_id):
+            """Members of a planted seed a tablet should cache, with their revisions."""
+            return self._offline_response(seed_id, "manifest")
+
+        @self.app.route("/offline/<seed_id>/sw.js")
+        def offline_worker(seed_id):
+            """Service worker keeping a planted seed on the tablet; lesson pages register it."""
+            return self._offline_response(seed_id, "worker")
+
+    def _receive_upload(self):
+        """
+        Copy the request body to a temporary file in fixed-size chunks.
+
+        Returns (path, size, sha256 hex digest). Raises RequestEntityTooLarge
+        past max_upload_bytes and ValueError for bodies shorter than their
+        Content-Length.
+        """
+        upload_dir = os.path.join(self.content_dir, UPLOAD_DIR)
+        os.makedirs(upload_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix=".upload", dir=upload_dir)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while True:
+                    chunk = request.stream.read(UPLOAD_CHUNK)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if self.max_upload_bytes and size > self.max_upload_bytes:
+                        raise RequestEntityTooLarge(f"Upload exceeds the {self.max_upload_bytes} byte limit")
+                    digest.update(chunk)
+                    f.write(chunk)
+            if request.content_length is not None and size != request.content_length:
+                raise ValueError(f"Upload truncated: got {size} of {request.content_length} bytes")
+        except BaseException:
+            os.remove(path)
+            raise
+        return path, size, digest.hexdigest()
+
+    def _render_home(self) -> str:
+        if not self.seeds:
+            items = "<p>Belum ada bibit yang ditanam.</p>"
+        else:
+            items = "\n".join(
+                f'<div class="seed"><strong>{html.escape(str(data.get("title", seed_id)))}</strong> '
+                f'({html.escape(seed_id)})</div>'
+                for seed_id, data in sorted(self.seeds.items()))
+        return HOME_PAGE.replace("<!-- seeds -->", items)
+
+    def _seed_page(self, params: Dict, limit: int, offset: int) -> Dict:
+        """A filtered page of /api/seeds entries."""
+        subject = params.get("subject", "").lower()
+        curriculum = params.get("curriculum", "").lower()
+        text = params.get("q", "").lower()
+        matches = []
+        for seed_id, data in sorted(self.seeds.items()):
+            if subject and str(data.get("subject", "")).lower() != subject:
+                continue
+            if curriculum and str(data.get("curriculum", "")).lower() != curriculum:
+                continue
+            if text and text not in seed_id.lower() and text not in str(data.get("title", "")).lower():
+                continue
+            matches.append(seed_id)
+        seeds = [{"seed_id": seed_id, "title": self.seeds[seed_id].get("title"),
+                  "subject": self.seeds[seed_id].get("subject"),
+                  "curriculum": self.seeds[seed_id].get("curriculum")}
+                 for seed_id in matches[offset:offset + limit]]
+        return {"seeds": seeds, "total": len(matches), "offset": offset, "limit": limit}
+
+    def _cached_listing(self, key, render, mimetype: str = "application/json") -> Response:
+        """
+        Response for a page built from the seed list, rendered once per change.
+
+        `render` returns the page text; it is cached with an ETag until the
+        next seed is planted, and clients holding that ETag get a 304.
+        """
+        def build():
+            body = render().encode("utf-8")
+            return (body, hashlib.sha1(body).hexdigest()[:16]), len(body)
+
+        generation = self._generation
+        body, etag = self.responses.get_or_build(LISTINGS, (generation,) + key, build)
+        headers = {"ETag": f'"{etag}"'}
+        if request.if_none_match.contains_weak(etag):
+            return Response(status=304, headers=headers)
+        return Response(body, headers=headers, mimetype=mimetype)
+
+    def _seeds_changed(self, seed_id: str):
+        self._generation += 1
+        self.responses.invalidate(seed_id)
+        self.responses.invalidate(LISTINGS)
+        if self.peer_sync:
+            self.peer_sync.notify_changed()
+
+    def _offline_response(self, seed_id: str, kind: str) -> Response:
+        """
+        The precache manifest ("manifest") or service worker ("worker") of a seed.
+
+        Both are built once per planted version and revalidated on every
+        use, so a replanted seed reaches tablets on their next visit.
+        """
+        archive = self.get_archive(seed_id)
+        if archive is None:
+            abort(404)
+
+        def build():
+            manifest = precache_manifest(seed_id, archive)
+            bodies = {"manifest": json.dumps(manifest).encode("utf-8"),
+                      "worker": service_worker(manifest).encode("utf-8")}
+            return (bodies, manifest), sum(len(body) for body in bodies.values())
+
+        bodies, manifest = self.responses.get_or_build(seed_id, ("offline", archive.version), build)
+        etag = f"{manifest['version']}-{kind}"
+        headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+        if kind == "worker":
+            # The worker lives under /offline/ but controls the seed's /content/ pages
+            headers["Service-Worker-Allowed"] = manifest["scope"]
+        if request.if_none_match.contains_weak(etag):
+            return Response(status=304, headers=headers)
+        mimetype = "text/javascript" if kind == "worker" else "application/json"
+        return Response(bodies[kind], headers=headers, mimetype=mimetype)
+
+    def _member_response(self, seed_id: str, archive: SeedArchive, name: str) -> Response:
+        """
+        Build the response for one archive member.
+
+        Clients that accept gzip get a precompressed copy as-is: either a
+        `<member>.gz` stored next to the member or the member's own deflate
+        stream. Range requests are answered from the uncompressed bytes;
+        deflated members small enough for the response cache are inflated
+        once and served from memory after that. A `v` query parameter
+        naming the member's current revision, as precache manifests do,
+        makes the response cacheable forever.
+        """
+        member = archive.members[name]
+        last_modified = int(archive.mtime)
+        gzipped = archive.members.get(name + ".gz")
+        use_gzip = (request.range is None and request.accept_encodings["gzip"] > 0
+                    and (gzipped is not None or member.deflated))
+
+        if use_gzip and gzipped is not None:
+            etag = f"{gzipped.crc:08x}-{gzipped.size:x}-gz"
+        elif use_gzip:
+            etag = f"{member.crc:08x}-{member.size:x}-gz"
+        else:
+            etag = f"{member.crc:08x}-{member.size:x}"
+
+        headers = {
+            "ETag": f'"{etag}"',
+            "Last-Modified": formatdate(last_modified, usegmt=True),
+            "Vary": "Accept-Encoding",
+            "Accept-Ranges": "bytes",
+        }
+        if "v" in request.args:
+            # A revisioned URL never changes content; a stale revision gets today's, uncached
+            headers["Cache-Control"] = IMMUTABLE if request.args["v"] == revision(member) else "no-cache"
+        mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains_weak(etag)
+        else:
+            since = request.if_modified_since
+            not_modified = since is not None and last_modified <= since.timestamp()
+        if not_modified:
+            return Response(status=304, headers=headers)
+
+        status = 200
+        start, length = 0, member.size
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            if gzipped is not None:
+                body = archive.open(name + ".gz")
+            else:
+                body = archive.open_gzip(name)
+            length = body.length
+        else:
+            byte_range = request.range
+            if_range = request.if_range
+            if byte_range is not None and (if_range.etag or if_range.date) and not (
+                    if_range.etag == etag or
+                    if_range.date and if_range.date.timestamp() >= last_modified):
+                byte_range = None  # The client's copy is stale; send the whole member
+            if byte_range is not None:
+                bounds = byte_range.range_for_length(member.size)
+                if bounds is None:
+                    headers["Content-Range"] = f"bytes */{member.size}"
+                    return Response(status=416, headers=headers)
+                start, stop = bounds
+                length = stop - start
+                status = 206
+                headers["Content-Range"] = f"bytes {start}-{stop - 1}/{member.size}"
+            if member.deflated and member.size <= self.responses.max_entry_bytes:
+                data = self.responses.get_or_build(seed_id, ("member", archive.version, name),
+                                                   lambda: (archive.read(name), member.size))
+                body = data[start:start + length]
+            else:
+                body = archive.open(name, start, length)
+
+        if hasattr(body, "read"):
+            # Lets a server with a sendfile-capable file wrapper skip the copy
+            body = wrap_file(request.environ, body)
+        response = Response(body, status=status, headers=headers, mimetype=mimetype,
+                            direct_passthrough=True)
+        response.content_length = length
+        return response
 
     def plant_seed(self, seed_id: str, seed_data: Dict):
         """Plant a seed in the local server."""
+        self.registry.put(seed_id, seed_data)
+        self.archives.pop(seed_id, None)
         self.seeds[seed_id] = seed_data
+        self._seeds_changed(seed_id)
+        self.search.submit(seed_id, seed_data)
         print(f"Planted seed: {seed_id}")
+
+    def get_archive(self, seed_id: str) -> Optional[SeedArchive]:
+        """
+        The planted archive of a seed, or None for unknown or JSON-only seeds.
+
+        Member indexes come from the registry the first time a seed is
+        used; an archive changed on disk since it was indexed is re-indexed.
+        """
+        archive = self.archives.get(seed_id)
+        if archive is None:
+            archive = self._open_archive(seed_id)
+            if archive is not None:
+                self.archives[seed_id] = archive
+        return archive
+
+    def _open_archive(self, seed_id: str) -> Optional[SeedArchive]:
+        """Open a seed's archive with its member index from the registry, bypassing self.archives."""
+        row = self.registry.seed(seed_id)
+        if not row or not row["path"]:
+            return None
+        path = os.path.join(self.content_dir, row["path"])
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if stat.st_size != row["size"] or stat.st_mtime != row["mtime"]:
+            self._register_archive(seed_id, path)
+            return self.archives[seed_id]
+        return SeedArchive(path, self.registry.members(seed_id), row["version"])
+
+    @traced("server.plant_archive")
+    def plant_archive(self, path: str, seed_id: Optional[str] = None, move: bool = False,
+                      planted_at: Optional[float] = None) -> str:
+        """
+        Plant a `.seed` archive so its members are served under /content/<seed_id>/.
+
+        The archive is copied into the content directory; replanting a seed
+        replaces the previous archive atomically.
+
+        Args:
+            path: Path to the .seed file
+            seed_id: Identifier to plant it under (default: the file name)
+            move: Move the file into place instead of copying it
+            planted_at: When the seed was first planted, for seeds copied from a peer
+
+        Returns:
+            The seed_id it was planted under
+        """
+        if seed_id is None:
+            seed_id = os.path.basename(path)
+            if seed_id.endswith(SEED_EXTENSION):
+                seed_id = seed_id[:-len(SEED_EXTENSION)]
+        os.makedirs(self.content_dir, exist_ok=True)
+        destination = os.path.join(self.content_dir, quote(seed_id, safe="") + SEED_EXTENSION)
+        if move:
+            os.replace(path, destination)
+        elif os.path.abspath(path) != os.path.abspath(destination):
+            tmp_path = destination + ".tmp"
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, destination)
+        self._register_archive(seed_id, destination, planted_at)
+        print(f"Planted seed: {seed_id}")
+        return seed_id
+
+    def _register_archive(self, seed_id: str, path: str, planted_at: Optional[float] = None):
+        archive = SeedArchive(path)
+        metadata = {}
+        if METADATA_MEMBER in archive.members:
+            metadata = json.loads(archive.read(METADATA_MEMBER))
+        archive.version = self.registry.put(seed_id, metadata, os.path.basename(path), archive.size,
+                                            archive.mtime, archive.members.values(), planted_at)
+        self.archives[seed_id] = archive
+        self.seeds[seed_id] = metadata
+        self._seeds_changed(seed_id)
+        self.search.submit(seed_id, metadata, archive)
+
+    def _import_archives(self):
+        """Register archives planted before the content directory had a registry."""
+        for name in sorted(os.listdir(self.content_dir)):
+            if not name.endswith(SEED_EXTENSION):
+                continue
+            path = os.path.join(self.content_dir, name)
+            try:
+                self._register_archive(unquote(name[:-len(SEED_EXTENSION)]), path)
+            except (zipfile.BadZipFile, ValueError, OSError) as e:
+                print(f"Skipping unreadable seed file {path}: {e}")
         
-    def run(self, debug: bool = False):
-        """Start the local server."""
-        self.app.run(host=self.host, port=self.port, debug=debug)
\ No newline at end of file
+    def start_peer_sync(self, http_port: Optional[int] = None, **options) -> PeerSync:
+        """
+        Find other servers on the LAN and keep this server's seeds in step with theirs.
+
+        Args:
+            http_port: Port announced to peers (default: self.port)
+            **options: Passed on to PeerSync, e.g. broadcast_address or workers
+        """
+        self.peer_sync = PeerSync(self, os.path.join(self.content_dir, UPLOAD_DIR), http_port or self.port,
+                                  metrics=self.metrics, **options)
+        self.peer_sync.start()
+        return self.peer_sync
+
+    def run(self, debug: bool = False, workers: int = 0, peer_sync: bool = False):
+        """
+        Start the local server.
+
+        Args:
+            debug: Run Flask's development server in debug mode
+            workers: Serve with the threaded keep-alive WSGIServer using this
+                many worker threads; 0 uses Flask's development server
+            peer_sync: Discover servers on the LAN and pull seeds from them
+        """
+        try:
+            if peer_sync:
+                self.start_peer_sync()
+            if workers <= 0:
+                self.app.run(host=self.host, port=self.port, debug=debug)
+            else:
+                WSGIServer(self.app, self.host, self.port, workers=workers).serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        """Write out buffered progress and stop the background workers."""
+        if self.peer_sync:
+            self.peer_sync.close()
+        self.progress.close()
+        self.planting.shutdown()
+        self.search.shutdown()
+        self.registry.close()
\ No newline at end of file
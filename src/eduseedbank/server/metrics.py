@@ -0,0 +1,265 @@
+"""
+Prometheus text-format metrics for the local server.
+
+Counters and histograms are sharded per thread: a request thread only
+ever updates its own dictionaries, so recording takes no lock and no two
+threads write the same value. A scrape sums the shards, folding those of
+threads that have exited into a shared total so servers that start a
+thread per request do not accumulate them. Values that already live
+elsewhere (cache statistics, registry size) are read by callbacks when
+/metrics is scraped rather than tracked twice.
+"""
+
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Sequence, Tuple
+
+# Seconds; spans a cached API response to a slow range over a weak Wi-Fi link
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FOLD_EVERY = 256  # New shards between sweeps for exited threads
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Shards:
+    """One dictionary per thread, plus the folded totals of exited threads."""
+
+    def __init__(self, merge: Callable[[Dict, Dict], None]):
+        self._merge = merge
+        self._local = threading.local()
+        self._live = []  # (weakref to thread, dict)
+        self._retired = {}
+        self._lock = threading.Lock()
+        self._since_fold = 0
+
+    def mine(self) -> Dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._lock:
+                self._live.append((weakref.ref(threading.current_thread()), values))
+                self._since_fold += 1
+                if self._since_fold >= FOLD_EVERY:
+                    self._fold()
+            return values
+
+    def _fold(self):
+        """Merge the shards of exited threads into _retired (caller holds the lock)."""
+        live = []
+        for thread_ref, values in self._live:
+            thread = thread_ref()
+            if thread is None or not thread.is_alive():
+                self._merge(self._retired, values)
+            else:
+                live.append((thread_ref, values))
+        self._live = live
+        self._since_fold = 0
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            self._fold()
+            total = {}
+            self._merge(total, self._retired)
+            for _, values in self._live:
+                # A shard's dict can grow while its thread records; copy before iterating
+                self._merge(total, dict(values))
+        return total
+
+
+def _merge_numbers(total: Dict, values: Dict):
+    for key, value in values.items():
+        total[key] = total.get(key, 0) + value
+
+
+def _merge_histograms(total: Dict, values: Dict):
+    for key, (counts, value_sum) in values.items():
+        if key in total:
+            old_counts, old_sum = total[key]
+            total[key] = ([a + b for a, b in zip(old_counts, counts)], old_sum + value_sum)
+        else:
+            total[key] = (list(counts), value_sum)
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._shards = _Shards(_merge_numbers)
+
+    def inc(self, *label_values: str, amount: float = 1):
+        values = self._shards.mine()
+        values[label_values] = values.get(label_values, 0) + amount
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        for key, value in sorted(self._shards.snapshot().items()):
+            yield self.name, _format_labels(self.labels, key), value
+
+
+class Gauge(Counter):
+    """Value that goes up and down; inc() and dec() from any thread add up correctly."""
+
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram:
+    """Bucketed distribution of observed values, e.g. request latencies."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _Shards(_merge_histograms)
+
+    def observe(self, value: float, *label_values: str):
+        values = self._shards.mine()
+        entry = values.get(label_values)
+        if entry is None:
+            entry = values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        # Counts are per bucket here and made cumulative when rendered
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        bucket_labels = self.labels + ("le",)
+        for key, (counts, value_sum) in sorted(self._shards.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield self.name + "_bucket", _format_labels(bucket_labels, key + (_format_value(bound),)), cumulative
+            yield self.name + "_sum", _format_labels(self.labels, key), value_sum
+            yield self.name + "_count", _format_labels(self.labels, key), cumulative
+
+
+class CallbackMetric:
+    """Metric whose samples are computed at scrape time from state kept elsewhere."""
+
+    def __init__(self, name: str, help_text: str, kind: str,
+                 collect: Callable[[], Dict[LabelValues, float]], labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.labels = tuple(labels)
+        self._collect = collect
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        for key, value in sorted(self._collect().items()):
+            yield self.name, _format_labels(self.labels, key), value
+
+
+class MetricsRegistry:
+    """Named metrics rendered together in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help_text, labels, buckets))
+
+    def callback(self, name: str, help_text: str, kind: str, collect: Callable[[], Dict[LabelValues, float]],
+                 labels: Sequence[str] = ()) -> CallbackMetric:
+        """
+        Register a metric read from `collect()` at scrape time.
+
+        `collect` returns {label values tuple: value}; () for an unlabelled value.
+        """
+        return self._add(CallbackMetric(name, help_text, kind, collect, labels))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class RequestMetrics:
+    """
+    WSGI middleware timing every request of an application.
+
+    The route label is the URL rule template (set in the environ by the
+    application, see ROUTE_KEY) so /content/<seed_id>/<path:member> is one
+    series rather than one per file. Latency is measured until the
+    application returns its response; bytes are taken from Content-Length.
+    """
+
+    ROUTE_KEY = "eduseedbank.route"
+
+    def __init__(self, app: Callable, registry: MetricsRegistry):
+        self.app = app
+        self.requests = registry.counter(
+            "eduseedbank_http_requests_total", "HTTP requests answered", ("route", "method", "status"))
+        self.latency = registry.histogram(
+            "eduseedbank_http_request_duration_seconds", "Time to produce a response", ("route",))
+        self.bytes = registry.counter(
+            "eduseedbank_http_response_bytes_total", "Response body bytes served", ("route",))
+        self.in_flight = registry.gauge(
+            "eduseedbank_http_requests_in_flight", "Requests being handled")
+
+    def __call__(self, environ, start_response):
+        start = time.perf_counter()
+        self.in_flight.inc()
+        response = {}
+
+        def recording_start_response(status, headers, exc_info=None):
+            response["status"] = status[:3]
+            for name, value in headers:
+                if name.lower() == "content-length":
+                    response["length"] = value
+            return start_response(status, headers, exc_info)
+
+        try:
+            return self.app(environ, recording_start_response)
+        finally:
+            self.in_flight.dec()
+            route = environ.get(self.ROUTE_KEY, "<unmatched>")
+            self.latency.observe(time.perf_counter() - start, route)
+            self.requests.inc(route, environ["REQUEST_METHOD"], response.get("status", "500"))
+            length = response.get("length")
+            if length and environ["REQUEST_METHOD"] != "HEAD":
+                self.bytes.inc(route, amount=int(length))
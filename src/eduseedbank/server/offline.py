@@ -0,0 +1,119 @@
+"""
+Offline bundles that let student tablets keep planted seeds.
+
+For every planted archive the server offers a precache manifest listing
+the URL and revision of each member, and a service worker built from it.
+Lesson pages register the worker when they are first opened; it fetches
+every listed member once, under URLs carrying the member's revision,
+and answers later requests for the seed from the tablet's cache. At the
+start of class only the worker's own update check reaches the server.
+
+The manifest's version is the archive's content digest. Replanting a
+seed with different content changes it, so browsers install the new
+worker, which precaches the new members and deletes the old seed
+version's cache when it takes over.
+"""
+
+import json
+from typing import Dict
+from urllib.parse import quote
+
+from .archive import SeedArchive
+
+CACHE_PREFIX = "eduseedbank"
+PRECACHE_MAX_BYTES = 8 * 1024 * 1024  # Larger members (long videos) stay on the server
+
+
+def revision(member) -> str:
+    """Revision of one archive member: its CRC and size, as in its ETag."""
+    return f"{member.crc:08x}-{member.size:x}"
+
+
+def content_url(seed_id: str, name: str) -> str:
+    """URL path a member of a planted seed is served under."""
+    return f"/content/{quote(seed_id, safe='')}/{quote(name)}"
+
+
+def cache_name(seed_id: str, version: str) -> str:
+    """Name of the tablet-side cache holding one version of a seed."""
+    return f"{CACHE_PREFIX}:{quote(seed_id, safe='')}:{version}"
+
+
+def precache_manifest(seed_id: str, archive: SeedArchive, max_bytes: int = PRECACHE_MAX_BYTES) -> Dict:
+    """
+    Members of a planted seed a tablet should cache, with their revisions.
+
+    `<member>.gz` copies are left out, since the server picks them itself
+    when a client accepts gzip, and so are members over `max_bytes`.
+
+    Args:
+        seed_id: Seed the archive is planted under
+        archive: Its planted archive
+        max_bytes: Largest member precached
+
+    Returns:
+        JSON-ready dict with the seed's version, cache name, scope and
+        precache entries ({"url", "revision", "size"}) in name order
+    """
+    version = archive.digest[:16]
+    precache, skipped = [], []
+    for name, member in sorted(archive.members.items()):
+        if name.endswith(".gz") and name[:-3] in archive.members:
+            continue
+        if member.size > max_bytes:
+            skipped.append(name)
+            continue
+        precache.append({"url": content_url(seed_id, name), "revision": revision(member), "size": member.size})
+    return {
+        "seed_id": seed_id,
+        "version": version,
+        "cache": cache_name(seed_id, version),
+        "scope": f"/content/{quote(seed_id, safe='')}/",
+        "precache": precache,
+        "skipped": skipped,
+    }
+
+
+SERVICE_WORKER = """\
+// EduSeedbank offline worker for one seed; generated by the school server.
+const MANIFEST = %(manifest)s;
+const PREFIX = "%(prefix)s";
+const REVISIONED = new Map(MANIFEST.precache.map(entry => [entry.url, entry.url + "?v=" + entry.revision]));
+
+self.addEventListener("install", event => {
+    event.waitUntil(caches.open(MANIFEST.cache)
+        .then(cache => cache.addAll(Array.from(REVISIONED.values())))
+        .then(() => self.skipWaiting()));
+});
+
+self.addEventListener("activate", event => {
+    // A replanted seed has a new version; drop the caches of older ones
+    event.waitUntil(caches.keys()
+        .then(keys => Promise.all(keys
+            .filter(key => key.startsWith(PREFIX) && key !== MANIFEST.cache)
+            .map(key => caches.delete(key))))
+        .then(() => self.clients.claim()));
+});
+
+self.addEventListener("fetch", event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    const revisioned = REVISIONED.get(url.pathname);
+    // Range requests (video seeking) and anything not in the manifest go to the server
+    if (request.method !== "GET" || request.headers.has("range") ||
+            url.origin !== self.location.origin || !revisioned) {
+        return;
+    }
+    event.respondWith(caches.open(MANIFEST.cache).then(cache =>
+        cache.match(revisioned).then(hit => hit || fetch(revisioned).then(response => {
+            if (response.ok) cache.put(revisioned, response.clone());
+            return response;
+        }))));
+});
+"""
+
+
+def service_worker(manifest: Dict) -> str:
+    """Service worker script precaching and serving the members of `manifest`."""
+    prefix = manifest["cache"][:-len(manifest["version"])]
+    return SERVICE_WORKER % {"manifest": json.dumps(manifest, sort_keys=True), "prefix": prefix}
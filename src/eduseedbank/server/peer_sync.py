@@ -0,0 +1,548 @@
+"""
+LAN synchronisation between school servers.
+
+Servers sharing a LAN or Wi-Fi bridge find each other by UDP broadcast
+and copy seeds from one another over HTTP instead of each fetching them
+over LoRa. A sync compares inventories keyed by each archive's content
+digest and pulls the seeds a peer holds a newer version of. A pull
+rebuilds the peer's archive file byte for byte: members the puller
+already has (same CRC, size and compression) are copied from its own
+archive and only the rest is fetched, as range requests spread over a
+pool of connections. Each pulled archive has its member CRCs and its
+digest checked before it is planted.
+"""
+
+import http.client
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from eduseedbank.profiling import traced
+
+from .archive import MemberInfo, SeedArchive
+from .planting import verify_archive
+
+DISCOVERY_PORT = 47474
+SERVICE = "eduseedbank"
+RANGE_SIZE = 4 * 1024 * 1024  # Largest range fetched by one request
+MIN_REUSE = 16 * 1024  # Members smaller than this are fetched along with their neighbours
+COPY_BLOCK = 1024 * 1024
+PEER_TIMEOUT_ROUNDS = 3  # Announcement intervals without news before a peer is forgotten
+
+
+@dataclass
+class Peer:
+    """A server heard announcing itself on the LAN."""
+    server_id: str
+    host: str
+    port: int
+    generation: int = 0  # Changes whenever the peer's seeds do
+    last_seen: float = 0.0
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+
+@dataclass
+class SyncReport:
+    """Outcome of one sync with a peer."""
+    peer: str
+    pulled: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    bytes_fetched: int = 0
+    bytes_reused: int = 0  # Copied from local archives instead of fetched
+    seconds: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def plan_ranges(size: int, members: List[MemberInfo], local: Optional[SeedArchive] = None,
+                min_reuse: int = MIN_REUSE, range_size: int = RANGE_SIZE):
+    """
+    Split a peer's archive into spans copied from a local archive and spans to fetch.
+
+    Args:
+        size: Size of the peer's archive file
+        members: The peer archive's member index (offsets are into its file)
+        local: This server's version of the seed, if any
+        min_reuse: Members with less compressed data than this are fetched anyway
+        range_size: Longest span fetched by a single request
+
+    Returns:
+        (copies, fetches): copies are (offset, length, local offset) and
+        fetches (offset, length), both covering the peer's file exactly once
+    """
+    reusable = {}
+    if local is not None:
+        for member in local.members.values():
+            reusable.setdefault((member.crc, member.size, member.compress_type, member.compressed_size), member)
+    copies = []
+    for member in sorted(members, key=lambda m: m.offset):
+        if member.offset < 0 or member.offset + member.compressed_size > size:
+            raise ValueError(f"Member {member.name} lies outside the archive")
+        mine = reusable.get((member.crc, member.size, member.compress_type, member.compressed_size))
+        if mine is not None and member.compressed_size >= min_reuse:
+            copies.append((member.offset, member.compressed_size, mine.offset))
+    fetches, position = [], 0
+    for offset, length, _ in copies + [(size, 0, 0)]:
+        while position < offset:
+            chunk = min(range_size, offset - position)
+            fetches.append((position, chunk))
+            position += chunk
+        position = offset + length
+    return copies, fetches
+
+
+class PeerDiscovery:
+    """Announces this server by UDP broadcast and keeps track of the servers it hears."""
+
+    def __init__(self, server_id: str, http_port: int, port: int = DISCOVERY_PORT,
+                 broadcast_address: str = "255.255.255.255", interval: float = 5.0,
+                 on_change: Optional[Callable[[Peer], None]] = None):
+        """
+        Args:
+            server_id: Identifier announced for this server; its own announcements are ignored
+            http_port: Port this server answers HTTP on
+            port: UDP port announcements are sent and received on
+            broadcast_address: Where announcements go (255.255.255.255, a subnet's
+                broadcast address, or 127.255.255.255 for servers on one machine)
+            interval: Seconds between announcements
+            on_change: Called with a peer when it is first heard or its seeds changed
+        """
+        self.server_id = server_id
+        self.http_port = http_port
+        self.port = port
+        self.broadcast_address = broadcast_address
+        self.interval = interval
+        self.on_change = on_change
+        self.generation = 0
+        self._peers = {}  # server_id -> Peer
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            # Lets several servers on one machine listen for announcements
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self._socket.bind(("", port))
+        self._socket.settimeout(0.5)  # How often the listener checks for close()
+        self._threads = [threading.Thread(target=self._announce_loop, name="peer-announce", daemon=True),
+                         threading.Thread(target=self._listen_loop, name="peer-listen", daemon=True)]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def announce(self):
+        """Tell peers now that this server's seeds changed, rather than at the next interval."""
+        self.generation += 1
+        self._wake.set()
+
+    def peers(self) -> List[Peer]:
+        """Servers heard from recently."""
+        cutoff = time.time() - PEER_TIMEOUT_ROUNDS * self.interval
+        with self._lock:
+            for server_id in [p.server_id for p in self._peers.values() if p.last_seen < cutoff]:
+                del self._peers[server_id]
+            return list(self._peers.values())
+
+    def _announce_loop(self):
+        while not self._stopping:
+            self._wake.clear()
+            message = {"service": SERVICE, "server_id": self.server_id, "port": self.http_port,
+                       "generation": self.generation}
+            try:
+                self._socket.sendto(json.dumps(message).encode("utf-8"), (self.broadcast_address, self.port))
+            except OSError as e:
+                print(f"Could not announce to {self.broadcast_address}:{self.port}: {e}")
+            self._wake.wait(self.interval)
+
+    def _listen_loop(self):
+        while not self._stopping:
+            try:
+                data, (host, _) = self._socket.recvfrom(2048)
+            except socket.timeout:
+                continue
+            except OSError:
+                return  # Socket closed
+            try:
+                message = json.loads(data)
+                if message.get("service") != SERVICE or message.get("server_id") == self.server_id:
+                    continue
+                server_id, port = str(message["server_id"]), int(message["port"])
+                generation = int(message.get("generation", 0))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                continue  # Not one of ours
+            with self._lock:
+                peer = self._peers.get(server_id)
+                changed = peer is None or (peer.host, peer.port, peer.generation) != (host, port, generation)
+                if peer is None:
+                    peer = self._peers[server_id] = Peer(server_id, host, port)
+                    self._wake.set()  # Answer a newcomer at once instead of at the next interval
+                peer.host, peer.port, peer.generation, peer.last_seen = host, port, generation, time.time()
+            if changed and self.on_change:
+                self.on_change(peer)
+
+    def close(self):
+        self._stopping = True
+        self._wake.set()
+        for thread in self._threads:
+            if thread.is_alive():
+                thread.join()
+        self._socket.close()
+
+
+class _PeerClient:
+    """Keep-alive HTTP connections to one peer, one per thread so range requests run in parallel."""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port,
+                                                                              timeout=self.timeout)
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def request(self, path: str, headers: Optional[Dict] = None) -> http.client.HTTPResponse:
+        """GET `path`; the response must be read to the end (or reset() called) before the next request."""
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request("GET", path, headers=headers or {})
+                return connection.getresponse()
+            except (ConnectionError, http.client.BadStatusLine):
+                # The peer closed an idle keep-alive connection; retry once on a new one
+                self.reset()
+                if attempt:
+                    raise
+
+    def get_json(self, path: str, headers: Optional[Dict] = None):
+        """(status, ETag, parsed body or None) of a JSON resource."""
+        response = self.request(path, headers)
+        body = response.read()
+        if response.status != 200:
+            return response.status, response.getheader("ETag"), None
+        return response.status, response.getheader("ETag"), json.loads(body)
+
+    def reset(self):
+        """Drop this thread's connection, e.g. after a response that was not read to the end."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+
+
+@dataclass
+class _Pull:
+    """One seed being copied from a peer into a temporary file."""
+    seed_id: str
+    digest: str
+    size: int
+    planted_at: float
+    copies: List[Tuple[int, int, int]] = field(default_factory=list)
+    fetches: List[Tuple[int, int]] = field(default_factory=list)
+    local_path: Optional[str] = None
+    path: str = ""
+    fd: int = -1
+    remaining: int = 0
+    error: Optional[str] = None
+    lock: threading.Lock = field(default_factory=threading.Lock)  # Guards fd's position without os.pwrite
+
+    def write(self, data: bytes, position: int):
+        """Write `data` at `position` of the temporary file; safe from several threads."""
+        view = memoryview(data)
+        while view:
+            if hasattr(os, "pwrite"):
+                written = os.pwrite(self.fd, view, position)
+            else:
+                # Windows has no pwrite; seek and write under the lock instead
+                with self.lock:
+                    os.lseek(self.fd, position, os.SEEK_SET)
+                    written = os.write(self.fd, view)
+            view = view[written:]
+            position += written
+
+    def discard(self):
+        """Close and delete the temporary file if it is still ours."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class PeerSync:
+    """Keeps a LocalServer's seeds in step with the servers it discovers on the LAN."""
+
+    def __init__(self, server, download_dir: str, http_port: int, workers: int = 4, interval: float = 60.0,
+                 discovery_port: int = DISCOVERY_PORT, broadcast_address: str = "255.255.255.255",
+                 announce_interval: float = 5.0, timeout: float = 30.0, metrics=None):
+        """
+        Args:
+            server: LocalServer whose seeds are synchronised
+            download_dir: Directory for archives being pulled (on the content directory's filesystem)
+            http_port: Port the server answers HTTP on, announced to peers
+            workers: Range requests and local copies running at once
+            interval: Seconds between syncs with every known peer; peers are also
+                synced as soon as they announce a change
+            discovery_port: UDP port of peer announcements
+            broadcast_address: Where announcements are sent
+            announce_interval: Seconds between announcements
+            timeout: Socket timeout of requests to peers
+            metrics: Optional MetricsRegistry to report transfers to
+        """
+        self.server = server
+        self.download_dir = download_dir
+        self.http_port = http_port
+        self.workers = workers
+        self.interval = interval
+        self.timeout = timeout
+        self.seeds_pulled = 0
+        self.bytes_fetched = 0
+        self.bytes_reused = 0
+        self.reports = {}  # peer address -> SyncReport of the last sync with it
+        self.discovery = PeerDiscovery(server.server_id, http_port, discovery_port, broadcast_address,
+                                       announce_interval, on_change=self._peer_changed)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="peer-sync")
+        self._etags = {}  # peer address -> inventory ETag as of the last sync that completed
+        self._changed = {}  # server_id -> Peer that announced a change since the last sync
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()  # One sync at a time, so two peers never race to plant a seed
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="peer-sync", daemon=True)
+        if metrics:
+            metrics.callback("eduseedbank_peer_sync_bytes_total", "Bytes of seeds pulled from peers",
+                             "counter", lambda: {("network",): self.bytes_fetched, ("local",): self.bytes_reused},
+                             ("source",))
+            metrics.callback("eduseedbank_peer_sync_seeds_pulled_total", "Seeds pulled from peers", "counter",
+                             lambda: {(): self.seeds_pulled})
+            metrics.callback("eduseedbank_peers", "Servers heard on the LAN", "gauge",
+                             lambda: {(): len(self.discovery.peers())})
+
+    def start(self):
+        self.discovery.start()
+        self._thread.start()
+
+    def notify_changed(self):
+        """Called when this server's seeds change, so peers hear about it without waiting."""
+        self.discovery.announce()
+
+    def _peer_changed(self, peer: Peer):
+        with self._lock:
+            self._changed[peer.server_id] = peer
+        self._wake.set()
+
+    def _run(self):
+        next_sweep = time.monotonic() + self.interval
+        while not self._stopping:
+            self._wake.wait(max(next_sweep - time.monotonic(), 0))
+            self._wake.clear()
+            if self._stopping:
+                return
+            with self._lock:
+                peers, self._changed = list(self._changed.values()), {}
+            if time.monotonic() >= next_sweep:
+                peers = self.discovery.peers()
+                next_sweep = time.monotonic() + self.interval
+            for peer in peers:
+                try:
+                    self.sync_with(peer.host, peer.port)
+                except (OSError, http.client.HTTPException, ValueError) as e:
+                    print(f"Sync with {peer.address} failed: {e}")
+
+    @traced("server.peer_sync")
+    def sync_with(self, host: str, port: int) -> SyncReport:
+        """Pull every seed the server at host:port has a newer version of."""
+        with self._sync_lock:
+            address = f"{host}:{port}"
+            report = SyncReport(address)
+            start = time.perf_counter()
+            client = _PeerClient(host, port, self.timeout)
+            try:
+                etag = self._etags.get(address)
+                status, etag, inventory = client.get_json(
+                    "/api/sync/inventory", {"If-None-Match": etag} if etag else None)
+                if status == 304:
+                    return report
+                if inventory is None:
+                    raise ValueError(f"{address} answered {status} for its inventory")
+                if inventory.get("server_id") != self.server.server_id:
+                    self._pull(client, self._plan(client, inventory["seeds"]), report)
+                if not report.failed and etag:
+                    self._etags[address] = etag
+            finally:
+                client.close()
+                report.seconds = time.perf_counter() - start
+                self.reports[address] = report
+                self.seeds_pulled += len(report.pulled)
+                self.bytes_fetched += report.bytes_fetched
+                self.bytes_reused += report.bytes_reused
+            return report
+
+    def _plan(self, client: _PeerClient, theirs: Dict[str, Dict]) -> List[_Pull]:
+        """Seeds to pull: missing here, or newer there (by planting time, then digest)."""
+        mine = self.server.registry.inventory()
+        pulls = []
+        for seed_id, entry in sorted(theirs.items()):
+            current = mine.get(seed_id)
+            if not entry["size"] or current is not None and (
+                    current["digest"] == entry["digest"] or
+                    (current["planted_at"], current["digest"]) > (entry["planted_at"], entry["digest"])):
+                continue
+            pull = _Pull(seed_id, entry["digest"], entry["size"], entry["planted_at"])
+            local = self.server.get_archive(seed_id) if current is not None else None
+            members = []
+            if local is not None:
+                status, _, manifest = client.get_json(f"/api/sync/seeds/{quote(seed_id, safe='')}/manifest")
+                if manifest is None:
+                    continue  # Gone from the peer since its inventory
+                # The manifest is newer than the inventory if the seed was just replanted
+                pull.digest, pull.size = manifest["digest"], manifest["size"]
+                members = [MemberInfo(**member) for member in manifest["members"]]
+                pull.local_path = local.path
+            pull.copies, pull.fetches = plan_ranges(pull.size, members, local)
+            pulls.append(pull)
+        return pulls
+
+    def _pull(self, client: _PeerClient, pulls: List[_Pull], report: SyncReport):
+        """Run the copies and fetches of every pull, planting each seed once its file is complete."""
+        os.makedirs(self.download_dir, exist_ok=True)
+        waiting, futures, started = deque(pulls), {}, []  # futures: future -> (pull, is its finish)
+        open_pulls = 0
+        try:
+            while waiting or futures:
+                # A bounded number of temporary files open at once, however many seeds are missing
+                while waiting and open_pulls < self.workers * 2:
+                    pull = waiting.popleft()
+                    started.append(pull)
+                    pull.fd, pull.path = tempfile.mkstemp(suffix=".sync", dir=self.download_dir)
+                    os.ftruncate(pull.fd, pull.size)
+                    for offset, length, local_offset in pull.copies:
+                        futures[self._executor.submit(self._copy, pull, offset, length, local_offset)] = (pull, False)
+                    for offset, length in pull.fetches:
+                        futures[self._executor.submit(self._fetch, client, pull, offset, length)] = (pull, False)
+                    pull.remaining = len(pull.copies) + len(pull.fetches)
+                    open_pulls += 1
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pull, finished = futures.pop(future)
+                    if finished:
+                        future.result()
+                        if pull.error:
+                            report.failed[pull.seed_id] = pull.error
+                        else:
+                            report.pulled.append(pull.seed_id)
+                        open_pulls -= 1
+                        continue
+                    try:
+                        fetched, reused = future.result()
+                        report.bytes_fetched += fetched
+                        report.bytes_reused += reused
+                    except Exception as e:
+                        pull.error = pull.error or str(e) or type(e).__name__
+                    pull.remaining -= 1
+                    if pull.remaining == 0:
+                        # Checked and planted on the pool as well, alongside other seeds' transfers
+                        futures[self._executor.submit(self._finish, pull)] = (pull, True)
+        finally:
+            # Leave no descriptors or .sync files behind, whatever stopped the loop
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            for pull in started:
+                pull.discard()
+
+    def _fetch(self, client: _PeerClient, pull: _Pull, offset: int, length: int) -> Tuple[int, int]:
+        last = offset + length - 1
+        # If-Range: a peer that replanted the seed meanwhile answers 200 instead of a stale range
+        response = client.request(f"/api/sync/seeds/{quote(pull.seed_id, safe='')}/archive",
+                                  {"Range": f"bytes={offset}-{last}", "If-Range": f'"{pull.digest}"'})
+        try:
+            content_range = response.getheader("Content-Range")
+            if response.status != 206 or content_range != f"bytes {offset}-{last}/{pull.size}":
+                raise ValueError(f"Seed {pull.seed_id} changed on the peer during the sync")
+            position = offset
+            while position <= last:
+                data = response.read(min(COPY_BLOCK, last + 1 - position))
+                if not data:
+                    raise ValueError(f"Transfer of seed {pull.seed_id} was cut short")
+                pull.write(data, position)
+                position += len(data)
+        except BaseException:
+            client.reset()
+            raise
+        return length, 0
+
+    def _copy(self, pull: _Pull, offset: int, length: int, local_offset: int) -> Tuple[int, int]:
+        with open(pull.local_path, "rb") as f:
+            f.seek(local_offset)
+            position = 0
+            while position < length:
+                data = f.read(min(COPY_BLOCK, length - position))
+                if not data:
+                    raise ValueError(f"Local archive of seed {pull.seed_id} is shorter than its index")
+                pull.write(data, offset + position)
+                position += len(data)
+        return 0, length
+
+    def _finish(self, pull: _Pull):
+        """Check a pulled archive and plant it; failures are left in pull.error."""
+        os.close(pull.fd)
+        pull.fd = -1
+        try:
+            if pull.error:
+                raise ValueError(pull.error)
+            verify_archive(pull.path)
+            digest = SeedArchive(pull.path).digest
+            if digest != pull.digest:
+                raise ValueError(f"Content digest mismatch: expected {pull.digest}, got {digest}")
+            self.server.plant_archive(pull.path, pull.seed_id, move=True, planted_at=pull.planted_at)
+        except Exception as e:
+            pull.error = str(e) or type(e).__name__
+            pull.discard()
+
+    def status(self) -> Dict:
+        return {
+            "server_id": self.server.server_id,
+            "peers": [asdict(peer) for peer in self.discovery.peers()],
+            "seeds_pulled": self.seeds_pulled,
+            "bytes_fetched": self.bytes_fetched,
+            "bytes_reused": self.bytes_reused,
+            "last_syncs": [report.to_dict() for report in self.reports.values()],
+        }
+
+    def close(self):
+        self._stopping = True
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.discovery.close()
+        self._executor.shutdown(wait=True)
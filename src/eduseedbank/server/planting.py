@@ -0,0 +1,166 @@
+"""
+Background planting of uploaded seed archives.
+
+Uploads are streamed to a temporary file by the request thread; checking
+the archive (every member's CRC, plus the client's SHA-256 if it sent
+one) and indexing it happen on a small worker pool. The upload request
+returns as soon as the body is on disk, with a job ID the client polls
+for the outcome, so a large seed never ties up a request thread while it
+is being verified.
+"""
+
+import os
+import threading
+import time
+import uuid
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Optional
+
+QUEUED = "queued"
+VERIFYING = "verifying"
+PLANTED = "planted"
+FAILED = "failed"
+
+VERIFY_BLOCK = 1024 * 1024
+# Seconds from upload to planted or failed
+JOB_DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+@dataclass
+class PlantingJob:
+    """Progress of one uploaded seed."""
+    job_id: str
+    seed_id: str
+    path: str
+    size: int
+    sha256: str
+    expected_sha256: Optional[str] = None
+    state: str = QUEUED
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        del data["path"]
+        return data
+
+
+def verify_archive(path: str):
+    """Read every member through zipfile so a corrupt or truncated archive raises."""
+    with zipfile.ZipFile(path) as zipf:
+        for info in zipf.infolist():
+            # zipfile checks the CRC once a member has been read to the end
+            with zipf.open(info) as member:
+                while member.read(VERIFY_BLOCK):
+                    pass
+
+
+class PlantingPool:
+    """Worker pool that verifies uploaded archives and plants them."""
+
+    def __init__(self, server, workers: int = 2, keep_jobs: int = 1000, registry=None, metrics=None):
+        """
+        Args:
+            server: LocalServer the verified archives are planted into
+            workers: Threads verifying archives concurrently
+            keep_jobs: Finished jobs remembered in memory for status queries
+            registry: Optional SeedRegistry that keeps job states across restarts
+            metrics: Optional MetricsRegistry to report job durations to
+        """
+        self.server = server
+        self.keep_jobs = keep_jobs
+        self.registry = registry
+        self.durations = None
+        if metrics:
+            self.durations = metrics.histogram(
+                "eduseedbank_planting_job_duration_seconds", "Time from upload to planted or failed",
+                ("state",), JOB_DURATION_BUCKETS)
+            metrics.callback("eduseedbank_planting_jobs_active", "Planting jobs queued or verifying",
+                             "gauge", lambda: {(): len(self._done)})
+        self.jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._done = {}  # job_id -> Event set when the job finishes
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="planting")
+        if registry:
+            # Their uploads were discarded with the old process
+            for job_id, data in registry.unfinished_jobs():
+                job = PlantingJob(path="", **data)
+                job.state, job.error, job.finished = FAILED, "Interrupted by a server restart", time.time()
+                self._save(job)
+
+    def submit(self, seed_id: str, path: str, size: int, sha256: str,
+               expected_sha256: Optional[str] = None) -> PlantingJob:
+        """Queue an uploaded archive at `path` for verification and planting."""
+        job = PlantingJob(uuid.uuid4().hex, seed_id, path, size, sha256, expected_sha256)
+        with self._lock:
+            self.jobs[job.job_id] = job
+            self._done[job.job_id] = threading.Event()
+            self._trim()
+        self._save(job)
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[PlantingJob]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+        if job is None and self.registry:
+            data = self.registry.job(job_id)
+            if data:
+                job = PlantingJob(path="", **data)
+        return job
+
+    def _save(self, job: PlantingJob):
+        if self.registry:
+            self.registry.save_job(job.job_id, job.state, job.to_dict())
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[PlantingJob]:
+        """Block until a job has finished; returns it, or None if unknown."""
+        with self._lock:
+            done = self._done.get(job_id)
+        if done is not None:
+            done.wait(timeout)
+        return self.get(job_id)
+
+    def _run(self, job: PlantingJob):
+        job.state = VERIFYING
+        self._save(job)
+        try:
+            if job.expected_sha256 and job.expected_sha256.lower() != job.sha256:
+                raise ValueError(f"SHA-256 mismatch: expected {job.expected_sha256}, got {job.sha256}")
+            verify_archive(job.path)
+            self.server.plant_archive(job.path, job.seed_id, move=True)
+            job.state = PLANTED
+        except Exception as e:
+            job.state = FAILED
+            job.error = str(e) or type(e).__name__
+            if os.path.exists(job.path):
+                os.remove(job.path)
+        finally:
+            job.finished = time.time()
+            try:
+                self._save(job)
+                if self.durations:
+                    self.durations.observe(job.finished - job.created, job.state)
+            finally:
+                # Waiters are released even if the job could not be recorded
+                with self._lock:
+                    done = self._done.pop(job.job_id, None)
+                if done:
+                    done.set()
+
+    def _trim(self):
+        """Forget the oldest finished jobs beyond keep_jobs."""
+        excess = len(self.jobs) - self.keep_jobs
+        for job_id in list(self.jobs):
+            if excess <= 0:
+                break
+            if self.jobs[job_id].finished is not None:
+                del self.jobs[job_id]
+                excess -= 1
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
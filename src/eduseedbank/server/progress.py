@@ -0,0 +1,218 @@
+"""
+Student progress tracking for the local server.
+
+Generated lesson pages report page views and quiz attempts. Events are
+buffered in memory and written to SQLite by a background thread in one
+transaction per batch, either every `flush_interval` seconds or as soon
+as `batch_size` events are waiting, so a server running from an SD card
+does not commit once per click. Aggregate queries flush first, so they
+always include every event recorded so far.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import (Boolean, Column, Float, Index, Integer, MetaData, String, Table, bindparam,
+                        case, func, insert, select)
+
+VIEW = "view"
+ATTEMPT = "attempt"
+EVENT_KINDS = (VIEW, ATTEMPT)
+MAX_FIELD_LENGTH = 200
+
+metadata = MetaData()
+
+events_table = Table(
+    "progress_events", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("student_id", String, nullable=False),
+    Column("seed_id", String, nullable=False),
+    Column("kind", String, nullable=False),
+    Column("page", String),
+    Column("exercise", String),
+    Column("answer", String),
+    Column("correct", Boolean),
+    Column("at", Float, nullable=False),
+    Index("ix_progress_student", "student_id", "seed_id"),
+    Index("ix_progress_seed", "seed_id"),
+)
+
+_INSERT = insert(events_table)
+_c = events_table.c
+_is_view = case((_c.kind == VIEW, 1), else_=0)
+_is_attempt = case((_c.kind == ATTEMPT, 1), else_=0)
+_is_correct = case((_c.correct.is_(True), 1), else_=0)
+_STUDENT_LESSONS = select(
+    _c.seed_id, func.sum(_is_view), func.sum(_is_attempt), func.sum(_is_correct), func.max(_c.at)
+).where(_c.student_id == bindparam("student_id")).group_by(_c.seed_id).order_by(_c.seed_id)
+_LESSON_TOTALS = select(
+    func.count(func.distinct(_c.student_id)), func.sum(_is_view), func.sum(_is_attempt), func.sum(_is_correct)
+).where(_c.seed_id == bindparam("seed_id"))
+_LESSON_EXERCISES = select(
+    _c.exercise, func.count(), func.sum(_is_correct), func.count(func.distinct(_c.student_id))
+).where((_c.seed_id == bindparam("seed_id")) & (_c.kind == ATTEMPT)).group_by(_c.exercise).order_by(_c.exercise)
+
+
+def parse_event(data: Dict) -> Dict:
+    """
+    Validate one event as posted by a lesson page.
+
+    Raises ValueError for a missing student_id or seed_id, an unknown kind,
+    an oversized field or a timestamp that is not a finite number.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Each event must be an object")
+    event = {}
+    for name in ("student_id", "seed_id", "page", "exercise", "answer"):
+        value = data.get(name)
+        if value is not None:
+            value = str(value)
+            if len(value) > MAX_FIELD_LENGTH:
+                raise ValueError(f"{name} is longer than {MAX_FIELD_LENGTH} characters")
+        event[name] = value
+    if not event["student_id"] or not event["seed_id"]:
+        raise ValueError("student_id and seed_id are required")
+    event["kind"] = data.get("kind", VIEW)
+    if event["kind"] not in EVENT_KINDS:
+        raise ValueError(f"kind must be one of {', '.join(EVENT_KINDS)}")
+    correct = data.get("correct")
+    event["correct"] = None if correct is None else bool(correct)
+    try:
+        event["at"] = float(data.get("at") or time.time())
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("at must be a Unix timestamp")
+    if not math.isfinite(event["at"]):
+        raise ValueError("at must be a Unix timestamp")
+    return event
+
+
+class ProgressTracker:
+    """Write-behind store of progress events with per-student and per-lesson summaries."""
+
+    def __init__(self, engine, flush_interval: float = 2.0, batch_size: int = 500,
+                 max_buffered: int = 50000):
+        """
+        Args:
+            engine: SQLAlchemy engine of the database to write to
+            flush_interval: Seconds between background flushes
+            batch_size: Buffered events that trigger a flush before the interval is up
+            max_buffered: Buffered events past which record() flushes in the caller,
+                so a stalled disk slows clients down instead of growing memory
+        """
+        self.engine = engine
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_buffered = max_buffered
+        self.recorded = 0
+        self.written = 0
+        self.transactions = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # One batch at a time, in order
+        self._wake = threading.Event()
+        self._stopping = False
+        metadata.create_all(engine)
+        self._thread = threading.Thread(target=self._run, name="progress-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, event: Dict):
+        """Buffer one event (as returned by parse_event)."""
+        self.record_many([event])
+
+    def record_many(self, events: List[Dict]):
+        with self._lock:
+            self._buffer.extend(events)
+            self.recorded += len(events)
+            buffered = len(self._buffer)
+        if buffered >= self.max_buffered:
+            self.flush()
+        elif buffered >= self.batch_size:
+            self._wake.set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def flush(self) -> int:
+        """
+        Write every buffered event in one transaction; returns how many were written.
+
+        If the write fails the batch goes back to the front of the buffer,
+        ahead of events recorded meanwhile, and the error is raised.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(_INSERT, batch)
+            except BaseException:
+                with self._lock:
+                    self._buffer[:0] = batch
+                raise
+            self.written += len(batch)
+            self.transactions += 1
+            return len(batch)
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Keep the writer alive; the batch is back in the buffer for the next flush
+                print(f"Error writing progress events: {e}")
+
+    def close(self):
+        """Stop the writer thread after a final flush."""
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+
+    def student_summary(self, student_id: str) -> Optional[Dict]:
+        """Views, attempts and correct answers of one student, per lesson; None if unknown."""
+        self.flush()
+        with self.engine.connect() as conn:
+            rows = conn.execute(_STUDENT_LESSONS, {"student_id": student_id}).all()
+        if not rows:
+            return None
+        lessons = [{"seed_id": seed_id, "page_views": views, "attempts": attempts, "correct": correct,
+                    "last_seen": last_seen}
+                   for seed_id, views, attempts, correct, last_seen in rows]
+        attempts = sum(lesson["attempts"] for lesson in lessons)
+        correct = sum(lesson["correct"] for lesson in lessons)
+        return {
+            "student_id": student_id,
+            "page_views": sum(lesson["page_views"] for lesson in lessons),
+            "attempts": attempts,
+            "correct": correct,
+            "accuracy": correct / attempts if attempts else None,
+            "lessons": lessons,
+        }
+
+    def lesson_summary(self, seed_id: str) -> Optional[Dict]:
+        """Students, views and per-exercise results of one lesson; None if it has no events."""
+        self.flush()
+        with self.engine.connect() as conn:
+            students, views, attempts, correct = conn.execute(_LESSON_TOTALS, {"seed_id": seed_id}).one()
+            if not students:
+                return None
+            exercises = conn.execute(_LESSON_EXERCISES, {"seed_id": seed_id}).all()
+        return {
+            "seed_id": seed_id,
+            "students": students,
+            "page_views": views,
+            "attempts": attempts,
+            "correct": correct,
+            "accuracy": correct / attempts if attempts else None,
+            "exercises": [{"exercise": exercise, "attempts": count, "correct": right,
+                           "students": exercise_students,
+                           "accuracy": right / count}
+                          for exercise, count, right, exercise_students in exercises],
+        }
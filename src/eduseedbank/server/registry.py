@@ -0,0 +1,181 @@
+"""
+Persistent registry of planted seeds for the local server.
+
+Seed metadata, each archive's member index and planting jobs live in a
+SQLite database next to the planted archives, so a restart reads one
+table instead of reopening every archive. The database runs in WAL mode
+so readers never wait for a planting write, and member indexes are only
+read when a seed's content is first requested.
+"""
+
+import json
+import time
+from itertools import groupby
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import (Column, Float, Integer, MetaData, String, Table, Text, bindparam,
+                        create_engine, delete, event, insert, select, update)
+
+from .archive import MemberInfo, content_digest
+
+metadata = MetaData()
+
+seeds_table = Table(
+    "seeds", metadata,
+    Column("seed_id", String, primary_key=True),
+    Column("path", String),  # None for seeds planted as plain JSON
+    Column("size", Integer),
+    Column("mtime", Float),
+    Column("metadata", Text, nullable=False),
+    Column("state", String, nullable=False),
+    Column("version", Integer, nullable=False, default=1),
+    Column("planted_at", Float, nullable=False),
+)
+
+members_table = Table(
+    "members", metadata,
+    Column("seed_id", String, primary_key=True),
+    Column("name", String, primary_key=True),
+    Column("offset", Integer, nullable=False),
+    Column("compressed_size", Integer, nullable=False),
+    Column("size", Integer, nullable=False),
+    Column("compress_type", Integer, nullable=False),
+    Column("crc", Integer, nullable=False),
+)
+
+jobs_table = Table(
+    "jobs", metadata,
+    Column("job_id", String, primary_key=True),
+    Column("data", Text, nullable=False),
+    Column("state", String, nullable=False),
+)
+
+PLANTED = "planted"
+
+# Statements are built once; SQLAlchemy caches their compiled form and
+# sqlite3 its prepared statements, so each call only binds parameters.
+_SELECT_SEEDS = select(seeds_table.c.seed_id, seeds_table.c.metadata)
+_SELECT_SEED = select(seeds_table).where(seeds_table.c.seed_id == bindparam("seed_id"))
+_SELECT_MEMBERS = select(
+    members_table.c.name, members_table.c.offset, members_table.c.compressed_size,
+    members_table.c.size, members_table.c.compress_type, members_table.c.crc
+).where(members_table.c.seed_id == bindparam("seed_id"))
+_DELETE_MEMBERS = delete(members_table).where(members_table.c.seed_id == bindparam("seed_id"))
+_DELETE_SEED = delete(seeds_table).where(seeds_table.c.seed_id == bindparam("seed_id"))
+_INSERT_MEMBER = insert(members_table)
+_SELECT_ARCHIVES = select(seeds_table.c.seed_id, seeds_table.c.size, seeds_table.c.planted_at).where(
+    seeds_table.c.path.is_not(None))
+_SELECT_ALL_MEMBERS = select(
+    members_table.c.seed_id, members_table.c.name, members_table.c.offset, members_table.c.compressed_size,
+    members_table.c.size, members_table.c.compress_type, members_table.c.crc
+).order_by(members_table.c.seed_id)
+_SELECT_JOB = select(jobs_table.c.data).where(jobs_table.c.job_id == bindparam("job_id"))
+
+
+class SeedRegistry:
+    """SQLite-backed store of planted seeds and their member indexes."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite database file, created if missing
+        """
+        self.path = path
+        self.engine = create_engine(f"sqlite:///{path}")
+        event.listen(self.engine, "connect", _configure_connection)
+        metadata.create_all(self.engine)
+
+    def seeds(self) -> Dict[str, Dict]:
+        """Metadata of every planted seed, without member indexes."""
+        with self.engine.connect() as conn:
+            return {seed_id: json.loads(data) for seed_id, data in conn.execute(_SELECT_SEEDS)}
+
+    def seed(self, seed_id: str) -> Optional[Dict]:
+        """Registry row of one seed (path, size, mtime, state, version, ...)."""
+        with self.engine.connect() as conn:
+            row = conn.execute(_SELECT_SEED, {"seed_id": seed_id}).mappings().first()
+        return dict(row) if row else None
+
+    def members(self, seed_id: str) -> Dict[str, MemberInfo]:
+        with self.engine.connect() as conn:
+            rows = conn.execute(_SELECT_MEMBERS, {"seed_id": seed_id})
+            return {row[0]: MemberInfo(*row) for row in rows}
+
+    def inventory(self) -> Dict[str, Dict]:
+        """
+        Archive-backed seeds with their size, planting time and content_digest().
+
+        Read in two queries whatever the number of seeds, for comparing
+        inventories with other servers.
+        """
+        with self.engine.connect() as conn:
+            seeds = {seed_id: {"size": size, "planted_at": planted_at}
+                     for seed_id, size, planted_at in conn.execute(_SELECT_ARCHIVES)}
+            for seed_id, rows in groupby(conn.execute(_SELECT_ALL_MEMBERS), key=lambda row: row[0]):
+                if seed_id in seeds:
+                    seeds[seed_id]["digest"] = content_digest(MemberInfo(*row[1:]) for row in rows)
+        for entry in seeds.values():
+            entry.setdefault("digest", content_digest(()))
+        return seeds
+
+    def put(self, seed_id: str, seed_metadata: Dict, path: Optional[str] = None,
+            size: Optional[int] = None, mtime: Optional[float] = None,
+            members: Optional[Iterable[MemberInfo]] = None, planted_at: Optional[float] = None) -> int:
+        """
+        Record a planted seed, replacing any previous version.
+
+        `planted_at` defaults to now; seeds copied from another server keep
+        the time they were first planted. Returns the seed's new version number.
+        """
+        with self.engine.begin() as conn:
+            row = conn.execute(_SELECT_SEED, {"seed_id": seed_id}).mappings().first()
+            version = row["version"] + 1 if row else 1
+            values = {
+                "path": path, "size": size, "mtime": mtime,
+                "metadata": json.dumps(seed_metadata), "state": PLANTED,
+                "version": version, "planted_at": planted_at or time.time(),
+            }
+            if row:
+                conn.execute(update(seeds_table).where(seeds_table.c.seed_id == seed_id), values)
+            else:
+                conn.execute(insert(seeds_table), dict(values, seed_id=seed_id))
+            conn.execute(_DELETE_MEMBERS, {"seed_id": seed_id})
+            rows = [{"seed_id": seed_id, "name": m.name, "offset": m.offset,
+                     "compressed_size": m.compressed_size, "size": m.size,
+                     "compress_type": m.compress_type, "crc": m.crc} for m in members or ()]
+            if rows:
+                conn.execute(_INSERT_MEMBER, rows)
+        return version
+
+    def remove(self, seed_id: str):
+        with self.engine.begin() as conn:
+            conn.execute(_DELETE_MEMBERS, {"seed_id": seed_id})
+            conn.execute(_DELETE_SEED, {"seed_id": seed_id})
+
+    def save_job(self, job_id: str, state: str, data: Dict):
+        with self.engine.begin() as conn:
+            conn.execute(delete(jobs_table).where(jobs_table.c.job_id == job_id))
+            conn.execute(insert(jobs_table), {"job_id": job_id, "state": state,
+                                              "data": json.dumps(data)})
+
+    def job(self, job_id: str) -> Optional[Dict]:
+        with self.engine.connect() as conn:
+            data = conn.execute(_SELECT_JOB, {"job_id": job_id}).scalar()
+        return json.loads(data) if data else None
+
+    def unfinished_jobs(self) -> Iterable[Tuple[str, Dict]]:
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(jobs_table.c.job_id, jobs_table.c.data)
+                                .where(jobs_table.c.state.in_(("queued", "verifying")))).all()
+        return [(job_id, json.loads(data)) for job_id, data in rows]
+
+    def close(self):
+        self.engine.dispose()
+
+
+def _configure_connection(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL lets content requests read while a planting job commits
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
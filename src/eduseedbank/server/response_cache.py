@@ -0,0 +1,137 @@
+"""
+In-process cache of built responses for the local server.
+
+When a class opens the same lesson at once, the first request inflates a
+member (or renders a listing) and the rest are answered from memory.
+Entries are kept under a byte-size cap with LRU eviction and grouped, by
+seed or by listing, so replanting a seed drops everything built from it.
+Concurrent misses on one key wait for a single build instead of each
+repeating it.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class ResponseCache:
+    """Byte-capped LRU cache of response bodies, invalidated by group."""
+
+    def __init__(self, capacity_bytes: int = 64 * 1024 * 1024, max_entry_bytes: Optional[int] = None):
+        """
+        Args:
+            capacity_bytes: Total size of cached values
+            max_entry_bytes: Largest single value cached (default: an eighth of the capacity)
+        """
+        self.capacity_bytes = capacity_bytes
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else capacity_bytes // 8
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # (group, key) -> (value, size)
+        self._groups = {}  # group -> set of keys
+        self._building = {}  # (group, key) -> Event set when its build finishes
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, group: Hashable, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get((group, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((group, key))
+            self.hits += 1
+            return entry[0]
+
+    def put(self, group: Hashable, key: Hashable, value: Any, size: int) -> bool:
+        """Cache `value`; returns False if it is larger than max_entry_bytes."""
+        if size > self.max_entry_bytes:
+            return False
+        with self._lock:
+            self._remove((group, key))
+            self._entries[(group, key)] = (value, size)
+            self._groups.setdefault(group, set()).add(key)
+            self.used_bytes += size
+            while self.used_bytes > self.capacity_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return True
+
+    def get_or_build(self, group: Hashable, key: Hashable, build: Callable[[], Tuple[Any, int]]) -> Any:
+        """
+        Cached value for (group, key), calling build() -> (value, size) on a miss.
+
+        Threads missing the same key while it is being built wait for that
+        build rather than running their own.
+        """
+        full_key = (group, key)
+        waited = False
+        while True:
+            with self._lock:
+                entry = self._entries.get(full_key)
+                if entry is not None:
+                    self._entries.move_to_end(full_key)
+                    self.hits += 1
+                    return entry[0]
+                building = self._building.get(full_key)
+                if building is None and not waited:
+                    building = self._building[full_key] = threading.Event()
+                    self.misses += 1
+                    break
+            if building is None:
+                # The value was too big to keep (or was invalidated at once); build a copy
+                return build()[0]
+            building.wait()
+            waited = True
+        try:
+            value, size = build()
+            self.put(group, key, value, size)
+            return value
+        finally:
+            with self._lock:
+                del self._building[full_key]
+            building.set()
+
+    def invalidate(self, group: Hashable):
+        """Drop every entry of a group, e.g. all responses built from one seed."""
+        with self._lock:
+            for key in list(self._groups.get(group, ())):
+                self._remove((group, key))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+            self.used_bytes = 0
+
+    def _remove(self, full_key):
+        entry = self._entries.pop(full_key, None)
+        if entry is None:
+            return
+        self.used_bytes -= entry[1]
+        group, key = full_key
+        keys = self._groups[group]
+        keys.discard(key)
+        if not keys:
+            del self._groups[group]
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "used_bytes": self.used_bytes,
+            "capacity_bytes": self.capacity_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hit_ratio,
+        }
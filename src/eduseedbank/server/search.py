@@ -0,0 +1,233 @@
+"""
+Full-text search over planted seeds.
+
+Titles, descriptions, subjects and the text of each seed's HTML and
+text members go into an SQLite FTS5 table in the seed registry's
+database. Seeds are indexed by a background thread when they are
+planted, so planting never waits for text extraction, and queries are
+ranked with BM25, weighting title matches above description and body
+matches.
+"""
+
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import OperationalError
+
+from eduseedbank.profiling import traced
+
+TEXT_EXTENSIONS = (".html", ".htm", ".txt", ".md")
+MAX_BODY_CHARS = 1024 * 1024  # Text indexed per seed; the rest is ignored
+SNIPPET_CHARS = 120
+SNIPPET_SCAN_CHARS = 16 * 1024  # Body text searched for a snippet; past it the snippet is the opening
+
+# bm25() weights for the columns below; seed_id is not searched
+_WEIGHTS = "0.0, 10.0, 4.0, 2.0, 1.0"
+# Prefix indexes on 2 and 3 characters keep as-you-type queries off a full scan
+_CREATE = text(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5("
+    "seed_id UNINDEXED, title, description, subject, body, prefix = '2 3', "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+_DELETE = text("DELETE FROM search WHERE seed_id = :seed_id")
+_INSERT = text(
+    "INSERT INTO search (seed_id, title, description, subject, body) "
+    "VALUES (:seed_id, :title, :description, :subject, :body)"
+)
+# Only the ranking runs under MATCH: snippet() there would be computed for
+# every matching row before the sort, so snippets are cut in Python from
+# the bodies of the rows that made the page.
+_QUERY = text(
+    f"SELECT rowid, seed_id, title, bm25(search, {_WEIGHTS}) AS score "
+    "FROM search WHERE search MATCH :query ORDER BY score LIMIT :limit OFFSET :offset"
+)
+_BODIES = text(f"SELECT rowid, substr(body, 1, {SNIPPET_SCAN_CHARS}) FROM search WHERE rowid IN :rowids").bindparams(
+    bindparam("rowids", expanding=True))
+_UNINDEXED = text("SELECT seed_id FROM seeds WHERE seed_id NOT IN (SELECT seed_id FROM search)")
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+class _TextExtractor(HTMLParser):
+    """Collects the visible text of an HTML document."""
+
+    SKIP = {"script", "style", "noscript"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skipping += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self._skipping:
+            self._skipping -= 1
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def html_text(document: str) -> str:
+    """Visible text of an HTML document, with whitespace collapsed."""
+    extractor = _TextExtractor()
+    extractor.feed(document)
+    extractor.close()
+    return " ".join(" ".join(extractor.parts).split())
+
+
+def archive_text(archive, limit: int = MAX_BODY_CHARS) -> str:
+    """Searchable text of a SeedArchive's HTML and text members."""
+    parts, length = [], 0
+    for name in sorted(archive.members):
+        if length >= limit or not name.lower().endswith(TEXT_EXTENSIONS):
+            continue
+        document = archive.read(name).decode("utf-8", errors="replace")
+        if name.lower().endswith((".html", ".htm")):
+            document = html_text(document)
+        parts.append(document[:limit - length])
+        length += len(parts[-1])
+    return "\n".join(parts)
+
+
+def snippet(body: str, words: List[str], length: int = SNIPPET_CHARS) -> str:
+    """
+    About `length` characters of `body` around the first query word found,
+    with matching words in [brackets]. The last query word matches as a prefix.
+    """
+    *whole, prefix = [re.escape(word) for word in words]
+    pattern = re.compile(r"\b(?:" + "|".join([f"{word}\\b" for word in whole] + [prefix]) + r")\w*",
+                         re.IGNORECASE)
+    # str.find is far quicker than the regex (or lowercasing a copy) over a
+    # body whose match may only be in the title; the regex is kept for
+    # marking the window.
+    variants = {variant for word in words for variant in (word.lower(), word.capitalize(), word.upper())}
+    positions = [position for position in (body.find(variant) for variant in variants) if position >= 0]
+    start = max(min(positions) - length // 3, 0) if positions else 0
+    end = min(start + length, len(body))
+    # Widen to whole words
+    while start > 0 and not body[start - 1].isspace():
+        start -= 1
+    while end < len(body) and not body[end].isspace():
+        end += 1
+    text = " ".join(body[start:end].split())
+    text = pattern.sub(lambda m: f"[{m.group()}]", text)
+    return ("..." if start else "") + text + ("..." if end < len(body) else "")
+
+
+def match_expression(query: str) -> Optional[str]:
+    """
+    Turn free text typed by a user into an FTS5 MATCH expression.
+
+    Every word must appear; the last one also matches as a prefix so
+    results show up while the user is still typing. Returns None when the
+    query has no words.
+    """
+    words = _WORD.findall(query)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class SearchIndex:
+    """FTS5 index of planted seeds, updated by a background thread."""
+
+    def __init__(self, engine):
+        """
+        Args:
+            engine: SQLAlchemy engine of the seed registry database
+        """
+        self.engine = engine
+        self.available = True
+        self._pending = {}  # seed_id -> Future of its latest indexing task
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search")
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(_CREATE)
+        except OperationalError as e:
+            # SQLite builds without FTS5 still serve content, just not search
+            print(f"Warning: full-text search disabled: {e}")
+            self.available = False
+
+    def submit(self, seed_id: str, seed_metadata: Dict, archive=None):
+        """Index a seed in the background, replacing what was indexed for it before."""
+        if not self.available:
+            return
+        future = self._executor.submit(self._index, seed_id, seed_metadata, archive)
+        with self._lock:
+            self._pending[seed_id] = future
+        future.add_done_callback(lambda done: self._finished(seed_id, done))
+
+    def _finished(self, seed_id: str, future):
+        with self._lock:
+            if self._pending.get(seed_id) is future:
+                del self._pending[seed_id]
+
+    def _index(self, seed_id: str, seed_metadata: Dict, archive=None):
+        try:
+            body = archive_text(archive) if archive is not None else ""
+        except (OSError, ValueError) as e:
+            print(f"Could not extract text from seed {seed_id}: {e}")
+            body = ""
+        row = {
+            "seed_id": seed_id,
+            "title": str(seed_metadata.get("title", "")),
+            "description": str(seed_metadata.get("description", "")),
+            "subject": " ".join(str(seed_metadata.get(key, "")) for key in ("subject", "curriculum")),
+            "body": body,
+        }
+        with self.engine.begin() as conn:
+            conn.execute(_DELETE, {"seed_id": seed_id})
+            conn.execute(_INSERT, row)
+
+    def remove(self, seed_id: str):
+        if self.available:
+            with self.engine.begin() as conn:
+                conn.execute(_DELETE, {"seed_id": seed_id})
+
+    def unindexed(self) -> List[str]:
+        """Registered seeds with nothing in the index, e.g. planted before search existed."""
+        if not self.available:
+            return []
+        with self.engine.connect() as conn:
+            return [row[0] for row in conn.execute(_UNINDEXED)]
+
+    @traced("server.search")
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """
+        Seeds matching `query`, best match first.
+
+        Each result has the seed_id, title, a snippet of the matching body
+        text with matches in [brackets], and its BM25 score (lower is better).
+        """
+        expression = match_expression(query)
+        if not self.available or expression is None:
+            return []
+        with self.engine.connect() as conn:
+            rows = conn.execute(_QUERY, {"query": expression, "limit": limit, "offset": offset}).all()
+            if not rows:
+                return []
+            bodies = dict(conn.execute(_BODIES, {"rowids": [row[0] for row in rows]}).all())
+        words = _WORD.findall(query)
+        return [{"seed_id": seed_id, "title": title, "snippet": snippet(bodies[rowid], words), "score": score}
+                for rowid, seed_id, title, score in rows]
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until every submitted seed has been indexed."""
+        with self._lock:
+            futures = list(self._pending.values())
+        for future in futures:
+            future.result(timeout)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,571 @@
+"""
+Threaded HTTP/1.1 WSGI server for running the local server in production.
+
+One thread accepts connections and watches idle keep-alive connections
+with a selector; a fixed pool of worker threads handles requests. A
+connection only holds a worker while a request is being read or
+answered, so forty tablets keeping their connections open between
+requests need no more than a handful of workers. Workers are threads
+rather than processes because LocalServer keeps planting jobs, archives
+and the search indexer in memory.
+
+Response bodies handed to wsgi.file_wrapper go out with sendfile:
+archive member streams through their own sendfile() (see archive.py),
+plain files through socket.sendfile.
+"""
+
+import os
+import queue
+import selectors
+import socket
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from typing import Callable, List, Optional, Tuple
+from urllib.parse import unquote_to_bytes
+
+RECV_SIZE = 64 * 1024
+MAX_HEAD_BYTES = 64 * 1024
+DRAIN_LIMIT = 64 * 1024  # Unread request body discarded to keep a connection alive
+SERVER_NAME = "EduSeedbank"
+
+# Statuses whose responses never carry a body
+_NO_BODY = ("1", "204", "304")
+
+
+class BadRequest(Exception):
+    """The client sent something that is not a usable HTTP request."""
+
+
+class FileWrapper:
+    """wsgi.file_wrapper: marks a file-like body the server may sendfile."""
+
+    def __init__(self, filelike, block_size: int = RECV_SIZE):
+        self.filelike = filelike
+        self.block_size = block_size
+
+    def __iter__(self):
+        while True:
+            data = self.filelike.read(self.block_size)
+            if not data:
+                return
+            yield data
+
+    def close(self):
+        if hasattr(self.filelike, "close"):
+            self.filelike.close()
+
+
+class _Connection:
+    """A client socket plus the bytes received but not yet parsed."""
+
+    def __init__(self, sock: socket.socket, address):
+        self.sock = sock
+        self.address = address
+        self.buffer = bytearray()
+        self.last_active = time.monotonic()
+
+    def fill(self) -> bool:
+        data = self.sock.recv(RECV_SIZE)
+        if not data:
+            return False
+        self.buffer += data
+        return True
+
+    def read_head(self) -> Optional[bytes]:
+        """Request line and headers of the next request; None if the client hung up."""
+        while True:
+            # Some clients send a stray CRLF after a request body
+            while self.buffer[:2] == b"\r\n":
+                del self.buffer[:2]
+            end = self.buffer.find(b"\r\n\r\n")
+            if end >= 0:
+                head = bytes(self.buffer[:end])
+                del self.buffer[:end + 4]
+                return head
+            if len(self.buffer) > MAX_HEAD_BYTES:
+                raise BadRequest("Request headers too large")
+            if not self.fill():
+                if self.buffer:
+                    raise BadRequest("Connection closed inside request headers")
+                return None
+
+    def read(self, size: int) -> bytes:
+        if not self.buffer and not self.fill():
+            return b""
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    def readline(self, limit: int) -> bytes:
+        while b"\n" not in self.buffer and len(self.buffer) < limit:
+            if not self.fill():
+                break
+        end = self.buffer.find(b"\n")
+        end = min(limit, end + 1 if end >= 0 else len(self.buffer))
+        line = bytes(self.buffer[:end])
+        del self.buffer[:end]
+        return line
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class _Body:
+    """wsgi.input for a request with a Content-Length (or none)."""
+
+    def __init__(self, connection: _Connection, length: int, expect_continue: bool = False):
+        self.connection = connection
+        self.remaining = length
+        self._expect_continue = expect_continue
+
+    def _continue(self):
+        if self._expect_continue:
+            self._expect_continue = False
+            self.connection.sock.sendall(b"HTTP/1.1 100 Continue\r\n\r\n")
+
+    def read(self, size: int = -1) -> bytes:
+        self._continue()
+        if size is None or size < 0:
+            size = self.remaining
+        chunks = []
+        while size > 0 and self.remaining > 0:
+            data = self.connection.read(min(size, self.remaining))
+            if not data:
+                raise BadRequest("Connection closed inside request body")
+            chunks.append(data)
+            size -= len(data)
+            self.remaining -= len(data)
+        return b"".join(chunks)
+
+    def readline(self, size: int = -1) -> bytes:
+        self._continue()
+        limit = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        if limit <= 0:
+            return b""
+        line = self.connection.readline(limit)
+        self.remaining -= len(line)
+        return line
+
+    def readlines(self, hint: int = -1) -> List[bytes]:
+        return list(iter(self.readline, b""))
+
+    def __iter__(self):
+        return iter(self.readline, b"")
+
+    def drain(self) -> bool:
+        """Discard what the application left unread; False if that is too much to bother."""
+        if self._expect_continue:
+            return False  # The client is still waiting to be told to send it
+        if self.remaining > DRAIN_LIMIT:
+            return False
+        while self.remaining:
+            self.read(self.remaining)
+        return True
+
+
+class _ChunkedBody(_Body):
+    """wsgi.input for a request sent with Transfer-Encoding: chunked."""
+
+    def __init__(self, connection: _Connection, expect_continue: bool = False):
+        super().__init__(connection, 0, expect_continue)
+        self._done = False
+
+    def _next_chunk(self):
+        line = self.connection.readline(MAX_HEAD_BYTES)
+        try:
+            size = int(line.split(b";", 1)[0].strip(), 16)
+        except ValueError:
+            raise BadRequest("Bad chunk size")
+        if size == 0:
+            while self.connection.readline(MAX_HEAD_BYTES) not in (b"\r\n", b"\n", b""):
+                pass  # Trailers are ignored
+            self._done = True
+        self.remaining = size
+
+    def _end_chunk(self):
+        if not self._done and self.remaining == 0:
+            self.connection.readline(MAX_HEAD_BYTES)  # CRLF after the chunk data
+
+    def read(self, size: int = -1) -> bytes:
+        self._continue()
+        chunks = []
+        size = sys.maxsize if size is None or size < 0 else size
+        while size > 0 and not self._done:
+            if self.remaining == 0:
+                self._next_chunk()
+                continue
+            data = super().read(min(size, self.remaining))
+            chunks.append(data)
+            size -= len(data)
+            self._end_chunk()
+        return b"".join(chunks)
+
+    def readline(self, size: int = -1) -> bytes:
+        self._continue()
+        line = b""
+        size = sys.maxsize if size is None or size < 0 else size
+        while not line.endswith(b"\n") and len(line) < size and not self._done:
+            if self.remaining == 0:
+                self._next_chunk()
+                continue
+            line += super().readline(size - len(line))
+            self._end_chunk()
+        return line
+
+    def drain(self) -> bool:
+        if self._expect_continue:
+            return False
+        drained = 0
+        while not self._done:
+            drained += len(self.read(RECV_SIZE))
+            if drained > DRAIN_LIMIT:
+                return False
+        return True
+
+
+class WSGIServer:
+    """Serves a WSGI application with HTTP/1.1 keep-alive on a pool of worker threads."""
+
+    def __init__(self, app: Callable, host: str = "127.0.0.1", port: int = 8080, workers: int = 8,
+                 keepalive: float = 5.0, timeout: float = 30.0, backlog: int = 128):
+        """
+        Args:
+            app: WSGI application
+            host: Address to listen on
+            port: Port to listen on (0 picks a free one)
+            workers: Threads handling requests
+            keepalive: Seconds an idle connection is kept open
+            timeout: Seconds a worker waits on a stalled client
+            backlog: Pending connections queued by the kernel
+        """
+        self.app = app
+        self.workers = workers
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.socket = socket.create_server((host, port), backlog=backlog)
+        self.socket.setblocking(False)
+        self.host, self.port = self.socket.getsockname()[:2]
+        self._selector = selectors.DefaultSelector()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wsgi")
+        self._returned = queue.SimpleQueue()  # Keep-alive connections handed back by workers
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._idle = {}  # fd -> _Connection waiting for its next request
+        self._running = threading.Event()
+        self._stopped = threading.Event()
+        self._date = (0, "")
+
+    def serve_forever(self):
+        """Accept and serve connections until shutdown() is called."""
+        self._selector.register(self.socket, selectors.EVENT_READ, "accept")
+        self._selector.register(self._wake_r, selectors.EVENT_READ, "wake")
+        self._running.set()
+        try:
+            while self._running.is_set():
+                for key, _ in self._selector.select(timeout=1.0):
+                    if key.data == "accept":
+                        self._accept()
+                    elif key.data == "wake":
+                        self._take_returned()
+                    else:
+                        self._dispatch(key.data)
+                self._close_expired()
+        finally:
+            for connection in list(self._idle.values()):
+                self._forget(connection)
+                connection.close()
+            self._selector.close()
+            self._executor.shutdown(wait=True)
+            while not self._returned.empty():
+                self._returned.get_nowait().close()
+            self.socket.close()
+            self._wake_r.close()
+            self._wake_w.close()
+            self._stopped.set()
+
+    def shutdown(self):
+        """Stop serve_forever() and wait for requests in progress to finish."""
+        self._running.clear()
+        self._wake()
+        self._stopped.wait()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, address = self.socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(True)
+            sock.settimeout(self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._dispatch(_Connection(sock, address), registered=False)
+
+    def _dispatch(self, connection: _Connection, registered: bool = True):
+        if registered:
+            self._forget(connection)
+        self._executor.submit(self._serve, connection)
+
+    def _forget(self, connection: _Connection):
+        self._selector.unregister(connection.sock)
+        del self._idle[connection.sock.fileno()]
+
+    def _take_returned(self):
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        while True:
+            try:
+                connection = self._returned.get_nowait()
+            except queue.Empty:
+                return
+            self._idle[connection.sock.fileno()] = connection
+            self._selector.register(connection.sock, selectors.EVENT_READ, connection)
+
+    def _close_expired(self):
+        deadline = time.monotonic() - self.keepalive
+        for connection in [c for c in self._idle.values() if c.last_active < deadline]:
+            self._forget(connection)
+            connection.close()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass
+
+    def _serve(self, connection: _Connection):
+        """Worker: answer requests on a connection until it goes idle or closes."""
+        try:
+            while self._handle(connection):
+                if not connection.buffer:
+                    connection.last_active = time.monotonic()
+                    self._returned.put(connection)
+                    self._wake()
+                    return
+                # A pipelined request is already buffered; answer it now
+        except (OSError, BadRequest):
+            pass
+        connection.close()
+
+    def _handle(self, connection: _Connection) -> bool:
+        """Answer one request; returns whether the connection stays open."""
+        try:
+            head = connection.read_head()
+            if head is None:
+                return False
+            environ, body = self._environ(connection, head)
+        except BadRequest as e:
+            self._send_simple(connection, "400 Bad Request", str(e))
+            return False
+
+        protocol = environ["SERVER_PROTOCOL"]
+        connection_header = environ.get("HTTP_CONNECTION", "").lower()
+        if protocol == "HTTP/1.1":
+            keep_alive = "close" not in connection_header
+        else:
+            keep_alive = "keep-alive" in connection_header
+
+        response = _Response(self, connection, environ, keep_alive)
+        result = None
+        try:
+            result = self.app(environ, response.start_response)
+            response.send(result)
+        except (OSError, BadRequest):
+            raise
+        except Exception:
+            traceback.print_exc()
+            if response.headers_sent:
+                return False
+            self._send_simple(connection, "500 Internal Server Error", "Internal Server Error")
+            return False
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return response.keep_alive and self._running.is_set() and body.drain()
+
+    def _environ(self, connection: _Connection, head: bytes) -> Tuple[dict, _Body]:
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+            raise BadRequest(f"Bad request line: {lines[0]!r}")
+        method, target, protocol = parts
+        if "://" in target:
+            target = "/" + target.split("://", 1)[1].partition("/")[2]
+        path, _, query = target.partition("?")
+
+        environ = {
+            "REQUEST_METHOD": method,
+            "SCRIPT_NAME": "",
+            # PEP 3333: the path is decoded bytes, carried as latin-1 text
+            "PATH_INFO": unquote_to_bytes(path).decode("latin-1"),
+            "QUERY_STRING": query,
+            "SERVER_NAME": self.host,
+            "SERVER_PORT": str(self.port),
+            "SERVER_PROTOCOL": protocol,
+            "REMOTE_ADDR": connection.address[0],
+            "REMOTE_PORT": str(connection.address[1]),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+            "wsgi.file_wrapper": FileWrapper,
+        }
+        for line in lines[1:]:
+            name, colon, value = line.partition(":")
+            if not colon:
+                raise BadRequest(f"Bad header line: {line!r}")
+            name = name.strip().upper().replace("-", "_")
+            value = value.strip()
+            if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                environ[name] = value
+                continue
+            key = "HTTP_" + name
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+        expect_continue = environ.get("HTTP_EXPECT", "").lower() == "100-continue" and protocol == "HTTP/1.1"
+        if "chunked" in environ.get("HTTP_TRANSFER_ENCODING", "").lower():
+            body = _ChunkedBody(connection, expect_continue)
+            environ["wsgi.input_terminated"] = True
+            environ.pop("CONTENT_LENGTH", None)
+        else:
+            try:
+                length = int(environ.get("CONTENT_LENGTH") or 0)
+            except ValueError:
+                raise BadRequest("Bad Content-Length")
+            if length < 0:
+                raise BadRequest("Bad Content-Length")
+            body = _Body(connection, length, expect_continue)
+        environ["wsgi.input"] = body
+        return environ, body
+
+    def http_date(self) -> str:
+        now = int(time.time())
+        if self._date[0] != now:
+            self._date = (now, formatdate(now, usegmt=True))
+        return self._date[1]
+
+    def _send_simple(self, connection: _Connection, status: str, message: str):
+        body = message.encode("utf-8")
+        try:
+            connection.sock.sendall(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+        except OSError:
+            pass
+
+
+class _Response:
+    """start_response() and body writing for one request."""
+
+    def __init__(self, server: WSGIServer, connection: _Connection, environ: dict, keep_alive: bool):
+        self.server = server
+        self.sock = connection.sock
+        self.environ = environ
+        self.keep_alive = keep_alive
+        self.status = None
+        self.headers = None
+        self.headers_sent = False
+        self.chunked = False
+        self.content_length = None
+        self.has_body = environ["REQUEST_METHOD"] != "HEAD"
+
+    def start_response(self, status: str, headers: list, exc_info=None):
+        if exc_info:
+            try:
+                if self.headers_sent:
+                    raise exc_info[1].with_traceback(exc_info[2])
+            finally:
+                exc_info = None
+        elif self.status is not None:
+            raise AssertionError("start_response() called twice without exc_info")
+        self.status, self.headers = status, headers
+        return self.write
+
+    def _head(self) -> bytes:
+        if self.status is None:
+            raise AssertionError("Application returned before calling start_response()")
+        lines = [f"HTTP/1.1 {self.status}"]
+        names = set()
+        for name, value in self.headers:
+            lower = name.lower()
+            names.add(lower)
+            if lower == "content-length":
+                self.content_length = int(value)
+            elif lower == "connection":
+                if value.lower() == "close":
+                    self.keep_alive = False
+                continue
+            lines.append(f"{name}: {value}")
+        if self.status.startswith(_NO_BODY):
+            self.has_body = False
+        elif self.content_length is None and self.has_body:
+            if self.environ["SERVER_PROTOCOL"] == "HTTP/1.1":
+                self.chunked = True
+                lines.append("Transfer-Encoding: chunked")
+            else:
+                self.keep_alive = False  # The end of the body is the end of the connection
+        if "date" not in names:
+            lines.append(f"Date: {self.server.http_date()}")
+        if "server" not in names:
+            lines.append(f"Server: {SERVER_NAME}")
+        lines.append("Connection: keep-alive" if self.keep_alive else "Connection: close")
+        self.headers_sent = True
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    def write(self, data: bytes):
+        head = b"" if self.headers_sent else self._head()
+        if not self.has_body:
+            data = b""
+        elif self.chunked and data:
+            data = b"%x\r\n%b\r\n" % (len(data), data)
+        if head or data:
+            self.sock.sendall(head + data)
+
+    def send(self, result):
+        if isinstance(result, FileWrapper) and self._sendfile(result):
+            return
+        for data in result:
+            if data:
+                self.write(data)
+        if not self.headers_sent:
+            self.write(b"")
+        if self.chunked:
+            self.sock.sendall(b"0\r\n\r\n")
+
+    def _sendfile(self, wrapper: FileWrapper) -> bool:
+        """Send a wrapped file with sendfile if both ends allow it; False to fall back to reading."""
+        filelike = wrapper.filelike
+        if hasattr(filelike, "sendfile"):
+            send = filelike.sendfile
+        elif hasattr(filelike, "fileno") and hasattr(filelike, "tell"):
+            try:
+                offset = filelike.tell()
+                os.fstat(filelike.fileno())
+            except (OSError, ValueError):
+                return False
+            send = lambda sock: sock.sendfile(filelike, offset, self.content_length)
+        else:
+            return False
+        head = self._head()
+        if self.chunked or not self.has_body:
+            # Without a length sendfile cannot frame the body; HEAD has none to send
+            self.sock.sendall(head)
+            if self.has_body:
+                for data in wrapper:
+                    self.write(data)
+                self.sock.sendall(b"0\r\n\r\n")
+            return True
+        self.sock.sendall(head)
+        send(self.sock)
+        return True
@@ -0,0 +1,60 @@
+"""
+Tests for EduSeedbank benchmark suite.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from click.testing import CliRunner
+
+from eduseedbank.bench import compare, run_benchmarks
+from eduseedbank.cli.main import main
+
+NAMES = {"seed_save", "seed_read", "html_render", "dissemination_events", "dissemination_airtime",
+         "lora_transfer", "lora_transfer_airtime", "server_requests"}
+
+
+def test_quick_run_reports_every_subsystem():
+    """Test that a small run measures each subsystem and produces a JSON-ready report."""
+    report = json.loads(json.dumps(run_benchmarks(scale=0.01, repeat=1)))
+    assert {result["name"] for result in report["results"]} == NAMES
+    assert all(result["value"] > 0 for result in report["results"])
+    assert report["environment"]["python"] and report["settings"]["scale"] == 0.01
+
+
+def test_compare_flags_regressions_in_the_right_direction():
+    """Test that a drop in a rate or a rise in a cost beyond the tolerance is a regression."""
+    baseline = {"results": [{"name": "rate", "value": 100.0, "unit": "op/s", "higher_is_better": True},
+                            {"name": "cost", "value": 10.0, "unit": "s", "higher_is_better": False},
+                            {"name": "gone", "value": 1.0, "unit": "s", "higher_is_better": False}]}
+    report = {"results": [{"name": "rate", "value": 95.0, "unit": "op/s", "higher_is_better": True},
+                          {"name": "cost", "value": 12.0, "unit": "s", "higher_is_better": False},
+                          {"name": "new", "value": 1.0, "unit": "s", "higher_is_better": False}]}
+    comparisons = {item.name: item for item in compare(baseline, report, tolerance=0.1)}
+    assert not comparisons["rate"].regressed and round(comparisons["rate"].change, 2) == -0.05
+    assert comparisons["cost"].regressed and round(comparisons["cost"].change, 2) == -0.2
+    assert comparisons["gone"].current is None and comparisons["new"].baseline is None
+    assert not comparisons["gone"].regressed and not comparisons["new"].regressed
+
+
+def test_bench_command_writes_report_and_fails_on_regression():
+    """Test that `bench --compare` exits non-zero against a much faster baseline."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "baseline.json")
+        runner = CliRunner()
+        result = runner.invoke(main, ["bench", "--only", "html", "--scale", "0.01", "--repeat", "1",
+                                      "--output", path])
+        assert result.exit_code == 0 and "html_render" in result.output
+        with open(path) as f:
+            baseline = json.load(f)
+        baseline["results"][0]["value"] *= 100
+        with open(path, "w") as f:
+            json.dump(baseline, f)
+        result = runner.invoke(main, ["bench", "--only", "html", "--scale", "0.01", "--repeat", "1",
+                                      "--compare", path])
+        assert result.exit_code == 1 and "REGRESSION" in result.output
@@ -0,0 +1,116 @@
+"""
+Tests for EduSeedbank relay chunk caching.
+"""
+
+import os
+import sys
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.cache import ChunkCache, RelayCache, simulate_relay_caching
+from eduseedbank.network.lora import LoRaNetwork, LoRaNode, Message, MessageType
+from eduseedbank.network.topology import line
+from eduseedbank.network.transfer import TransferManager
+
+
+def _make_chain():
+    """gateway - relay - school1, plus school2 hanging off the relay."""
+    network = LoRaNetwork()
+    network.multi_hop = True
+    nodes = {name: LoRaNode(name, is_gateway=name == "gateway", verbose=False)
+             for name in ("gateway", "relay", "school1", "school2")}
+    for node in nodes.values():
+        network.add_node(node)
+    nodes["gateway"].connected_nodes = [nodes["relay"]]
+    nodes["relay"].connected_nodes = [nodes["gateway"], nodes["school1"], nodes["school2"]]
+    nodes["school1"].connected_nodes = [nodes["relay"]]
+    nodes["school2"].connected_nodes = [nodes["relay"]]
+    nodes["gateway"].store_seed("lesson", {"title": "Lesson", "body": "x" * 2000})
+    return network, nodes
+
+
+def test_relay_answers_repeat_request_from_cache():
+    """Test that a second school behind a relay is served without reaching the gateway."""
+    network, nodes = _make_chain()
+    relay_cache = RelayCache(nodes["relay"], capacity_bytes=64 * 1024)
+    for name in ("school1", "school2"):
+        TransferManager(nodes[name], chunk_size=100, window=8)
+
+    nodes["school1"].transfers.request("lesson", "gateway")
+    assert relay_cache.chunks_served == 0
+
+    reached_gateway = []
+    receive = nodes["gateway"].receive_message
+    nodes["gateway"].receive_message = lambda message: (reached_gateway.append(message), receive(message))
+    nodes["school2"].transfers.request("lesson", "gateway")
+
+    assert nodes["school2"].seed_storage["lesson"] == nodes["gateway"].seed_storage["lesson"]
+    assert relay_cache.chunks_served > 0
+    assert reached_gateway == []
+
+
+def test_relay_answers_in_its_own_name():
+    """Test that cached chunks come from the relay, naming the gateway as the holder to ask next."""
+    network, nodes = _make_chain()
+    RelayCache(nodes["relay"], capacity_bytes=64 * 1024)
+    TransferManager(nodes["school1"], chunk_size=100, window=8)
+    TransferManager(nodes["school2"], chunk_size=100, window=8)
+    nodes["school1"].transfers.request("lesson", "gateway")
+
+    chunks = []
+    receive = nodes["school2"].receive_message
+    nodes["school2"].receive_message = lambda message: (chunks.append(message), receive(message))
+    nodes["school2"].transfers.request("lesson", "gateway")
+
+    assert chunks and {(m.source, m.payload["holder"]) for m in chunks} == {("relay", "gateway")}
+    assert nodes["school2"].transfers.completed == ["lesson"]
+
+
+def test_only_nodes_on_the_route_forward():
+    """Test that a neighbour hearing a frame meant for another node handles it instead of relaying it."""
+    network = LoRaNetwork()
+    nodes = {name: LoRaNode(name, verbose=False) for name in ("gateway", "school1", "school2")}
+    for node in nodes.values():
+        network.add_node(node)
+    nodes["gateway"].connected_nodes = [nodes["school1"], nodes["school2"]]
+    routed = []
+    network.link_filter = lambda message: routed.append(message) or True
+
+    nodes["gateway"].broadcast_message(Message(MessageType.SEED_DATA, "gateway", "school1",
+                                               {"seed_id": "lesson", "seed_data": {"title": "Lesson"}}, 0))
+    assert routed == []
+    assert "lesson" in nodes["school1"].seed_storage and "lesson" in nodes["school2"].seed_storage
+
+    _, chain = _make_chain()
+    forwarded = []
+    chain["school2"].send_message = forwarded.append
+    chain["relay"].send_message = forwarded.append
+    message = Message(MessageType.NETWORK_PONG, "school1", "gateway", {}, 0)
+    chain["school2"].receive_message(message)
+    chain["relay"].receive_message(message)
+    assert forwarded == [message]
+
+
+def test_lfu_da_keeps_popular_seed():
+    """Test that LFU-DA evicts a one-off seed before a frequently requested one."""
+    cache = ChunkCache(capacity_bytes=300, policy="lfu-da")
+    for _ in range(5):
+        cache.record_request("popular")
+    cache.put(("popular", "d", 100, 0), b"p" * 100)
+    cache.put(("rare", "d", 100, 0), b"r" * 100)
+    cache.put(("rare", "d", 100, 1), b"r" * 100)
+    cache.put(("new", "d", 100, 0), b"n" * 100)
+
+    assert ("popular", "d", 100, 0) in cache
+    assert cache.used_bytes <= 300
+    assert cache.evictions == 1
+
+
+def test_simulation_reports_airtime_saved():
+    """Test that relay caching saves airtime on a Zipf workload along a line."""
+    report = simulate_relay_caching(lambda: line(6).to_network(), requests=40,
+                                    catalog=5, seed_bytes=500)
+    assert report.chunks_from_cache > 0
+    assert 0 < report.hit_ratio <= 1
+    assert report.airtime_with_cache < report.airtime_without_cache
@@ -0,0 +1,53 @@
+"""
+Tests for EduSeedbank command-line interface startup.
+"""
+
+import os
+import subprocess
+import sys
+
+# Add src to path so we can import our modules
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+sys.path.insert(0, SRC)
+
+from click.testing import CliRunner
+
+from eduseedbank.cli.main import COMMANDS, main
+
+# Import time the CLI may add to click's own before `--help` is shown
+STARTUP_BUDGET_MS = 25
+HEAVY_MODULES = ("flask", "werkzeug", "sqlalchemy", "eduseedbank.server", "eduseedbank.network",
+                 "eduseedbank.compression", "eduseedbank.packaging")
+
+
+def _import_times(*args):
+    """{module: self import time in microseconds} of `python -X importtime <args>`."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], capture_output=True, text=True,
+                            env=dict(os.environ, PYTHONPATH=os.path.abspath(SRC)), check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            times[name.strip()] = int(self_us)
+    return times
+
+
+def test_commands_are_listed_and_loaded_on_demand():
+    """Test that --help lists every command and a command's module loads only when it is used."""
+    result = CliRunner().invoke(main, ["--help"])
+    assert result.exit_code == 0
+    assert all(name in result.output for name in COMMANDS)
+
+    times = _import_times("-m", "eduseedbank.cli.main", "create-package", "--help")
+    assert "eduseedbank.cli.content" in times and "eduseedbank.cli.server" not in times
+    assert [name for name in times if name.startswith(HEAVY_MODULES)] == []
+
+
+def test_help_starts_within_budget():
+    """Test that `create-package --help` imports little beyond click itself."""
+    click_us = min(sum(_import_times("-c", "import click").values()) for _ in range(3))
+    cli_us = min(sum(_import_times("-m", "eduseedbank.cli.main", "create-package", "--help").values())
+                 for _ in range(3))
+    assert (cli_us - click_us) / 1000 < STARTUP_BUDGET_MS
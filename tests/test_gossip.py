@@ -0,0 +1,59 @@
+"""
+Tests for EduSeedbank gossip-based seed dissemination.
+"""
+
+import os
+import sys
+import random
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.gossip import BloomFilter, GossipAgent, build_random_mesh, run_gossip
+from eduseedbank.network.lora import LoRaNetwork, LoRaNode
+
+
+def test_bloom_filter_roundtrip():
+    """Test that a serialized Bloom filter keeps every added item."""
+    bloom = BloomFilter.for_capacity(100, fp_rate=0.01, salt=7)
+    for i in range(100):
+        bloom.add(f"seed{i}")
+
+    restored = BloomFilter.from_payload(bloom.to_payload())
+    assert all(f"seed{i}" in restored for i in range(100))
+
+
+def test_gossip_pulls_only_missing_seeds():
+    """Test that a node requests only the seeds it lacks."""
+    network = LoRaNetwork()
+    gateway = LoRaNode("gateway", is_gateway=True, verbose=False)
+    school = LoRaNode("school1", verbose=False)
+    network.add_node(gateway)
+    network.add_node(school)
+    gateway.connect_to_node(school)
+    school.connect_to_node(gateway)
+
+    gateway.store_seed("shared", {"title": "Shared"})
+    gateway.store_seed("new", {"title": "New"})
+    school.store_seed("shared", {"title": "Shared"})
+
+    GossipAgent(gateway)
+    agent = GossipAgent(school)
+    agent.gossip_round(1)
+
+    assert set(school.seed_storage) == {"shared", "new"}
+    assert list(agent.pending) == ["new"]
+
+
+def test_gossip_converges_on_random_mesh():
+    """Test that every node ends up with every seed."""
+    rng = random.Random(1)
+    network = build_random_mesh(30, rng=rng)
+    nodes = list(network.nodes.values())
+    for i in range(5):
+        rng.choice(nodes).store_seed(f"seed{i}", {"title": f"Seed {i}"})
+
+    result = run_gossip(network, rng=rng)
+    assert result.converged
+    assert all(len(node.seed_storage) == 5 for node in nodes)
+    assert result.control_bytes > 0
@@ -0,0 +1,80 @@
+"""
+Tests for EduSeedbank server metrics.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import zipfile
+from io import BytesIO
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.server.local_server import LocalServer
+from eduseedbank.server.metrics import MetricsRegistry
+
+
+def _samples(text):
+    """{"name{labels}": value} of a Prometheus text exposition."""
+    return {line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+            for line in text.splitlines() if line and not line.startswith("#")}
+
+
+def test_sharded_metrics_add_up_across_threads():
+    """Test that counts from many (also finished) threads are all in the rendered totals."""
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.01, 0.1))
+
+    def work():
+        for _ in range(1000):
+            requests.inc("/api/seeds")
+            latency.observe(0.05)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latency.observe(0.001)
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    samples = _samples(text)
+    assert samples['requests_total{route="/api/seeds"}'] == 8000
+    assert samples['latency_seconds_bucket{le="0.01"}'] == 1
+    assert samples['latency_seconds_bucket{le="0.1"}'] == 8001
+    assert samples['latency_seconds_bucket{le="+Inf"}'] == samples["latency_seconds_count"] == 8001
+
+
+def test_server_metrics_endpoint():
+    """Test that /metrics reports route latencies, bytes, cache counts and planting durations."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server = LocalServer(content_dir=os.path.join(temp_dir, "content"))
+        client = server.app.test_client()
+        archive = BytesIO()
+        with zipfile.ZipFile(archive, "w") as zipf:
+            zipf.writestr("index.html", b"<p>padi</p>" * 100, compress_type=zipfile.ZIP_DEFLATED)
+        response = client.put("/api/seeds/padi/archive", data=archive.getvalue())
+        server.planting.wait(response.get_json()["job_id"], timeout=10)
+        for _ in range(3):
+            client.get("/content/padi/index.html")
+        client.get("/content/padi/missing.html")
+
+        response = client.get("/metrics")
+        assert response.mimetype == "text/plain"
+        samples = _samples(response.get_data(as_text=True))
+        route = "/content/<seed_id>/<path:member>"
+        assert samples[f'eduseedbank_http_requests_total{{route="{route}",method="GET",status="200"}}'] == 3
+        assert samples[f'eduseedbank_http_requests_total{{route="{route}",method="GET",status="404"}}'] == 1
+        assert samples[f'eduseedbank_http_request_duration_seconds_count{{route="{route}"}}'] == 4
+        assert samples[f'eduseedbank_http_response_bytes_total{{route="{route}"}}'] >= 3 * 1100
+        assert samples["eduseedbank_response_cache_hits_total"] == 2
+        assert samples["eduseedbank_response_cache_misses_total"] == 1
+        assert samples['eduseedbank_planting_job_duration_seconds_count{state="planted"}'] == 1
+        assert samples["eduseedbank_registry_seeds"] == 1
+        assert samples["eduseedbank_registry_database_bytes"] > 0
+        assert samples["eduseedbank_http_requests_in_flight"] == 1  # The scrape itself
+        server.close()
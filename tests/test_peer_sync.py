@@ -0,0 +1,136 @@
+"""
+Tests for EduSeedbank LAN peer sync.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.server.archive import SeedArchive
+from eduseedbank.server.local_server import LocalServer
+from eduseedbank.server.peer_sync import plan_ranges
+from eduseedbank.server.wsgi import WSGIServer
+
+VIDEO = random.Random(0).getrandbits(8 * 256 * 1024).to_bytes(256 * 1024, "little")
+
+
+def _make_archive(path, page):
+    with zipfile.ZipFile(path, "w") as zipf:
+        zipf.writestr("metadata.json", '{"title": "Padi"}')
+        zipf.writestr("index.html", page, compress_type=zipfile.ZIP_DEFLATED)
+        zipf.writestr("video.mp4", VIDEO)
+    return path
+
+
+def _serve(directory, name):
+    local = LocalServer(content_dir=os.path.join(directory, name))
+    httpd = WSGIServer(local.app, "127.0.0.1", 0, workers=4)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return local, httpd
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_plan_ranges_copies_unchanged_members():
+    """Test that only members missing locally are fetched, and the plan covers the whole file."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        old = SeedArchive(_make_archive(os.path.join(temp_dir, "old.seed"), b"<p>lama</p>"))
+        new = SeedArchive(_make_archive(os.path.join(temp_dir, "new.seed"), b"<p>baru</p>" * 50))
+        copies, fetches = plan_ranges(new.size, list(new.members.values()), old, range_size=64 * 1024)
+        video = new.members["video.mp4"]
+        assert copies == [(video.offset, video.compressed_size, old.members["video.mp4"].offset)]
+        assert sum(length for _, length in fetches) == new.size - video.compressed_size
+        assert all(length <= 64 * 1024 for _, length in fetches)
+        spans = sorted([(offset, length) for offset, length, _ in copies] + fetches)
+        assert spans[0][0] == 0 and all(a + n == b for (a, n), (b, _) in zip(spans, spans[1:]))
+
+        _, everything = plan_ranges(new.size, list(new.members.values()), None)
+        assert sum(length for _, length in everything) == new.size
+
+
+def test_sync_pulls_missing_seeds_then_deltas():
+    """Test that a sync pulls a missing seed, then only the changed bytes of a replanted one."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        (origin, origin_http), (school, school_http) = _serve(temp_dir, "origin"), _serve(temp_dir, "school")
+        sync = school.start_peer_sync(school_http.port, discovery_port=random.randint(40000, 60000),
+                                      broadcast_address="127.255.255.255", interval=3600)
+        try:
+            source = _make_archive(os.path.join(temp_dir, "padi.seed"), b"<p>Menanam padi</p>")
+            origin.plant_archive(source)
+            report = sync.sync_with("127.0.0.1", origin_http.port)
+            assert report.pulled == ["padi"] and report.bytes_reused == 0
+            assert school.seeds["padi"] == {"title": "Padi"}
+            assert _read(school.get_archive("padi").path) == _read(origin.get_archive("padi").path)
+            assert sync.sync_with("127.0.0.1", origin_http.port).pulled == []
+
+            time.sleep(0.01)  # A later planting time than the first version
+            origin.plant_archive(_make_archive(source, b"<p>Menanam padi di sawah</p>"))
+            report = sync.sync_with("127.0.0.1", origin_http.port)
+            assert report.pulled == ["padi"] and not report.failed
+            assert report.bytes_reused == len(VIDEO) and report.bytes_fetched < 1024
+            assert _read(school.get_archive("padi").path) == _read(origin.get_archive("padi").path)
+            assert school.registry.inventory() == origin.registry.inventory()
+        finally:
+            school.close()
+            origin_http.shutdown()
+            school_http.shutdown()
+
+
+def test_servers_discover_each_other_and_converge():
+    """Test that servers found by broadcast pull a newly planted seed without being asked."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        port = random.randint(40000, 60000)
+        servers = [_serve(temp_dir, name) for name in ("a", "b", "c")]
+        for local, httpd in servers:
+            local.start_peer_sync(httpd.port, discovery_port=port, broadcast_address="127.255.255.255",
+                                  announce_interval=0.5)
+        try:
+            servers[0][0].plant_archive(_make_archive(os.path.join(temp_dir, "padi.seed"), b"<p>Padi</p>"))
+            deadline = time.time() + 10
+            while not all("padi" in local.seeds for local, _ in servers) and time.time() < deadline:
+                time.sleep(0.01)
+            assert all("padi" in local.seeds for local, _ in servers)
+            assert len(servers[1][0].peer_sync.discovery.peers()) == 2
+        finally:
+            for local, httpd in servers:
+                local.close()
+                httpd.shutdown()
+
+
+def test_failed_pull_leaves_no_temporary_files(monkeypatch):
+    """Test that pulls work without os.pwrite and that any error in a transfer is reported and cleaned up."""
+    monkeypatch.delattr(os, "pwrite", raising=False)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        (origin, origin_http), (school, school_http) = _serve(temp_dir, "origin"), _serve(temp_dir, "school")
+        sync = school.start_peer_sync(school_http.port, discovery_port=random.randint(40000, 60000),
+                                      broadcast_address="127.255.255.255", interval=3600)
+        try:
+            source = _make_archive(os.path.join(temp_dir, "padi.seed"), b"<p>Menanam padi</p>")
+            origin.plant_archive(source)
+            assert sync.sync_with("127.0.0.1", origin_http.port).pulled == ["padi"]
+            assert _read(school.get_archive("padi").path) == _read(origin.get_archive("padi").path)
+
+            def broken(*args):
+                raise RuntimeError("disk full")
+
+            time.sleep(0.01)
+            origin.plant_archive(_make_archive(source, b"<p>Menanam padi di sawah</p>"))
+            monkeypatch.setattr(sync, "_fetch", broken)
+            report = sync.sync_with("127.0.0.1", origin_http.port)
+            assert report.failed == {"padi": "disk full"} and report.pulled == []
+            assert os.listdir(sync.download_dir) == []
+            assert school.get_archive("padi").digest != origin.get_archive("padi").digest
+        finally:
+            school.close()
+            origin_http.shutdown()
+            school_http.shutdown()
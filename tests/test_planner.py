@@ -0,0 +1,89 @@
+"""
+Tests for EduSeedbank gateway broadcast planning.
+"""
+
+import os
+import sys
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.lora import LoRaNetwork, LoRaNode, Message, MessageType
+from eduseedbank.network.planner import BROADCAST_STEP, RELAY, BroadcastPlanner
+
+
+def _make_star():
+    """gateway - relay, with three schools around the relay."""
+    network = LoRaNetwork()
+    names = ["gateway", "relay", "school1", "school2", "school3"]
+    nodes = {name: LoRaNode(name, is_gateway=name == "gateway", verbose=False) for name in names}
+    for node in nodes.values():
+        network.add_node(node)
+
+    def link(a, b):
+        nodes[a].connect_to_node(nodes[b])
+        nodes[b].connect_to_node(nodes[a])
+
+    link("gateway", "relay")
+    for school in names[2:]:
+        link("relay", school)
+    nodes["gateway"].store_seed("lesson", {"title": "Lesson", "body": "x" * 1000})
+    return network, nodes
+
+
+def test_shared_neighbourhood_gets_one_broadcast():
+    """Test that schools behind one relay are served by a single relayed broadcast."""
+    network, nodes = _make_star()
+    planner = BroadcastPlanner(nodes["gateway"], region=None)
+    for school in ("school1", "school2", "school3"):
+        nodes[school].send_message(Message(MessageType.SEED_REQUEST, school, "gateway",
+                                           {"seed_id": "lesson"}, 0))
+    assert len(planner.pending) == 3
+    assert "lesson" not in nodes["school1"].seed_storage
+
+    schedule = planner.flush(now=0.0)
+    assert [(t.node, t.kind) for t in schedule.transmissions] == [("gateway", RELAY), ("relay", BROADCAST_STEP)]
+    assert sorted(schedule.transmissions[1].covers) == ["school1", "school2", "school3"]
+    assert schedule.airtime < schedule.baseline_airtime
+    for school in ("school1", "school2", "school3"):
+        assert nodes[school].seed_storage["lesson"] == nodes["gateway"].seed_storage["lesson"]
+    assert planner.pending == []
+
+
+def test_schedule_respects_duty_cycle():
+    """Test that a transmission longer than the hourly budget is spread over hours."""
+    _, nodes = _make_star()
+    planner = BroadcastPlanner(nodes["gateway"], duty_cycle=0.0005)
+    schedule = planner.plan([("relay", "lesson")], now=0.0)
+
+    step = schedule.transmissions[0]
+    assert step.airtime > 0.0005 * 3600
+    assert step.end - step.start > 3600
+
+
+def test_unknown_requester_is_reported():
+    """Test that requests the planner cannot route are listed as unserved."""
+    _, nodes = _make_star()
+    planner = BroadcastPlanner(nodes["gateway"], region=None)
+    schedule = planner.plan([("nowhere", "lesson"), ("school1", "lesson")], now=0.0)
+    assert schedule.unserved == [("nowhere", "lesson")]
+    assert len(schedule.transmissions) == 2
+    assert [c for t in schedule.transmissions for c in t.covers] == ["school1"]
+
+
+def test_one_way_link_does_not_stall_the_cover():
+    """Test that a link only the requester hears across is not counted as covering it."""
+    network = LoRaNetwork()
+    nodes = {name: LoRaNode(name, is_gateway=name == "gateway", verbose=False)
+             for name in ("gateway", "relay", "school")}
+    for node in nodes.values():
+        network.add_node(node)
+    for a, b in (("gateway", "relay"), ("relay", "school")):
+        nodes[a].connect_to_node(nodes[b])
+        nodes[b].connect_to_node(nodes[a])
+    nodes["school"].connect_to_node(nodes["gateway"])  # The gateway cannot reach the school back
+    nodes["gateway"].store_seed("a", {"title": "A"})
+
+    schedule = BroadcastPlanner(nodes["gateway"], region=None).plan([("school", "a")], now=0.0)
+    assert [(t.node, t.kind) for t in schedule.transmissions] == [("gateway", RELAY), ("relay", BROADCAST_STEP)]
+    assert schedule.transmissions[1].covers == ["school"]
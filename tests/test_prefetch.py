@@ -0,0 +1,112 @@
+"""
+Tests for EduSeedbank curriculum-aware prefetching.
+"""
+
+import os
+import sys
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.lora import LoRaNetwork, LoRaNode, MessageType
+from eduseedbank.network.prefetch import (
+    CalendarEntry, PrefetchPlanner, PrefetchScheduler, TermCalendar, simulate_prefetch
+)
+from eduseedbank.network.scheduler import BACKGROUND
+from eduseedbank.network.transfer import TransferManager
+
+CATALOG = {
+    "fotosintesis": {"title": "Fotosintesis pada daun", "subject": "IPA", "curriculum": "K13"},
+    "fotosintesis-lama": {"title": "Fotosintesis", "subject": "IPA", "curriculum": "KTSP"},
+    "pecahan": {"title": "Pecahan sederhana", "subject": "Matematika", "curriculum": "K13",
+                "body": "x" * 3000},
+    "irigasi": {"title": "Irigasi sawah", "subject": "Pertanian", "curriculum": "K13",
+                "topics": ["air", "irigasi"]},
+}
+
+
+def _calendar() -> TermCalendar:
+    return TermCalendar.from_dict({"start": 0, "week_seconds": 100, "weeks": {
+        "1": [{"subject": "IPA", "topic": "fotosintesis"}],
+        "2": [{"subject": "Pertanian", "topic": "irigasi sawah"}, {"subject": "Matematika", "topic": "pecahan"}],
+        "5": [{"subject": "IPA", "topic": "gempa bumi"}],
+    }})
+
+
+def test_planner_orders_by_week_and_respects_budget():
+    """Test that the plan follows the calendar, the curriculum and the storage budget."""
+    calendar = _calendar()
+    assert calendar.week_at(150) == 2
+    assert [entry.week for entry in calendar.upcoming(50, 1)] == [1, 2, 2]
+
+    planner = PrefetchPlanner(calendar, CATALOG, curriculum="K13", budget_bytes=10**6, lookahead_weeks=1)
+    assert [c.seed_id for c in planner.plan(50)] == ["fotosintesis", "irigasi", "pecahan"]
+    # Already held seeds are skipped, and the large seed no longer fits a small budget
+    planner.budget_bytes = 1000
+    assert [c.seed_id for c in planner.plan(50, held={"fotosintesis"})] == ["irigasi"]
+
+
+def _make_school():
+    network = LoRaNetwork()
+    gateway = LoRaNode("gateway", is_gateway=True, verbose=False)
+    school = LoRaNode("school1", verbose=False)
+    network.add_node(gateway)
+    network.add_node(school)
+    for seed_id, seed in CATALOG.items():
+        gateway.store_seed(seed_id, seed)
+    manager = TransferManager(school, chunk_size=100, window=None)
+    planner = PrefetchPlanner(_calendar(), CATALOG, curriculum="K13", lookahead_weeks=1)
+    return network, school, manager, PrefetchScheduler(school, planner, "gateway")
+
+
+def test_scheduler_prefetches_in_background_only_when_idle():
+    """Test that prefetches ask for the background class and wait while the node is busy."""
+    network, school, manager, prefetcher = _make_school()
+    requests = []
+    network.link_filter = lambda message: requests.append(message) or True
+
+    manager.partials["busy"] = object()
+    assert prefetcher.tick(50) is None
+    del manager.partials["busy"]
+
+    assert prefetcher.tick(50) == "fotosintesis"
+    assert "fotosintesis" in school.seed_storage
+    request = next(m for m in requests if m.msg_type == MessageType.SEED_REQUEST)
+    assert request.payload["priority"] == BACKGROUND
+    assert all(m.payload["priority"] == BACKGROUND for m in requests if m.msg_type == MessageType.SEED_CHUNK)
+
+    prefetcher.tick(50)
+    prefetcher.tick(50)
+    assert prefetcher.fetched == ["fotosintesis", "irigasi"]
+    # Seeds of past weeks are dropped to make room again
+    prefetcher.tick(450)
+    assert "fotosintesis" not in school.seed_storage
+
+
+def test_demand_promotes_a_running_prefetch():
+    """Test that a teacher's request for a seed being prefetched leaves the background class."""
+    network, school, manager, prefetcher = _make_school()
+    requests = []
+    network.link_filter = lambda message: requests.append(message) or message.msg_type != MessageType.SEED_CHUNK
+    assert prefetcher.tick(50) == "fotosintesis"
+    assert manager.priorities["fotosintesis"] == BACKGROUND
+
+    prefetcher.demand("fotosintesis")
+    assert prefetcher.in_flight is None and "fotosintesis" not in manager.priorities
+    assert "priority" not in requests[-1].payload
+
+    # A prefetch that gets no new chunk for retry_after seconds is given up and asked for again
+    prefetcher = PrefetchScheduler(school, prefetcher.planner, "gateway", retry_after=30)
+    assert prefetcher.tick(50) == "fotosintesis"
+    assert prefetcher.tick(70) is None
+    assert prefetcher.tick(80) == "fotosintesis" and prefetcher.in_flight[1] == 80
+
+
+def test_simulated_prefetch_removes_on_demand_latency():
+    """Test that prefetching cuts latency for calendar lessons within the budget."""
+    report = simulate_prefetch(weeks=4, lessons_per_week=2, extra_seeds=5, seed_bytes=2000,
+                               budget_bytes=16 * 1024)
+    assert report.served_from_prefetch > 0
+    assert report.mean_latency_with < report.mean_latency_without
+    assert 0 < report.latency_removed <= 1
+    assert report.peak_prefetch_bytes <= 16 * 1024
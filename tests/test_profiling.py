@@ -0,0 +1,65 @@
+"""
+Tests for EduSeedbank profiling hooks.
+"""
+
+import os
+import pstats
+import sys
+import tempfile
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from click.testing import CliRunner
+
+from eduseedbank import profiling
+from eduseedbank.cli.main import main
+
+
+@profiling.traced("test.work")
+def _work(size):
+    return [0] * size
+
+
+def test_spans_record_only_while_enabled():
+    """Test that spans cost no records while off and total calls, time and allocations while on."""
+    profiling.reset()
+    _work(10)
+    with profiling.span("test.block"):
+        pass
+    assert profiling.summary() == {}
+
+    profiling.enable(allocations=True)
+    try:
+        kept = [_work(100000) for _ in range(3)]
+        with profiling.span("test.block"):
+            _work(10)
+    finally:
+        profiling.disable()
+    stats = profiling.summary()
+    profiling.reset()
+    assert stats["test.work"].calls == 4 and stats["test.block"].calls == 1
+    assert stats["test.work"].wall > 0 and stats["test.work"].cpu >= 0
+    # Net bytes: garbage freed while a span runs is subtracted, so allow some slack
+    assert stats["test.work"].allocated >= 0.9 * 3 * 100000 * 8 and len(kept) == 3
+    assert "test.work" in profiling.format_summary(stats)
+
+
+def test_cli_profile_and_span_options():
+    """Test that --profile writes pstats or collapsed stacks and --spans prints the stage summary."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        page = os.path.join(temp_dir, "padi.html")
+        command = ["create-html", "--title", "Padi", "--content", "<p>Sawah</p>", "--output", page]
+        profile = os.path.join(temp_dir, "run.pstats")
+        result = CliRunner().invoke(main, ["--profile", profile, "--spans"] + command)
+        assert result.exit_code == 0 and "packaging.render_page" in result.output
+        assert any(name == "create_interactive_page" for _, _, name in pstats.Stats(profile).stats)
+        assert not profiling.enabled()
+
+        collapsed = os.path.join(temp_dir, "run.folded")
+        result = CliRunner().invoke(main, ["--profile", collapsed, "--profile-format", "collapsed",
+                                           "simulate-network"])
+        assert result.exit_code == 0
+        with open(collapsed) as f:
+            lines = f.read().splitlines()
+        assert all(";" in line and line.rsplit(" ", 1)[1].isdigit() for line in lines)
@@ -0,0 +1,101 @@
+"""
+Tests for EduSeedbank student progress tracking.
+"""
+
+import os
+import sys
+import tempfile
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import OperationalError
+
+from eduseedbank.packaging.html_generator import HTMLGenerator
+from eduseedbank.server.local_server import LocalServer
+from eduseedbank.server.progress import ProgressTracker, events_table, parse_event
+
+
+def test_events_are_written_in_batches():
+    """Test that buffered events reach SQLite in one transaction per batch."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(temp_dir, 'progress.db')}")
+        tracker = ProgressTracker(engine, flush_interval=60, batch_size=1000)
+        for index in range(250):
+            tracker.record(parse_event({"student_id": f"s{index % 25}", "seed_id": "padi"}))
+        assert tracker.pending == 250 and tracker.transactions == 0
+
+        summary = tracker.lesson_summary("padi")
+        assert summary["students"] == 25 and summary["page_views"] == 250
+        assert tracker.transactions == 1 and tracker.written == 250
+        tracker.close()
+        engine.dispose()
+
+
+def test_failed_batch_is_retried_in_order():
+    """Test that a batch the database refused stays buffered ahead of newer events and is written later."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(temp_dir, 'progress.db')}")
+        tracker = ProgressTracker(engine, flush_interval=60, batch_size=1000)
+        tracker.record(parse_event({"student_id": "ani", "seed_id": "padi", "at": 1}))
+        events_table.drop(engine)
+        with pytest.raises(OperationalError):
+            tracker.flush()
+        tracker.record(parse_event({"student_id": "budi", "seed_id": "padi", "at": 2}))
+        assert tracker.pending == 2 and tracker.written == 0
+
+        events_table.create(engine)
+        assert tracker.flush() == 2
+        with engine.connect() as conn:
+            assert [row.student_id for row in conn.execute(select(events_table).order_by(events_table.c.id))] == [
+                "ani", "budi"]
+        for at in ("nan", "inf", float("-inf"), 1e400):
+            with pytest.raises(ValueError):
+                parse_event({"student_id": "ani", "seed_id": "padi", "at": at})
+        tracker.close()
+        engine.dispose()
+
+
+def test_progress_api_and_summaries():
+    """Test recording views and attempts over HTTP and reading per-student and per-lesson results."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server = LocalServer(content_dir=os.path.join(temp_dir, "content"))
+        client = server.app.test_client()
+        events = [
+            {"student_id": "ani", "seed_id": "padi", "kind": "view", "page": "index.html"},
+            {"student_id": "ani", "seed_id": "padi", "kind": "attempt", "exercise": "0", "correct": False},
+            {"student_id": "ani", "seed_id": "padi", "kind": "attempt", "exercise": "0", "correct": True},
+            {"student_id": "budi", "seed_id": "padi", "kind": "attempt", "exercise": "1", "correct": True},
+            {"student_id": "ani", "seed_id": "jagung", "kind": "view"},
+        ]
+        response = client.post("/api/progress", json={"events": events})
+        assert response.status_code == 202 and response.get_json()["accepted"] == 5
+        # sendBeacon posts a single event as text/plain
+        client.post("/api/progress", data='{"student_id": "budi", "seed_id": "padi"}',
+                    content_type="text/plain")
+
+        ani = client.get("/api/progress/students/ani").get_json()
+        assert (ani["page_views"], ani["attempts"], ani["correct"]) == (2, 2, 1)
+        assert [lesson["seed_id"] for lesson in ani["lessons"]] == ["jagung", "padi"]
+
+        padi = client.get("/api/progress/lessons/padi").get_json()
+        assert padi["students"] == 2 and padi["page_views"] == 2 and padi["accuracy"] == 2 / 3
+        assert [(e["exercise"], e["attempts"], e["correct"]) for e in padi["exercises"]] == [("0", 2, 1), ("1", 1, 1)]
+
+        assert client.get("/api/progress/students/citra").status_code == 404
+        assert client.post("/api/progress", json={"seed_id": "padi"}).status_code == 400
+        assert client.post("/api/progress", json={"student_id": "a", "seed_id": "b",
+                                                  "kind": "dance"}).status_code == 400
+        server.close()
+
+
+def test_generated_pages_report_progress():
+    """Test that generated lesson pages report views and quiz attempts to the server."""
+    page = HTMLGenerator().create_interactive_page("Padi", "<p>Menanam padi</p>", [
+        {"question": "Kapan padi dipanen?", "options": ["Musim kemarau", "Musim hujan"],
+         "correct_answer": "Musim kemarau"}])
+    assert '"/api/progress"' in page
+    assert 'reportProgress({kind: "view"})' in page
+    assert 'kind: "attempt"' in page
@@ -0,0 +1,120 @@
+"""
+Tests for EduSeedbank publish pipeline.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+
+import pytest
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.lora import LoRaNode
+from eduseedbank.network.transfer import TransferManager
+from eduseedbank.network.transport import decode_message
+from eduseedbank.publish import STAGES, publish
+from eduseedbank.server.archive import SeedArchive
+from eduseedbank.server.planting import verify_archive
+
+
+def _make_lesson(directory):
+    os.makedirs(os.path.join(directory, "gambar"))
+    with open(os.path.join(directory, "lesson.json"), "w") as f:
+        json.dump({"title": "Menanam Padi", "subject": "Pertanian",
+                   "pages": {"pengantar.txt": {"title": "Pengantar", "exercises": [
+                       {"question": "Di mana padi ditanam?", "options": ["sawah", "laut"],
+                        "correct_answer": "sawah"}]}}}, f)
+    with open(os.path.join(directory, "pengantar.txt"), "w") as f:
+        f.write("Padi ditanam di sawah.\n\nSawah perlu air.")
+    with open(os.path.join(directory, "ringkasan.html"), "w") as f:
+        f.write("<h2>Ringkasan</h2>")
+    with open(os.path.join(directory, "gambar", "sawah.png"), "wb") as f:
+        f.write(random.Random(0).getrandbits(8 * 5000).to_bytes(5000, "little"))
+    with open(os.path.join(directory, "video.mp4"), "wb") as f:
+        f.write(random.Random(1).getrandbits(8 * 300 * 1024).to_bytes(300 * 1024, "little"))
+
+
+def test_publish_builds_seed_and_frames():
+    """Test that a lesson folder becomes a valid seed archive and frames that reassemble into it."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lesson = os.path.join(temp_dir, "lesson")
+        _make_lesson(lesson)
+        result = publish(lesson, os.path.join(temp_dir, "out", "padi"), transcode=False, chunk_size=100)
+
+        verify_archive(result.seed_path)
+        archive = SeedArchive(result.seed_path)
+        assert set(archive.members) == {"metadata.json", "pengantar.html", "ringkasan.html",
+                                        "gambar/sawah.png", "video.mp4"}
+        assert json.loads(archive.read("metadata.json"))["title"] == "Menanam Padi"
+        page = archive.read("pengantar.html").decode()
+        assert "<title>Pengantar</title>" in page and "Di mana padi ditanam?" in page
+        assert archive.members["video.mp4"].stored and archive.members["pengantar.html"].deflated
+
+        with open(result.seed_path, "rb") as f:
+            seed = f.read()
+        with open(result.frames_path, "rb") as f:
+            frames = [decode_message(line).payload for line in f]
+        assert len(frames) == result.frames == -(-len(seed) // 100)
+        assert all(frame["total"] == len(frames) and frame["size"] == len(seed) for frame in frames)
+        assert [frame["last"] for frame in frames].count(True) == 1 and frames[-1]["last"]
+        assert b"".join(base64.b64decode(frame["data"]) for frame in frames) == seed
+        assert frames[0]["digest"] == result.digest == hashlib.sha256(seed).hexdigest()
+        assert [stage.name for stage in result.stages] == list(STAGES)
+
+
+def test_published_frames_reach_a_transfer_manager():
+    """Test that a receiving TransferManager turns the published frames back into the seed archive."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lesson = os.path.join(temp_dir, "lesson")
+        _make_lesson(lesson)
+        result = publish(lesson, os.path.join(temp_dir, "out", "padi"), transcode=False, chunk_size=100)
+
+        school = LoRaNode("school1", verbose=False)
+        manager = TransferManager(school, archive_dir=os.path.join(temp_dir, "received"))
+        with open(result.frames_path, "rb") as f:
+            for line in f:
+                manager.handle_chunk(decode_message(line))
+
+        assert manager.completed == ["padi"] and manager.partials == {}
+        received = school.seed_storage["padi"]
+        assert received["title"] == "Menanam Padi"
+        with open(received["archive"], "rb") as f, open(result.seed_path, "rb") as g:
+            assert f.read() == g.read()
+        verify_archive(received["archive"])
+
+
+def test_failed_stage_stops_the_pipeline():
+    """Test that an error in one stage is raised and leaves no partial outputs behind."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lesson = os.path.join(temp_dir, "lesson")
+        _make_lesson(lesson)
+        with open(os.path.join(lesson, "rusak.txt"), "wb") as f:
+            f.write(b"\xff\xfe bukan utf-8")
+        with pytest.raises(UnicodeDecodeError):
+            publish(lesson, os.path.join(temp_dir, "padi"), transcode=False)
+        assert os.listdir(temp_dir) == ["lesson"]
+
+
+def test_renamed_members_must_not_collide():
+    """Test that two files packaged under the same name are refused before anything is written."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lesson = os.path.join(temp_dir, "lesson")
+        _make_lesson(lesson)
+        with open(os.path.join(lesson, "pengantar.md"), "w") as f:
+            f.write("Pengantar lain.")
+        with pytest.raises(ValueError, match="pengantar.html"):
+            publish(lesson, os.path.join(temp_dir, "padi"), transcode=False)
+        assert os.listdir(temp_dir) == ["lesson"]
+
+        os.remove(os.path.join(lesson, "pengantar.md"))
+        with open(os.path.join(lesson, "video.webm"), "wb") as f:
+            f.write(b"webm")
+        publish(lesson, os.path.join(temp_dir, "padi"), transcode=False)
+        with pytest.raises(ValueError, match="video.mp4"):
+            publish(lesson, os.path.join(temp_dir, "padi"), transcode=True)
@@ -0,0 +1,52 @@
+"""
+Tests for EduSeedbank server response cache.
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.server.response_cache import ResponseCache
+
+
+def test_lru_eviction_under_byte_cap_and_group_invalidation():
+    """Test that the least recently used entries go first and groups drop together."""
+    cache = ResponseCache(capacity_bytes=300, max_entry_bytes=200)
+    cache.put("padi", "a", b"a" * 100, 100)
+    cache.put("padi", "b", b"b" * 100, 100)
+    cache.put("jagung", "c", b"c" * 100, 100)
+    assert cache.get("padi", "a") is not None  # "b" is now the oldest
+    cache.put("jagung", "d", b"d" * 100, 100)
+    assert cache.get("padi", "b") is None
+    assert cache.used_bytes == 300 and cache.evictions == 1
+    assert not cache.put("padi", "huge", b"x" * 250, 250)
+
+    cache.invalidate("jagung")
+    assert len(cache) == 1 and cache.used_bytes == 100
+    assert cache.get("padi", "a") == b"a" * 100
+
+
+def test_concurrent_misses_build_once():
+    """Test that threads missing the same key share a single build."""
+    cache = ResponseCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        time.sleep(0.05)
+        return b"lesson", 6
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_build("padi", "page", build)))
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [b"lesson"] * 10
+    assert len(builds) == 1
+    assert cache.misses == 1 and cache.hits == 9
@@ -0,0 +1,142 @@
+"""
+Tests for the EduSeedbank asyncio network runtime.
+"""
+
+import os
+import sys
+import asyncio
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.lora import LoRaNetwork, LoRaNode, Message, MessageType
+from eduseedbank.network.runtime import AsyncNetworkRuntime, WallClock, run_messages
+
+
+def _make_network(count: int) -> LoRaNetwork:
+    network = LoRaNetwork()
+    for i in range(count):
+        network.add_node(LoRaNode(f"node{i}", verbose=False))
+    return network
+
+
+class _BurstNode(LoRaNode):
+    """Answers every ping with a burst of pongs."""
+
+    def __init__(self, node_id: str, burst: int):
+        super().__init__(node_id, verbose=False)
+        self.burst = burst
+
+    def receive_message(self, message: Message):
+        if message.msg_type != MessageType.NETWORK_PING:
+            return super().receive_message(message)
+        for _ in range(self.burst):
+            self.send_message(Message(MessageType.NETWORK_PONG, self.node_id, message.source, {}, 0))
+
+
+def test_seed_request_under_simulated_clock():
+    """Test that a request/response pair completes in virtual time."""
+    network = _make_network(2)
+    network.get_node("node0").store_seed("seed1", {"title": "Seed"})
+    request = Message(MessageType.SEED_REQUEST, "node1", "node0", {"seed_id": "seed1"}, 0)
+
+    runtime = run_messages(network, [request], latency=0.5)
+
+    assert "seed1" in network.get_node("node1").seed_storage
+    assert runtime.delivered == 2
+    assert runtime.clock.now() == 1.0
+    # The network falls back to synchronous delivery afterwards
+    assert network.runtime is None
+
+
+def test_many_nodes_ping_pong():
+    """Test that thousands of concurrent ping/pong exchanges all complete."""
+    count = 2000
+    network = _make_network(count)
+    pings = [Message(MessageType.NETWORK_PING, f"node{i}", f"node{(i + 1) % count}", {}, 0)
+             for i in range(count)]
+
+    runtime = run_messages(network, pings, latency=0.1)
+    assert runtime.delivered == 2 * count
+
+
+def test_drop_overflow_discards_when_queue_full():
+    """Test that a full queue drops messages under the drop policy."""
+    network = _make_network(2)
+    pings = [Message(MessageType.NETWORK_PING, "node1", "node0", {}, 0) for _ in range(10)]
+
+    async def _run():
+        runtime = AsyncNetworkRuntime(network, queue_size=2, overflow="drop")
+        runtime.start()
+        for ping in pings:
+            runtime.submit(ping)
+        await runtime.run_until_idle()
+        await runtime.stop()
+        return runtime
+
+    runtime = asyncio.run(_run())
+    # node0's queue takes two pings before its task runs; the rest are dropped,
+    # and the two pongs reach node1's empty queue
+    assert runtime.dropped == 8
+    assert runtime.delivered == 4
+
+
+def test_blocking_overflow_between_busy_peers():
+    """Test that two nodes with one-slot queues pinging each other do not deadlock."""
+    network = _make_network(2)
+    pings = [Message(MessageType.NETWORK_PING, f"node{i % 2}", f"node{(i + 1) % 2}", {}, 0) for i in range(10)]
+
+    async def _run():
+        runtime = AsyncNetworkRuntime(network, queue_size=1)
+        runtime.start()
+        for ping in pings:
+            network.get_node(ping.source).send_message(ping)
+        await asyncio.wait_for(runtime.run_until_idle(), timeout=5)
+        await runtime.stop()
+        return runtime
+
+    runtime = asyncio.run(_run())
+    assert runtime.delivered == 2 * len(pings) and runtime.dropped == 0
+
+
+def test_fast_sender_is_throttled():
+    """Test that a node cannot have more frames in flight than a queue holds."""
+    network = LoRaNetwork()
+    network.add_node(_BurstNode("node0", burst=50))
+    network.add_node(LoRaNode("node1", verbose=False))
+    ping = Message(MessageType.NETWORK_PING, "node1", "node0", {}, 0)
+
+    runtime = run_messages(network, [ping], queue_size=2)
+
+    assert runtime.delivered == 51 and runtime.dropped == 0
+    assert runtime.throttled > 0
+    assert runtime.peak_in_flight == 2
+
+
+def test_throttled_peers_do_not_deadlock():
+    """Test that two throttled nodes bursting at each other still drain."""
+    network = LoRaNetwork()
+    network.add_node(_BurstNode("node0", burst=20))
+    network.add_node(_BurstNode("node1", burst=20))
+    pings = [Message(MessageType.NETWORK_PING, "node0", "node1", {}, 0),
+             Message(MessageType.NETWORK_PING, "node1", "node0", {}, 0)]
+
+    async def _run():
+        runtime = AsyncNetworkRuntime(network, queue_size=1)
+        runtime.start()
+        for ping in pings:
+            network.get_node(ping.source).send_message(ping)
+        await asyncio.wait_for(runtime.run_until_idle(), timeout=5)
+        await runtime.stop()
+        return runtime
+
+    runtime = asyncio.run(_run())
+    assert runtime.delivered == 42 and runtime.dropped == 0
+
+
+def test_wall_clock_runtime():
+    """Test that the same handlers run against real time."""
+    network = _make_network(2)
+    ping = Message(MessageType.NETWORK_PING, "node0", "node1", {}, 0)
+    runtime = run_messages(network, [ping], clock=WallClock(), latency=0.01)
+    assert runtime.delivered == 2
@@ -0,0 +1,138 @@
+"""
+Tests for EduSeedbank per-node transmit scheduling.
+"""
+
+import os
+import sys
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.lora import Message, MessageType
+from eduseedbank.network.radio import frame_size
+from eduseedbank.network.scheduler import (
+    BACKGROUND, BULK, CONTROL, DutyCycleLimiter, FifoScheduler, ScheduledTransport, TransmitScheduler,
+    priority_of, simulate_control_latency
+)
+from eduseedbank.network.transport import Transport
+
+
+def _chunk(destination: str, seed_id: str, index: int) -> Message:
+    return Message(MessageType.SEED_CHUNK, "gateway", destination,
+                   {"seed_id": seed_id, "index": index, "data": "AAAA"}, 0)
+
+
+def _drain(scheduler: TransmitScheduler):
+    now, sent = 0.0, []
+    while len(scheduler):
+        start, airtime, _, message = scheduler.pop(scheduler.next_start(now))
+        now = start + airtime
+        sent.append(message)
+    return sent
+
+
+def test_control_jumps_ahead_of_bulk():
+    """Test that pings and requests go out before queued bulk data."""
+    scheduler = TransmitScheduler(region=None)
+    for i in range(5):
+        scheduler.enqueue(_chunk("school1", "a", i))
+    scheduler.enqueue(Message(MessageType.SEED_REQUEST, "gateway", "school2", {"seed_id": "b"}, 0))
+    scheduler.enqueue(Message(MessageType.NETWORK_PING, "gateway", "school2", {}, 0))
+
+    sent = _drain(scheduler)
+    assert [m.msg_type for m in sent[:2]] == [MessageType.NETWORK_PING, MessageType.SEED_REQUEST]
+
+
+def test_weighted_fair_queueing_between_transfers():
+    """Test that concurrent transfers interleave in proportion to their weights."""
+    scheduler = TransmitScheduler(region=None, weights={("school2", "b"): 2.0})
+    for i in range(30):
+        scheduler.enqueue(_chunk("school1", "a", i))
+    for i in range(30):
+        scheduler.enqueue(_chunk("school2", "b", i))
+
+    first = _drain(scheduler)[:30]
+    share_b = sum(1 for m in first if m.destination == "school2")
+    assert 18 <= share_b <= 22
+
+
+def test_background_yields_to_bulk_within_its_share():
+    """Test that background frames go after bulk data and stop at their duty-cycle share."""
+    scheduler = TransmitScheduler(duty_cycle=0.01, background_share=0.5)
+    for i in range(3):
+        prefetch = _chunk("school1", "next-week", i)
+        prefetch.payload["priority"] = BACKGROUND
+        scheduler.enqueue(prefetch)
+    scheduler.enqueue(_chunk("school2", "today", 0))
+
+    assert scheduler.pop(0.0)[3].payload["seed_id"] == "today"
+    # Fill half the hour's budget; background frames must wait, bulk frames need not
+    scheduler.limiter.record(1.0, 0.5 * 36.0 - scheduler.peek()[1] / 2)
+    assert scheduler.next_start(2.0) > 2.0
+    scheduler.enqueue(_chunk("school2", "today", 1))
+    assert scheduler.next_start(2.0) == 2.0
+
+
+def test_requested_priority_can_only_demote():
+    """Test that a requester cannot promote bulk data to control or name an unknown class."""
+    for requested in (CONTROL, 9, "0", None, True):
+        chunk = _chunk("school1", "a", 0)
+        chunk.payload["priority"] = requested
+        assert priority_of(chunk) == BULK
+    chunk.payload["priority"] = BACKGROUND
+    assert priority_of(chunk) == BACKGROUND
+
+    scheduler = TransmitScheduler(region=None)
+    for requested in (CONTROL, 9):
+        chunk = _chunk("school1", "a", requested)
+        chunk.payload["priority"] = requested
+        scheduler.enqueue(chunk)
+    scheduler.enqueue(Message(MessageType.NETWORK_PING, "gateway", "school2", {}, 0))
+    assert _drain(scheduler)[0].msg_type == MessageType.NETWORK_PING
+
+
+def test_duty_cycle_limiter_defers_transmissions():
+    """Test that the hourly budget pushes frames into the next window."""
+    limiter = DutyCycleLimiter(0.01)
+    limiter.record(0.0, 36.0)
+    assert limiter.earliest_start(100.0, 1.0) == 3600.0
+    assert DutyCycleLimiter(None).earliest_start(5.0, 100.0) == 5.0
+
+
+def test_priority_scheduler_cuts_control_latency():
+    """Test that control latency under bulk load beats FIFO by a wide margin."""
+    fair = simulate_control_latency(TransmitScheduler(region=None), seed=1)
+    fifo = simulate_control_latency(FifoScheduler(region=None), seed=1)
+    assert fair.control_messages == fifo.control_messages > 0
+    assert fair.p99 * 10 < fifo.p99
+
+    # Under the duty cycle FIFO sends no control frame at all; those still count
+    fair = simulate_control_latency(TransmitScheduler(), seed=1)
+    fifo = simulate_control_latency(FifoScheduler(), seed=1)
+    assert fifo.unsent_control == fifo.control_messages > fair.unsent_control
+    assert fifo.p50 > 100 * fair.p50
+
+
+def test_scheduled_transport_pump():
+    """Test that pumping sends frames back to back in priority order."""
+    class Recorder:
+        def __init__(self):
+            self.sent = []
+
+        def attach(self, node):
+            pass
+
+        def send(self, message):
+            self.sent.append(message)
+
+    recorder = Recorder()
+    transport = ScheduledTransport(recorder, TransmitScheduler(region=None), clock=lambda: 0.0)
+    transport.send(_chunk("school1", "a", 0))
+    transport.send(Message(MessageType.NETWORK_PING, "gateway", "school1", {}, 0))
+
+    assert transport.pump(0.0)[0].msg_type == MessageType.NETWORK_PING
+    assert transport.frames_sent == 1
+    transport.pump(10.0)
+    assert len(recorder.sent) == transport.frames_sent == 2
+    assert transport.bytes_sent == sum(frame_size(message) for message in recorder.sent)
+    assert isinstance(transport, Transport)
@@ -0,0 +1,315 @@
+"""
+Tests for EduSeedbank local server.
+"""
+
+import gzip
+import hashlib
+import os
+import sys
+import tempfile
+import zipfile
+from io import BytesIO
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.server.local_server import LocalServer
+
+PAGE = b"<html><body>" + b"Belajar menanam padi. " * 200 + b"</body></html>"
+VIDEO = bytes(range(256)) * 64
+
+
+def _make_archive(directory):
+    path = os.path.join(directory, "padi.seed")
+    with zipfile.ZipFile(path, "w") as zipf:
+        zipf.writestr("metadata.json", '{"title": "Padi"}')
+        zipf.writestr("index.html", PAGE, compress_type=zipfile.ZIP_DEFLATED)
+        zipf.writestr("video.mp4", VIDEO, compress_type=zipfile.ZIP_STORED)
+        zipf.writestr("style.css", b"body { color: green; }")
+        zipf.writestr("style.css.gz", gzip.compress(b"body { color: green; }"))
+    return path
+
+
+def _make_server(directory):
+    server = LocalServer(content_dir=os.path.join(directory, "content"))
+    server.plant_archive(_make_archive(directory))
+    return server, server.app.test_client()
+
+
+def test_serves_members_from_archive():
+    """Test that planted archive members are served with validators."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server, client = _make_server(temp_dir)
+        try:
+            assert server.seeds["padi"] == {"title": "Padi"}
+
+            response = client.get("/content/padi/index.html")
+            assert response.status_code == 200
+            assert response.data == PAGE
+            assert response.mimetype == "text/html"
+            assert response.headers["ETag"] and response.headers["Last-Modified"]
+
+            again = client.get("/content/padi/index.html",
+                               headers={"If-None-Match": response.headers["ETag"]})
+            assert again.status_code == 304
+            assert client.get("/content/padi/missing.html").status_code == 404
+        finally:
+            server.close()
+
+
+def test_range_request_on_stored_member():
+    """Test that a byte range of a stored video member comes back as 206."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server, client = _make_server(temp_dir)
+        try:
+            response = client.get("/content/padi/video.mp4", headers={"Range": "bytes=1000-1999"})
+            assert response.status_code == 206
+            assert response.data == VIDEO[1000:2000]
+            assert response.headers["Content-Range"] == f"bytes 1000-1999/{len(VIDEO)}"
+
+            response = client.get("/content/padi/video.mp4", headers={"Range": f"bytes={len(VIDEO)}-"})
+            assert response.status_code == 416
+        finally:
+            server.close()
+
+
+def test_precompressed_responses_when_accepted():
+    """Test that gzip clients get the deflate stream or the .gz sibling as-is."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server, client = _make_server(temp_dir)
+        try:
+            response = client.get("/content/padi/index.html", headers={"Accept-Encoding": "gzip"})
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert len(response.data) < len(PAGE)
+            assert gzip.decompress(response.data) == PAGE
+
+            response = client.get("/content/padi/style.css", headers={"Accept-Encoding": "gzip, br"})
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert gzip.decompress(response.data) == b"body { color: green; }"
+            assert response.mimetype == "text/css"
+        finally:
+            server.close()
+
+
+def test_planted_archives_survive_restart():
+    """Test that a new server indexes archives already in the content directory."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        _make_server(temp_dir)[0].close()
+        restarted = LocalServer(content_dir=os.path.join(temp_dir, "content"))
+        try:
+            response = restarted.app.test_client().get("/content/padi/video.mp4")
+            assert response.data == VIDEO
+        finally:
+            restarted.close()
+
+
+def test_upload_is_verified_and_planted_in_background():
+    """Test that a streamed upload returns a job that ends with the seed planted."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server = LocalServer(content_dir=os.path.join(temp_dir, "content"))
+        try:
+            client = server.app.test_client()
+            with open(_make_archive(temp_dir), "rb") as f:
+                body = f.read()
+
+            response = client.put("/api/seeds/padi/archive", input_stream=BytesIO(body),
+                                  headers={"Content-Length": str(len(body)),
+                                           "X-Seed-SHA256": hashlib.sha256(body).hexdigest()})
+            assert response.status_code == 202
+            job_id = response.get_json()["job_id"]
+            server.planting.wait(job_id, timeout=10)
+
+            status = client.get(response.headers["Location"]).get_json()
+            assert status["state"] == "planted" and status["size"] == len(body)
+            assert client.get("/content/padi/video.mp4").data == VIDEO
+        finally:
+            server.close()
+
+
+def test_corrupt_upload_fails_job():
+    """Test that an archive failing its CRC check is reported and not planted."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server = LocalServer(content_dir=os.path.join(temp_dir, "content"))
+        try:
+            client = server.app.test_client()
+            with open(_make_archive(temp_dir), "rb") as f:
+                body = bytearray(f.read())
+            position = body.index(VIDEO[:64]) + 100
+            body[position] ^= 0xFF
+
+            response = client.put("/api/seeds/padi/archive", input_stream=BytesIO(bytes(body)),
+                                  headers={"Content-Length": str(len(body))})
+            job = server.planting.wait(response.get_json()["job_id"], timeout=10)
+            assert job.state == "failed" and "CRC" in job.error
+            assert "padi" not in server.archives
+            assert os.listdir(os.path.join(temp_dir, "content", ".uploads")) == []
+        finally:
+            server.close()
+
+
+def test_unexpected_planting_error_fails_job(monkeypatch):
+    """Test that any error while planting fails the job and releases its waiters."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server = LocalServer(content_dir=os.path.join(temp_dir, "content"))
+        try:
+            def broken(*args, **kwargs):
+                raise RuntimeError("registry is gone")
+
+            monkeypatch.setattr(server, "plant_archive", broken)
+            with open(_make_archive(temp_dir), "rb") as f:
+                body = f.read()
+            response = server.app.test_client().put("/api/seeds/padi/archive", input_stream=BytesIO(body),
+                                                    headers={"Content-Length": str(len(body))})
+            job = server.planting.wait(response.get_json()["job_id"], timeout=10)
+            assert job.state == "failed" and job.error == "registry is gone"
+            assert os.listdir(os.path.join(temp_dir, "content", ".uploads")) == []
+        finally:
+            server.close()
+
+def test_registry_restores_seeds_without_reading_archives():
+    """Test that a restart lists seeds from the registry and indexes members lazily."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server, client = _make_server(temp_dir)
+        try:
+            client.post("/api/plant", json={"seed_id": "catatan", "seed_data": {"title": "Catatan"}})
+            job = server.planting.submit("rusak", os.path.join(temp_dir, "missing"), 0, "")
+            server.planting.wait(job.job_id, timeout=10)
+            server.search.wait(timeout=10)
+
+            restarted = LocalServer(content_dir=os.path.join(temp_dir, "content"))
+            try:
+                assert restarted.seeds == {"padi": {"title": "Padi"}, "catatan": {"title": "Catatan"}}
+                assert restarted.archives == {}
+                assert restarted.planting.get(job.job_id).state == "failed"
+
+                response = restarted.app.test_client().get("/content/padi/index.html")
+                assert response.data == PAGE
+                assert restarted.archives["padi"].version == 1
+                assert restarted.get_archive("catatan") is None
+            finally:
+                restarted.close()
+        finally:
+            server.close()
+
+
+def test_search_ranks_planted_content():
+    """Test that /api/search finds seeds by title and by the text of their pages."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server, client = _make_server(temp_dir)
+        try:
+            client.post("/api/plant", json={"seed_id": "jagung", "seed_data": {
+                "title": "Menanam Jagung", "description": "Padi dan jagung di lahan kering"}})
+            server.search.wait(timeout=10)
+
+            results = client.get("/api/search?q=padi").get_json()["results"]
+            assert [r["seed_id"] for r in results] == ["padi", "jagung"]
+            assert "[padi]" in results[0]["snippet"].lower()
+
+            prefix = client.get("/api/search?q=menan").get_json()["results"]
+            assert {r["seed_id"] for r in prefix} == {"padi", "jagung"}
+            assert client.get("/api/search?q=jagung").get_json()["results"][0]["seed_id"] == "jagung"
+            assert client.get("/api/search?q=%22%29").get_json()["results"] == []
+            assert len(client.get("/api/search?q=padi&limit=x").get_json()["results"]) == 2
+            assert len(client.get("/api/search?q=padi&limit=1").get_json()["results"]) == 1
+            assert client.get("/api/search?q=padi&limit=0").get_json()["results"] == []
+            assert client.get("/api/search?q=padi&limit=-1").get_json()["results"] == []
+            assert len(client.get("/api/search?q=padi&offset=-3").get_json()["results"]) == 2
+        finally:
+            server.close()
+
+
+def test_response_cache_serves_hot_members_and_invalidates_on_replant():
+    """Test that an inflated member is built once and replaced when its seed is replanted."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server, client = _make_server(temp_dir)
+        try:
+            for _ in range(5):
+                assert client.get("/content/padi/index.html").data == PAGE
+            assert client.get("/content/padi/index.html", headers={"Range": "bytes=0-11"}).data == PAGE[:12]
+            stats = client.get("/api/cache").get_json()
+            assert stats["misses"] == 1 and stats["hits"] == 5
+
+            path = os.path.join(temp_dir, "padi.seed")
+            with zipfile.ZipFile(path, "w") as zipf:
+                zipf.writestr("metadata.json", '{"title": "Padi 2"}')
+                zipf.writestr("index.html", b"<p>baru</p>", compress_type=zipfile.ZIP_DEFLATED)
+            server.plant_archive(path)
+            assert client.get("/content/padi/index.html").data == b"<p>baru</p>"
+            assert b"Padi 2" in client.get("/").data
+        finally:
+            server.close()
+
+
+def test_offline_bundle_precaches_members_and_versions_on_replant():
+    """Test that a seed's service worker lists revisioned members and changes when the seed does."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server, client = _make_server(temp_dir)
+        try:
+            manifest = client.get("/offline/padi/precache.json").get_json()
+            urls = {entry["url"]: entry["revision"] for entry in manifest["precache"]}
+            assert set(urls) == {"/content/padi/metadata.json", "/content/padi/index.html",
+                                 "/content/padi/video.mp4", "/content/padi/style.css"}
+
+            worker = client.get("/offline/padi/sw.js")
+            assert worker.mimetype == "text/javascript"
+            assert worker.headers["Service-Worker-Allowed"] == "/content/padi/"
+            assert manifest["cache"] in worker.get_data(as_text=True)
+            assert client.get("/offline/padi/sw.js", headers={"If-None-Match": worker.headers["ETag"]}).status_code == 304
+
+            page = client.get("/content/padi/index.html?v=" + urls["/content/padi/index.html"])
+            assert page.data == PAGE and "immutable" in page.headers["Cache-Control"]
+            assert client.get("/content/padi/index.html?v=old").headers["Cache-Control"] == "no-cache"
+            assert client.get("/offline/missing/sw.js").status_code == 404
+
+            path = os.path.join(temp_dir, "padi.seed")
+            with zipfile.ZipFile(path, "w") as zipf:
+                zipf.writestr("index.html", b"<p>baru</p>")
+            server.plant_archive(path)
+            replanted = client.get("/offline/padi/sw.js", headers={"If-None-Match": worker.headers["ETag"]})
+            assert replanted.status_code == 200 and replanted.headers["ETag"] != worker.headers["ETag"]
+            assert [e["url"] for e in client.get("/offline/padi/precache.json").get_json()["precache"]] == [
+                "/content/padi/index.html"]
+        finally:
+            server.close()
+
+
+def test_seed_listing_pages_filters_and_etags():
+    """Test /api/seeds legacy shape, pagination, filtering and 304 on an unchanged list."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server, client = _make_server(temp_dir)
+        try:
+            for index in range(5):
+                server.plant_seed(f"ipa-{index}", {"title": f"IPA {index}", "subject": "IPA"})
+            server.plant_seed("ips-0", {"title": "Sejarah", "subject": "IPS"})
+
+            response = client.get("/api/seeds")
+            assert sorted(response.get_json()) == ["ipa-0", "ipa-1", "ipa-2", "ipa-3", "ipa-4", "ips-0", "padi"]
+            etag = response.headers["ETag"]
+            assert client.get("/api/seeds", headers={"If-None-Match": etag}).status_code == 304
+
+            page = client.get("/api/seeds?subject=ipa&limit=2&offset=2").get_json()
+            assert page["total"] == 5
+            assert [s["seed_id"] for s in page["seeds"]] == ["ipa-2", "ipa-3"]
+            assert client.get("/api/seeds?q=sejarah").get_json()["seeds"][0]["seed_id"] == "ips-0"
+            assert len(client.get("/api/seeds?limit=many").get_json()["seeds"]) == 7
+            for limit in ("0", "-1"):
+                empty = client.get(f"/api/seeds?limit={limit}").get_json()
+                assert empty["seeds"] == [] and empty["total"] == 7 and empty["limit"] == 0
+
+            server.plant_seed("ipa-5", {"title": "IPA 5", "subject": "IPA"})
+            assert client.get("/api/seeds", headers={"If-None-Match": etag}).status_code == 200
+        finally:
+            server.close()
+
+
+def test_serves_members_without_pread(monkeypatch):
+    """Test that members are read by seek and read on platforms without os.pread."""
+    monkeypatch.delattr(os, "pread", raising=False)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server, client = _make_server(temp_dir)
+        try:
+            assert client.get("/content/padi/index.html").data == PAGE
+            response = client.get("/content/padi/video.mp4", headers={"Range": "bytes=1000-1999"})
+            assert response.data == VIDEO[1000:2000]
+        finally:
+            server.close()
@@ -0,0 +1,93 @@
+"""
+Tests for EduSeedbank disk-backed node seed storage.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.lora import LoRaNode
+from eduseedbank.network.storage import DiskSeedStore
+
+
+def test_store_persists_across_restart():
+    """Test that stored seeds survive reopening the store."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = DiskSeedStore(temp_dir, hot_items=0)
+        store["seed/1"] = {"title": "Pertanian", "files": ["a.html"]}
+        store.pin("seed/1")
+
+        reopened = DiskSeedStore(temp_dir)
+        assert list(reopened.keys()) == ["seed/1"]
+        assert reopened["seed/1"]["title"] == "Pertanian"
+        assert "seed/1" in reopened.pinned
+
+
+def test_reads_return_copies():
+    """Test that changing a stored or returned seed does not change the store."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = DiskSeedStore(temp_dir)
+        seed = {"title": "Pertanian", "files": ["a.html"]}
+        store["seed"] = seed
+        seed["files"].append("b.html")
+
+        first = store["seed"]
+        first["files"].append("c.html")
+        assert store["seed"] == {"title": "Pertanian", "files": ["a.html"]}
+
+
+def test_lru_eviction_respects_pins():
+    """Test that the quota evicts the least recently used unpinned seed."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = DiskSeedStore(temp_dir)
+        store["a"] = {"data": "x" * 100}
+        store.quota_bytes = store.used_bytes * 3
+        store["b"] = {"data": "x" * 100}
+        store["c"] = {"data": "x" * 100}
+        store.pin("a")
+        store["b"]  # Touch b so c is the least recently used unpinned seed
+
+        store["d"] = {"data": "x" * 100}
+        assert set(store) == {"a", "b", "d"}
+        assert store.evictions == 1
+
+
+def test_lfu_eviction():
+    """Test that LFU evicts the least frequently read seed."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = DiskSeedStore(temp_dir, policy="lfu")
+        store["a"] = {"data": "x" * 100}
+        store.quota_bytes = store.used_bytes * 2
+        store["b"] = {"data": "x" * 100}
+        for _ in range(3):
+            store["a"]
+        store["b"]
+
+        store["c"] = {"data": "x" * 100}
+        assert set(store) == {"a", "c"}
+
+
+def test_quota_full_of_pins_raises():
+    """Test that a store whose contents are all pinned refuses new seeds."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = DiskSeedStore(temp_dir)
+        store["a"] = {"data": "x" * 100}
+        store.quota_bytes = store.used_bytes
+        store.pin("a")
+        with pytest.raises(RuntimeError):
+            store["b"] = {"data": "y" * 100}
+        assert set(store) == {"a"}
+
+
+def test_node_uses_disk_store():
+    """Test that a node can be given a disk-backed store."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        node = LoRaNode("school1", verbose=False, seed_storage=DiskSeedStore(temp_dir))
+        node.store_seed("sample1", {"title": "Sample"})
+        assert os.path.exists(os.path.join(temp_dir, "sample1.seed"))
+        assert node.seed_storage["sample1"] == {"title": "Sample"}
@@ -0,0 +1,60 @@
+"""
+Tests for EduSeedbank network tracing.
+"""
+
+import os
+import sys
+import tempfile
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.lora import Message, MessageType
+from eduseedbank.network.topology import line
+from eduseedbank.network.trace import Tracer, analyse_trace, read_trace
+
+
+def _ping_along_line(tracer):
+    network = line(4).to_network()
+    network.multi_hop = True
+    network.set_tracer(tracer)
+    network.get_node("node3").send_message(
+        Message(MessageType.NETWORK_PING, "node3", "gateway", {"timestamp": 0}, 0))
+    return network
+
+
+def test_trace_file_rebuilds_message_paths():
+    """Test that a trace file replays into per-message paths and node counters."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "run.trace")
+        with Tracer(path=path, capacity=4) as tracer:
+            _ping_along_line(tracer)
+
+        analysis = analyse_trace(read_trace(path))
+        paths = {p.msg_type: p for p in analysis.paths.values()}
+        assert paths[MessageType.NETWORK_PING].hops == ["node3", "node2", "node1", "gateway"]
+        assert paths[MessageType.NETWORK_PONG].hops == ["gateway", "node1", "node2", "node3"]
+        assert len(analysis.latencies()) == 2
+        assert analysis.node_counters["node1"]["forward"] == 2
+        assert analysis.events == tracer.written
+
+
+def test_ring_buffer_keeps_most_recent_events():
+    """Test that an in-memory tracer overwrites its oldest events and saves the rest."""
+    tracer = Tracer(capacity=5)
+    _ping_along_line(tracer)
+    assert tracer.written > 5
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "ring.trace")
+        tracer.save(path)
+        events = read_trace(path)
+    assert len(events) == 5
+    assert events[-1].event == "receive" and events[-1].node == "node3"
+    assert events[-1].msg_type == MessageType.NETWORK_PONG
+
+
+def test_tracing_disabled_by_default():
+    """Test that nodes carry no tracer unless one is attached."""
+    network = _ping_along_line(None)
+    assert all(node.tracer is None for node in network.nodes.values())
@@ -0,0 +1,127 @@
+"""
+Tests for EduSeedbank network transports.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.network.lora import BROADCAST, LoRaNetwork, LoRaNode, Message, MessageType
+from eduseedbank.network.runtime import run_messages
+from eduseedbank.network.transport import (
+    InProcessTransport, PtyRadioHub, SerialTransport, Transport, UdpMulticastTransport,
+    decode_message, encode_message
+)
+
+
+def _wait_for(condition, timeout: float = 3.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_message_roundtrip():
+    """Test that a message survives serialization."""
+    message = Message(MessageType.SEED_REQUEST, "school1", "gateway", {"seed_id": "a"}, 12.5)
+    assert decode_message(encode_message(message)) == message
+
+
+def test_in_process_transport():
+    """Test that the in-process transport keeps direct delivery working."""
+    network = LoRaNetwork()
+    gateway = LoRaNode("gateway", verbose=False)
+    school = LoRaNode("school1", verbose=False)
+    network.add_node(gateway)
+    network.add_node(school)
+    for node in (gateway, school):
+        node.set_transport(InProcessTransport(network))
+    gateway.store_seed("sample1", {"title": "Sample"})
+
+    school.send_message(Message(MessageType.SEED_REQUEST, "school1", "gateway", {"seed_id": "sample1"}, 0))
+    assert "sample1" in school.seed_storage
+
+
+def test_in_process_broadcast_goes_through_runtime_queues():
+    """Test that broadcasts over the in-process transport are queued and delayed like unicast frames."""
+    network = LoRaNetwork()
+    nodes = [LoRaNode(name, verbose=False) for name in ("gateway", "school1", "school2")]
+    for node in nodes:
+        network.add_node(node)
+        node.set_transport(InProcessTransport(network))
+    nodes[0].connected_nodes = nodes[1:]
+
+    announce = Message(MessageType.SEED_DATA, "gateway", BROADCAST,
+                       {"seed_id": "sample1", "seed_data": {"title": "Sample"}}, 0)
+    runtime = run_messages(network, [announce], latency=0.5)
+    assert runtime.delivered == 2 and runtime.clock.now() == 0.5
+    assert all("sample1" in node.seed_storage for node in nodes[1:])
+
+
+def test_in_process_transport_relays_over_multiple_hops():
+    """Test that a relay using the in-process transport passes a request on instead of back to itself."""
+    network = LoRaNetwork()
+    network.multi_hop = True
+    nodes = [LoRaNode(name, verbose=False) for name in ("school1", "relay", "gateway")]
+    for node in nodes:
+        network.add_node(node)
+        node.set_transport(InProcessTransport(network))
+    for near, far in zip(nodes, nodes[1:]):
+        near.connect_to_node(far)
+        far.connect_to_node(near)
+    nodes[2].store_seed("sample1", {"title": "Sample"})
+
+    nodes[0].send_message(Message(MessageType.SEED_REQUEST, "school1", "gateway", {"seed_id": "sample1"}, 0))
+    assert "sample1" in nodes[0].seed_storage
+    assert nodes[1].transport.frames_sent == 2 and "sample1" not in nodes[1].seed_storage
+
+
+def test_transport_requires_send():
+    """Test that the Transport base class cannot be used without a send() implementation."""
+    with pytest.raises(TypeError):
+        Transport()
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="pseudo-terminals require POSIX")
+def test_serial_pty_transport():
+    """Test a seed request over the pty-based serial radio emulator."""
+    hub = PtyRadioHub(2)
+    gateway = LoRaNode("gateway", verbose=False)
+    school = LoRaNode("school1", verbose=False)
+    gateway.store_seed("sample1", {"title": "Sample"})
+    transports = [SerialTransport(hub.devices[0]), SerialTransport(hub.devices[1])]
+    gateway.set_transport(transports[0])
+    school.set_transport(transports[1])
+    try:
+        school.send_message(Message(MessageType.SEED_REQUEST, "school1", "gateway", {"seed_id": "sample1"}, 0))
+        assert _wait_for(lambda: "sample1" in school.seed_storage)
+    finally:
+        for transport in transports:
+            transport.close()
+        hub.close()
+
+
+def test_udp_multicast_transport():
+    """Test a ping/pong exchange over loopback multicast."""
+    ping_node = LoRaNode("node0", verbose=False)
+    pong_node = LoRaNode("node1", verbose=False)
+    transports = [UdpMulticastTransport(port=5097), UdpMulticastTransport(port=5097)]
+    try:
+        ping_node.set_transport(transports[0])
+        pong_node.set_transport(transports[1])
+    except OSError as e:
+        pytest.skip(f"multicast unavailable: {e}")
+    try:
+        ping_node.send_message(Message(MessageType.NETWORK_PING, "node0", "node1", {}, 0))
+        assert _wait_for(lambda: transports[0].frames_received == 1)
+        assert transports[1].frames_received == 1
+    finally:
+        for transport in transports:
+            transport.close()
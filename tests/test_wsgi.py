@@ -0,0 +1,108 @@
+"""
+Tests for EduSeedbank production WSGI server.
+"""
+
+import http.client
+import os
+import socket
+import sys
+import tempfile
+import threading
+import zipfile
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from eduseedbank.server.local_server import LocalServer
+from eduseedbank.server.wsgi import WSGIServer
+
+VIDEO = bytes(range(256)) * 256
+
+
+def _serve(app, **kwargs):
+    server = WSGIServer(app, "127.0.0.1", 0, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _echo_app(environ, start_response):
+    body = environ["wsgi.input"].read()
+    if environ["PATH_INFO"] == "/stream":
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [b"a" * 10, b"", b"b" * 5]
+    start_response("200 OK", [("Content-Type", "text/plain"), ("Content-Length", str(len(body) + 4))])
+    return [b"echo", body]
+
+
+def test_keep_alive_serves_several_requests_per_connection():
+    """Test that one connection carries sequential requests, bodies and chunked responses."""
+    server = _serve(_echo_app, workers=2)
+    try:
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        connection.request("POST", "/echo", body=b"padi")
+        response = connection.getresponse()
+        assert response.read() == b"echopadi"
+        sock = connection.sock
+
+        connection.request("GET", "/stream")
+        response = connection.getresponse()
+        assert response.getheader("Transfer-Encoding") == "chunked"
+        assert response.read() == b"a" * 10 + b"b" * 5
+
+        connection.request("POST", "/echo", body=iter([b"ja", b"gung"]),
+                           headers={"Transfer-Encoding": "chunked"}, encode_chunked=True)
+        assert connection.getresponse().read() == b"echojagung"
+        assert connection.sock is sock
+        connection.close()
+    finally:
+        server.shutdown()
+
+
+def test_pipelined_requests_and_bad_request():
+    """Test that pipelined requests are answered in order and garbage gets a 400."""
+    server = _serve(_echo_app, workers=1)
+    try:
+        with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+            sock.sendall(b"GET /a HTTP/1.1\r\nHost: x\r\n\r\n"
+                         b"POST /b HTTP/1.1\r\nHost: x\r\nContent-Length: 3\r\nConnection: close\r\n\r\nabc")
+            received = b""
+            while True:
+                data = sock.recv(4096)
+                if not data:
+                    break
+                received += data
+        assert received.count(b"HTTP/1.1 200 OK") == 2
+        assert received.endswith(b"echoabc")
+
+        with socket.create_connection(("127.0.0.1", server.port), timeout=5) as sock:
+            sock.sendall(b"NONSENSE\r\n\r\n")
+            assert sock.recv(4096).startswith(b"HTTP/1.1 400")
+    finally:
+        server.shutdown()
+
+
+def test_local_server_content_over_sendfile():
+    """Test that archive members and ranges come through the server's sendfile path intact."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        archive = os.path.join(temp_dir, "padi.seed")
+        with zipfile.ZipFile(archive, "w") as zipf:
+            zipf.writestr("metadata.json", '{"title": "Padi"}')
+            zipf.writestr("video.mp4", VIDEO)
+        local = LocalServer(content_dir=os.path.join(temp_dir, "content"))
+        local.plant_archive(archive)
+        server = _serve(local.app, workers=4)
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+            connection.request("GET", "/content/padi/video.mp4")
+            assert connection.getresponse().read() == VIDEO
+            connection.request("GET", "/content/padi/video.mp4", headers={"Range": "bytes=100-199"})
+            response = connection.getresponse()
+            assert response.status == 206 and response.read() == VIDEO[100:200]
+            connection.request("HEAD", "/content/padi/video.mp4")
+            response = connection.getresponse()
+            assert response.getheader("Content-Length") == str(len(VIDEO)) and response.read() == b""
+            connection.request("GET", "/api/seeds")
+            assert connection.getresponse().read().strip() == b'["padi"]'
+        finally:
+            server.shutdown()
+            local.close()